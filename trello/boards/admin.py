@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Board
+from .models import ArchivedBoard, Board, BoardImport
 
 @admin.register(Board)
 class BoardAdmin(admin.ModelAdmin):
@@ -9,8 +9,8 @@ class BoardAdmin(admin.ModelAdmin):
     This class customizes the Django admin interface for the Board model,
     defining how the model is displayed, filtered, and searched in the admin panel.
     """
-    list_display = ('title', 'owner', 'color', 'created_at', 'updated_at')
-    list_filter = ('created_at', 'updated_at', 'owner')
+    list_display = ('title', 'owner', 'color', 'is_template', 'created_at', 'updated_at')
+    list_filter = ('is_template', 'created_at', 'updated_at', 'owner')
     search_fields = ('title', 'owner__username')
     ordering = ('-created_at',)
     filter_horizontal = ('members',)
@@ -39,4 +39,51 @@ class BoardAdmin(admin.ModelAdmin):
         """
         if db_field.name == 'members':
             kwargs['queryset'] = db_field.related_model.objects.order_by('username')
-        return super().formfield_for_manytomany(db_field, request, **kwargs)
\ No newline at end of file
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+
+@admin.register(ArchivedBoard)
+class ArchivedBoardAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the ArchivedBoard model, read-only.
+
+    Archived boards are restored through the API; their compressed documents are never loaded
+    by the admin.
+    """
+    list_display = ('title', 'owner', 'workspace', 'list_count', 'task_count', 'archived_at')
+    list_filter = ('archived_at',)
+    search_fields = ('title', 'owner__username')
+    ordering = ('-archived_at',)
+    exclude = ('data',)
+
+    def get_queryset(self, request):
+        """
+        Customize the queryset to leave the documents out.
+
+        Returns:
+            Queryset: The archived boards without their data, with the owner and workspace selected.
+        """
+        return super().get_queryset(request).defer('data').select_related('owner', 'workspace')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BoardImport)
+class BoardImportAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the BoardImport model, read-only.
+    """
+    list_display = ('id', 'owner', 'workspace', 'status', 'board', 'task_count', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('owner__username', 'error')
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
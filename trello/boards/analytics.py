@@ -0,0 +1,284 @@
+"""
+Board analytics: cumulative flow, throughput and overdue trends, read from daily rollups.
+
+Charting a board over time from lists_task would scan the tasks of the board on every
+request. The counts of each list at the end of each day (UTC) are instead kept in
+ListDailyRollup rows, and the analytics endpoint reads only those: a year of a board of ten
+lists is at most 3,650 rows, read on the (board, date, list) constraint.
+
+roll_up() runs daily from the beat schedule for the days since the last rollup of a
+database. It only writes rows for the boards that changed since the first of those days:
+the boards whose board row, lists or tasks were updated (tasks created, edited, moved,
+completed or deleted all bump updated_at), and the boards with tasks falling due, which
+become overdue without changing. The other boards kept their counts, so their last rows
+still hold, and readers carry them forward over the days without rows. A board without
+lists at the end of a day has one row with list_id 0, so an emptied board is not carried
+forward. backfill_rollups computes the rows of past days for all boards, in chunks.
+
+The counts of a day are computed from the timestamps of the tasks, as of the end of the day:
+a task is in its list if it was created before and not deleted by then, overdue if its due
+date had passed and it was not completed by then, and completed that day if its completed_at
+falls in it (set when the task is marked completed, see lists.serializers.TaskSerializer). Moves are not recorded, so tasks are counted in their current list, and purged
+tasks are gone: a backfill of past days approximates moves and deletions, where the daily
+rollup of the day before is exact but for the moves made since midnight.
+"""
+
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from lists.models import List, Task
+from .archive import insert_rows
+from .models import Board, ListDailyRollup
+
+ONE_DAY = timedelta(days=1)
+
+# Task rows read at a time
+TASK_CHUNK_SIZE = 2000
+
+# Columns of a rollup row read by the analytics
+ROLLUP_FIELDS = ('date', 'list_id', 'list_title', 'task_count', 'overdue_count', 'completed_count')
+
+
+def day_start(day):
+    """
+    Returns midnight (UTC) at the start of a day.
+    """
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def compute_rollups(board_ids, first_day, last_day, database=DEFAULT_DB_ALIAS):
+    """
+    Computes the rollup rows of boards for a range of days.
+
+    Each list and task is read once: the days it counts on form a range, added to the counts
+    of its list with a +1 at the start of the range and a -1 at its end, summed up afterwards.
+
+    Args:
+        board_ids (list): The boards; deleted ones are skipped.
+        first_day (date): The first day of the range.
+        last_day (date): The last day of the range.
+        database (str): The database of the boards.
+
+    Returns:
+        list: The rows, dicts of the columns of ListDailyRollup.
+    """
+    days = (last_day - first_day).days + 1
+    start, end = day_start(first_day), day_start(last_day + ONE_DAY)
+
+    def index(moment, default):
+        # The first day ending after the moment, within [0, days]
+        if moment is None:
+            return default
+        return min(max((moment - start) // ONE_DAY, 0), days)
+
+    boards = dict(
+        Board.objects.using(database).filter(pk__in=board_ids, created_at__lt=end).values_list('pk', 'created_at')
+    )
+    lists = {}
+    for list_id, board_id, title, created_at, deleted_at in (
+        List._base_manager.using(database)
+        .filter(Q(deleted_at__isnull=True) | Q(deleted_at__gte=start), board_id__in=list(boards), created_at__lt=end)
+        .values_list('id', 'board_id', 'title', 'created_at', 'deleted_at')
+    ):
+        first, last = index(created_at, 0), index(deleted_at, days)
+        lists[list_id] = (board_id, title, first, last, [0] * (days + 1), [0] * (days + 1), [0] * days)
+
+    tasks = (
+        Task._base_manager.using(database)
+        .filter(Q(deleted_at__isnull=True) | Q(deleted_at__gte=start), list_id__in=list(lists), created_at__lt=end)
+        .values_list('list_id', 'created_at', 'deleted_at', 'due_date', 'completed_at')
+        .iterator(chunk_size=TASK_CHUNK_SIZE)
+    )
+    for list_id, created_at, deleted_at, due_date, completed_at in tasks:
+        _board_id, _title, list_first, list_last, in_list, overdue, completed = lists[list_id]
+        first = max(index(created_at, 0), list_first)
+        last = min(index(deleted_at, days), list_last)
+        if first < last:
+            in_list[first] += 1
+            in_list[last] -= 1
+        if due_date is not None:
+            overdue_first = max(first, index(due_date, 0))
+            overdue_last = min(last, index(completed_at, days))
+            if overdue_first < overdue_last:
+                overdue[overdue_first] += 1
+                overdue[overdue_last] -= 1
+        if completed_at is not None and start <= completed_at < end:
+            completed[(completed_at - start) // ONE_DAY] += 1
+
+    adapt = connections[database].ops.adapt_datefield_value
+    dates = [adapt(first_day + offset * ONE_DAY) for offset in range(days)]
+    rows = []
+    covered = set()
+    for list_id, (board_id, title, first, last, in_list, overdue, completed) in lists.items():
+        task_count = overdue_count = 0
+        for offset in range(last):
+            task_count += in_list[offset]
+            overdue_count += overdue[offset]
+            if offset >= first:
+                covered.add((board_id, offset))
+                rows.append({
+                    'board_id': board_id, 'date': dates[offset], 'list_id': list_id, 'list_title': title,
+                    'task_count': task_count, 'overdue_count': overdue_count, 'completed_count': completed[offset],
+                })
+    rows.extend(
+        {'board_id': board_id, 'date': dates[offset], 'list_id': 0, 'list_title': '',
+         'task_count': 0, 'overdue_count': 0, 'completed_count': 0}
+        for board_id, created_at in boards.items() for offset in range(index(created_at, 0), days)
+        if (board_id, offset) not in covered
+    )
+    return rows
+
+
+def write_rollups(board_ids, first_day, last_day, database=DEFAULT_DB_ALIAS):
+    """
+    Replaces the rollup rows of boards for a range of days, in one transaction.
+
+    Args:
+        board_ids (list): The boards; deleted ones get no rows.
+        first_day (date): The first day of the range.
+        last_day (date): The last day of the range.
+        database (str): The database of the boards.
+
+    Returns:
+        int: The number of rows written.
+    """
+    with transaction.atomic(using=database):
+        ListDailyRollup.objects.using(database).filter(
+            board_id__in=board_ids, date__gte=first_day, date__lte=last_day
+        )._raw_delete(database)
+        rows = compute_rollups(board_ids, first_day, last_day, database)
+        insert_rows(ListDailyRollup, rows, database)
+    return len(rows)
+
+
+def changed_boards(since, until, database=DEFAULT_DB_ALIAS):
+    """
+    Returns the boards whose counts may have changed over a range of time.
+
+    Args:
+        since (datetime): The start of the range.
+        until (datetime): The end of the range, for the tasks falling due.
+        database (str): The database of the boards.
+
+    Returns:
+        list: The board ids, sorted, deleted boards included.
+    """
+    boards = set(Board._base_manager.using(database).filter(updated_at__gte=since).values_list('pk', flat=True))
+    boards.update(
+        List._base_manager.using(database).filter(updated_at__gte=since).values_list('board_id', flat=True).distinct()
+    )
+    boards.update(
+        Task._base_manager.using(database)
+        .filter(Q(updated_at__gte=since) | Q(due_date__gte=since, due_date__lt=until))
+        .values_list('list__board_id', flat=True).distinct()
+    )
+    return sorted(boards)
+
+
+def in_chunks(ids, chunk_size):
+    """
+    Yields lists of at most chunk_size ids.
+    """
+    ids = iter(ids)
+    while chunk := list(islice(ids, chunk_size)):
+        yield chunk
+
+
+def roll_up(database=DEFAULT_DB_ALIAS, today=None, chunk_size=None):
+    """
+    Writes the rollup rows of the days since the last rollup, for the boards that changed.
+
+    The days run from the day after the last day rolled up (yesterday on the first run) to
+    yesterday. The boards are written BOARD_ROLLUP_CHUNK_SIZE at a time, each chunk in its own
+    transaction.
+
+    Args:
+        database (str): 'default' or a workspace database.
+        today (date, optional): The current day (UTC).
+        chunk_size (int, optional): Boards per chunk, BOARD_ROLLUP_CHUNK_SIZE by default.
+
+    Returns:
+        dict: The number of 'days' rolled up, 'boards' changed and 'rows' written.
+    """
+    chunk_size = chunk_size or settings.BOARD_ROLLUP_CHUNK_SIZE
+    last_day = (today or timezone.now().date()) - ONE_DAY
+    latest = ListDailyRollup.objects.using(database).aggregate(latest=Max('date'))['latest']
+    first_day = latest + ONE_DAY if latest else last_day
+    if first_day > last_day:
+        return {'days': 0, 'boards': 0, 'rows': 0}
+
+    board_ids = changed_boards(day_start(first_day), day_start(last_day + ONE_DAY), database)
+    rows = 0
+    for chunk in in_chunks(board_ids, chunk_size):
+        rows += write_rollups(chunk, first_day, last_day, database)
+    return {'days': (last_day - first_day).days + 1, 'boards': len(board_ids), 'rows': rows}
+
+
+def board_analytics(board_id, first_day, last_day):
+    """
+    Returns the analytics of a board over a range of days, read from its rollup rows only.
+
+    The counts of the days without rows are those of the last day with rows before them,
+    from the range or before it.
+
+    Args:
+        board_id (int): The board.
+        first_day (date): The first day of the range.
+        last_day (date): The last day of the range.
+
+    Returns:
+        dict: The 'dates' of the range; for each list on the board during the range, its
+        'id', latest 'title' and the 'tasks' in it each day ('lists', the cumulative flow);
+        the 'tasks', 'overdue' and 'completed' tasks of the board each day; and the tasks
+        completed each week, from Monday ('throughput').
+    """
+    rollups = ListDailyRollup.objects.filter(board_id=board_id)
+    before = rollups.filter(date__lt=first_day).order_by('-date').values('date')[:1]
+    rows = rollups.filter(
+        Q(date__gte=first_day, date__lte=last_day) | Q(date=before)
+    ).order_by('date', 'list_id').values_list(*ROLLUP_FIELDS)
+
+    by_date = {}
+    for row in rows:
+        by_date.setdefault(row[0], []).append(row)
+    days = (last_day - first_day).days + 1
+    dates = [first_day + offset * ONE_DAY for offset in range(days)]
+    state = {}
+    if by_date and min(by_date) < first_day:
+        state = {
+            list_id: (title, tasks, overdue)
+            for _date, list_id, title, tasks, overdue, _done in by_date.pop(min(by_date)) if list_id
+        }
+
+    lists = {}
+    totals = {'tasks': [], 'overdue': [], 'completed': []}
+    weeks = {}
+    for offset, day in enumerate(dates):
+        completed = 0
+        if day in by_date:
+            state = {}
+            for _date, list_id, title, tasks, overdue, done in by_date[day]:
+                completed += done
+                if list_id:
+                    state[list_id] = (title, tasks, overdue)
+        for list_id, (title, tasks, _overdue) in state.items():
+            series = lists.setdefault(list_id, {'id': list_id, 'title': title, 'tasks': [0] * days})
+            series['title'] = title
+            series['tasks'][offset] = tasks
+        totals['tasks'].append(sum(tasks for _title, tasks, _overdue in state.values()))
+        totals['overdue'].append(sum(overdue for _title, _tasks, overdue in state.values()))
+        totals['completed'].append(completed)
+        week = day - timedelta(days=day.weekday())
+        weeks[week] = weeks.get(week, 0) + completed
+
+    return {
+        'dates': dates,
+        'lists': sorted(lists.values(), key=lambda series: series['id']),
+        **totals,
+        'throughput': [{'week': week, 'completed': completed} for week, completed in weeks.items()],
+    }
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class BoardsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'boards'
+
+    def ready(self):
+        from django.db.models.signals import m2m_changed
+        from core.conditional import touch_on_m2m_change
+        from .models import Board
+
+        # Membership changes must change the ETag of the board
+        m2m_changed.connect(touch_on_m2m_change('members'), sender=Board.members.through, weak=False)
@@ -0,0 +1,333 @@
+"""
+Archiving of boards into compressed cold storage.
+
+Old boards nobody works on any more still fill the board, list and task tables and every
+index on them. archive_board() moves a board out of them: the board, its labels,
+invitations, lists, tasks, assignees, task labels and checklist items are written as one
+JSON document, compressed with zlib into an ArchivedBoard row, and the rows are then
+deleted in chunks (see boards.trash.purge_board).
+
+The document is written outside of any transaction, reading the tasks in batches, so the
+write lock is only taken to store it; a board changed meanwhile is left for a later run.
+Reading an archived board streams the document as it is decompressed, without loading a
+single row back. restore_archived_board() loads the rows back, with their ids and
+timestamps, when the board is needed again.
+
+The document is {"board": {..., "members": [...]}, "labels": [...], "invitations": [...],
+"lists": [{..., "tasks": [{..., "assigned_users": [...], "labels": [...], "checklist": [...]}]}]},
+with the column names of the tables (e.g. "owner_id") as keys and users and labels by id.
+"""
+
+import json
+import zlib
+from datetime import datetime
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, DateTimeField, Max
+from django.utils import timezone
+
+from invitations.models import Invitation
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from .models import ArchivedBoard, Board
+from .trash import purge_board
+
+BOARD_FIELDS = ('id', 'workspace_id', 'title', 'owner_id', 'color', 'is_template', 'created_at', 'updated_at')
+LABEL_FIELDS = ('id', 'board_id', 'name', 'color', 'created_at', 'updated_at')
+INVITATION_FIELDS = ('id', 'board_id', 'invited_user_id', 'status', 'created_at')
+LIST_FIELDS = ('id', 'board_id', 'title', 'created_at', 'updated_at')
+TASK_FIELDS = (
+    'id', 'list_id', 'title', 'description', 'due_date', 'order',
+    'checklist_total_count', 'checklist_done_count', 'completed_at', 'created_at', 'updated_at',
+)
+CHECKLIST_FIELDS = ('id', 'task_id', 'text', 'done', 'order', 'created_at', 'updated_at')
+
+# Compressed bytes decompressed at a time when an archive is streamed
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def encode_value(value):
+    """
+    Encodes the values json does not know: datetimes, in ISO 8601 with their microseconds.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Cannot encode {type(value).__name__} values.')
+
+
+def dump(value):
+    return json.dumps(value, default=encode_value, separators=(',', ':'))
+
+
+def with_related(tasks, database, batch_size):
+    """
+    Adds their assignees, labels and checklist items to task rows, batch_size tasks at a time.
+
+    Args:
+        tasks (iterable): Task rows (dicts of TASK_FIELDS).
+        database (str): The database of the tasks.
+        batch_size (int): Tasks whose related rows are read with one query per table.
+
+    Yields:
+        dict: The task rows, with 'assigned_users', 'labels' and 'checklist'.
+    """
+    tasks = iter(tasks)
+    while batch := list(islice(tasks, batch_size)):
+        ids = [task['id'] for task in batch]
+        related = {task_id: {'assigned_users': [], 'labels': [], 'checklist': []} for task_id in ids}
+        assignees = Task.assigned_users.through.objects.using(database).filter(task_id__in=ids)
+        for task_id, user_id in assignees.order_by('task_id', 'user_id').values_list('task_id', 'user_id'):
+            related[task_id]['assigned_users'].append(user_id)
+        task_labels = TaskLabel.objects.using(database).filter(task_id__in=ids)
+        for task_id, label_id in task_labels.order_by('task_id', 'label_id').values_list('task_id', 'label_id'):
+            related[task_id]['labels'].append(label_id)
+        items = ChecklistItem.objects.using(database).filter(task_id__in=ids).order_by('task_id', 'order', 'id')
+        for item in items.values(*CHECKLIST_FIELDS):
+            related[item['task_id']]['checklist'].append(item)
+        for task in batch:
+            task.update(related[task['id']])
+            yield task
+
+
+def board_document(board_id, database, batch_size, counts):
+    """
+    Yields the JSON document of a board in pieces, reading its tasks batch_size at a time.
+
+    Deleted lists and tasks are left out.
+
+    Args:
+        board_id (int): The board.
+        database (str): The database of the board.
+        batch_size (int): Tasks read at a time.
+        counts (dict): Receives the number of 'lists' and 'tasks' in the document.
+
+    Yields:
+        str: Consecutive pieces of the document.
+    """
+    board = Board._base_manager.using(database).filter(pk=board_id).values(*BOARD_FIELDS).get()
+    members = Board.members.through.objects.using(database).filter(board_id=board_id)
+    board['members'] = list(members.order_by('user_id').values_list('user_id', flat=True))
+    labels = Label.objects.using(database).filter(board_id=board_id).order_by('id').values(*LABEL_FIELDS)
+    invitations = Invitation.objects.using(database).filter(board_id=board_id).order_by('id')
+    yield (
+        f'{{"board":{dump(board)},"labels":{dump(list(labels))},'
+        f'"invitations":{dump(list(invitations.values(*INVITATION_FIELDS)))},"lists":['
+    )
+
+    lists = List._base_manager.using(database).filter(board_id=board_id, deleted_at__isnull=True).order_by('id')
+    # In the order of the lists, so that each list's tasks follow each other
+    tasks = Task._base_manager.using(database).filter(
+        list__board_id=board_id, list__deleted_at__isnull=True, deleted_at__isnull=True
+    ).order_by('list_id', 'order', 'id').values(*TASK_FIELDS).iterator(chunk_size=batch_size)
+    groups = groupby(with_related(tasks, database, batch_size), key=itemgetter('list_id'))
+    list_id, list_tasks = next(groups, (None, ()))
+    for list_index, list_row in enumerate(lists.values(*LIST_FIELDS)):
+        yield (',' if list_index else '') + dump(list_row)[:-1] + ',"tasks":['
+        if list_id == list_row['id']:
+            for task_index, task in enumerate(list_tasks):
+                yield (',' if task_index else '') + dump(task)
+                counts['tasks'] += 1
+            list_id, list_tasks = next(groups, (None, ()))
+        yield ']}'
+        counts['lists'] += 1
+    yield ']}'
+
+
+def compress(pieces):
+    """
+    Compresses the pieces of a document with zlib as they are produced.
+
+    Returns:
+        bytes: The compressed document.
+    """
+    compressor = zlib.compressobj()
+    parts = [compressor.compress(piece.encode()) for piece in pieces]
+    parts.append(compressor.flush())
+    return b''.join(parts)
+
+
+def board_version(board_id, database):
+    """
+    Returns a value that changes with every change to a board shown by its document.
+
+    Every write through the API bumps the updated_at of the row it changes, or of the task
+    or board whose assignees, labels, checklist counters or members it changes; deletes are
+    soft and bump it too. Invitations have no updated_at and are counted by status.
+
+    Args:
+        board_id (int): The board.
+        database (str): The database of the board.
+
+    Returns:
+        tuple: The board's updated_at and deleted_at, the row counts and latest updated_at
+        of its lists, tasks, labels and checklist items, and its invitations by status.
+    """
+    def summary(model, **lookups):
+        return tuple(model._base_manager.using(database).filter(**lookups).aggregate(
+            count=Count('pk'), modified=Max('updated_at'),
+        ).values())
+
+    return (
+        Board._base_manager.using(database).filter(pk=board_id).values_list('updated_at', 'deleted_at').first(),
+        summary(List, board_id=board_id),
+        summary(Task, list__board_id=board_id),
+        summary(Label, board_id=board_id),
+        summary(ChecklistItem, task__list__board_id=board_id),
+        tuple(
+            Invitation.objects.using(database).filter(board_id=board_id)
+            .values_list('status').annotate(count=Count('pk')).order_by('status')
+        ),
+    )
+
+
+def archive_board(board_id, database=DEFAULT_DB_ALIAS, batch_size=None):
+    """
+    Archives a board: stores its document, hides the board, then deletes its rows in chunks.
+
+    Should the deletion be interrupted, the board stays hidden (as deleted) and its rows are
+    removed by the purge of deleted boards, or when the archive is restored.
+
+    Args:
+        board_id (int): The board.
+        database (str): The database of the board's workspace.
+        batch_size (int, optional): Tasks read and deleted at a time, BOARD_ARCHIVE_BATCH_SIZE
+            by default.
+
+    Returns:
+        ArchivedBoard or None: The archive, or None if the board does not exist, is deleted,
+        or changed while its document was written (archive it again later).
+    """
+    batch_size = batch_size or settings.BOARD_ARCHIVE_BATCH_SIZE
+    board = Board.objects.using(database).filter(pk=board_id).first()
+    if board is None:
+        return None
+    version = board_version(board_id, database)
+    counts = {'lists': 0, 'tasks': 0}
+    data = compress(board_document(board_id, database, batch_size, counts))
+
+    with transaction.atomic(using=database):
+        if board_version(board_id, database) != version:
+            return None
+        archived = ArchivedBoard.objects.using(database).create(
+            id=board.pk, workspace_id=board.workspace_id, title=board.title, owner_id=board.owner_id,
+            color=board.color, created_at=board.created_at, list_count=counts['lists'],
+            task_count=counts['tasks'], data=data,
+        )
+        members = Board.members.through.objects.using(database).filter(board_id=board_id)
+        ArchivedBoard.members.through.objects.using(database).bulk_create([
+            ArchivedBoard.members.through(archivedboard_id=board_id, user_id=user_id)
+            for user_id in members.values_list('user_id', flat=True)
+        ])
+        Board._base_manager.using(database).filter(pk=board_id).update(deleted_at=timezone.now())
+    purge_board(board_id, database, batch_size)
+    return archived
+
+
+def stream_document(archived):
+    """
+    Yields the JSON document of an archived board as it is decompressed.
+
+    Args:
+        archived (ArchivedBoard): The archive.
+
+    Yields:
+        bytes: Consecutive pieces of the document.
+    """
+    decompressor = zlib.decompressobj()
+    data = memoryview(archived.data)
+    for start in range(0, len(data), STREAM_CHUNK_SIZE):
+        piece = decompressor.decompress(data[start:start + STREAM_CHUNK_SIZE])
+        if piece:
+            yield piece
+    yield decompressor.flush()
+
+
+def insert_rows(model, rows, database):
+    """
+    Inserts rows of the document into a table as they are, with one executemany().
+
+    bulk_create() would build an instance per row and prepare each of its values through its
+    field, which took most of the time of restoring a large board, and split the rows into
+    INSERTs of a few hundred rows to stay under SQLite's limit of parameters per statement.
+    The rows come from the table's own columns, so only the datetimes need converting to the
+    database's format.
+
+    Args:
+        model: The model of the table.
+        rows (list): Dicts of column names to values, all with the same keys. Datetimes are
+            given as datetimes or ISO strings.
+        database (str): The database of the table.
+    """
+    if not rows:
+        return
+    connection = connections[database]
+    columns = [model._meta.get_field(column) for column in rows[0]]
+    datetimes = [index for index, field in enumerate(columns) if isinstance(field, DateTimeField)]
+    adapt = connection.ops.adapt_datetimefield_value
+    params = []
+    for row in rows:
+        values = list(row.values())
+        for index in datetimes:
+            if isinstance(values[index], str):
+                values[index] = datetime.fromisoformat(values[index])
+            if values[index] is not None:
+                values[index] = adapt(values[index])
+        params.append(values)
+    with connection.cursor() as cursor:
+        cursor.executemany('INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in columns),
+            ', '.join(['%s'] * len(columns)),
+        ), params)
+
+
+def restore_archived_board(archived):
+    """
+    Loads an archived board back into the board, list and task tables and deletes the archive.
+
+    The rows get their ids and timestamps back. Users deleted since the board was archived
+    are left out of its members, assignees and invitations. The rows an interrupted
+    archive_board() left behind, all of them in the document, are purged first with one
+    DELETE per table rather than in chunks, so the restore runs a fixed number of queries
+    whatever the size of the board. Runs in the caller's transaction.
+
+    Args:
+        archived (ArchivedBoard): The archive, read from the database of its workspace.
+    """
+    database = archived._state.db
+    document = json.loads(zlib.decompress(archived.data))
+    board = document['board']
+    members = board.pop('members')
+    lists, tasks, assignees, task_labels, checklist = [], [], [], [], []
+    for list_row in document['lists']:
+        for task in list_row.pop('tasks'):
+            assignees.extend({'task_id': task['id'], 'user_id': user_id} for user_id in task.pop('assigned_users'))
+            task_labels.extend({'task_id': task['id'], 'label_id': label_id} for label_id in task.pop('labels'))
+            checklist.extend(task.pop('checklist'))
+            tasks.append(task)
+        lists.append(list_row)
+
+    invitations = document['invitations']
+    user_ids = {*members, *(row['user_id'] for row in assignees), *(row['invited_user_id'] for row in invitations)}
+    users = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    tables = (
+        (Board, [board]),
+        (Board.members.through, [{'board_id': board['id'], 'user_id': user_id} for user_id in members if user_id in users]),
+        (Label, document['labels']),
+        (Invitation, [row for row in invitations if row['invited_user_id'] in users]),
+        (List, lists),
+        (Task, tasks),
+        (Task.assigned_users.through, [row for row in assignees if row['user_id'] in users]),
+        (TaskLabel, task_labels),
+        (ChecklistItem, checklist),
+    )
+    # Ids are never reused, so a board row with the archive's id is the hidden board of an
+    # interrupted archive_board()
+    if Board._base_manager.using(database).filter(pk=board['id'], deleted_at__isnull=False).exists():
+        purge_board(board['id'], database)
+    for model, rows in tables:
+        insert_rows(model, rows, database)
+    archived.delete()
@@ -0,0 +1,161 @@
+"""
+Deep cloning of boards, and board templates.
+
+A clone copies a board's labels, lists and tasks, with their labels and checklist items,
+optionally its members, the assignees of its tasks and their due dates. A template is a clone
+flagged with is_template, which boards are then cloned from.
+
+Each table is read with one query and written with one executemany() (see
+boards.archive.insert_rows), whatever the size of the board. The copies of labels, lists and
+tasks get ids from a block reserved at once in the table's SQLite sequence, so the new id of
+each row copied is known in memory and the rows pointing at it are copied with it, without
+reading the copies back. Saving each copied object would cost one query per row, and
+bulk_create() spent most of the time of cloning a large board preparing each value through
+its field and splitting the rows into INSERTs of a few hundred rows.
+
+The clone runs in the caller's transaction, on the database of the board's workspace; the
+transaction's write lock keeps the reserved ids to the clone.
+"""
+
+from django.db import connections
+from django.utils import timezone
+
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from workspaces.tenancy import users_within_board_quota
+from .archive import insert_rows
+from .models import Board
+
+TASK_FIELDS = (
+    'id', 'list_id', 'title', 'description', 'due_date', 'order', 'checklist_total_count', 'checklist_done_count',
+    'completed_at',
+)
+
+
+def reserve_ids(model, count, database):
+    """
+    Reserves consecutive ids of a table by moving its SQLite sequence past them.
+
+    Args:
+        model: The model of the table.
+        count (int): The ids reserved.
+        database (str): The database of the table.
+
+    Returns:
+        int: The first id reserved.
+    """
+    table = model._meta.db_table
+    with connections[database].cursor() as cursor:
+        # The sequence of a table has no row until a row is first inserted
+        cursor.execute(
+            f'INSERT INTO sqlite_sequence (name, seq) SELECT %s, COALESCE(MAX(id), 0) FROM {table} '
+            'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)',
+            [table, table],
+        )
+        cursor.execute('UPDATE sqlite_sequence SET seq = seq + %s WHERE name = %s RETURNING seq', [count, table])
+        last = cursor.fetchone()[0]
+    return last - count + 1
+
+
+def copy_rows(model, rows, database):
+    """
+    Inserts copies of rows under new ids, and returns the new id of each row copied.
+
+    Args:
+        model: The model of the rows.
+        rows (list): (id, copy) pairs: the id of a row copied, and the columns of its copy
+            (dicts with the same keys).
+        database (str): The database of the table.
+
+    Returns:
+        dict: The ids of the copies, by id of the row copied.
+    """
+    if not rows:
+        return {}
+    first = reserve_ids(model, len(rows), database)
+    ids = {row_id: first + index for index, (row_id, _copy) in enumerate(rows)}
+    insert_rows(model, [{'id': ids[row_id], **copy} for row_id, copy in rows], database)
+    return ids
+
+
+def clone_board(board, owner, workspace, title=None, template=False, members=True, assignees=False, due_dates=True):
+    """
+    Copies a board, with its labels, lists, tasks and checklist items, into a new board.
+
+    The copied members exclude the new owner, the users at their board quota in the workspace
+    and those beyond the board's member quota. Assignees are copied only if they are members
+    of the new board or its owner. The checklist items of a template are copied undone.
+
+    Args:
+        board (Board): The board copied.
+        owner: The owner of the new board.
+        workspace (Workspace): The workspace of the new board, on the database of the board's.
+        title (str, optional): The title of the new board, the board's by default.
+        template (bool): Whether the new board is a template.
+        members (bool): Whether to copy the members of the board.
+        assignees (bool): Whether to copy the assignees of the tasks.
+        due_dates (bool): Whether to copy the due dates of the tasks.
+
+    Returns:
+        Board: The new board.
+    """
+    clone = Board.objects.create(
+        title=title or board.title, owner=owner, workspace=workspace, color=board.color, is_template=template,
+    )
+    database = clone._state.db
+    now = timezone.now()
+    created = {'created_at': now, 'updated_at': now}
+
+    member_ids = []
+    if members:
+        member_ids = list(
+            Board.members.through.objects.filter(board_id=board.pk).exclude(user_id=owner.pk)
+            .order_by('id').values_list('user_id', flat=True)
+        )
+        member_ids = users_within_board_quota(workspace, member_ids)[:workspace.max_board_members]
+        insert_rows(
+            Board.members.through, [{'board_id': clone.pk, 'user_id': user_id} for user_id in member_ids], database
+        )
+
+    labels = copy_rows(Label, [
+        (row['id'], {'board_id': clone.pk, 'name': row['name'], 'color': row['color'], **created})
+        for row in Label.objects.filter(board_id=board.pk).order_by('id').values('id', 'name', 'color')
+    ], database)
+    lists = copy_rows(List, [
+        (row['id'], {'board_id': clone.pk, 'title': row['title'], **created})
+        for row in List.objects.filter(board_id=board.pk).order_by('id').values('id', 'title')
+    ], database)
+    tasks = copy_rows(Task, [
+        (row['id'], {
+            'list_id': lists[row['list_id']], 'title': row['title'], 'description': row['description'],
+            'due_date': row['due_date'] if due_dates else None, 'order': row['order'],
+            'checklist_total_count': row['checklist_total_count'],
+            'checklist_done_count': 0 if template else row['checklist_done_count'],
+            'completed_at': None if template else row['completed_at'], **created,
+        })
+        for row in Task.objects.filter(list_id__in=list(lists)).order_by('id').values(*TASK_FIELDS)
+    ], database)
+    if not tasks:
+        return clone
+
+    # Read by board with a join; the rows of deleted tasks are skipped
+    copied = {'task__list__board_id': board.pk}
+    if assignees:
+        allowed = {owner.pk, *member_ids}
+        insert_rows(Task.assigned_users.through, [
+            {'task_id': tasks[task_id], 'user_id': user_id}
+            for task_id, user_id in Task.assigned_users.through.objects.filter(**copied).order_by('id')
+            .values_list('task_id', 'user_id')
+            if task_id in tasks and user_id in allowed
+        ], database)
+    insert_rows(TaskLabel, [
+        {'task_id': tasks[task_id], 'label_id': labels[label_id]}
+        for task_id, label_id in TaskLabel.objects.filter(**copied).order_by('id').values_list('task_id', 'label_id')
+        if task_id in tasks
+    ], database)
+    insert_rows(ChecklistItem, [
+        {'task_id': tasks[row['task_id']], 'text': row['text'], 'done': row['done'] and not template,
+         'order': row['order'], **created}
+        for row in ChecklistItem.objects.filter(**copied).order_by('id').values('task_id', 'text', 'done', 'order')
+        if row['task_id'] in tasks
+    ], database)
+    return clone
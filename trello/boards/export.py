@@ -0,0 +1,186 @@
+"""
+Streaming export of boards as JSON Lines or CSV.
+
+Serializing a large board through ListSerializer builds every list, task and nested user
+in memory before the first byte is sent. An export streams instead: the tasks of each board
+are read with .iterator(), EXPORT_CHUNK_SIZE at a time, with one more query per chunk for
+the usernames of their assignees and one for the names of their labels, and the output is
+written (and gzip-compressed, if asked) as the rows arrive. Memory stays flat whatever the
+size of the boards.
+
+JSON Lines exports have one object per line: each board ("type": "board"), then each of its
+lists ("type": "list") followed by the list's tasks ("type": "task"). CSV exports have a
+header, then one row per task, with the id and title of its board and list.
+"""
+
+import csv
+import json
+import re
+import zlib
+from datetime import datetime
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.conf import settings
+
+from lists.models import List, Task, TaskLabel
+from .archive import encode_value
+from .models import Board
+
+# Content type of each export format
+EXPORT_FORMATS = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+
+BOARD_FIELDS = ('id', 'workspace_id', 'title', 'color', 'owner__username', 'created_at', 'updated_at')
+LIST_FIELDS = ('id', 'board_id', 'title', 'created_at', 'updated_at')
+TASK_FIELDS = (
+    'id', 'list_id', 'title', 'description', 'due_date', 'order',
+    'checklist_done_count', 'checklist_total_count', 'created_at', 'updated_at',
+)
+CSV_COLUMNS = (
+    'board_id', 'board', 'list_id', 'list', 'task_id', 'title', 'description', 'due_date', 'order',
+    'assigned_users', 'labels', 'checklist_done', 'checklist_total', 'created_at', 'updated_at',
+)
+
+# Characters of output gathered before a piece is compressed and sent
+PIECE_SIZE = 64 * 1024
+
+accepts_gzip = re.compile(r'\bgzip\b').search
+
+
+def with_names(tasks, database, chunk_size):
+    """
+    Adds the usernames of their assignees and the names of their labels to task rows.
+
+    Args:
+        tasks (iterable): Task rows (dicts of TASK_FIELDS).
+        database (str): The database of the tasks.
+        chunk_size (int): Tasks whose assignees and labels are read with one query each.
+
+    Yields:
+        dict: The task rows, with 'assigned_users' and 'labels' lists.
+    """
+    tasks = iter(tasks)
+    while chunk := list(islice(tasks, chunk_size)):
+        ids = [task['id'] for task in chunk]
+        names = {task_id: {'assigned_users': [], 'labels': []} for task_id in ids}
+        assignees = Task.assigned_users.through.objects.using(database).filter(task_id__in=ids)
+        for task_id, username in assignees.order_by('task_id', 'user__username').values_list('task_id', 'user__username'):
+            names[task_id]['assigned_users'].append(username)
+        task_labels = TaskLabel.objects.using(database).filter(task_id__in=ids)
+        for task_id, name in task_labels.order_by('task_id', 'label__name').values_list('task_id', 'label__name'):
+            names[task_id]['labels'].append(name)
+        for task in chunk:
+            task.update(names[task['id']])
+            yield task
+
+
+def export_records(board_ids, database, chunk_size=None):
+    """
+    Yields the boards, their lists and their tasks, in that order, reading the tasks in chunks.
+
+    Boards deleted in the meantime are skipped.
+
+    Args:
+        board_ids (iterable): The boards.
+        database (str): The database of the boards' workspace.
+        chunk_size (int, optional): Tasks read at a time, EXPORT_CHUNK_SIZE by default.
+
+    Yields:
+        tuple: ('board', row), ('list', row) or ('task', row), rows being dicts.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    for board_id in board_ids:
+        board = Board.objects.using(database).filter(pk=board_id).values(*BOARD_FIELDS).first()
+        if board is None:
+            continue
+        board['owner'] = board.pop('owner__username')
+        yield 'board', board
+
+        lists = List.objects.using(database).filter(board_id=board_id).order_by('id').values(*LIST_FIELDS)
+        # In the order of the lists, so that each list's tasks follow each other
+        tasks = Task.objects.using(database).filter(list__board_id=board_id).order_by(
+            'list_id', 'order', 'id'
+        ).values(*TASK_FIELDS).iterator(chunk_size=chunk_size)
+        groups = groupby(with_names(tasks, database, chunk_size), key=itemgetter('list_id'))
+        list_id, list_tasks = next(groups, (None, ()))
+        for list_row in list(lists):
+            yield 'list', list_row
+            # Tasks of a list created after the lists were read are left out
+            while list_id is not None and list_id < list_row['id']:
+                list_id, list_tasks = next(groups, (None, ()))
+            if list_id == list_row['id']:
+                for task in list_tasks:
+                    yield 'task', task
+                list_id, list_tasks = next(groups, (None, ()))
+
+
+def jsonl_lines(records):
+    """
+    Formats export records as JSON Lines.
+    """
+    for kind, row in records:
+        yield json.dumps({'type': kind, **row}, default=encode_value) + '\n'
+
+
+class Echo:
+    """
+    File-like object handing back what is written to it, so csv.writer returns its lines.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    """
+    Formats the tasks of export records as CSV, one row per task after a header row.
+    """
+    def iso(value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    board = list_row = None
+    for kind, row in records:
+        if kind == 'board':
+            board = row
+        elif kind == 'list':
+            list_row = row
+        else:
+            yield writer.writerow((
+                board['id'], board['title'], list_row['id'], list_row['title'], row['id'], row['title'],
+                row['description'], iso(row['due_date']), row['order'], ', '.join(row['assigned_users']),
+                ', '.join(row['labels']), row['checklist_done_count'], row['checklist_total_count'],
+                iso(row['created_at']), iso(row['updated_at']),
+            ))
+
+
+def export_stream(board_ids, database, export_format, compress=False, chunk_size=None):
+    """
+    Yields an export of boards as bytes, in pieces of about PIECE_SIZE characters.
+
+    Args:
+        board_ids (iterable): The boards.
+        database (str): The database of the boards' workspace.
+        export_format (str): One of EXPORT_FORMATS.
+        compress (bool): Whether to gzip the export as it is written.
+        chunk_size (int, optional): Tasks read at a time, EXPORT_CHUNK_SIZE by default.
+
+    Yields:
+        bytes: Consecutive pieces of the export.
+    """
+    format_lines = jsonl_lines if export_format == 'jsonl' else csv_lines
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    buffer, size = [], 0
+    for line in format_lines(export_records(board_ids, database, chunk_size)):
+        buffer.append(line)
+        size += len(line)
+        if size < PIECE_SIZE:
+            continue
+        piece = ''.join(buffer).encode()
+        buffer, size = [], 0
+        piece = compressor.compress(piece) if compressor else piece
+        if piece:
+            yield piece
+    piece = ''.join(buffer).encode()
+    yield compressor.compress(piece) + compressor.flush() if compressor else piece
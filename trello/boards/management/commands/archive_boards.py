@@ -0,0 +1,81 @@
+"""
+Archives the boards nobody changed for a while into compressed cold storage.
+
+A board is idle when neither it nor any of its lists and tasks was updated for
+BOARD_ARCHIVE_IDLE_DAYS (--idle-days). Each board is archived as by the API (see
+boards.archive): its document is written without the write lock, then its rows are deleted
+in chunks. Boards changed while they were being archived are skipped and picked up by the
+next run. The workspace databases are included.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from boards.archive import archive_board
+from boards.models import Board
+from lists.models import List, Task
+
+
+def idle_boards(database, cutoff):
+    """
+    Returns the ids of the boards of a database without changes since cutoff.
+
+    Args:
+        database (str): 'default' or a workspace database.
+        cutoff (datetime): The time of the latest change allowed.
+
+    Returns:
+        list: The board ids, oldest first.
+    """
+    lists = List._base_manager.filter(board_id=OuterRef('pk'), updated_at__gte=cutoff)
+    tasks = Task._base_manager.filter(list__board_id=OuterRef('pk'), updated_at__gte=cutoff)
+    boards = Board.objects.using(database).filter(updated_at__lt=cutoff).exclude(Exists(lists)).exclude(Exists(tasks))
+    return list(boards.order_by('updated_at').values_list('pk', flat=True))
+
+
+class Command(BaseCommand):
+    help = 'Archives the boards without changes for BOARD_ARCHIVE_IDLE_DAYS days, or the given boards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-days', type=int, default=None, help='Days without changes (BOARD_ARCHIVE_IDLE_DAYS)')
+        parser.add_argument('--board', type=int, action='append', default=[], help='A board to archive, idle or not')
+        parser.add_argument('--database', default=None, help='Only this database (default: all)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Tasks read and deleted at a time')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the boards that would be archived')
+
+    def handle(self, *args, **options):
+        idle_days = options['idle_days'] or settings.BOARD_ARCHIVE_IDLE_DAYS
+        cutoff = timezone.now() - timedelta(days=idle_days)
+        databases = [options['database']] if options['database'] else [DEFAULT_DB_ALIAS, *settings.WORKSPACE_DATABASES]
+
+        started = time.perf_counter()
+        archived = skipped = tasks = size = 0
+        for database in databases:
+            if options['board']:
+                board_ids = list(Board.objects.using(database).filter(pk__in=options['board']).values_list('pk', flat=True))
+            else:
+                board_ids = idle_boards(database, cutoff)
+            for board_id in board_ids:
+                if options['dry_run']:
+                    self.stdout.write(f'{database}: board {board_id}')
+                    continue
+                archive = archive_board(board_id, database, options['batch_size'])
+                if archive is None:
+                    skipped += 1
+                    continue
+                archived += 1
+                tasks += archive.task_count
+                size += len(archive.data)
+
+        if options['dry_run']:
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} board(s) with {tasks} task(s) into {size / 1024:.0f} KiB '
+            f'in {time.perf_counter() - started:.1f}s; {skipped} changed meanwhile and were skipped.'
+        ))
@@ -0,0 +1,55 @@
+"""
+Computes the analytics rollups of past days, for all boards or the given ones.
+
+The rows of the --days days up to yesterday are replaced, --chunk-size boards per
+transaction (see boards.analytics.write_rollups), so the write lock is only held for one
+chunk at a time. Run it once when the analytics are deployed: the daily rollup then only
+writes the boards that change. Moves and purges of past tasks are not recorded, so the past
+days count the tasks in their current lists, and without the purged ones.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from boards.analytics import in_chunks, write_rollups
+from boards.models import Board
+
+
+class Command(BaseCommand):
+    help = 'Computes the daily analytics rollups of the boards over the past days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='Days up to yesterday (default: 365)')
+        parser.add_argument('--board', type=int, action='append', default=[], help='Only this board (repeatable)')
+        parser.add_argument('--database', default=None, help='Only this database (default: all)')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Boards per transaction (BOARD_ROLLUP_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1.')
+        chunk_size = options['chunk_size'] or settings.BOARD_ROLLUP_CHUNK_SIZE
+        last_day = timezone.now().date() - timedelta(days=1)
+        first_day = last_day - timedelta(days=options['days'] - 1)
+        databases = [options['database']] if options['database'] else [DEFAULT_DB_ALIAS, *settings.WORKSPACE_DATABASES]
+
+        started = time.perf_counter()
+        boards = rows = 0
+        for database in databases:
+            queryset = Board.objects.using(database)
+            if options['board']:
+                queryset = queryset.filter(pk__in=options['board'])
+            board_ids = list(queryset.order_by('id').values_list('pk', flat=True))
+            for chunk in in_chunks(board_ids, chunk_size):
+                rows += write_rollups(chunk, first_day, last_day, database)
+                boards += len(chunk)
+                self.stdout.write(f'{database}: {boards} board(s), {rows} row(s)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {boards} board(s) from {first_day} to {last_day} into {rows} row(s) '
+            f'in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,61 @@
+"""
+Exports boards as JSON Lines or CSV, streamed to a file or to the standard output.
+
+The boards are given by id (--board), or by user (--user, the boards the user owns or is a
+member of). The export is the one of the export endpoints (see boards.export): tasks are
+read EXPORT_CHUNK_SIZE (--chunk-size) at a time and written as they are read.
+"""
+
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+from boards.export import EXPORT_FORMATS, export_stream
+from boards.models import Board
+
+
+class Command(BaseCommand):
+    help = 'Exports boards, or all the boards of a user, as JSON Lines or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, action='append', default=[], help='A board to export')
+        parser.add_argument('--user', help='Export the boards this username owns or is a member of')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='jsonl', dest='export_format')
+        parser.add_argument('--output', default='-', help='File written (default: the standard output)')
+        parser.add_argument('--gzip', action='store_true', help='Compress the export with gzip')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database of the boards')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Tasks read at a time')
+
+    def handle(self, *args, **options):
+        if not options['board'] and not options['user']:
+            raise CommandError('Give --board or --user.')
+        boards = Board.objects.using(options['database'])
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user {options['user']!r}.")
+            boards = boards.filter(Q(owner=user) | Q(members=user)).distinct()
+        if options['board']:
+            boards = boards.filter(pk__in=options['board'])
+        board_ids = list(boards.order_by('id').values_list('pk', flat=True))
+
+        started = time.perf_counter()
+        pieces = export_stream(
+            board_ids, options['database'], options['export_format'], options['gzip'], options['chunk_size']
+        )
+        output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        size = 0
+        try:
+            for piece in pieces:
+                output.write(piece)
+                size += len(piece)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {len(board_ids)} board(s), {size / 1024:.0f} KiB, in {time.perf_counter() - started:.1f}s.'
+        ))
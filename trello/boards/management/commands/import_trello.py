@@ -0,0 +1,54 @@
+"""
+Imports a Trello JSON export into a new board, as the import endpoint does (see
+boards.trello_import), printing the progress after each batch of cards.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from boards.trello_import import import_trello_board
+from workspaces.models import Workspace
+from workspaces.tenancy import personal_workspace, workspace_database
+
+
+class Command(BaseCommand):
+    help = 'Imports a Trello JSON export into a new board owned by a user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The Trello JSON export')
+        parser.add_argument('--user', required=True, help='Username of the owner of the new board')
+        parser.add_argument('--workspace', type=int, default=None, help="The workspace (default: the user's personal one)")
+        parser.add_argument('--batch-size', type=int, default=None, help='Cards inserted at a time')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"No user {options['user']!r}.")
+        if options['workspace'] is None:
+            workspace = personal_workspace(user)
+        else:
+            workspace = Workspace.objects.filter(pk=options['workspace']).first()
+            if workspace is None:
+                raise CommandError(f"No workspace {options['workspace']}.")
+
+        def report(imported, total):
+            self.stdout.write(f'{imported}/{total} cards')
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_trello_board(
+                    file, user, workspace, workspace_database(workspace.pk), options['batch_size'], progress=report
+                )
+        except OSError as error:
+            raise CommandError(error) from error
+        except ValidationError as error:
+            raise CommandError(' '.join(map(str, error.detail))) from error
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported board {result['board'].pk} with {result['lists']} list(s), {result['tasks']} task(s), "
+            f"{result['checklist_items']} checklist item(s) and {result['members']} member(s) "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
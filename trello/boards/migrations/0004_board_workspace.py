@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def create_personal_workspaces(apps, schema_editor):
+    """
+    Puts the existing boards in the personal workspace of their owner.
+    """
+    Board = apps.get_model('boards', 'Board')
+    Workspace = apps.get_model('workspaces', 'Workspace')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    db = schema_editor.connection.alias
+    owners = User.objects.using(db).filter(owned_boards__isnull=False).distinct()
+    Workspace.objects.using(db).bulk_create(
+        (Workspace(owner=owner, name=f"{owner.username}'s workspace", is_personal=True) for owner in owners.iterator()),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    personal = Workspace.objects.using(db).filter(owner_id=OuterRef('owner_id'), is_personal=True)
+    Board.objects.using(db).update(workspace_id=Subquery(personal.values('id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_members_alter_board_owner'),
+        ('workspaces', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='boards', to='workspaces.workspace'),
+        ),
+        migrations.RunPython(create_personal_workspaces, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='board',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='boards', to='workspaces.workspace'),
+        ),
+        migrations.AddIndex(
+            model_name='board',
+            index=models.Index(fields=['workspace', 'owner'], name='board_workspace_owner_idx'),
+        ),
+    ]
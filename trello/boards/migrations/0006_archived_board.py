@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0005_board_soft_delete'),
+        ('workspaces', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBoard',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('color', models.CharField(default='#FFFFFF', max_length=7)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('list_count', models.PositiveIntegerField(default=0)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('members', models.ManyToManyField(related_name='archived_board_memberships', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owned_archived_boards', to=settings.AUTH_USER_MODEL)),
+                ('workspace', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_boards', to='workspaces.workspace')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['workspace', 'owner'], name='archived_board_ws_owner_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0007_board_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='is_template',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0008_board_is_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('list_id', models.BigIntegerField()),
+                ('list_title', models.CharField(max_length=100)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('board', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='boards.board')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='rollup_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('board', 'date', 'list_id'), name='rollup_board_date_list_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0009_list_daily_rollup'),
+        ('workspaces', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedboard',
+            name='workspace',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_boards', to='workspaces.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='board',
+            name='workspace',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='boards', to='workspaces.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='boardimport',
+            name='workspace',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='board_imports', to='workspaces.workspace'),
+        ),
+    ]
@@ -2,31 +2,65 @@
 Django model for a Board entity.
 
 This module defines the Board model, which represents a board in the application.
-Each board has a title, an owner, members, a color, and timestamps for creation and updates.
+Each board belongs to a workspace and has a title, an owner, members, a color, and timestamps
+for creation, updates and (soft) deletion. A board flagged as a template is the model other
+boards are cloned from (see boards.cloning). Archived boards are moved out of the board, list
+and task tables into the ArchivedBoard model. Imports of Trello exports are tracked by the
+BoardImport model. The ListDailyRollup model holds the daily counts the board analytics are
+read from.
 """
 
 from django.db import models
 from django.conf import settings
+from core.softdelete import SoftDeleteManager
 
 class Board(models.Model):
     """
     Represents a board in the application.
 
     Attributes:
+        workspace (ForeignKey): The workspace owning the board, whose quotas apply to it.
+                              Boards are removed if the workspace is deleted (CASCADE).
         title (CharField): The title of the board, with a maximum length of 100 characters.
         owner (ForeignKey): The user who owns the board, linked to the AUTH_USER_MODEL.
                           Deleted boards are removed if the owner is deleted (CASCADE).
         members (ManyToManyField): Users who are members of the board, linked to AUTH_USER_MODEL.
         color (CharField): The color of the board in hexadecimal format, defaulting to white (#FFFFFF).
+        is_template (BooleanField): Whether the board is a template, saved from a board to be
+                                   cloned into new ones. Templates count toward the board quota.
         created_at (DateTimeField): Timestamp when the board was created, set automatically on creation.
         updated_at (DateTimeField): Timestamp when the board was last updated, updated automatically.
+        deleted_at (DateTimeField): When the board was deleted, null while it is not. A deleted
+                                   board and everything on it are hidden by the default manager
+                                   until they are purged (see core.softdelete).
     """
+    # Covered by the (workspace, owner) index. Without a constraint: the workspace is on the
+    # default database, the board may be on a workspace database
+    workspace = models.ForeignKey(
+        'workspaces.Workspace', on_delete=models.CASCADE, related_name='boards', db_index=False, db_constraint=False
+    )
     title = models.CharField(max_length=100)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='owned_boards')
     members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='board_memberships')
     color = models.CharField(max_length=7, default='#FFFFFF')
+    is_template = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = SoftDeleteManager()
+
+    class Meta:
+        """
+        Meta class for Board.
+
+        The boards of a workspace are listed, and counted per owner for its quotas, on one index.
+        The purge finds the deleted boards on a partial index, which holds only them.
+        """
+        indexes = [
+            models.Index(fields=['workspace', 'owner'], name='board_workspace_owner_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='board_deleted_idx'),
+        ]
 
     def __str__(self):
         """
@@ -35,4 +69,168 @@ class Board(models.Model):
         Returns:
             str: The title of the board.
         """
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class ArchivedBoard(models.Model):
+    """
+    Represents an archived board, kept out of the board, list and task tables.
+
+    The board's lists, tasks, labels, checklists and invitations are stored as one
+    zlib-compressed JSON document (see boards.archive). The fields needed to list and
+    authorize archived boards are copied to columns.
+
+    Attributes:
+        id (BigIntegerField): The id the board had, and gets back when it is restored.
+        workspace (ForeignKey): The workspace of the board. Removed with the workspace (CASCADE).
+        title (CharField): The title of the board.
+        owner (ForeignKey): The owner of the board. Removed with the owner (CASCADE).
+        members (ManyToManyField): The members of the board, who may read the archive.
+        color (CharField): The color of the board.
+        created_at (DateTimeField): When the board was created.
+        archived_at (DateTimeField): When the board was archived, set automatically.
+        list_count (PositiveIntegerField): The number of lists in the archive.
+        task_count (PositiveIntegerField): The number of tasks in the archive.
+        data (BinaryField): The compressed JSON document of the board.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    # Covered by the (workspace, owner) index. Without a constraint, as for Board.workspace
+    workspace = models.ForeignKey(
+        'workspaces.Workspace', on_delete=models.CASCADE, related_name='archived_boards', db_index=False,
+        db_constraint=False,
+    )
+    title = models.CharField(max_length=100)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='owned_archived_boards'
+    )
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='archived_board_memberships')
+    color = models.CharField(max_length=7, default='#FFFFFF')
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    list_count = models.PositiveIntegerField(default=0)
+    task_count = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+
+    class Meta:
+        """
+        Meta class for ArchivedBoard.
+
+        The archived boards of a workspace are listed per owner on one index, as boards are.
+        """
+        indexes = [
+            models.Index(fields=['workspace', 'owner'], name='archived_board_ws_owner_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Returns the string representation of the ArchivedBoard instance.
+
+        Returns:
+            str: The title of the board.
+        """
+        return self.title
+
+
+class BoardImport(models.Model):
+    """
+    Represents the import of a Trello JSON export into a new board (see boards.trello_import).
+
+    Small exports are imported during the upload; larger ones are stored and imported by a
+    Celery task, and the import is then followed through its status.
+
+    Attributes:
+        workspace (ForeignKey): The workspace of the new board. Removed with the workspace (CASCADE).
+        owner (ForeignKey): The user who uploaded the export, owner of the new board.
+                           Removed with the owner (CASCADE).
+        file (FileField): The uploaded export, until it is imported; empty for the exports
+                         imported during the upload.
+        status (CharField): 'pending', 'running', 'done' or 'failed'.
+        error (TextField): Why the import failed.
+        board (ForeignKey): The new board, once imported. Kept null if the board is deleted.
+        list_count (PositiveIntegerField): The number of lists imported.
+        task_count (PositiveIntegerField): The number of tasks imported (cards).
+        member_count (PositiveIntegerField): The number of Trello members matched to users.
+        created_at (DateTimeField): When the export was uploaded, set automatically.
+        finished_at (DateTimeField): When the import was done or failed.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    # Without a constraint, as for Board.workspace
+    workspace = models.ForeignKey(
+        'workspaces.Workspace', on_delete=models.CASCADE, related_name='board_imports', db_constraint=False
+    )
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='board_imports')
+    file = models.FileField(upload_to='board-imports/', blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    board = models.ForeignKey(Board, on_delete=models.SET_NULL, null=True, blank=True, related_name='imports')
+    list_count = models.PositiveIntegerField(default=0)
+    task_count = models.PositiveIntegerField(default=0)
+    member_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        """
+        Returns the string representation of the BoardImport instance.
+
+        Returns:
+            str: The import and its status.
+        """
+        return f'Import {self.pk} ({self.status})'
+
+
+class ListDailyRollup(models.Model):
+    """
+    Represents the counts of one list of a board at the end of one day (UTC), for the board
+    analytics (see boards.analytics).
+
+    A board has rows for the days it changed on; the days in between have the counts of the
+    last day with rows, and no task completed.
+
+    Attributes:
+        board (ForeignKey): The board of the list. Removed with the board (CASCADE).
+        date (DateField): The day.
+        list_id (BigIntegerField): The list, kept once the list is deleted.
+        list_title (CharField): The title of the list at the end of the day.
+        task_count (PositiveIntegerField): The tasks in the list at the end of the day.
+        overdue_count (PositiveIntegerField): Those of the tasks whose due date had passed
+                                             without their being completed.
+        completed_count (PositiveIntegerField): The tasks of the list completed during the day.
+    """
+    # Covered by the unique constraint
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='rollups', db_index=False)
+    date = models.DateField()
+    list_id = models.BigIntegerField()
+    list_title = models.CharField(max_length=100)
+    task_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        """
+        Meta class for ListDailyRollup.
+
+        The rows of a board over a range of days are read on the unique constraint, and the
+        index finds the last day rolled up.
+        """
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'date', 'list_id'], name='rollup_board_date_list_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='rollup_date_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Returns the string representation of the ListDailyRollup instance.
+
+        Returns:
+            str: The list and the day.
+        """
+        return f'{self.list_title} on {self.date}'
@@ -2,12 +2,22 @@
 Django REST Framework serializer for the Board model.
 
 This module defines the BoardSerializer, which handles serialization and deserialization
-of Board model instances for API interactions.
+of Board model instances for API interactions, the read-only ArchivedBoardSerializer, the
+serializers of the imports of Trello exports, the options of board clones, and the range of
+days of the board analytics.
 """
 
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Board
+from .models import ArchivedBoard, Board, BoardImport
+from .trello_import import progress_cache_key
 from users.serializers import UserSerializer
+from workspaces.models import Workspace
+from workspaces.tenancy import workspace_database
 
 class BoardSerializer(serializers.ModelSerializer):
     """
@@ -17,11 +27,16 @@ class BoardSerializer(serializers.ModelSerializer):
     It includes nested serialization for the owner and members using UserSerializer.
 
     Attributes:
+        workspace (PrimaryKeyRelatedField): The workspace of the board, set on creation only;
+                                          the user's personal workspace by default.
+        is_template (BooleanField): Whether the board is a template, read-only (templates are
+                                   saved from boards, see BoardCloneView).
         owner (UserSerializer): Serializer for the board's owner, read-only.
         members (UserSerializer): Serializer for the board's members, supports multiple users, read-only.
     """
     owner = UserSerializer(read_only=True)  # Uses UserSerializer for owner representation
     members = UserSerializer(many=True, read_only=True)  # Uses UserSerializer for members, handling multiple users
+    workspace = serializers.PrimaryKeyRelatedField(queryset=Workspace.objects.all(), required=False)
 
     class Meta:
         """
@@ -30,5 +45,181 @@ class BoardSerializer(serializers.ModelSerializer):
         Defines the model to serialize, fields to include, and read-only fields.
         """
         model = Board
-        fields = ['id', 'title', 'owner', 'members', 'color', 'created_at', 'updated_at']
-        read_only_fields = ['owner', 'created_at', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'workspace', 'title', 'owner', 'members', 'color', 'is_template', 'created_at', 'updated_at']
+        read_only_fields = ['owner', 'is_template', 'created_at', 'updated_at']
+
+    def validate_workspace(self, workspace):
+        """
+        Ensures the user may create boards in the workspace, and that boards stay in theirs.
+
+        Args:
+            workspace (Workspace): The workspace.
+
+        Returns:
+            Workspace: The workspace, unchanged.
+
+        Raises:
+            ValidationError: If the user is neither the owner nor a member of the workspace, or
+                            the board would move to another workspace.
+        """
+        if self.instance is not None:
+            if workspace.pk != self.instance.workspace_id:
+                raise serializers.ValidationError("A board cannot be moved to another workspace.")
+            return workspace
+        user = self.context['request'].user
+        if workspace.owner_id != user.pk and not workspace.members.filter(pk=user.pk).exists():
+            raise serializers.ValidationError("You are not a member of this workspace.")
+        return workspace
+
+
+class ArchivedBoardSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the ArchivedBoard model, without its document.
+
+    Attributes:
+        owner (UserSerializer): Serializer for the board's owner.
+        members (UserSerializer): Serializer for the board's members.
+    """
+    owner = UserSerializer(read_only=True)
+    members = UserSerializer(many=True, read_only=True)
+
+    class Meta:
+        """
+        Meta class for ArchivedBoardSerializer.
+        """
+        model = ArchivedBoard
+        fields = [
+            'id', 'workspace', 'title', 'owner', 'members', 'color', 'created_at', 'archived_at',
+            'list_count', 'task_count',
+        ]
+        read_only_fields = fields
+
+
+class BoardImportSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the BoardImport model.
+
+    Attributes:
+        progress (SerializerMethodField): The cards imported and to import while the import
+                                        runs, else null.
+    """
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        """
+        Meta class for BoardImportSerializer.
+        """
+        model = BoardImport
+        fields = [
+            'id', 'workspace', 'status', 'error', 'board', 'list_count', 'task_count', 'member_count',
+            'progress', 'created_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, board_import):
+        """
+        Returns the progress of a running import, kept in the cache (see boards.trello_import).
+        """
+        if board_import.status != 'running':
+            return None
+        return cache.get(progress_cache_key(board_import.pk))
+
+
+class BoardImportCreateSerializer(serializers.Serializer):
+    """
+    Serializer of the upload of a Trello export.
+
+    Attributes:
+        file (FileField): The Trello JSON export.
+        workspace (PrimaryKeyRelatedField): The workspace of the new board; the user's
+                                          personal workspace by default.
+    """
+    file = serializers.FileField()
+    workspace = serializers.PrimaryKeyRelatedField(queryset=Workspace.objects.all(), required=False)
+
+    def validate_workspace(self, workspace):
+        """
+        Ensures the user may create boards in the workspace.
+
+        Raises:
+            ValidationError: If the user is neither the owner nor a member of the workspace.
+        """
+        user = self.context['request'].user
+        if workspace.owner_id != user.pk and not workspace.members.filter(pk=user.pk).exists():
+            raise serializers.ValidationError("You are not a member of this workspace.")
+        return workspace
+
+
+class BoardCloneSerializer(serializers.Serializer):
+    """
+    Serializer of the options of a board clone, or of a template saved from a board.
+
+    The board cloned is given in the context as 'board'.
+
+    Attributes:
+        title (CharField): The title of the new board; the board's by default.
+        workspace (PrimaryKeyRelatedField): The workspace of the new board; the board's by default.
+        members (BooleanField): Whether to copy the members of the board, true by default.
+        assignees (BooleanField): Whether to copy the assignees of the tasks, false by default.
+        due_dates (BooleanField): Whether to copy the due dates of the tasks, true by default.
+    """
+    title = serializers.CharField(max_length=100, required=False)
+    workspace = serializers.PrimaryKeyRelatedField(queryset=Workspace.objects.all(), required=False)
+    members = serializers.BooleanField(default=True)
+    assignees = serializers.BooleanField(default=False)
+    due_dates = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        """
+        Ensures the user may create boards in the workspace of the new board.
+
+        Returns:
+            dict: The options, with the workspace of the new board.
+
+        Raises:
+            ValidationError: If the user is neither the owner nor a member of the workspace, or
+                            the workspace is on another database than the board's.
+        """
+        board = self.context['board']
+        workspace = attrs.get('workspace') or board.workspace
+        user = self.context['request'].user
+        if workspace.owner_id != user.pk and not workspace.members.filter(pk=user.pk).exists():
+            raise serializers.ValidationError({'workspace': ["You are not a member of this workspace."]})
+        if workspace_database(workspace.pk) != workspace_database(board.workspace_id):
+            raise serializers.ValidationError(
+                {'workspace': ["A board can only be cloned into a workspace on the same database."]}
+            )
+        attrs['workspace'] = workspace
+        return attrs
+
+
+class BoardAnalyticsQuerySerializer(serializers.Serializer):
+    """
+    Serializer of the query parameters of the board analytics.
+
+    Attributes:
+        start (DateField): The first day; a year before `end` by default.
+        end (DateField): The last day; yesterday (UTC), the last day rolled up, by default.
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        """
+        Fills in the default days and limits the range to BOARD_ANALYTICS_MAX_DAYS.
+
+        Returns:
+            dict: The 'start' and 'end' days.
+
+        Raises:
+            ValidationError: If start is after end, or the range is too long.
+        """
+        end = attrs.setdefault('end', timezone.now().date() - timedelta(days=1))
+        start = attrs.setdefault('start', end - timedelta(days=364))
+        if start > end:
+            raise serializers.ValidationError({'start': ['Must not be after end.']})
+        if (end - start).days >= settings.BOARD_ANALYTICS_MAX_DAYS:
+            raise serializers.ValidationError(
+                {'start': [f'The range is limited to {settings.BOARD_ANALYTICS_MAX_DAYS} days.']}
+            )
+        return attrs
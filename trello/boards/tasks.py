@@ -0,0 +1,87 @@
+"""
+Celery tasks of the boards app.
+
+This module defines the purge of the boards, lists and tasks deleted longer than
+SOFT_DELETE_UNDO_MINUTES ago, scheduled by CELERY_BEAT_SCHEDULE, the archiving of a board
+requested through the API, the import of the large Trello exports uploaded, and the daily
+rollup of the board analytics.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from trello.celery import app
+from . import analytics, archive
+from .models import BoardImport
+from .trello_import import run_import
+from .trash import purge_deleted
+
+@app.task
+def purge_deleted_boards():
+    """
+    Removes the deleted boards, lists and tasks whose undo window is over, in chunks.
+
+    The workspace databases are purged too.
+
+    Returns:
+        dict: The number of boards, lists and tasks deleted, see purge_deleted().
+    """
+    purged = Counter()
+    for database in [DEFAULT_DB_ALIAS, *settings.WORKSPACE_DATABASES]:
+        purged.update(purge_deleted(database))
+    return dict(purged)
+
+@app.task
+def roll_up_board_analytics():
+    """
+    Rolls up the counts of the boards changed since the last rollup, see analytics.roll_up().
+
+    The workspace databases are rolled up too.
+
+    Returns:
+        dict: The number of boards changed and rollup rows written.
+    """
+    rolled_up = Counter()
+    for database in [DEFAULT_DB_ALIAS, *settings.WORKSPACE_DATABASES]:
+        result = analytics.roll_up(database)
+        rolled_up.update(boards=result['boards'], rows=result['rows'])
+    return dict(rolled_up)
+
+@app.task
+def archive_board(board_id, database=None):
+    """
+    Archives a board into compressed cold storage, see boards.archive.archive_board().
+
+    Args:
+        board_id (int): The board.
+        database (str): The database of the board's workspace.
+
+    Returns:
+        int or None: The number of tasks archived, or None if the board was not archived.
+    """
+    archived = archive.archive_board(board_id, database or DEFAULT_DB_ALIAS)
+    return archived and archived.task_count
+
+@app.task
+def import_board(import_id, database=None):
+    """
+    Imports an uploaded Trello export, see boards.trello_import.run_import(), then deletes it.
+
+    Args:
+        import_id (int): The BoardImport, pending.
+        database (str): The database of the import's workspace.
+
+    Returns:
+        str or None: The status of the import, or None if it was not pending.
+    """
+    database = database or DEFAULT_DB_ALIAS
+    board_import = BoardImport.objects.using(database).filter(pk=import_id, status='pending').first()
+    if board_import is None:
+        return None
+    try:
+        with board_import.file.open('rb') as file:
+            run_import(board_import, file, database)
+    finally:
+        board_import.file.delete()
+    return board_import.status
@@ -1,3 +1,336 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.querybudget import query_budget
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from workspaces.tenancy import personal_workspace
+from .analytics import day_start, roll_up, write_rollups
+from .archive import archive_board
+from .models import ArchivedBoard, Board, BoardImport, ListDailyRollup
+from .trash import purge_deleted
+from .views import (
+    ArchivedBoardRestoreView, BoardAnalyticsView, BoardCloneView, BoardExportView, BoardImportListCreateView,
+    BoardRestoreView,
+)
+
+User = get_user_model()
+
+
+class BoardTestCase(APITestCase):
+    """
+    A board of alice's with a member, two lists and three tasks, one of them labelled,
+    assigned and with a checklist item done out of two.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.member = User.objects.create_user(username='bob', email='bob@example.com', password='secret')
+        self.workspace = personal_workspace(self.user)
+        self.board = Board.objects.create(title='Roadmap', owner=self.user, workspace=self.workspace)
+        self.board.members.add(self.member)
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#EB5A46')
+        self.todo = List.objects.create(board=self.board, title='To do')
+        self.done = List.objects.create(board=self.board, title='Done')
+        self.task = Task.objects.create(
+            list=self.todo, title='Write the spec', order=0, checklist_total_count=2, checklist_done_count=1
+        )
+        self.task.assigned_users.add(self.member)
+        TaskLabel.objects.create(task=self.task, label=self.label)
+        ChecklistItem.objects.create(task=self.task, text='Outline', done=True, order=0)
+        ChecklistItem.objects.create(task=self.task, text='Review', order=1)
+        Task.objects.create(list=self.todo, title='Plan the release', order=1)
+        Task.objects.create(list=self.done, title='Kick-off', order=0)
+        self.client.force_authenticate(self.user)
+
+
+class BoardSoftDeleteTests(BoardTestCase):
+    """
+    Deleted boards are hidden, can be restored for a while, then are purged.
+    """
+
+    def test_deleted_board_is_hidden_and_restored(self):
+        self.assertEqual(self.client.delete(f'/boards/{self.board.pk}/').status_code, 204)
+        self.assertEqual(self.client.get(f'/boards/{self.board.pk}/').status_code, 404)
+        self.assertEqual(self.client.get('/boards/').data, [])
+
+        with query_budget(view=BoardRestoreView, method='POST'):
+            response = self.client.post(f'/boards/{self.board.pk}/restore/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f'/boards/{self.board.pk}/').status_code, 200)
+        self.assertEqual(Task.objects.filter(list__board=self.board).count(), 3)
+
+    def test_board_cannot_be_restored_after_the_undo_window(self):
+        self.client.delete(f'/boards/{self.board.pk}/')
+        Board._base_manager.filter(pk=self.board.pk).update(
+            deleted_at=timezone.now() - timedelta(minutes=settings.SOFT_DELETE_UNDO_MINUTES + 1)
+        )
+        self.assertEqual(self.client.post(f'/boards/{self.board.pk}/restore/').status_code, 404)
+
+    def test_purge_deletes_the_board_with_everything_on_it(self):
+        self.client.delete(f'/boards/{self.board.pk}/')
+
+        self.assertEqual(purge_deleted(), {'boards': 0, 'lists': 0, 'tasks': 0})
+        later = timezone.now() + timedelta(minutes=settings.SOFT_DELETE_UNDO_MINUTES + 1)
+        self.assertEqual(purge_deleted(now=later, batch_size=2), {'boards': 1, 'lists': 0, 'tasks': 3})
+        self.assertFalse(Board._base_manager.filter(pk=self.board.pk).exists())
+        self.assertFalse(List._base_manager.filter(board_id=self.board.pk).exists())
+        self.assertFalse(Task._base_manager.exists())
+        self.assertFalse(ChecklistItem.objects.exists())
+        self.assertFalse(Label.objects.exists())
+
+    def test_purge_deletes_deleted_lists(self):
+        self.client.delete(f'/lists/boards/{self.board.pk}/lists/{self.todo.pk}/')
+
+        later = timezone.now() + timedelta(minutes=settings.SOFT_DELETE_UNDO_MINUTES + 1)
+        self.assertEqual(purge_deleted(now=later), {'boards': 0, 'lists': 1, 'tasks': 2})
+        self.assertEqual(list(Task._base_manager.values_list('title', flat=True)), ['Kick-off'])
+
+
+class BoardArchiveTests(BoardTestCase):
+    """
+    Archived boards leave the board tables, can be read and are restored as they were.
+    """
+
+    def test_archive_round_trip(self):
+        task_ids = sorted(Task.objects.values_list('pk', flat=True))
+        archived = archive_board(self.board.pk)
+
+        self.assertEqual((archived.list_count, archived.task_count), (2, 3))
+        self.assertFalse(Board._base_manager.filter(pk=self.board.pk).exists())
+        self.assertFalse(Task._base_manager.exists())
+        self.assertEqual([row['id'] for row in self.client.get('/boards/archived/').data], [self.board.pk])
+        # Not restorable as a deleted board
+        self.assertEqual(self.client.post(f'/boards/{self.board.pk}/restore/').status_code, 404)
+
+        response = self.client.get(f'/boards/archived/{self.board.pk}/')
+        document = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(document['board']['title'], 'Roadmap')
+        self.assertEqual([list_row['title'] for list_row in document['lists']], ['To do', 'Done'])
+
+        with query_budget(view=ArchivedBoardRestoreView, method='POST'):
+            response = self.client.post(f'/boards/archived/{self.board.pk}/restore/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ArchivedBoard.objects.exists())
+        board = Board.objects.get(pk=self.board.pk)
+        self.assertEqual(list(board.members.all()), [self.member])
+        self.assertEqual(sorted(Task.objects.values_list('pk', flat=True)), task_ids)
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual(list(task.assigned_users.all()), [self.member])
+        self.assertEqual(list(task.labels.values_list('name', flat=True)), ['Bug'])
+        self.assertEqual(list(task.checklist_items.order_by('order').values_list('text', 'done')),
+                         [('Outline', True), ('Review', False)])
+
+    def test_restore_after_an_interrupted_archive(self):
+        with mock.patch('boards.archive.purge_board'):
+            archive_board(self.board.pk)
+        self.assertTrue(Board._base_manager.filter(pk=self.board.pk, deleted_at__isnull=False).exists())
+
+        with query_budget(view=ArchivedBoardRestoreView, method='POST'):
+            response = self.client.post(f'/boards/archived/{self.board.pk}/restore/')
+        self.assertEqual(response.status_code, 200)
+        board = Board.objects.get(pk=self.board.pk)
+        self.assertEqual(list(board.members.all()), [self.member])
+        self.assertEqual(Task.objects.filter(list__board=board).count(), 3)
+        self.assertEqual(Label.objects.filter(board=board).count(), 1)
+
+    def test_only_the_owner_restores(self):
+        archive_board(self.board.pk)
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get('/boards/archived/').status_code, 200)
+        self.assertEqual(self.client.post(f'/boards/archived/{self.board.pk}/restore/').status_code, 404)
+
+
+class BoardExportTests(BoardTestCase):
+    """
+    Boards are streamed as JSON Lines or CSV.
+    """
+
+    def test_jsonl_export(self):
+        with query_budget(view=BoardExportView):
+            response = self.client.get(f'/boards/{self.board.pk}/export/jsonl/')
+        self.assertEqual(response.status_code, 200)
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+        self.assertEqual([record['type'] for record in records], ['board', 'list', 'task', 'task', 'list', 'task'])
+        self.assertEqual(records[2]['title'], 'Write the spec')
+        self.assertEqual(records[2]['assigned_users'], ['bob'])
+        self.assertEqual(records[2]['labels'], ['Bug'])
+
+    def test_csv_export_of_all_boards(self):
+        Board.objects.create(title='Empty', owner=self.user, workspace=self.workspace)
+
+        response = self.client.get('/boards/export/csv/')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+        self.assertEqual(rows[0][:6], ['board_id', 'board', 'list_id', 'list', 'task_id', 'title'])
+        self.assertEqual([row[5] for row in rows[1:]], ['Write the spec', 'Plan the release', 'Kick-off'])
+
+    def test_export_of_an_inaccessible_board(self):
+        self.client.force_authenticate(User.objects.create_user(username='carol', email='carol@example.com'))
+        self.assertEqual(self.client.get(f'/boards/{self.board.pk}/export/jsonl/').status_code, 404)
+        self.assertEqual(self.client.get(f'/boards/{self.board.pk}/export/xml/').status_code, 404)
+
+
+TRELLO_EXPORT = {
+    'name': 'Imported',
+    'labels': [{'id': 'l1', 'name': 'Bug', 'color': 'red'}],
+    'members': [{'id': 'm1', 'username': 'bob'}, {'id': 'm2', 'username': 'nobody'}],
+    'lists': [
+        {'id': 'a', 'name': 'Backlog', 'pos': 1, 'closed': False},
+        {'id': 'b', 'name': 'Old', 'pos': 2, 'closed': True},
+    ],
+    'cards': [
+        {'id': 'c2', 'idList': 'a', 'name': 'Second', 'pos': 20, 'idMembers': [], 'idLabels': [], 'due': None},
+        {'id': 'c1', 'idList': 'a', 'name': 'First', 'pos': 10, 'idMembers': ['m1', 'm2'], 'idLabels': ['l1'],
+         'due': '2030-01-01T12:00:00.000Z'},
+        {'id': 'c3', 'idList': 'b', 'name': 'Archived list', 'pos': 1, 'idMembers': [], 'idLabels': [], 'due': None},
+    ],
+    'checklists': [{'idCard': 'c1', 'checkItems': [
+        {'name': 'Done', 'state': 'complete', 'pos': 1}, {'name': 'Open', 'state': 'incomplete', 'pos': 2},
+    ]}],
+}
+
+
+class TrelloImportTests(APITestCase):
+    """
+    Trello JSON exports are imported into new boards.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.member = User.objects.create_user(username='bob', email='bob@example.com', password='secret')
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content):
+        return self.client.post('/boards/imports/', {'file': SimpleUploadedFile('board.json', content)})
+
+    def test_inline_import(self):
+        with query_budget(view=BoardImportListCreateView, method='POST'):
+            response = self.upload(json.dumps(TRELLO_EXPORT).encode())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'done')
+
+        board = Board.objects.get(pk=response.data['board'])
+        self.assertEqual((board.title, board.owner), ('Imported', self.user))
+        self.assertEqual(list(board.members.all()), [self.member])
+        self.assertEqual(list(board.lists.values_list('title', flat=True)), ['Backlog'])
+        first, second = Task.objects.filter(list__board=board).order_by('order')
+        self.assertEqual((first.title, second.title), ('First', 'Second'))
+        self.assertEqual(list(first.assigned_users.all()), [self.member])
+        self.assertEqual(list(first.labels.values_list('name', flat=True)), ['Bug'])
+        self.assertEqual((first.checklist_done_count, first.checklist_total_count), (1, 2))
+
+    def test_invalid_export_is_rejected(self):
+        response = self.upload(b'not a Trello export')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.data)
+        self.assertFalse(Board.objects.exists())
+        self.assertFalse(BoardImport.objects.exists())
+
+
+class BoardCloneTests(BoardTestCase):
+    """
+    Boards are cloned, or saved as templates, with their labels, lists, tasks and checklists.
+    """
+
+    def test_clone(self):
+        with query_budget(view=BoardCloneView, method='POST'):
+            response = self.client.post(f'/boards/{self.board.pk}/clone/', {'title': 'Copy', 'assignees': True})
+        self.assertEqual(response.status_code, 201)
+
+        clone = Board.objects.get(pk=response.data['id'])
+        self.assertEqual((clone.title, clone.is_template), ('Copy', False))
+        self.assertEqual(list(clone.members.all()), [self.member])
+        self.assertEqual(list(clone.lists.order_by('id').values_list('title', flat=True)), ['To do', 'Done'])
+        task = Task.objects.get(list__board=clone, title='Write the spec')
+        self.assertNotEqual(task.pk, self.task.pk)
+        self.assertEqual(list(task.assigned_users.all()), [self.member])
+        self.assertEqual(list(task.labels.values_list('board', flat=True)), [clone.pk])
+        self.assertEqual((task.checklist_done_count, task.checklist_total_count), (1, 2))
+        self.assertEqual(list(task.checklist_items.order_by('order').values_list('text', 'done')),
+                         [('Outline', True), ('Review', False)])
+        # The original is left as it was
+        self.assertEqual(Task.objects.filter(list__board=self.board).count(), 3)
+
+    def test_template(self):
+        response = self.client.post(f'/boards/{self.board.pk}/template/', {'members': False})
+        self.assertEqual(response.status_code, 201)
+
+        template = Board.objects.get(pk=response.data['id'])
+        self.assertTrue(template.is_template)
+        self.assertFalse(template.members.exists())
+        task = Task.objects.get(list__board=template, title='Write the spec')
+        self.assertFalse(task.assigned_users.exists())
+        self.assertEqual(task.checklist_done_count, 0)
+        self.assertFalse(task.checklist_items.filter(done=True).exists())
+        self.assertEqual(
+            [board['id'] for board in self.client.get('/boards/?template=true').data], [template.pk]
+        )
+
+    def test_inaccessible_board_is_not_cloned(self):
+        self.client.force_authenticate(User.objects.create_user(username='carol', email='carol@example.com'))
+        self.assertEqual(self.client.post(f'/boards/{self.board.pk}/clone/').status_code, 404)
+
+
+class BoardAnalyticsTests(BoardTestCase):
+    """
+    The daily rollups, and the analytics read from them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        # Created three days ago; the spec fell due the day before yesterday
+        created_at = day_start(self.today - timedelta(days=3))
+        for model in (Board, List, Task):
+            model.objects.update(created_at=created_at)
+        Task.objects.filter(pk=self.task.pk).update(due_date=day_start(self.today - timedelta(days=2)) + timedelta(hours=12))
+
+    def analytics(self, first_day, last_day):
+        with query_budget(view=BoardAnalyticsView):
+            response = self.client.get(
+                f'/boards/{self.board.pk}/analytics/', {'start': first_day.isoformat(), 'end': last_day.isoformat()}
+            )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_rollups_count_tasks_and_overdue_tasks(self):
+        first_day, last_day = self.today - timedelta(days=3), self.today - timedelta(days=1)
+        self.assertEqual(write_rollups([self.board.pk], first_day, last_day), 6)
+
+        data = self.analytics(first_day, last_day)
+        self.assertEqual(data['tasks'], [3, 3, 3])
+        self.assertEqual(data['overdue'], [0, 1, 1])
+        self.assertEqual([series['tasks'] for series in data['lists']], [[2, 2, 2], [1, 1, 1]])
+
+    def test_days_without_rows_carry_the_last_counts_forward(self):
+        last_day = self.today - timedelta(days=1)
+        write_rollups([self.board.pk], last_day, last_day)
+
+        data = self.analytics(self.today, self.today + timedelta(days=1))
+        self.assertEqual(data['tasks'], [3, 3])
+
+    def test_roll_up_writes_the_days_since_the_last_rollup(self):
+        self.assertEqual(roll_up(today=self.today), {'days': 1, 'boards': 1, 'rows': 2})
+        self.assertEqual(roll_up(today=self.today), {'days': 0, 'boards': 0, 'rows': 0})
+
+        Task.objects.update(deleted_at=timezone.now())
+        self.assertEqual(roll_up(today=self.today + timedelta(days=1))['days'], 1)
+        self.assertEqual(
+            list(ListDailyRollup.objects.filter(date=self.today).values_list('task_count', flat=True)), [0, 0]
+        )
+
+    def test_invalid_range_is_rejected(self):
+        response = self.client.get(
+            f'/boards/{self.board.pk}/analytics/', {'start': self.today.isoformat(), 'end': '2000-01-01'}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,156 @@
+"""
+Undo and purge of the deleted boards, lists and tasks (see core.softdelete).
+
+A deleted board can be restored by its owner or members for SOFT_DELETE_UNDO_MINUTES. Once
+that window is over, the purge task removes the deleted rows with everything below them:
+the tasks are deleted SOFT_DELETE_PURGE_BATCH_SIZE at a time, with their assignees, labels
+and checklist items, each chunk in its own short transaction, so the write lock is never
+held for long; then the lists, labels, invitations, members and analytics rollups of a board
+and the board.
+
+The rows are deleted with raw DELETEs, table by table, instead of the ORM's cascade, which
+would also look up the notifications of each task on the default database (without an
+index on the task). The notifications of purged boards and tasks are kept until the
+retention job deletes them, and show no board or task title meanwhile.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from invitations.models import Invitation
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from .models import ArchivedBoard, Board, BoardImport, ListDailyRollup
+
+
+def undo_cutoff(now=None):
+    """
+    Returns the time before which deleted rows can no longer be restored.
+
+    Args:
+        now (datetime, optional): The current time.
+
+    Returns:
+        datetime: now minus SOFT_DELETE_UNDO_MINUTES.
+    """
+    return (now or timezone.now()) - timedelta(minutes=settings.SOFT_DELETE_UNDO_MINUTES)
+
+
+def restorable_boards(user):
+    """
+    Returns the deleted boards a user owns or is a member of that can still be restored.
+
+    Boards hidden because they were archived are left out: they are restored from their archive.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The boards, with the owner joined.
+    """
+    return (
+        Board._base_manager.filter(Q(owner=user) | Q(members=user), deleted_at__gte=undo_cutoff())
+        .exclude(Exists(ArchivedBoard.objects.filter(pk=OuterRef('pk'))))
+        .distinct()
+        .select_related('owner')
+    )
+
+
+def purge_tasks(tasks, database, batch_size=None):
+    """
+    Deletes tasks with their assignees, labels and checklist items, in chunks.
+
+    Args:
+        tasks (QuerySet): The tasks, of Task._base_manager on the database.
+        database (str): The database of the tasks.
+        batch_size (int, optional): Tasks per chunk and transaction. None deletes them all
+            with one DELETE per table, in the caller's transaction.
+
+    Returns:
+        int: The number of tasks deleted.
+    """
+    if batch_size is None:
+        for model in (TaskLabel, ChecklistItem, Task.assigned_users.through):
+            model._base_manager.using(database).filter(task_id__in=tasks.values('pk'))._raw_delete(database)
+        return tasks._raw_delete(database)
+    purged = 0
+    while ids := list(tasks.values_list('pk', flat=True)[:batch_size]):
+        with transaction.atomic(using=database):
+            for model in (TaskLabel, ChecklistItem, Task.assigned_users.through):
+                model._base_manager.using(database).filter(task_id__in=ids)._raw_delete(database)
+            Task._base_manager.using(database).filter(pk__in=ids)._raw_delete(database)
+        purged += len(ids)
+    return purged
+
+
+def purge_board(board_id, database, batch_size=None):
+    """
+    Deletes a board with everything on it.
+
+    Args:
+        board_id (int): The board.
+        database (str): The database of the board.
+        batch_size (int, optional): Tasks per chunk and transaction. None deletes the whole
+            board with one DELETE per table, in the caller's transaction.
+
+    Returns:
+        int: The number of tasks deleted.
+    """
+    purged = purge_tasks(Task._base_manager.using(database).filter(list__board_id=board_id), database, batch_size)
+    with transaction.atomic(using=database, savepoint=batch_size is not None):
+        for model in (Label, List, Invitation, ListDailyRollup, Board.members.through):
+            model._base_manager.using(database).filter(board_id=board_id)._raw_delete(database)
+        # The imports of the board are kept (on_delete=SET_NULL, which raw deletes skip)
+        BoardImport._base_manager.using(database).filter(board_id=board_id).update(board=None)
+        Board._base_manager.using(database).filter(pk=board_id)._raw_delete(database)
+    return purged
+
+
+def purge_list(list_id, database, batch_size):
+    """
+    Deletes a list with its tasks.
+
+    Args:
+        list_id (int): The list.
+        database (str): The database of the list.
+        batch_size (int): Tasks per chunk and transaction.
+
+    Returns:
+        int: The number of tasks deleted.
+    """
+    purged = purge_tasks(Task._base_manager.using(database).filter(list_id=list_id), database, batch_size)
+    with transaction.atomic(using=database):
+        List._base_manager.using(database).filter(pk=list_id)._raw_delete(database)
+    return purged
+
+
+def purge_deleted(database=DEFAULT_DB_ALIAS, now=None, batch_size=None):
+    """
+    Purges the boards, lists and tasks of a database deleted before the undo window.
+
+    Args:
+        database (str): 'default' or a workspace database.
+        now (datetime, optional): The current time.
+        batch_size (int, optional): Tasks per chunk, SOFT_DELETE_PURGE_BATCH_SIZE by default.
+
+    Returns:
+        dict: The number of boards, lists and tasks deleted, the rows below them included.
+    """
+    cutoff = undo_cutoff(now)
+    batch_size = batch_size or settings.SOFT_DELETE_PURGE_BATCH_SIZE
+    purged = {'boards': 0, 'lists': 0, 'tasks': 0}
+
+    boards = Board._base_manager.using(database).filter(deleted_at__lt=cutoff).values_list('pk', flat=True)
+    for board_id in list(boards):
+        purged['tasks'] += purge_board(board_id, database, batch_size)
+        purged['boards'] += 1
+    lists = List._base_manager.using(database).filter(deleted_at__lt=cutoff).values_list('pk', flat=True)
+    for list_id in list(lists):
+        purged['tasks'] += purge_list(list_id, database, batch_size)
+        purged['lists'] += 1
+    tasks = Task._base_manager.using(database).filter(deleted_at__lt=cutoff)
+    purged['tasks'] += purge_tasks(tasks, database, batch_size)
+    return purged
@@ -0,0 +1,413 @@
+"""
+Import of Trello JSON exports into new boards.
+
+A Trello export is one JSON object with the board's fields and arrays of its labels, lists,
+cards, checklists, members and actions; the actions alone often take most of the file.
+iter_export() parses it incrementally, yielding the arrays one element at a time, so the file
+is never loaded whole. It is read twice:
+
+1. The first pass reads the board, its labels, lists and members, and the list and position
+   of every card, to number the tasks of each list in the Trello order.
+2. The second pass runs in one transaction on the database of the board's workspace. It
+   creates the board, its members, labels and lists. It then inserts the cards as tasks,
+   IMPORT_BATCH_SIZE at a time with bulk_create(), with their assignees and labels through
+   bulk inserts into the through tables, and the checklist items of the cards. The checklist
+   counters are finally computed with recount_checklists().
+
+Archived ("closed") lists and cards are left out. Trello members are matched to users by
+username; the others are left out, as are the members beyond the board's quota.
+"""
+
+import codecs
+import json
+import re
+from itertools import count
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from core.routers import using_tenant_database
+from lists.checklists import recount_checklists
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from workspaces.tenancy import check_board_quota, users_within_board_quota
+from .models import Board
+
+# The colors of the Trello label color names ("green", "green_dark", ...)
+TRELLO_COLORS = {
+    'green': '#61BD4F', 'yellow': '#F2D600', 'orange': '#FF9F1A', 'red': '#EB5A46', 'purple': '#C377E0',
+    'blue': '#0079BF', 'sky': '#00C2E0', 'lime': '#51E898', 'pink': '#FF78CB', 'black': '#344563',
+}
+
+# Characters read from the export at a time
+READ_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r'\s*')
+
+
+def progress_cache_key(import_id):
+    return f'board-import-progress:{import_id}'
+
+
+class JSONReader:
+    """
+    Reads JSON values one at a time from a text file, buffering little more than the value read.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size=READ_SIZE):
+        """
+        Appends the next size characters of the file to the unread part of the buffer.
+
+        Returns:
+            bool: False at the end of the file.
+        """
+        data = '' if self.eof else self.file.read(size)
+        self.eof = not data
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return not self.eof
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character, without consuming it ('' at the end).
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        """
+        Consumes the next character, which must be char.
+
+        Raises:
+            ValidationError: If it is another one.
+        """
+        if self.peek() != char:
+            raise ValidationError(f'Not a Trello JSON export: expected {char!r}.')
+        self.pos += 1
+
+    def value(self):
+        """
+        Reads the next value, reading more of the file until it is complete.
+
+        Raises:
+            ValidationError: If the value is not valid JSON.
+        """
+        self.peek()
+        size = READ_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may go on in the rest of the file
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as error:
+                if self.eof:
+                    raise ValidationError(f'Not a Trello JSON export: {error.msg}.') from error
+            self.fill(size)
+            size *= 2
+
+
+def iter_export(file):
+    """
+    Yields the members of a Trello export, its arrays element by element.
+
+    Args:
+        file: The export, as a text file.
+
+    Yields:
+        tuple: (key, value) for each member of the top-level object that is not an array,
+        and (key, element) for each element of those that are.
+
+    Raises:
+        ValidationError: If the file is not a JSON object.
+    """
+    reader = JSONReader(file)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValidationError('Not a Trello JSON export: expected a key.')
+        reader.expect(':')
+        if reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() != ']':
+                while True:
+                    yield key, reader.value()
+                    if reader.peek() != ',':
+                        break
+                    reader.expect(',')
+            reader.expect(']')
+        else:
+            yield key, reader.value()
+        if reader.peek() != ',':
+            break
+        reader.expect(',')
+    reader.expect('}')
+
+
+def read_pass(file):
+    """
+    Starts a pass over an export: rewinds the binary file and decodes it as UTF-8.
+    """
+    file.seek(0)
+    return iter_export(codecs.getreader('utf-8-sig')(file))
+
+
+def read_outline(file):
+    """
+    Reads what is needed before the cards are inserted: the first pass over an export.
+
+    Args:
+        file: The export, as a binary file that can be rewound.
+
+    Returns:
+        dict: The 'board' fields, the open 'lists' and all 'labels' and 'members' (dicts of the
+        export), and the 'orders' of the open cards of the open lists, by card id.
+
+    Raises:
+        ValidationError: If the file is not a Trello JSON export.
+    """
+    outline = {'board': {}, 'labels': [], 'lists': [], 'members': []}
+    positions = {}
+    for key, value in read_pass(file):
+        if key in ('name', 'prefs'):
+            outline['board'][key] = value
+        elif key in ('labels', 'lists', 'members') and isinstance(value, dict):
+            outline[key].append(value)
+        elif key == 'cards' and isinstance(value, dict) and value.get('id') and not value.get('closed'):
+            positions[value.get('id')] = (value.get('idList'), value.get('pos') or 0)
+    if 'name' not in outline['board']:
+        raise ValidationError('Not a Trello JSON export: the board has no name.')
+
+    outline['lists'] = sorted(
+        (list_row for list_row in outline['lists'] if not list_row.get('closed')),
+        key=lambda list_row: list_row.get('pos') or 0,
+    )
+    open_lists = {list_row.get('id') for list_row in outline['lists']}
+    ranked = sorted(
+        (position, card_id) for card_id, position in positions.items() if position[0] in open_lists
+    )
+    outline['orders'] = {}
+    last_order = {}
+    for (list_id, _pos), card_id in ranked:
+        last_order[list_id] = outline['orders'][card_id] = last_order.get(list_id, -1) + 1
+    return outline
+
+
+def match_members(members, owner, workspace, board):
+    """
+    Returns the users matching the Trello members by username, and adds them to the board.
+
+    The owner is matched but not added. Users at their board quota in the workspace, or
+    beyond the board's member quota, are left out.
+
+    Args:
+        members (list): The members of the export.
+        owner: The owner of the new board.
+        workspace (Workspace): The workspace of the board.
+        board (Board): The new board.
+
+    Returns:
+        dict: User ids by Trello member id.
+    """
+    usernames = {member.get('username'): member.get('id') for member in members if member.get('username')}
+    users = dict(
+        get_user_model().objects.filter(username__in=list(usernames)).order_by('username').values_list('pk', 'username')
+    )
+    added = users_within_board_quota(workspace, [user_id for user_id in users if user_id != owner.pk])
+    added = added[:workspace.max_board_members]
+    Board.members.through.objects.bulk_create(
+        Board.members.through(board_id=board.pk, user_id=user_id) for user_id in added
+    )
+    return {usernames[users[user_id]]: user_id for user_id in [*added, *([owner.pk] if owner.pk in users else [])]}
+
+
+def create_labels(labels, board):
+    """
+    Creates the labels of the board, and returns the label id of each Trello label.
+
+    Labels without a name are named after their color; Trello labels with the same name
+    become one label, as names are unique within a board.
+    """
+    by_name = {}
+    trello_names = {}
+    for label in labels:
+        color = (label.get('color') or 'green').split('_')[0]
+        name = ((label.get('name') or '').strip() or color)[:50]
+        trello_names[label.get('id')] = name
+        by_name.setdefault(name, Label(board=board, name=name, color=TRELLO_COLORS.get(color, '#61BD4F')))
+    Label.objects.bulk_create(by_name.values())
+    return {label_id: by_name[name].pk for label_id, name in trello_names.items()}
+
+
+def import_trello_board(file, owner, workspace, database=DEFAULT_DB_ALIAS, batch_size=None, progress=None):
+    """
+    Imports a Trello export into a new board of a workspace, in one transaction.
+
+    Args:
+        file: The export, as a binary file that can be rewound.
+        owner: The owner of the new board.
+        workspace (Workspace): The workspace of the board.
+        database (str): The database of the workspace.
+        batch_size (int, optional): Cards inserted at a time, IMPORT_BATCH_SIZE by default.
+        progress (callable, optional): Called with the number of cards imported and the
+            number of cards to import after each batch.
+
+    Returns:
+        dict: The new 'board', and the number of 'lists', 'tasks', 'members' and
+        'checklist_items' imported.
+
+    Raises:
+        ValidationError: If the file is not a Trello JSON export, or the owner reached the
+            board quota of the workspace.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    outline = read_outline(file)
+    orders = outline['orders']
+    result = {'lists': len(outline['lists']), 'tasks': 0, 'checklist_items': 0}
+
+    with using_tenant_database(database), transaction.atomic(using=database):
+        check_board_quota(workspace, owner, "Cannot import the board: you have {max_boards} boards in this workspace.")
+        color = (outline['board'].get('prefs') or {}).get('backgroundColor') or ''
+        board = Board.objects.create(
+            title=(outline['board']['name'] or 'Trello board').strip()[:100], owner=owner, workspace=workspace,
+            color=color if re.fullmatch(r'#[0-9A-Fa-f]{6}', color) else '#FFFFFF',
+        )
+        users = match_members(outline['members'], owner, workspace, board)
+        labels = create_labels(outline['labels'], board)
+        lists = List.objects.bulk_create(
+            List(board=board, title=(list_row.get('name') or '').strip()[:100]) for list_row in outline['lists']
+        )
+        list_ids = {list_row.get('id'): list_obj.pk for list_row, list_obj in zip(outline['lists'], lists)}
+
+        task_ids = {}
+        cards, items, waiting = [], [], []
+        item_orders = {}
+
+        def insert_cards():
+            tasks = Task.objects.bulk_create(
+                Task(
+                    list_id=list_ids[card['idList']], title=(card.get('name') or '').strip()[:100],
+                    description=card.get('desc') or '', order=orders[card['id']],
+                    due_date=parse_datetime(card['due']) if card.get('due') else None,
+                )
+                for card in cards
+            )
+            assignees, task_labels = [], []
+            for card, task in zip(cards, tasks):
+                task_ids[card['id']] = task.pk
+                assignees.extend(
+                    Task.assigned_users.through(task_id=task.pk, user_id=users[member_id])
+                    for member_id in dict.fromkeys(card.get('idMembers') or ()) if member_id in users
+                )
+                task_labels.extend(
+                    TaskLabel(task_id=task.pk, label_id=label_id)
+                    for label_id in dict.fromkeys(
+                        labels[trello_id] for trello_id in card.get('idLabels') or () if trello_id in labels
+                    )
+                )
+            Task.assigned_users.through.objects.bulk_create(assignees)
+            TaskLabel.objects.bulk_create(task_labels)
+            result['tasks'] += len(cards)
+            cards.clear()
+            if progress is not None:
+                progress(result['tasks'], len(orders))
+
+        def add_items(checklist):
+            task_id = task_ids[checklist['idCard']]
+            numbers = item_orders.setdefault(task_id, count())
+            for item in sorted(checklist.get('checkItems') or (), key=lambda item: item.get('pos') or 0):
+                items.append(ChecklistItem(
+                    task_id=task_id, text=(item.get('name') or '').strip()[:200],
+                    done=item.get('state') == 'complete', order=next(numbers),
+                ))
+
+        def insert_items():
+            ChecklistItem.objects.bulk_create(items)
+            result['checklist_items'] += len(items)
+            items.clear()
+
+        for key, value in read_pass(file):
+            if key == 'cards' and isinstance(value, dict) and value.get('id') in orders:
+                cards.append(value)
+                if len(cards) >= batch_size:
+                    insert_cards()
+            elif key == 'checklists' and isinstance(value, dict) and value.get('idCard') in orders:
+                # Exports list the checklists after the cards; others wait for their cards
+                if value['idCard'] in task_ids:
+                    add_items(value)
+                else:
+                    waiting.append(value)
+                if len(items) >= batch_size:
+                    insert_items()
+        if cards:
+            insert_cards()
+        for checklist in waiting:
+            add_items(checklist)
+        insert_items()
+
+        if result['checklist_items']:
+            first, last = min(task_ids.values()), max(task_ids.values())
+            for start in range(first, last + 1, batch_size):
+                recount_checklists(start, start + batch_size)
+    result.update(board=board, members=len(users))
+    return result
+
+
+def run_import(board_import, file, database=DEFAULT_DB_ALIAS):
+    """
+    Runs an import, recording its outcome and its progress.
+
+    The progress is kept in the cache while the import runs, as the transaction of the
+    import hides its rows until it is done.
+
+    Args:
+        board_import (BoardImport): The import, with its owner and workspace.
+        file: The export, as a binary file that can be rewound.
+        database (str): The database of the workspace.
+
+    Returns:
+        BoardImport: The import, done or failed.
+    """
+    def report(imported, total):
+        cache.set(progress_cache_key(board_import.pk), {'imported': imported, 'total': total}, 24 * 60 * 60)
+
+    board_import.status = 'running'
+    board_import.save(update_fields=['status'])
+    try:
+        result = import_trello_board(file, board_import.owner, board_import.workspace, database, progress=report)
+    except Exception as error:
+        if not isinstance(error, ValidationError):
+            board_import.status, board_import.error, board_import.finished_at = 'failed', 'The import failed.', timezone.now()
+            board_import.save()
+            raise
+        board_import.status = 'failed'
+        board_import.error = ' '.join(map(str, error.detail))
+    else:
+        board_import.status = 'done'
+        board_import.board = result['board']
+        board_import.list_count = result['lists']
+        board_import.task_count = result['tasks']
+        board_import.member_count = result['members']
+    board_import.finished_at = timezone.now()
+    board_import.save()
+    cache.delete(progress_cache_key(board_import.pk))
+    return board_import
@@ -2,13 +2,34 @@
 URL configuration for the board-related endpoints.
 
 This module defines the URL patterns for the board application, mapping API endpoints
-to their respective views for listing, creating, retrieving, updating, and deleting boards.
+to their respective views. Boards are listed, created, retrieved, updated and deleted,
+restored after a deletion, cloned, saved as templates and archived. Archived boards are
+read and restored. Boards are exported, Trello exports imported, and analytics read.
 """
 
 from django.urls import path
-from .views import BoardListCreateView, BoardDetailView
+from .views import (
+    ArchivedBoardDetailView, ArchivedBoardListView, ArchivedBoardRestoreView, BoardAnalyticsView,
+    BoardArchiveView, BoardCloneView, BoardDetailView, BoardDetailAsyncView, BoardExportView,
+    BoardImportDetailView, BoardImportListCreateView, BoardListAsyncView, BoardListCreateView,
+    BoardRestoreView,
+)
 
 urlpatterns = [
     path('', BoardListCreateView.as_view(), name='board-list-create'),  # Endpoint for listing all boards or creating a new board
     path('<int:pk>/', BoardDetailView.as_view(), name='board-detail'),  # Endpoint for retrieving, updating, or deleting a specific board by its primary key
+    path('<int:pk>/restore/', BoardRestoreView.as_view(), name='board-restore'),  # Endpoint for undoing the deletion of a board
+    path('<int:pk>/clone/', BoardCloneView.as_view(), name='board-clone'),  # Endpoint for copying a board into a new board
+    path('<int:pk>/template/', BoardCloneView.as_view(template=True), name='board-template'),  # Endpoint for saving a board as a template
+    path('<int:pk>/archive/', BoardArchiveView.as_view(), name='board-archive'),  # Endpoint for archiving a board (in the background)
+    path('<int:pk>/analytics/', BoardAnalyticsView.as_view(), name='board-analytics'),  # Endpoint for the cumulative flow, throughput and overdue trends of a board
+    path('<int:pk>/export/<str:export_format>/', BoardExportView.as_view(), name='board-export'),  # Endpoint streaming a board as JSON Lines (jsonl) or CSV (csv)
+    path('export/<str:export_format>/', BoardExportView.as_view(), name='board-export-all'),  # Endpoint streaming all of the user's boards as JSON Lines or CSV
+    path('imports/', BoardImportListCreateView.as_view(), name='board-import-list-create'),  # Endpoint for listing imports or uploading a Trello JSON export
+    path('imports/<int:pk>/', BoardImportDetailView.as_view(), name='board-import-detail'),  # Endpoint for following an import
+    path('archived/', ArchivedBoardListView.as_view(), name='archived-board-list'),  # Endpoint for listing archived boards
+    path('archived/<int:pk>/', ArchivedBoardDetailView.as_view(), name='archived-board-detail'),  # Endpoint streaming an archived board, read-only
+    path('archived/<int:pk>/restore/', ArchivedBoardRestoreView.as_view(), name='archived-board-restore'),  # Endpoint for restoring an archived board
+    path('async/', BoardListAsyncView.as_view(), name='board-list-async'),  # Async (ASGI) version of the board list
+    path('async/<int:pk>/', BoardDetailAsyncView.as_view(), name='board-detail-async'),  # Async (ASGI) version of the board detail
 ]
\ No newline at end of file
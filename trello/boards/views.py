@@ -1,74 +1,628 @@
 """
 Django REST Framework views for board-related API endpoints.
 
-This module defines generic views for listing/creating boards and retrieving/updating/deleting individual boards.
+This module defines generic views for listing/creating boards and retrieving/updating/
+deleting individual boards. Other views restore deleted boards, clone boards and save
+them as templates, and archive boards. Archived boards can be read and restored. Boards
+are exported, Trello exports imported, and board analytics read. Async versions of the
+board list and detail serve ASGI.
 Views ensure authentication and restrict access to boards owned or membership-based.
 """
 
 from rest_framework import generics
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
-from .models import Board
-from .serializers import BoardSerializer
+from rest_framework import status
+from rest_framework.response import Response
+from .analytics import board_analytics
+from .archive import restore_archived_board, stream_document
+from .cloning import clone_board
+from .export import EXPORT_FORMATS, accepts_gzip, export_stream
+from .models import ArchivedBoard, Board, BoardImport
+from .serializers import (
+    ArchivedBoardSerializer, BoardAnalyticsQuerySerializer, BoardCloneSerializer, BoardImportCreateSerializer,
+    BoardImportSerializer, BoardSerializer,
+)
+from .trash import restorable_boards
+from .trello_import import run_import
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from core.async_views import AsyncReadView
+from core.conditional import ConditionalRequestMixin
+from core.mixins import AtomicWriteMixin, SerializerTimingMixin
+from core.routers import tenant_database
+from core.softdelete import restore, soft_delete
+from workspaces.tenancy import check_board_quota, check_workspace_database, personal_workspace
 
 
-class BoardListCreateView(generics.ListCreateAPIView):
+def accessible_boards(user):
+    """
+    Returns the boards a user owns or is a member of, ready for BoardSerializer.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The boards, with the owner joined and the members prefetched.
+    """
+    return (
+        Board.objects.filter(Q(owner=user) | Q(members=user))
+        .distinct()
+        .select_related('owner')
+        .prefetch_related('members')
+    )
+
+
+def accessible_archived_boards(user):
+    """
+    Returns the archived boards a user owns or was a member of, without their documents.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The archived boards, with the owner joined and the members prefetched.
+    """
+    return (
+        ArchivedBoard.objects.filter(Q(owner=user) | Q(members=user))
+        .distinct()
+        .defer('data')
+        .select_related('owner')
+        .prefetch_related('members')
+    )
+
+
+def scope_to_workspace(queryset, params):
+    """
+    Limits boards to one workspace when the query parameters name one.
+
+    Args:
+        queryset (QuerySet): The boards.
+        params (QueryDict): The query parameters; `workspace` is a workspace id.
+
+    Returns:
+        QuerySet: The boards of that workspace, or all of them without the parameter.
+
+    Raises:
+        ValidationError: If `workspace` is not an id.
+    """
+    workspace_id = params.get('workspace')
+    if workspace_id is None:
+        return queryset
+    if not workspace_id.isdigit():
+        raise ValidationError({'workspace': ['Must be a workspace id.']})
+    return queryset.filter(workspace_id=workspace_id)
+
+
+def filter_templates(queryset, params):
+    """
+    Limits boards to the templates, or to the other boards, when the query parameters ask.
+
+    Args:
+        queryset (QuerySet): The boards.
+        params (QueryDict): The query parameters; `template` is 'true' or 'false'.
+
+    Returns:
+        QuerySet: The templates, the other boards, or all of them without the parameter.
+
+    Raises:
+        ValidationError: If `template` is neither 'true' nor 'false'.
+    """
+    template = params.get('template')
+    if template is None:
+        return queryset
+    if template not in ('true', 'false'):
+        raise ValidationError({'template': ["Must be 'true' or 'false'."]})
+    return queryset.filter(is_template=template == 'true')
+
+
+class BoardListCreateView(ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating boards.
 
-    Handles GET requests to list boards the user owns or is a member of,
-    and POST requests to create new boards with the authenticated user as owner.
-    Enforces a limit of 5 total boards per user (owned or joined).
+    Handles GET requests to list boards the user owns or is a member of (`?workspace=<id>`
+    for the boards of one workspace, `?template=true` for the templates only, `?template=false`
+    for the other boards), and POST requests to create new boards with the
+    authenticated user as owner, in the user's personal workspace unless another is given.
+    Enforces the board quota of the workspace (boards owned or joined per user).
     """
     queryset = Board.objects.all()
     serializer_class = BoardSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5, 'POST': 8}
 
     def perform_create(self, serializer):
         """
-        Custom creation logic to enforce board limit and set owner.
+        Custom creation logic to enforce the board quota and set owner and workspace.
 
-        Checks if the user has reached the maximum of 5 boards (owned or membership).
-        Raises ValidationError if limit exceeded.
+        Checks that the workspace is the one the request is routed to (see
+        workspaces.middleware), and if the user has reached the max_boards_per_user boards
+        (owned or membership) of the workspace. Raises ValidationError otherwise.
         Saves the serializer with the request user as owner.
         """
-        max_boards = 5  # Board limit per user
-        # Counting the total boards that the user owns or is a member of
-        total_boards = Board.objects.filter(
-            Q(owner=self.request.user) | Q(members=self.request.user)
-        ).distinct().count()
-        if total_boards >= max_boards:
-            raise ValidationError(f"Cannot create or join more than {max_boards} boards.")
-        serializer.save(owner=self.request.user)
+        workspace = serializer.validated_data.get('workspace') or personal_workspace(self.request.user)
+        check_workspace_database(workspace)
+        check_board_quota(
+            workspace, self.request.user, "Cannot create or join more than {max_boards} boards in this workspace."
+        )
+        serializer.save(owner=self.request.user, workspace=workspace)
 
     def get_queryset(self):
         """
-        Filters queryset to boards owned by or where the user is a member.
+        Filters queryset to boards owned by or where the user is a member, in one workspace
+        with `?workspace=<id>`, templates or not with `?template=true|false`.
+        The owner is joined and the members are prefetched for the nested serializers.
 
         Returns:
             QuerySet: Boards accessible to the requesting user.
         """
-        return Board.objects.filter(Q(owner=self.request.user) | Q(members=self.request.user))
+        params = self.request.query_params
+        return filter_templates(scope_to_workspace(accessible_boards(self.request.user), params), params)
 
 
-class BoardDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BoardDetailView(
+    ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API view for retrieving, updating, or deleting a specific board.
 
     Restricts access to boards the user owns or is a member of.
-    Supports GET, PUT/PATCH, and DELETE methods.
+    Supports GET, PUT/PATCH, and DELETE methods, with ETag/Last-Modified validators.
+    DELETE hides the board with everything on it and can be undone for a while (see core.softdelete).
     """
     queryset = Board.objects.all()
     serializer_class = BoardSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5, 'PUT': 10, 'PATCH': 10, 'DELETE': 6}
+    last_modified_covers_payload = True
 
     def get_queryset(self):
         """
         Filters queryset to boards owned by or where the user is a member.
 
         Ensures only accessible boards can be retrieved/updated/deleted.
+        The owner is joined and the members are prefetched for the nested serializers.
+
         Returns:
             QuerySet: Boards accessible to the requesting user.
         """
-        return Board.objects.filter(Q(owner=self.request.user) | Q(members=self.request.user))
\ No newline at end of file
+        return accessible_boards(self.request.user)
+
+    def perform_destroy(self, instance):
+        """
+        Marks the board as deleted; its lists and tasks are purged in the background later.
+
+        Args:
+            instance (Board): The board to delete.
+        """
+        soft_delete(instance)
+
+
+class BoardRestoreView(AtomicWriteMixin, SerializerTimingMixin, generics.GenericAPIView):
+    """
+    API view for undoing the deletion of a board.
+
+    Handles POST requests restoring, with everything on it, a board the user owns or is a
+    member of that was deleted less than SOFT_DELETE_UNDO_MINUTES ago. The board quota of
+    the workspace is checked again for the owner of the board.
+    """
+    serializer_class = BoardSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 9}
+
+    def post(self, request, pk):
+        """
+        Restores the board.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The deleted board.
+
+        Returns:
+            Response: The restored board.
+
+        Raises:
+            Http404: If the board is not deleted, not accessible, or its undo window is over.
+            ValidationError: If the owner reached the board quota of the workspace meanwhile.
+        """
+        board = get_object_or_404(restorable_boards(request.user), pk=pk)
+        check_board_quota(
+            board.workspace, board.owner, "Cannot restore the board: its owner has {max_boards} boards in this workspace."
+        )
+        restore(board)
+        return Response(self.get_serializer(accessible_boards(request.user).get(pk=pk)).data)
+
+
+class BoardCloneView(AtomicWriteMixin, generics.GenericAPIView):
+    """
+    API view for cloning a board, or saving it as a template.
+
+    Handles POST requests for a board the user owns or is a member of, copying its labels,
+    lists, tasks and checklist items into a new board owned by the user (see boards.cloning),
+    with the options of BoardCloneSerializer. The view of /template/ is created with
+    template=True and saves the copy as a template; cloning a template creates a plain board.
+    The board quota of the new board's workspace is checked for the user, as on creation.
+    """
+    serializer_class = BoardCloneSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 32}
+    template = False
+
+    def post(self, request, pk):
+        """
+        Clones the board.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The board copied.
+
+        Returns:
+            Response: The new board, 201 Created.
+
+        Raises:
+            Http404: If the board does not exist or is not accessible.
+            ValidationError: If the options are invalid, or the user reached the board quota of
+                            the workspace.
+        """
+        board = get_object_or_404(accessible_boards(request.user).select_related('workspace'), pk=pk)
+        serializer = self.get_serializer(
+            data=request.data, context={**self.get_serializer_context(), 'board': board}
+        )
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        check_board_quota(
+            options['workspace'], request.user, "Cannot create or join more than {max_boards} boards in this workspace."
+        )
+        clone = clone_board(board, request.user, template=self.template, **options)
+        return Response(
+            BoardSerializer(accessible_boards(request.user).get(pk=clone.pk)).data, status=status.HTTP_201_CREATED
+        )
+
+
+class BoardArchiveView(AtomicWriteMixin, generics.GenericAPIView):
+    """
+    API view for archiving a board.
+
+    Handles POST requests from the owner of a board. The board is archived by a Celery task
+    once the request commits (see boards.archive): it stays as it is until then, and is then
+    read from /boards/archived/.
+    """
+    serializer_class = BoardSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 4}
+
+    def post(self, request, pk):
+        """
+        Enqueues the archiving of the board.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The board.
+
+        Returns:
+            Response: 202 Accepted.
+
+        Raises:
+            Http404: If the board does not exist or the user is not its owner.
+        """
+        board = get_object_or_404(Board.objects.filter(owner=request.user), pk=pk)
+        # Imported here: loads the Celery app, which only this view needs
+        from .tasks import archive_board
+
+        database = tenant_database()
+        transaction.on_commit(lambda: archive_board.delay(board.pk, database), using=database)
+        return Response({'detail': 'The board will be archived.'}, status=status.HTTP_202_ACCEPTED)
+
+
+class ArchivedBoardListView(SerializerTimingMixin, generics.ListAPIView):
+    """
+    API view for listing archived boards.
+
+    Handles GET requests to list the archived boards the user owns or was a member of
+    (`?workspace=<id>` for the archived boards of one workspace), without their contents.
+    """
+    serializer_class = ArchivedBoardSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5}
+
+    def get_queryset(self):
+        """
+        Filters queryset to archived boards owned by or where the user was a member.
+
+        Returns:
+            QuerySet: Archived boards accessible to the requesting user.
+        """
+        return scope_to_workspace(accessible_archived_boards(self.request.user), self.request.query_params)
+
+
+class ArchivedBoardDetailView(generics.GenericAPIView):
+    """
+    API view for reading an archived board, read-only.
+
+    Handles GET requests by streaming the JSON document of the board (see boards.archive)
+    as it is decompressed, with its lists, tasks, labels, checklists and invitations.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 4}
+
+    def get(self, request, pk):
+        """
+        Streams the document of the archived board.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The archived board.
+
+        Returns:
+            StreamingHttpResponse: The JSON document.
+
+        Raises:
+            Http404: If the archived board does not exist or is not accessible.
+        """
+        accessible = accessible_archived_boards(request.user).values('pk')
+        archived = get_object_or_404(ArchivedBoard.objects.only('data').filter(pk__in=accessible), pk=pk)
+        return StreamingHttpResponse(stream_document(archived), content_type='application/json')
+
+
+class ArchivedBoardRestoreView(AtomicWriteMixin, SerializerTimingMixin, generics.GenericAPIView):
+    """
+    API view for restoring an archived board.
+
+    Handles POST requests from the owner of an archived board, which is loaded back into the
+    board, list and task tables with its ids and timestamps. The board quota of its workspace
+    is checked for the owner. The budget covers purging the rows of an interrupted archive
+    first, a fixed number of queries whatever the size of the board.
+    """
+    serializer_class = BoardSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 30}
+
+    def post(self, request, pk):
+        """
+        Restores the archived board.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The archived board.
+
+        Returns:
+            Response: The restored board.
+
+        Raises:
+            Http404: If the archived board does not exist or the user is not its owner.
+            ValidationError: If the owner reached the board quota of the workspace.
+        """
+        archived = get_object_or_404(ArchivedBoard.objects.filter(owner=request.user), pk=pk)
+        check_board_quota(
+            archived.workspace, request.user, "Cannot restore the board: you have {max_boards} boards in this workspace."
+        )
+        restore_archived_board(archived)
+        return Response(self.get_serializer(accessible_boards(request.user).get(pk=pk)).data)
+
+
+class BoardExportView(generics.GenericAPIView):
+    """
+    API view for exporting boards as JSON Lines or CSV.
+
+    Handles GET requests for one board the user owns or is a member of, or for all of them
+    (`?workspace=<id>` for the boards of one workspace). The export is streamed as it is read
+    (see boards.export), gzip-compressed when the client accepts it.
+
+    Left out of the OpenAPI schema, which cannot describe a streamed file without importing
+    drf_yasg here; the formats are documented in the README.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 2}
+    swagger_schema = None
+
+    def get(self, request, export_format, pk=None):
+        """
+        Streams the export of the board, or of all the user's boards.
+
+        Args:
+            request: The HTTP request object.
+            export_format (str): 'jsonl' or 'csv'.
+            pk (int, optional): The board; all accessible boards without it.
+
+        Returns:
+            StreamingHttpResponse: The export, as an attachment.
+
+        Raises:
+            Http404: If the format is unknown, or the board does not exist or is not accessible.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise Http404
+        boards = Board.objects.filter(Q(owner=request.user) | Q(members=request.user)).distinct()
+        if pk is not None:
+            boards = boards.filter(pk=pk)
+        else:
+            boards = scope_to_workspace(boards, request.query_params)
+        board_ids = list(boards.order_by('id').values_list('pk', flat=True))
+        if pk is not None and not board_ids:
+            raise Http404
+
+        # The rows are read once the view has returned, out of the workspace routing
+        compress = bool(accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        response = StreamingHttpResponse(
+            export_stream(board_ids, tenant_database(), export_format, compress),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        name = f'board-{pk}' if pk is not None else 'boards'
+        response['Content-Disposition'] = f'attachment; filename="{name}.{export_format}"'
+        return response
+
+
+class BoardAnalyticsView(generics.GenericAPIView):
+    """
+    API view for the analytics of a board: cumulative flow, throughput and overdue trends.
+
+    Handles GET requests for a board the user owns or is a member of, over a range of days
+    (`?start=` and `?end=`, ISO dates; the year up to yesterday by default). The analytics are
+    read from the daily rollups only (see boards.analytics), so the tasks of today are not
+    counted yet. A task counts as completed from the time it was marked completed (the
+    `completed` field of the task endpoints), not when its checklist is all done; it is
+    overdue while it is past due and not completed.
+    """
+    serializer_class = BoardAnalyticsQuerySerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 4}
+
+    def get(self, request, pk):
+        """
+        Returns the analytics of the board.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The board.
+
+        Returns:
+            Response: The analytics, see board_analytics().
+
+        Raises:
+            ValidationError: If the range of days is invalid.
+            Http404: If the board does not exist or is not accessible.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        boards = Board.objects.filter(Q(owner=request.user) | Q(members=request.user), pk=pk)
+        if not boards.exists():
+            raise Http404
+        return Response(board_analytics(pk, serializer.validated_data['start'], serializer.validated_data['end']))
+
+
+class BoardImportListCreateView(AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
+    """
+    API view for listing the user's imports of Trello exports and uploading one.
+
+    Handles GET requests to list the imports of the user, newest first, and POST requests
+    (multipart, with the export as `file` and optionally a `workspace`) to import an export
+    into a new board owned by the user (see boards.trello_import). Exports of up to
+    IMPORT_INLINE_MAX_BYTES are imported during the request; larger ones are stored and
+    imported by a Celery task once the request commits, and followed through
+    /boards/imports/{id}/.
+    """
+    serializer_class = BoardImportSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    query_budget = {'GET': 3, 'POST': 40}
+
+    def get_queryset(self):
+        """
+        Returns the imports of the requesting user, newest first.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            # Schema generation, without a user
+            return BoardImport.objects.none()
+        return BoardImport.objects.filter(owner=self.request.user).order_by('-created_at', '-id')
+
+    def get_serializer_class(self):
+        """
+        Returns the upload serializer for POST, the read-only import serializer otherwise.
+        """
+        if getattr(self, 'swagger_fake_view', False) and self.request is None:
+            # Schema generation, without a request to tell the method
+            return BoardImportSerializer
+        return BoardImportCreateSerializer if self.request.method == 'POST' else BoardImportSerializer
+
+    def create(self, request, *args, **kwargs):
+        """
+        Imports the uploaded export, or enqueues its import.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The import; 201 Created once imported, 202 Accepted if enqueued. An
+            export rejected during the request is not recorded as an import.
+
+        Raises:
+            ValidationError: If the upload is invalid, the workspace is on another database
+                            than the request's, the owner reached the board quota of
+                            the workspace, or the export imported during the request is not a
+                            Trello JSON export.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        workspace = serializer.validated_data.get('workspace') or personal_workspace(request.user)
+        check_workspace_database(workspace)
+        check_board_quota(workspace, request.user, "Cannot import the board: you have {max_boards} boards in this workspace.")
+
+        database = tenant_database()
+        board_import = BoardImport(owner=request.user, workspace=workspace)
+        if upload.size <= settings.IMPORT_INLINE_MAX_BYTES:
+            # In a savepoint, so a rejected export leaves no failed import behind whichever
+            # transaction the request runs in
+            with transaction.atomic(using=database):
+                board_import.save()
+                run_import(board_import, upload, database)
+                if board_import.status == 'failed':
+                    raise ValidationError({'file': [board_import.error]})
+            return Response(BoardImportSerializer(board_import).data, status=status.HTTP_201_CREATED)
+
+        board_import.file = upload
+        board_import.save()
+        # Imported here: loads the Celery app, which only this view needs
+        from .tasks import import_board
+
+        transaction.on_commit(lambda: import_board.delay(board_import.pk, database), using=database)
+        return Response(BoardImportSerializer(board_import).data, status=status.HTTP_202_ACCEPTED)
+
+
+class BoardImportDetailView(SerializerTimingMixin, generics.RetrieveAPIView):
+    """
+    API view for following an import of a Trello export.
+
+    Handles GET requests for the imports of the user, with the progress of a running import.
+    """
+    serializer_class = BoardImportSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3}
+
+    def get_queryset(self):
+        """
+        Returns the imports of the requesting user.
+        """
+        return BoardImport.objects.filter(owner=self.request.user)
+
+
+class BoardListAsyncView(AsyncReadView):
+    """
+    Async version of the board list (GET of BoardListCreateView) for ASGI.
+    """
+    query_budget = 5
+
+    async def get_data(self, request, user, **kwargs):
+        """
+        Returns the boards the user owns or is a member of.
+        """
+        queryset = filter_templates(scope_to_workspace(accessible_boards(user), request.GET), request.GET)
+        boards = [board async for board in queryset.aiterator(chunk_size=self.chunk_size)]
+        return BoardSerializer(boards, many=True).data
+
+
+class BoardDetailAsyncView(AsyncReadView):
+    """
+    Async version of the board detail (GET of BoardDetailView) for ASGI.
+    """
+    query_budget = 5
+
+    async def get_data(self, request, user, pk=None, **kwargs):
+        """
+        Returns the board if the user owns it or is a member of it.
+
+        Raises:
+            Http404: If the board does not exist or is not accessible.
+        """
+        board = await accessible_boards(user).filter(pk=pk).afirst()
+        if board is None:
+            raise Http404('No Board matches the given query.')
+        return BoardSerializer(board).data
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .db import install_execute_dispatcher, install_on_open_connections
+
+        connection_created.connect(install_execute_dispatcher, weak=False)
+        install_on_open_connections()
+        # The Celery publish timing hooks are connected by trello.celery when the app loads
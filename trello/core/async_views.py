@@ -0,0 +1,142 @@
+"""
+Base classes for the async read endpoints.
+
+DRF views are synchronous, so under ASGI each of them holds a worker thread for the whole
+request. The hot read endpoints also have async versions built on plain Django async views:
+they authenticate the JWT and run their queries with the async ORM, so one ASGI worker can
+wait on many slow clients at once. Their responses match the DRF versions, since they use
+the same serializers on fully prefetched instances (the serializers never hit the database).
+"""
+
+from abc import ABC, abstractmethod
+
+from django.http import Http404, HttpResponse
+from django.utils import translation
+from django.utils.translation import gettext as _
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES, JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .renderers import TimedJSONRenderer
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with an async user lookup.
+
+    Token parsing and validation are pure computation and are inherited unchanged.
+    """
+    async def aauthenticate(self, request):
+        """
+        Authenticates the request from its Authorization header.
+
+        Args:
+            request: The Django HttpRequest.
+
+        Returns:
+            User or None: The authenticated user, or None if no JWT was sent.
+
+        Raises:
+            AuthenticationFailed: If the token is invalid or its user cannot log in.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return await self.aget_user(self.get_validated_token(raw_token))
+
+    async def aget_user(self, validated_token):
+        """
+        Async version of JWTAuthentication.get_user().
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as error:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from error
+
+        user = await self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+
+class AsyncReadView(ABC, View):
+    """
+    Async, JWT-authenticated, read-only JSON view.
+
+    An abstract base class: subclasses must implement `get_data()`, and one without it cannot
+    be instantiated. get_data() may raise Http404 or an APIException. Errors are returned in
+    DRF's format ({"detail": ...}) with the same status codes as the DRF views. The preferred
+    language of the authenticated user is activated here rather than by UserLanguageMiddleware,
+    which would look the user up a second time.
+    """
+    http_method_names = ['get', 'head', 'options']
+    authentication_class = AsyncJWTAuthentication
+    chunk_size = 200  # rows fetched (and prefetched) per aiterator() round trip
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Authenticates the request and renders the data returned by get_data().
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            HttpResponse: The JSON response.
+        """
+        try:
+            user = await self.authentication_class().aauthenticate(request)
+        except AuthenticationFailed as error:
+            # Same body as DRF's exception handler: a dict detail is returned as is
+            data = error.detail if isinstance(error.detail, dict) else {'detail': error.detail}
+            return self.render(data, status=error.status_code, authenticate=True)
+        if user is None:
+            return self.render({'detail': NotAuthenticated.default_detail}, status=401, authenticate=True)
+        request.user = user
+        if user.preferred_language:
+            translation.activate(user.preferred_language)
+            request.LANGUAGE_CODE = user.preferred_language
+
+        try:
+            data = await self.get_data(request, user, **kwargs)
+        except Http404 as error:
+            return self.render({'detail': str(error) or _('Not found.')}, status=404)
+        except APIException as error:
+            # E.g. invalid query parameters; same body as DRF's exception handler
+            data = error.detail if isinstance(error.detail, (dict, list)) else {'detail': error.detail}
+            return self.render(data, status=error.status_code)
+        return self.render(data)
+
+    @abstractmethod
+    async def get_data(self, request, user, **kwargs):
+        """
+        Returns the serialized data of the response. Implemented by subclasses.
+
+        Args:
+            request: The HTTP request object.
+            user: The authenticated user.
+            **kwargs: The URL keyword arguments.
+
+        Raises:
+            Http404: If the requested object does not exist or is not accessible.
+            APIException: E.g. ValidationError, returned with its status code.
+        """
+
+    def render(self, data, status=200, authenticate=False):
+        """
+        Renders data as a JSON response.
+        """
+        response = HttpResponse(TimedJSONRenderer().render(data), status=status, content_type='application/json')
+        if authenticate:
+            response['WWW-Authenticate'] = f'{AUTH_HEADER_TYPES[0]} realm="api"'
+        return response
@@ -0,0 +1,207 @@
+"""
+Sub-requests of the /batch/ endpoint.
+
+A batch runs an ordered list of API requests in one HTTP round trip. Each sub-request is
+built from the batch request (same host, cookies and Authorization header), resolved
+against the URLconf and handed to its view directly, without going through the middleware
+again. DRF views get the user the batch request was authenticated with, so the JWT is only
+checked once per batch.
+
+With `atomic`, all sub-requests run in one database transaction: the first one answering
+with an error status rolls the transaction back, and the sub-requests after it are not run.
+"""
+
+import json
+import logging
+from contextlib import nullcontext
+from io import BytesIO
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from django.utils import translation
+from django.utils.translation import gettext as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .querybudget import QueryRecorder, report_budget_violations
+from .routers import activate_request, deactivate_request, tenant_database
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Headers a sub-request may set; everything else is taken from the batch request
+FORWARDED_HEADERS = ('Accept-Language', 'If-Match', 'If-None-Match', 'If-Modified-Since', 'If-Unmodified-Since')
+
+# Headers of the sub-responses returned to the client
+RETURNED_HEADERS = ('ETag', 'Last-Modified', 'Location')
+
+# Status of the sub-requests skipped after an error in an atomic batch
+FAILED_DEPENDENCY = 424
+
+
+def build_subrequest(request, method, path, body=None, headers=None):
+    """
+    Builds the HttpRequest of a sub-request.
+
+    Args:
+        request: The DRF Request of the batch.
+        method (str): The HTTP method.
+        path (str): The path, with an optional query string.
+        body: The JSON body, or None.
+        headers (dict): Headers of FORWARDED_HEADERS to set.
+
+    Returns:
+        WSGIRequest: The sub-request, authenticated as the batch request's user.
+    """
+    path_info, _, query_string = path.partition('?')
+    content = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        key: value for key, value in request._request.META.items()
+        if not key.startswith(('HTTP_IF_', 'HTTP_CONTENT_', 'CONTENT_', 'wsgi.'))
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+        'wsgi.url_scheme': request.scheme,
+    })
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+    subrequest = WSGIRequest(environ)
+    # What the middleware set on the batch request
+    if hasattr(request._request, 'session'):
+        subrequest.session = request._request.session
+    subrequest.user = request.user
+    # Read by rest_framework.request.Request: skips the authentication classes
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def _response_body(response):
+    """
+    Returns the body of a sub-response as JSON-serializable data.
+    """
+    if isinstance(response, Response):
+        return response.data
+    if response.streaming or not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def _call_view(subrequest, match):
+    """
+    Calls the view of a sub-request and returns its response.
+    """
+    subrequest.resolver_match = match
+    callback = match.func
+    if iscoroutinefunction(callback):
+        return async_to_sync(callback)(subrequest, *match.args, **match.kwargs)
+    return callback(subrequest, *match.args, **match.kwargs)
+
+
+def run_subrequest(request, method, path, body=None, headers=None):
+    """
+    Runs one sub-request of a batch.
+
+    Args:
+        request: The DRF Request of the batch.
+        method (str): The HTTP method.
+        path (str): The path, with an optional query string.
+        body: The JSON body, or None.
+        headers (dict): Headers of FORWARDED_HEADERS to set.
+
+    Returns:
+        dict: The sub-response: its status, RETURNED_HEADERS and body.
+    """
+    subrequest = build_subrequest(request, method, path, body, headers)
+    try:
+        match = resolve(subrequest.path_info)
+    except Resolver404:
+        return {'status': 404, 'headers': {}, 'body': {'detail': _('Not found.')}}
+    view_class = getattr(match.func, 'view_class', None)
+    if not getattr(view_class, 'batchable', True):
+        return {'status': 400, 'headers': {}, 'body': {'detail': _('This endpoint cannot be used in a batch.')}}
+
+    language = translation.get_language()
+    if headers and any(name.lower() == 'accept-language' for name in headers):
+        language = translation.get_language_from_request(subrequest)
+    subrequest.LANGUAGE_CODE = language
+
+    recorder = QueryRecorder(settings.QUERY_BUDGET_REPEAT_THRESHOLD) if settings.QUERY_BUDGET != 'off' else None
+    with translation.override(language), recorder.record() if recorder else nullcontext():
+        try:
+            response = _call_view(subrequest, match)
+        except Http404:
+            response = Response({'detail': _('Not found.')}, status=404)
+        except PermissionDenied:
+            response = Response({'detail': _('You do not have permission to perform this action.')}, status=403)
+        except Exception:
+            logger.exception('Batch sub-request failed: %s %s', method, path)
+            response = Response({'detail': _('A server error occurred.')}, status=500)
+    if recorder is not None:
+        subrequest.query_budget_view = view_class
+        report_budget_violations(subrequest, recorder)
+
+    return {
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)},
+        'body': _response_body(response),
+    }
+
+
+def run_batch(request, subrequests, atomic=False):
+    """
+    Runs the sub-requests of a batch in order.
+
+    A batch of safe-method sub-requests outside a transaction may read from the replicas
+    (ReplicaRoutingMiddleware only sees a POST) and does not pin the client to the primary.
+
+    Args:
+        request: The DRF Request of the batch.
+        subrequests (list): Validated sub-requests (method, path, body, headers).
+        atomic (bool): Whether to run them in one transaction, rolled back on the first error.
+
+    Returns:
+        tuple: (list of sub-responses, whether the transaction was rolled back)
+    """
+    # The budgets of the sub-requests' views were checked one by one
+    request._request.query_budget_checked = True
+
+    if atomic:
+        responses = []
+        with transaction.atomic(using=tenant_database()):
+            for index, subrequest in enumerate(subrequests):
+                response = run_subrequest(request, **subrequest)
+                responses.append(response)
+                if response['status'] >= 400:
+                    transaction.set_rollback(True)
+                    responses.extend(
+                        {'status': FAILED_DEPENDENCY, 'headers': {}, 'body': None}
+                        for _ in subrequests[index + 1:]
+                    )
+                    return responses, True
+        return responses, False
+
+    read_only = all(subrequest['method'] in SAFE_METHODS for subrequest in subrequests)
+    token = None
+    if read_only and settings.REPLICA_DATABASES:
+        request._request.read_only = True
+        token = activate_request(request._request, settings.REPLICA_PIN_COOKIE not in request.COOKIES)
+    try:
+        return [run_subrequest(request, **subrequest) for subrequest in subrequests], False
+    finally:
+        if token is not None:
+            deactivate_request(token)
@@ -0,0 +1,77 @@
+"""
+Helpers shared by the benchmark management commands.
+
+This module provides small utilities to summarize latency samples into the
+percentile-based figures that every benchmark reports, and to run a benchmark
+against a throwaway database.
+"""
+
+import math
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+# Username prefix and password of the users generated by seed_benchmark_data
+BENCH_USER_PREFIX = 'bench_'
+BENCH_PASSWORD = 'bench-password'
+
+
+def percentile(sorted_samples, pct):
+    """
+    Returns the nearest-rank percentile of an already sorted list of samples.
+
+    Args:
+        sorted_samples (list): Samples sorted in ascending order.
+        pct (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The sample at the requested percentile, or 0.0 for an empty list.
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize_latencies(samples):
+    """
+    Summarizes latency samples (in seconds) as milliseconds.
+
+    Args:
+        samples (list): Latency samples in seconds.
+
+    Returns:
+        dict: Sample count, mean, p50, p95, p99 and max latency in milliseconds.
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'mean_ms': round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+@contextmanager
+def scratch_database(verbosity=0):
+    """
+    Runs the enclosed block against a fresh, migrated test database.
+
+    Uses the same machinery as the test runner, so benchmarks never touch the
+    configured database. The test environment is set up as well, which allows the
+    test client's host and switches email to the in-memory backend.
+
+    Args:
+        verbosity (int): Verbosity passed to the test database creation.
+    """
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
@@ -0,0 +1,230 @@
+"""
+Conditional requests (ETag, Last-Modified, If-Match) for the DRF views.
+
+A client that polls a board, its lists or a task sends back the ETag it got with
+If-None-Match and receives 304 Not Modified while nothing changed. The validator behind
+the ETag is computed with one aggregate query (row count and latest updated_at of the
+objects in the response and of the related objects nested in it) instead of serializing
+the response and hashing it. Membership changes (board members, task assignees) bump the
+updated_at of the board or task through touch_on_m2m_change(), so they change it as well.
+
+Writes can be made conditional too: PUT, PATCH and DELETE with an If-Match header that no
+longer matches the current ETag are rejected with 412 Precondition Failed, so two clients
+editing the same object cannot silently overwrite each other.
+"""
+
+import copy
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+
+
+class PreconditionFailed(APIException):
+    """
+    Raised when the If-Match (or If-Unmodified-Since) precondition of a write fails.
+    """
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource was modified since you last retrieved it.'
+    default_code = 'precondition_failed'
+
+
+def evaluate_preconditions(request, etag, last_modified):
+    """
+    Evaluates the conditional headers of a request against the current validators.
+
+    Same as django.utils.cache.get_conditional_response(), except that If-Unmodified-Since
+    is ignored when the resource has no Last-Modified (RFC 9110, section 13.1.4) instead of
+    always failing.
+
+    Args:
+        request: The Django HttpRequest.
+        etag (str): The current ETag.
+        last_modified (int or None): The current Last-Modified timestamp.
+
+    Returns:
+        HttpResponse or None: A 304 or 412 response, or None if the request should proceed.
+    """
+    if last_modified is None and 'HTTP_IF_UNMODIFIED_SINCE' in request.META:
+        request = copy.copy(request)
+        request.META = {key: value for key, value in request.META.items() if key != 'HTTP_IF_UNMODIFIED_SINCE'}
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def touch_on_m2m_change(field_name):
+    """
+    Returns an m2m_changed receiver that bumps updated_at when a many-to-many field changes.
+
+    Adding or removing a member does not save the board, so its updated_at (and thus its
+    validator) would not change. Both sides of the relation are handled: board.members.add()
+    touches the board, user.board_memberships.add() touches the boards in pk_set.
+
+    Args:
+        field_name (str): The many-to-many field, on the model that has updated_at.
+
+    Returns:
+        callable: The receiver, to connect with sender=<Model>.<field_name>.through.
+    """
+    def receiver(sender, instance, action, reverse, model, pk_set, **kwargs):
+        if action not in ('post_add', 'post_remove', 'pre_clear'):
+            return
+        if pk_set is not None and not pk_set:
+            return  # Nothing was actually added or removed
+        now = timezone.now()
+        if not reverse:
+            type(instance)._default_manager.filter(pk=instance.pk).update(updated_at=now)
+            instance.updated_at = now
+        elif pk_set is not None:
+            model._default_manager.filter(pk__in=pk_set).update(updated_at=now)
+        else:
+            model._default_manager.filter(**{field_name: instance}).update(updated_at=now)
+    return receiver
+
+
+class ConditionalRequestMixin:
+    """
+    Adds ETag (and optionally Last-Modified) validators to a DRF generic view.
+
+    GET and HEAD answer 304 Not Modified when the client's copy is current. PUT, PATCH and
+    DELETE honour If-Match and If-Unmodified-Since, and successful updates return the new
+    ETag so the client can chain edits.
+
+    Attributes:
+        conditional_related (tuple): Relations nested in the response (e.g. 'tasks'), whose
+            row count and latest updated_at are part of the validator.
+        last_modified_covers_payload (bool): Whether the latest updated_at changes with every
+            change of the response. Only then is Last-Modified sent and If-Modified-Since
+            honoured: a deleted row changes the row count, but not the latest updated_at.
+    """
+    conditional_related = ()
+    last_modified_covers_payload = False
+
+    def get_validators(self):
+        """
+        Computes the validators of the current response without serializing it.
+
+        Returns:
+            tuple: (etag, last_modified), last_modified being a timestamp or None; or
+            (None, None) if a detail view's object does not exist or is not accessible.
+        """
+        queryset = self.get_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        is_detail = lookup_url_kwarg in self.kwargs
+        if is_detail:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+        # The access filters join memberships and need distinct(), so aggregate over the ids
+        aggregates = {'count': Count('pk'), 'modified': Max('updated_at')}
+        for related in self.conditional_related:
+            related_filter = self.get_related_filter(related)
+            aggregates[f'{related}_count'] = Count(related, distinct=True, filter=related_filter)
+            aggregates[f'{related}_modified'] = Max(f'{related}__updated_at', filter=related_filter)
+        model = queryset.model
+        values = model._default_manager.filter(pk__in=queryset.values('pk')).aggregate(**aggregates)
+        if is_detail and not values['count']:
+            return None, None
+
+        # Keyed by model rather than view, so the ETag of a task detail GET is valid for a move
+        accepted_renderer = getattr(self.request, 'accepted_renderer', None)
+        parts = [
+            model._meta.label,
+            'detail' if is_detail else 'list',
+            getattr(accepted_renderer, 'format', ''),
+            str(self.request.user.pk),
+            # Filters and orderings are different representations of the same objects; every
+            # value of a repeated parameter counts
+            *(f'{key}={items!r}' for key, items in sorted(self.request.query_params.lists())),
+            *(f'{key}={values[key]!r}' for key in sorted(values)),
+        ]
+        etag = quote_etag(hashlib.md5(':'.join(parts).encode(), usedforsecurity=False).hexdigest())
+
+        modified = [value for key, value in values.items() if key.endswith('modified') and value]
+        last_modified = None
+        if self.last_modified_covers_payload and modified:
+            last_modified = timegm(max(modified).utctimetuple())
+        return etag, last_modified
+
+    def get_related_filter(self, related):
+        """
+        Returns the condition on a conditional_related relation selecting the related objects
+        nested in the response, or None if all of them are.
+
+        Args:
+            related (str): A name of conditional_related.
+
+        Returns:
+            Q or None: A condition relative to the view's model, e.g. on 'tasks__...'.
+        """
+        return None
+
+    def get(self, request, *args, **kwargs):
+        """
+        Answers 304 Not Modified when If-None-Match or If-Modified-Since match.
+
+        Args:
+            request: The HTTP request object.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            Response: The response, or an empty 304 response.
+        """
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        response = evaluate_preconditions(request._request, etag, last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        self.set_validator_headers(response, etag, last_modified)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Checks the preconditions of writes once the request is authenticated.
+
+        Like evaluate_preconditions(), but raises instead of returning a response, so the
+        error has DRF's format. Weak ETags never match If-Match (strong comparison).
+
+        Raises:
+            PreconditionFailed: If If-Match or If-Unmodified-Since do not match.
+        """
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS or request.method == 'POST':
+            return
+        if 'HTTP_IF_MATCH' not in request.META and 'HTTP_IF_UNMODIFIED_SINCE' not in request.META:
+            return
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return  # The view answers 404
+        if_match = parse_etags(request.META.get('HTTP_IF_MATCH', ''))
+        if if_match:
+            passes = if_match == ['*'] or etag in if_match
+        else:
+            if_unmodified_since = parse_http_date_safe(request.META.get('HTTP_IF_UNMODIFIED_SINCE', ''))
+            passes = not (last_modified and if_unmodified_since) or last_modified <= if_unmodified_since
+        if not passes:
+            raise PreconditionFailed()
+
+    def update(self, request, *args, **kwargs):
+        """
+        Updates the object and returns the validators of its new version.
+        """
+        response = super().update(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        if etag is not None:
+            self.set_validator_headers(response, etag, last_modified)
+        return response
+
+    def set_validator_headers(self, response, etag, last_modified):
+        """
+        Sets the ETag and Last-Modified headers of a response.
+        """
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
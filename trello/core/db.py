@@ -0,0 +1,65 @@
+"""
+Database execute wrappers that follow the current context instead of the current thread.
+
+connection.execute_wrapper() only sees queries run on the calling thread's connection. An
+async view runs its ORM queries on a worker thread through sync_to_async, so the request
+instrumentation (metrics, query budgets, profiling) would miss them. Instead, every
+connection gets a single dispatcher when it is created, and the wrappers of the current
+request are kept in a ContextVar, which asgiref copies into the worker threads.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+_active_wrappers = ContextVar('core_execute_wrappers', default=())
+
+
+def dispatch_execute(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection; runs the wrappers of the current context.
+
+    The first wrapper activated is the outermost, as with nested connection.execute_wrapper().
+    """
+    for wrapper in reversed(_active_wrappers.get()):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_execute_dispatcher(sender=None, connection=None, **kwargs):
+    """
+    Installs the dispatcher on a connection (connection_created signal receiver).
+
+    Args:
+        connection: The database wrapper that was just connected.
+    """
+    if dispatch_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, dispatch_execute)
+
+
+def install_on_open_connections():
+    """
+    Installs the dispatcher on the connections opened before the signal was connected.
+    """
+    for connection in connections.all(initialized_only=True):
+        install_execute_dispatcher(connection=connection)
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """
+    Runs the enclosed block with an execute wrapper on every database alias.
+
+    Unlike connection.execute_wrapper(), the wrapper also sees the queries that the block
+    runs on other threads through sync_to_async (the async ORM).
+
+    Args:
+        wrapper (callable): An execute wrapper, see connection.execute_wrapper().
+    """
+    token = _active_wrappers.set(_active_wrappers.get() + (wrapper,))
+    try:
+        yield wrapper
+    finally:
+        _active_wrappers.reset(token)
@@ -0,0 +1,265 @@
+"""
+Logging building blocks referenced from settings.LOGGING.
+
+This module provides a QueueHandler that hands records to a background QueueListener,
+so formatting and file I/O happen off the request thread, a rotating file handler that
+creates its directory, a JSON formatter for structured log records, and a sampling filter
+for noisy loggers such as django.db.backends.
+"""
+
+import atexit
+import json
+import logging
+import logging.config
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler as BaseRotatingFileHandler
+from pathlib import Path
+
+# Attributes every LogRecord has; anything else on a record was passed through `extra`.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+class RotatingFileHandler(BaseRotatingFileHandler):
+    """
+    RotatingFileHandler that creates the directory of its file when it opens it.
+
+    With delay=True the file is opened on the first record, so commands that log nothing
+    (check, test, migrate) leave no directory behind.
+    """
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _BlockingSentinelListener(QueueListener):
+    """
+    QueueListener whose stop() waits for room in a full queue instead of failing.
+    """
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler that owns the QueueListener feeding the target handlers.
+
+    The request thread only puts the record on a bounded in-memory queue; message
+    formatting and writing happen in the listener thread. When the queue is full the
+    record is dropped and counted rather than blocking the caller. The drops are reported
+    by a warning record once the queue has room again, and when the listener stops.
+
+    The listener is started lazily on the first record of each process, so forked
+    workers (Celery prefork, gunicorn --preload) get their own listener thread and queue.
+    A listener stopped in the same process is restarted on the same queue, with the
+    records left on it.
+
+    The target handlers and their formatters are configured here, from dicts in the
+    logging.config format given in this handler's own configuration, rather than looked
+    up among the configured handlers, which would depend on the order logging.config
+    configures them in.
+
+    Attributes:
+        targets (list): The handlers that receive the records.
+        dropped (int): Number of records dropped because the queue was full.
+        reported_dropped (int): Number of those already reported.
+    """
+    def __init__(self, handlers, formatters=None, queue_size=10000, respect_handler_level=True):
+        """
+        Initializes the handler and configures the target handlers.
+
+        Args:
+            handlers (dict): Configurations of the target handlers by name, as in
+                settings.LOGGING['handlers'].
+            formatters (dict, optional): Configurations of the formatters the target
+                handlers refer to by name, as in settings.LOGGING['formatters'].
+            queue_size (int): Maximum number of records waiting in the queue.
+            respect_handler_level (bool): Whether target handler levels are applied.
+
+        Raises:
+            ValueError: If a target handler or formatter cannot be configured.
+        """
+        super().__init__(queue.Queue(queue_size))
+        configurator = logging.config.DictConfigurator({})
+        configurator.config['formatters'] = {
+            name: configurator.configure_formatter(dict(config)) for name, config in (formatters or {}).items()
+        }
+        self.targets = []
+        for name, config in handlers.items():
+            try:
+                handler = configurator.configure_handler(dict(config))
+            except Exception as error:
+                raise ValueError(f'Unable to configure the target handler {name!r}.') from error
+            handler.name = name
+            self.targets.append(handler)
+        self.queue_size = queue_size
+        self.respect_handler_level = respect_handler_level
+        self.listener = None
+        self.listener_pid = None
+        self.listener_lock = threading.Lock()
+        self.dropped = 0
+        self.reported_dropped = 0
+        # A fork may copy the lock held by another thread of the parent
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset_listener_lock)
+        # Once: the registration is inherited by forked processes, where the pid check applies
+        atexit.register(self.stop_listener)
+
+    def reset_listener_lock(self):
+        """
+        Replaces the listener lock in a forked process.
+        """
+        self.listener_lock = threading.Lock()
+
+    def start_listener(self):
+        """
+        Starts a listener thread for the current process.
+
+        Must be called with listener_lock held.
+        """
+        if self.listener_pid is not None:
+            # Forked: the records on the inherited queue are the parent's, which its own
+            # listener writes, and the queue's locks may have been copied while held
+            self.queue = queue.Queue(self.queue_size)
+        self.listener = _BlockingSentinelListener(
+            self.queue, *self.targets, respect_handler_level=self.respect_handler_level
+        )
+        self.listener.start()
+        self.listener_pid = os.getpid()
+
+    def stop_listener(self):
+        """
+        Flushes the queue, stops the listener thread of the current process and reports
+        the records dropped since the last report.
+        """
+        with self.listener_lock:
+            if self.listener is None or self.listener_pid != os.getpid():
+                return
+            self.listener.stop()
+            self.listener = None
+            self.listener_pid = None
+            if self.dropped > self.reported_dropped:
+                record = self.dropped_record()
+                self.reported_dropped = self.dropped
+                for handler in self.targets:
+                    if not self.respect_handler_level or record.levelno >= handler.level:
+                        handler.handle(record)
+
+    def dropped_record(self):
+        """
+        Returns a warning record counting the records dropped since the last report.
+
+        Returns:
+            logging.LogRecord: The warning.
+        """
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            '%d log records were dropped because the queue was full (%d in total).',
+            (self.dropped - self.reported_dropped, self.dropped), None,
+        )
+
+    def prepare(self, record):
+        """
+        Returns the record unchanged.
+
+        The queue never leaves the process, so the record does not need to be made
+        picklable; formatting it here would put the cost back on the request thread.
+        """
+        return record
+
+    def enqueue(self, record):
+        """
+        Puts the record on the queue, or drops it if the queue is full.
+
+        The records dropped since the last report are reported first.
+        """
+        if self.listener_pid != os.getpid():
+            with self.listener_lock:
+                if self.listener_pid != os.getpid():
+                    self.start_listener()
+        try:
+            if self.dropped > self.reported_dropped and self.queue.qsize() < self.queue_size - 1:
+                dropped = self.dropped
+                self.queue.put_nowait(self.dropped_record())
+                self.reported_dropped = dropped
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Stops the listener before closing, so queued records are written out.
+        """
+        self.stop_listener()
+        super().close()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line.
+
+    Besides the standard fields, every value passed through `extra` (for example the
+    `duration`, `sql` and `alias` of django.db.backends records) is included.
+    """
+    def format(self, record):
+        """
+        Serializes the record to JSON.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The JSON document.
+        """
+        payload = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a random fraction of records below WARNING; warnings and errors always pass.
+
+    Attributes:
+        rate (float): Fraction of records kept, between 0 and 1.
+    """
+    def __init__(self, rate=1.0, name=''):
+        """
+        Initializes the filter.
+
+        Args:
+            rate (float): Fraction of records kept, between 0 and 1.
+            name (str): Logger name restriction, as for logging.Filter.
+        """
+        super().__init__(name)
+        self.rate = rate
+
+    def filter(self, record):
+        """
+        Decides whether the record is kept.
+
+        Args:
+            record (logging.LogRecord): The record to check.
+
+        Returns:
+            bool: True if the record should be logged.
+        """
+        return record.levelno >= logging.WARNING or random.random() < self.rate
@@ -0,0 +1,297 @@
+"""
+Concurrency benchmark of the ASGI entry point against the WSGI one.
+
+Starts each server in turn on the current database (seed it first with seed_benchmark_data):
+
+    wsgi       trello.wsgi under gunicorn, one worker with --wsgi-threads threads, sync views
+    asgi_sync  trello.asgi under uvicorn, one worker, the same sync views
+    asgi       trello.asgi under uvicorn, one worker, the async views (board list, board
+               detail, lists with tasks, invitations)
+
+and drives it with an increasing number of concurrent keep-alive clients from one asyncio
+loop. --trickle-ms makes the clients slow: each sends its request line, waits, then sends
+the headers, like a client on a bad network. Reports latency percentiles, throughput,
+status codes and the peak thread count and memory of the server for every level as JSON.
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from boards.models import Board
+from core.bench import BENCH_USER_PREFIX, summarize_latencies
+from core.management.commands.bench_endpoints import git_revision
+
+# URL names of the endpoints, sync and async versions
+ENDPOINTS = {
+    'boards': ('board-list-create', 'board-list-async'),
+    'board_detail': ('board-detail', 'board-detail-async'),
+    'lists': ('list-list-create', 'list-list-async'),
+    'invitations': ('invitation-list-create', 'invitation-list-async'),
+}
+
+TARGETS = ('wsgi', 'asgi_sync', 'asgi')
+
+
+def server_command(target, port, threads):
+    """
+    Returns the command line starting the server of a target.
+    """
+    if target == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'trello.wsgi:application', '--workers', '1',
+            '--worker-class', 'gthread', '--threads', str(threads), '--bind', f'127.0.0.1:{port}',
+            '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'trello.asgi:application', '--workers', '1',
+        '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--no-access-log',
+    ]
+
+
+def process_tree_usage(pid):
+    """
+    Returns the thread count and resident memory (MB) of a process and its children.
+
+    Reads /proc, so it returns (None, None) on other platforms.
+    """
+    threads, rss_kb = 0, 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            for line in Path(f'/proc/{current}/status').read_text().splitlines():
+                if line.startswith('Threads:'):
+                    threads += int(line.split()[1])
+                elif line.startswith('VmRSS:'):
+                    rss_kb += int(line.split()[1])
+            for task in Path(f'/proc/{current}/task').iterdir():
+                pending.extend(int(child) for child in (task / 'children').read_text().split())
+    except OSError:
+        return None, None
+    return threads, round(rss_kb / 1024, 1)
+
+
+def wait_for_port(port, process, timeout=30):
+    """
+    Waits until the server accepts connections.
+
+    Raises:
+        CommandError: If the server exits or does not start in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f'The server exited with code {process.returncode}.')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f'The server did not start on port {port} within {timeout}s.')
+
+
+class HttpClient:
+    """
+    Minimal asyncio HTTP/1.1 client sending GET requests over one keep-alive connection.
+    """
+    def __init__(self, port, token, trickle):
+        self.port = port
+        self.token = token
+        self.trickle = trickle
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """
+        Sends a GET request and reads the whole response.
+
+        Returns:
+            int: The status code.
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\n'.encode())
+        if self.trickle:
+            await self.writer.drain()
+            await asyncio.sleep(self.trickle)
+        self.writer.write(
+            f'Host: 127.0.0.1:{self.port}\r\nAuthorization: Bearer {self.token}\r\n'
+            'Accept: application/json\r\n\r\n'.encode()
+        )
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding') == 'chunked':
+            while size := int((await self.reader.readline()).strip(), 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        else:
+            await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = 'Compares the ASGI (async views) and WSGI entry points under concurrent load and reports JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[8, 32, 128], help='Concurrent clients, one run per value',
+        )
+        parser.add_argument('--requests', type=int, default=400, help='Requests per run')
+        parser.add_argument('--wsgi-threads', type=int, default=8, help='Threads of the gunicorn worker')
+        parser.add_argument('--trickle-ms', type=float, default=0, help='Delay between request line and headers')
+        parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS), help='Servers to run')
+        parser.add_argument('--port', type=int, default=8765, help='Port the servers listen on')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        users = list(
+            get_user_model().objects.filter(username__startswith=BENCH_USER_PREFIX)
+            .filter(Q(owned_boards__isnull=False) | Q(board_memberships__isnull=False))
+            .distinct().order_by('id')[:max(options['concurrency'])]
+        )
+        if not users:
+            raise CommandError('No benchmark data. Run `python manage.py seed_benchmark_data` first.')
+        clients = [
+            (
+                str(AccessToken.for_user(user)),
+                list(Board.objects.filter(Q(owner=user) | Q(members=user)).distinct().values_list('id', flat=True)),
+            )
+            for user in users
+        ]
+
+        results = {}
+        for target in options['targets']:
+            results[target] = self.run_target(target, clients, options)
+
+        report = {
+            'revision': git_revision(),
+            'requests_per_run': options['requests'],
+            'wsgi_threads': options['wsgi_threads'],
+            'trickle_ms': options['trickle_ms'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        self.stdout.write(output)
+
+    def run_target(self, target, clients, options):
+        """
+        Starts the server of a target and runs every concurrency level against it.
+        """
+        port = options['port']
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'trello.settings'}
+        process = subprocess.Popen(
+            server_command(target, port, options['wsgi_threads']),
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        try:
+            try:
+                wait_for_port(port, process)
+            except CommandError as error:
+                process.kill()
+                stderr = process.communicate()[1].decode(errors='replace')[-500:]
+                raise CommandError(f'{target}: {error} {stderr}') from error
+            use_async = target == 'asgi'
+            asyncio.run(self.run_level(port, clients[:1], 1, len(ENDPOINTS), use_async, 0, process.pid, options))
+            return {
+                str(concurrency): asyncio.run(self.run_level(
+                    port, clients, concurrency, options['requests'], use_async,
+                    options['trickle_ms'] / 1000, process.pid, options,
+                ))
+                for concurrency in options['concurrency']
+            }
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    async def run_level(self, port, clients, concurrency, total, use_async, trickle, pid, options):
+        """
+        Sends `total` requests from `concurrency` clients and summarizes them.
+        """
+        samples, statuses, errors = [], {}, 0
+        remaining = [total]
+        peak = {'threads': 0, 'rss_mb': 0.0}
+        running = True
+
+        async def sample_usage():
+            while running:
+                threads, rss_mb = process_tree_usage(pid)
+                if threads is not None:
+                    peak['threads'] = max(peak['threads'], threads)
+                    peak['rss_mb'] = max(peak['rss_mb'], rss_mb)
+                await asyncio.sleep(0.02)
+
+        async def client(index):
+            nonlocal errors
+            rng = random.Random(options['seed'] + index)
+            token, board_ids = clients[index % len(clients)]
+            http = HttpClient(port, token, trickle)
+            try:
+                while remaining[0] > 0:
+                    remaining[0] -= 1
+                    endpoint = rng.choice(list(ENDPOINTS))
+                    kwargs = {}
+                    if endpoint == 'board_detail' and board_ids:
+                        kwargs = {'pk': rng.choice(board_ids)}
+                    elif endpoint == 'lists' and board_ids:
+                        kwargs = {'board_id': rng.choice(board_ids)}
+                    elif endpoint != 'boards' and endpoint != 'invitations':
+                        endpoint, kwargs = 'boards', {}
+                    path = reverse(ENDPOINTS[endpoint][1 if use_async else 0], kwargs=kwargs)
+                    started = time.perf_counter()
+                    try:
+                        status = await http.get(path)
+                    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                        errors += 1
+                        await http.close()
+                        continue
+                    samples.append(time.perf_counter() - started)
+                    statuses[status] = statuses.get(status, 0) + 1
+            finally:
+                await http.close()
+
+        monitor = asyncio.create_task(sample_usage())
+        started = time.perf_counter()
+        await asyncio.gather(*(client(index) for index in range(concurrency)))
+        wall = time.perf_counter() - started
+        running = False
+        await monitor
+        return {
+            **summarize_latencies(samples),
+            'throughput_rps': round(len(samples) / wall, 1) if wall else 0.0,
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+            'errors': errors,
+            'server_peak_threads': peak['threads'] or None,
+            'server_peak_rss_mb': peak['rss_mb'] or None,
+        }
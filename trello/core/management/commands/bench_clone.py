@@ -0,0 +1,108 @@
+"""
+Benchmark of board cloning.
+
+Seeds a scratch database with one board per --sizes entry (tasks spread over --lists lists,
+each task with an assignee, a label and two checklist items, the board with a member), then
+clones each board through the clone endpoint, with and without its assignees, and saves it
+as a template, reporting for each:
+
+    time_ms         the time of the request
+    queries         the queries it ran
+    tasks           the tasks of the new board
+
+Reports JSON.
+"""
+
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from boards.models import Board
+from core.bench import scratch_database
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from workspaces.tenancy import personal_workspace
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the time and queries of cloning boards of several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='500,5000,20000', help='Comma-separated task counts, one board each')
+        parser.add_argument('--lists', type=int, default=10, help='Lists of each board')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        report = {}
+        # Without the query log of DEBUG
+        with scratch_database(), override_settings(DEBUG=False):
+            User = get_user_model()
+            user = User.objects.create_user(username='bench', email='bench@example.com', password=None)
+            member = User.objects.create_user(username='bench_member', email='member@example.com', password=None)
+            workspace = personal_workspace(user)
+            # Room for the boards seeded and their clones
+            workspace.max_boards_per_user = 4 * len(sizes)
+            workspace.save(update_fields=['max_boards_per_user'])
+            client = APIClient()
+            client.force_authenticate(user)
+            for size in sizes:
+                board = self.seed(user, member, workspace, size, options['lists'])
+                clone_url = reverse('board-clone', kwargs={'pk': board.pk})
+                report[size] = {
+                    'clone': self.measure(client, clone_url, {}),
+                    'clone_assignees': self.measure(client, clone_url, {'assignees': True}),
+                    'template': self.measure(client, reverse('board-template', kwargs={'pk': board.pk}), {}),
+                }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def seed(self, user, member, workspace, size, list_count):
+        """
+        Creates a board of size tasks, each assigned to the user, labelled and with a checklist.
+        """
+        board = Board.objects.create(title=f'Board of {size}', owner=user, workspace=workspace)
+        board.members.add(member)
+        lists = List.objects.bulk_create(List(title=f'List {index}', board=board) for index in range(list_count))
+        label = Label.objects.create(board=board, name='Label')
+        tasks = Task.objects.bulk_create(
+            (Task(title=f'Task {index}', description='A task to clone', list=lists[index % list_count], order=index,
+                  checklist_total_count=2, checklist_done_count=1)
+             for index in range(size)),
+            batch_size=5000,
+        )
+        Task.assigned_users.through.objects.bulk_create(
+            (Task.assigned_users.through(task_id=task.pk, user_id=user.pk) for task in tasks), batch_size=5000
+        )
+        TaskLabel.objects.bulk_create((TaskLabel(task_id=task.pk, label_id=label.pk) for task in tasks), batch_size=5000)
+        ChecklistItem.objects.bulk_create(
+            (ChecklistItem(task_id=task.pk, text=f'Item {order}', done=order == 0, order=order)
+             for task in tasks for order in range(2)),
+            batch_size=5000,
+        )
+        return board
+
+    def measure(self, client, url, data):
+        """
+        Posts a clone request, timing it and counting its queries.
+        """
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            response = client.post(url, data, format='json')
+        elapsed = time.perf_counter() - started
+        if response.status_code != 201:
+            raise CommandError(f'The clone answered {response.status_code}: {response.content.decode()}')
+        return {
+            'time_ms': round(elapsed * 1000, 1),
+            'queries': len(queries),
+            'tasks': Task.objects.filter(list__board_id=response.data['id']).count(),
+        }
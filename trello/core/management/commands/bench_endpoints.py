@@ -0,0 +1,297 @@
+"""
+Load benchmark for the API endpoints.
+
+Drives the real URL routes (boards, board detail, lists with tasks, tasks, task move,
+invitation accept and reject) from concurrent clients, each logged in as a user generated
+by seed_benchmark_data. Requests are either served in-process through the test client or
+sent over HTTP to a running server (--base-url), e.g. to compare the WSGI and ASGI entry
+points. Reports p50/p95/p99 latency, throughput and queries per request as JSON so runs
+can be compared across commits, together with the cold-start time of the web and worker
+entry points of the checkout (see core.startup).
+
+Writes (moves, accepted and rejected invitations) change the data set; re-seed with
+`seed_benchmark_data --clear` before runs that are meant to be compared.
+"""
+
+import http.client
+import json
+import random
+import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Q
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from boards.models import Board
+from core.bench import BENCH_PASSWORD, BENCH_USER_PREFIX, summarize_latencies
+from core.startup import measure_cold_start
+from invitations.models import Invitation
+from lists.models import List, Task
+
+# Relative weight of each endpoint in the request mix
+ENDPOINT_WEIGHTS = {
+    'boards': 25,
+    'board_detail': 15,
+    'lists': 25,
+    'tasks': 15,
+    'task_move': 10,
+    'invitation_accept': 5,
+    'invitation_reject': 5,
+}
+
+
+class QueryCounter:
+    """
+    Execute wrapper counting the queries of the current thread's connection.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class InProcessTransport:
+    """
+    Sends requests through DRF's test client, authenticated as the given user.
+    """
+    def __init__(self, user):
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def request(self, method, path, data=None):
+        """
+        Sends a request and returns its status code and query count.
+        """
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.client.generic(
+                method, path, json.dumps(data) if data is not None else '', content_type='application/json'
+            )
+        return response.status_code, counter.count
+
+    def close(self):
+        connections.close_all()
+
+
+class HttpTransport:
+    """
+    Sends requests to a running server over one keep-alive connection, with a JWT.
+
+    The query count is read from the Server-Timing header when the server has
+    instrumentation enabled.
+    """
+    def __init__(self, base_url, user):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        self.headers = {'Content-Type': 'application/json', 'Host': parts.netloc}
+        status, body = self._send('POST', reverse('token_obtain_pair'),
+                                  {'username': user.username, 'password': BENCH_PASSWORD})
+        if status != 200:
+            raise CommandError(f'Could not obtain a token for {user.username}: {status} {body[:200]!r}')
+        self.headers['Authorization'] = f"Bearer {json.loads(body)['access']}"
+
+    def _send(self, method, path, data=None):
+        self.connection.request(method, path, json.dumps(data) if data is not None else None, self.headers)
+        response = self.connection.getresponse()
+        self.last_response = response
+        return response.status, response.read()
+
+    def request(self, method, path, data=None):
+        """
+        Sends a request and returns its status code and query count (None if unknown).
+        """
+        status, _ = self._send(method, path, data)
+        return status, parse_query_count(self.last_response.getheader('Server-Timing', ''))
+
+    def close(self):
+        self.connection.close()
+
+
+def parse_query_count(server_timing):
+    """
+    Extracts the query count from a Server-Timing header written by PerformanceMiddleware.
+
+    Returns:
+        int or None: The number of queries, or None if the header has no db entry.
+    """
+    for entry in server_timing.split(','):
+        name, _, params = entry.strip().partition(';')
+        if name == 'db' and 'desc="' in params:
+            return int(params.split('desc="', 1)[1].split(' ', 1)[0])
+    return None
+
+
+def git_revision():
+    """
+    Returns the current git commit of the project, or None outside a checkout.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class UserWorkload:
+    """
+    The ids a benchmark client can act on: its boards, lists, tasks and pending invitations.
+    """
+    def __init__(self, user):
+        self.user = user
+        self.board_ids = list(
+            Board.objects.filter(Q(owner=user) | Q(members=user)).distinct().values_list('id', flat=True)
+        )
+        self.lists = list(List.objects.filter(board_id__in=self.board_ids).values_list('id', 'board_id'))
+        self.lists_by_board = {}
+        for list_id, board_id in self.lists:
+            self.lists_by_board.setdefault(board_id, []).append(list_id)
+        self.tasks = list(
+            Task.objects.filter(list__board_id__in=self.board_ids).values_list('id', 'list__board_id')[:500]
+        )
+        self.invitations = list(
+            Invitation.objects.filter(invited_user=user, status='pending').values_list('id', flat=True)
+        )
+        self.lock = threading.Lock()
+
+    def pop_invitation(self):
+        with self.lock:
+            return self.invitations.pop() if self.invitations else None
+
+    def next_request(self, endpoint, rng):
+        """
+        Builds the request for an endpoint.
+
+        Returns:
+            tuple or None: (method, path, data), or None if the user has nothing to act on.
+        """
+        if endpoint == 'boards':
+            return 'GET', reverse('board-list-create'), None
+        if endpoint == 'board_detail' and self.board_ids:
+            return 'GET', reverse('board-detail', kwargs={'pk': rng.choice(self.board_ids)}), None
+        if endpoint == 'lists' and self.board_ids:
+            return 'GET', reverse('list-list-create', kwargs={'board_id': rng.choice(self.board_ids)}), None
+        if endpoint == 'tasks' and self.lists:
+            return 'GET', reverse('task-list-create', kwargs={'list_id': rng.choice(self.lists)[0]}), None
+        if endpoint == 'task_move' and self.tasks:
+            task_id, board_id = rng.choice(self.tasks)
+            target = rng.choice(self.lists_by_board[board_id])
+            return 'PATCH', reverse('task-move', kwargs={'pk': task_id}), {'list_id': target, 'order': rng.randrange(100)}
+        if endpoint in ('invitation_accept', 'invitation_reject'):
+            invitation_id = self.pop_invitation()
+            if invitation_id is not None:
+                url_name = 'invitation-accept' if endpoint == 'invitation_accept' else 'invitation-reject'
+                return 'PATCH', reverse(url_name, kwargs={'pk': invitation_id}), {}
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Runs a concurrent load benchmark against the API endpoints and reports JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (threads)')
+        parser.add_argument('--requests', type=int, default=100, help='Requests per client')
+        parser.add_argument('--base-url', help='Benchmark a running server (e.g. http://127.0.0.1:8000) over HTTP')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+        parser.add_argument('--cold-start-runs', type=int, default=3,
+                            help='Processes started per entry point to time the cold start (0 to skip)')
+
+    def handle(self, *args, **options):
+        # A seeded sample of users with boards, so owners, members and invitees are all represented
+        users = list(
+            get_user_model().objects.filter(username__startswith=BENCH_USER_PREFIX)
+            .filter(Q(owned_boards__isnull=False) | Q(board_memberships__isnull=False))
+            .distinct().order_by('id')
+        )
+        random.Random(options['seed']).shuffle(users)
+        users = users[:options['concurrency']]
+        if not users:
+            raise CommandError('No benchmark data. Run `python manage.py seed_benchmark_data` first.')
+        workloads = [UserWorkload(user) for user in users]
+        if not options['base_url']:
+            setup_test_environment()
+        connections.close_all()
+
+        samples = {endpoint: [] for endpoint in ENDPOINT_WEIGHTS}
+        queries = {endpoint: [] for endpoint in ENDPOINT_WEIGHTS}
+        statuses = {endpoint: {} for endpoint in ENDPOINT_WEIGHTS}
+        lock = threading.Lock()
+        endpoints, weights = zip(*ENDPOINT_WEIGHTS.items())
+
+        def client(index):
+            rng = random.Random(options['seed'] + index)
+            workload = workloads[index % len(workloads)]
+            if options['base_url']:
+                transport = HttpTransport(options['base_url'], workload.user)
+            else:
+                transport = InProcessTransport(workload.user)
+            try:
+                sent = 0
+                while sent < options['requests']:
+                    endpoint = rng.choices(endpoints, weights)[0]
+                    request = workload.next_request(endpoint, rng)
+                    if request is None:
+                        continue
+                    sent += 1
+                    started = time.perf_counter()
+                    status, query_count = transport.request(*request)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        samples[endpoint].append(elapsed)
+                        if query_count is not None:
+                            queries[endpoint].append(query_count)
+                        statuses[endpoint][status] = statuses[endpoint].get(status, 0) + 1
+            finally:
+                transport.close()
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(options['concurrency'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        all_samples = [sample for endpoint_samples in samples.values() for sample in endpoint_samples]
+        all_queries = [count for endpoint_queries in queries.values() for count in endpoint_queries]
+        report = {
+            'revision': git_revision(),
+            'transport': options['base_url'] or 'in-process',
+            'concurrency': options['concurrency'],
+            'wall_s': round(wall, 3),
+            'overall': {
+                **summarize_latencies(all_samples),
+                'throughput_rps': round(len(all_samples) / wall, 1) if wall else 0.0,
+                'queries_per_request': round(sum(all_queries) / len(all_queries), 2) if all_queries else None,
+            },
+            'endpoints': {
+                endpoint: {
+                    **summarize_latencies(samples[endpoint]),
+                    'throughput_rps': round(len(samples[endpoint]) / wall, 1) if wall else 0.0,
+                    'queries_per_request': (
+                        round(sum(queries[endpoint]) / len(queries[endpoint]), 2) if queries[endpoint] else None
+                    ),
+                    'status_codes': {str(code): count for code, count in sorted(statuses[endpoint].items())},
+                }
+                for endpoint in ENDPOINT_WEIGHTS if samples[endpoint]
+            },
+        }
+        if options['cold_start_runs'] > 0:
+            report['cold_start'] = measure_cold_start(('web', 'worker'), options['cold_start_runs'])
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        self.stdout.write(output)
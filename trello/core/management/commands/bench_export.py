@@ -0,0 +1,126 @@
+"""
+Benchmark of the streaming board export.
+
+Seeds a scratch database with one board per --sizes entry (tasks spread over --lists lists,
+each task with an assignee and a label), then, for each board, reads the export endpoint in
+JSON Lines and CSV, plain and gzip-compressed, and reports:
+
+    time_ms         the time to read the whole response
+    bytes           its size
+    queries         the queries run while it was streamed
+    peak_kib        the peak memory allocated meanwhile (tracemalloc, in a second run, as
+                    tracing slows the code down)
+
+The same board serialized through ListSerializer, as the lists-with-tasks endpoint would,
+is measured as well ("serializer"), for comparison. Reports JSON.
+"""
+
+import json
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from boards.models import Board
+from core.bench import scratch_database
+from lists.models import Label, List, Task, TaskLabel
+from lists.serializers import ListSerializer
+from workspaces.tenancy import personal_workspace
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the memory and time of streaming board exports against ListSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated task counts, one board each')
+        parser.add_argument('--lists', type=int, default=10, help='Lists of each board')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        report = {}
+        # Without the query log of DEBUG, which keeps the SQL of every chunk read
+        with scratch_database(), override_settings(DEBUG=False):
+            user = get_user_model().objects.create_user(username='bench', email='bench@example.com', password=None)
+            client = APIClient()
+            client.force_authenticate(user)
+            for size in sizes:
+                board = self.seed(user, size, options['lists'])
+                results = {}
+                for export_format in ('jsonl', 'csv'):
+                    url = reverse('board-export', kwargs={'pk': board.pk, 'export_format': export_format})
+                    results[export_format] = self.measure(lambda: client.get(url))
+                    results[f'{export_format}_gzip'] = self.measure(lambda: client.get(url, HTTP_ACCEPT_ENCODING='gzip'))
+                results['serializer'] = self.measure_serializer(board)
+                report[size] = results
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def seed(self, user, size, list_count):
+        """
+        Creates a board of size tasks, each assigned to the user and labelled.
+        """
+        board = Board.objects.create(title=f'Board of {size}', owner=user, workspace=personal_workspace(user))
+        lists = List.objects.bulk_create(List(title=f'List {index}', board=board) for index in range(list_count))
+        label = Label.objects.create(board=board, name='Label')
+        tasks = Task.objects.bulk_create(
+            (Task(title=f'Task {index}', description='A task to export', list=lists[index % list_count], order=index)
+             for index in range(size)),
+            batch_size=5000,
+        )
+        Task.assigned_users.through.objects.bulk_create(
+            (Task.assigned_users.through(task_id=task.pk, user_id=user.pk) for task in tasks), batch_size=5000
+        )
+        TaskLabel.objects.bulk_create((TaskLabel(task_id=task.pk, label_id=label.pk) for task in tasks), batch_size=5000)
+        return board
+
+    def measure(self, request):
+        """
+        Reads a streamed response to the end, without keeping it.
+        """
+        def read():
+            response = request()
+            if response.status_code != 200:
+                raise CommandError(f'The export answered {response.status_code}.')
+            return sum(len(piece) for piece in response.streaming_content)
+
+        return self.profile(read)
+
+    def measure_serializer(self, board):
+        """
+        Renders the lists of a board with their tasks through ListSerializer.
+        """
+        def render():
+            lists = List.objects.filter(board=board).prefetch_related('tasks__assigned_users', 'tasks__labels')
+            return len(JSONRenderer().render(ListSerializer(lists, many=True).data))
+
+        return self.profile(render)
+
+    def profile(self, func):
+        """
+        Times func, which returns a size in bytes, counts its queries, then traces its memory.
+        """
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            size = func()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        func()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'time_ms': round(elapsed * 1000, 1),
+            'bytes': size,
+            'queries': len(queries),
+            'peak_kib': round(peak / 1024),
+        }
@@ -0,0 +1,183 @@
+"""
+Benchmark of the task label filters and bulk label changes.
+
+Seeds a scratch database with one board of --tasks tasks spread over --lists lists and
+--labels labels, each task carrying up to --max-labels-per-task of them, then measures:
+
+    filters     the ids of the tasks of one list with any or all of several labels, with
+                the (label, task) index of the TaskLabel table and without it
+    endpoint    the task list endpoint with the same filters
+    bulk        applying a label to --bulk-tasks tasks and removing it again through the
+                bulk endpoint, against adding it task by task
+
+Reports latency percentiles, row counts and the query plans as JSON.
+"""
+
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from boards.models import Board
+from core.bench import scratch_database, summarize_latencies
+from lists.filters import filter_tasks
+from lists.models import Label, List, Task, TaskLabel
+from workspaces.tenancy import personal_workspace
+
+# Label combinations filtered on, as (labels_match, number of labels)
+FILTERS = (('any', 1), ('any', 3), ('all', 2), ('all', 3))
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the any-of/all-of task label filters and bulk label changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000, help='Tasks on the board')
+        parser.add_argument('--lists', type=int, default=10, help='Lists the tasks are spread over')
+        parser.add_argument('--labels', type=int, default=50, help='Labels of the board')
+        parser.add_argument('--max-labels-per-task', type=int, default=4, help='Most labels on one task')
+        parser.add_argument('--runs', type=int, default=20, help='Runs of each measurement')
+        parser.add_argument('--bulk-tasks', type=int, default=5000, help='Tasks of a bulk label change')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the generated data')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            started = time.perf_counter()
+            user, board, list_obj, labels = self.seed(options)
+            report = {
+                'tasks': options['tasks'],
+                'lists': options['lists'],
+                'labels': options['labels'],
+                'task_labels': TaskLabel.objects.count(),
+                'seed_s': round(time.perf_counter() - started, 1),
+            }
+            client = APIClient()
+            client.force_authenticate(user)
+            combinations = {
+                f'{match}_{count}': {'labels': labels[:count], 'labels_match': match} for match, count in FILTERS
+            }
+            report['filters'] = self.measure_filters(list_obj, combinations, options['runs'])
+            report['endpoint'] = self.measure_endpoint(client, list_obj, combinations, options['runs'])
+            report['bulk'] = self.measure_bulk(client, board, labels[-1], options)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def seed(self, options):
+        """
+        Creates the board, its lists, labels and tasks, and applies the labels at random.
+
+        Returns:
+            tuple: The owner, the board, the first list and the label ids.
+        """
+        rng = random.Random(options['seed'])
+        user = get_user_model().objects.create_user(username='bench', email='bench@example.com', password=None)
+        board = Board.objects.create(title='Benchmark board', owner=user, workspace=personal_workspace(user))
+        lists = List.objects.bulk_create(
+            List(title=f'List {index}', board=board) for index in range(options['lists'])
+        )
+        labels = [
+            label.id for label in Label.objects.bulk_create(
+                Label(board=board, name=f'Label {index}') for index in range(options['labels'])
+            )
+        ]
+        Task.objects.bulk_create(
+            (Task(title=f'Task {index}', list=lists[index % len(lists)], order=index // len(lists))
+             for index in range(options['tasks'])),
+            batch_size=5000,
+        )
+        task_ids = Task.objects.values_list('id', flat=True)
+        TaskLabel.objects.bulk_create(
+            (TaskLabel(task_id=task_id, label_id=label_id)
+             for task_id in task_ids.iterator()
+             for label_id in rng.sample(labels, rng.randint(0, options['max_labels_per_task']))),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return user, board, lists[0], labels
+
+    def measure_filters(self, list_obj, combinations, runs):
+        """
+        Times the filtered task ids of a list, with and without the (label, task) index.
+        """
+        results = {}
+        for name, filters in combinations.items():
+            queryset = filter_tasks(Task.objects.filter(list=list_obj), filters).values_list('id', flat=True)
+            results[name] = {
+                'rows': len(queryset),
+                'indexed': summarize_latencies(self.time(lambda: list(queryset.all()), runs)),
+                'plan': queryset.explain(),
+            }
+
+        index = next(index for index in TaskLabel._meta.indexes if index.name == 'task_label_label_task_idx')
+        with connection.schema_editor() as editor:
+            editor.remove_index(TaskLabel, index)
+        try:
+            for name, filters in combinations.items():
+                queryset = filter_tasks(Task.objects.filter(list=list_obj), filters).values_list('id', flat=True)
+                results[name]['unindexed'] = summarize_latencies(self.time(lambda: list(queryset.all()), runs))
+                results[name]['unindexed_plan'] = queryset.explain()
+        finally:
+            with connection.schema_editor() as editor:
+                editor.add_index(TaskLabel, index)
+        return results
+
+    def measure_endpoint(self, client, list_obj, combinations, runs):
+        """
+        Times the task list endpoint with each label filter.
+        """
+        url = reverse('task-list-create', kwargs={'list_id': list_obj.id})
+        results = {}
+        for name, filters in combinations.items():
+            params = {'labels': ','.join(map(str, filters['labels'])), 'labels_match': filters['labels_match']}
+            response = client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(f'GET {url} answered {response.status_code}: {response.content[:200]!r}')
+            results[name] = {
+                'tasks': len(response.data),
+                **summarize_latencies(self.time(lambda: client.get(url, params), runs)),
+            }
+        return results
+
+    def measure_bulk(self, client, board, label_id, options):
+        """
+        Times applying and removing a label on many tasks at once, and task by task.
+        """
+        url = reverse('label-bulk', kwargs={'board_id': board.id})
+        tasks = list(Task.objects.order_by('id').values_list('id', flat=True)[:options['bulk_tasks']])
+        results = {'tasks': len(tasks), 'apply': [], 'remove': []}
+        for _ in range(min(options['runs'], 5)):
+            for action in ('apply', 'remove'):
+                started = time.perf_counter()
+                response = client.post(url, {'action': action, 'labels': [label_id], 'tasks': tasks}, format='json')
+                results[action].append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f'POST {url} answered {response.status_code}: {response.content[:200]!r}')
+        results['apply'] = summarize_latencies(results['apply'])
+        results['remove'] = summarize_latencies(results['remove'])
+
+        # One add() per task, as a client labelling the tasks one by one would cause
+        sample = Task.objects.filter(pk__in=tasks[:500])
+        started = time.perf_counter()
+        for task in sample:
+            task.labels.add(label_id)
+        per_task = (time.perf_counter() - started) / len(sample)
+        TaskLabel.objects.filter(label_id=label_id, task_id__in=tasks).delete()
+        results['task_by_task_apply_estimate_ms'] = round(per_task * len(tasks) * 1000, 1)
+        return results
+
+    def time(self, func, runs):
+        """
+        Calls func once to warm up, then runs times, and returns the latencies in seconds.
+        """
+        func()
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return samples
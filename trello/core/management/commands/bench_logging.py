@@ -0,0 +1,137 @@
+"""
+Request-latency benchmark for the logging configuration.
+
+Serves the lists-with-tasks endpoint (one of the most query-heavy reads) from a scratch
+database with SQL logging forced on, under several logging setups: the former synchronous
+FileHandler configuration and the queue-based settings.LOGGING, at DEBUG and INFO levels.
+Reports latency percentiles and the bytes written to disk for each setup as JSON.
+"""
+
+import copy
+import json
+import logging.config
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from boards.models import Board
+from core.bench import scratch_database, summarize_latencies
+from lists.models import List, Task
+from workspaces.tenancy import personal_workspace
+
+
+def sync_file_config(log_dir, level):
+    """
+    Returns the former configuration: one synchronous FileHandler on the root logger.
+    """
+    return {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {
+            'file': {'class': 'logging.FileHandler', 'filename': str(log_dir / 'debug.log')},
+        },
+        'loggers': {
+            '': {'handlers': ['file'], 'level': level},
+            'django.db.backends': {'level': level},
+        },
+    }
+
+
+def queue_config(log_dir, level, sample_rate):
+    """
+    Returns settings.LOGGING writing to log_dir, without console output.
+    """
+    config = copy.deepcopy(settings.LOGGING)
+    targets = config['handlers']['queue']['handlers']
+    del targets['console']
+    targets['file']['filename'] = log_dir / 'trello.log'
+    config['filters']['sql_sampling']['rate'] = sample_rate
+    config['loggers']['']['level'] = level
+    config['loggers']['django.db.backends']['level'] = level
+    return config
+
+
+def reset_logging():
+    """
+    Closes all handlers, which flushes queued records, and drops logger filters.
+
+    logging.config.dictConfig() adds filters to existing loggers without removing the
+    old ones, so they are cleared explicitly between setups.
+    """
+    logging.config.dictConfig({'version': 1, 'disable_existing_loggers': False})
+    for logger in [logging.getLogger(), *logging.Logger.manager.loggerDict.values()]:
+        if isinstance(logger, logging.Logger):
+            logger.filters.clear()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks request latency under the synchronous and queue-based logging setups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per logging setup')
+        parser.add_argument('--tasks', type=int, default=20, help='Tasks in each of the 5 lists')
+
+    def handle(self, *args, **options):
+        scenarios = {
+            'sync_file_debug': lambda log_dir: sync_file_config(log_dir, 'DEBUG'),
+            'sync_file_info': lambda log_dir: sync_file_config(log_dir, 'INFO'),
+            'queue_debug': lambda log_dir: queue_config(log_dir, 'DEBUG', 1.0),
+            'queue_debug_sampled': lambda log_dir: queue_config(log_dir, 'DEBUG', settings.SQL_LOG_SAMPLE_RATE),
+            'queue_info': lambda log_dir: queue_config(log_dir, 'INFO', settings.SQL_LOG_SAMPLE_RATE),
+        }
+        report = {'requests': options['requests'], 'scenarios': {}}
+        with scratch_database():
+            url, user = self.seed(options['tasks'])
+            client = APIClient()
+            client.force_authenticate(user)
+            connection.force_debug_cursor = True  # log SQL as with DEBUG = True
+            try:
+                for name, build_config in scenarios.items():
+                    with tempfile.TemporaryDirectory() as tmp_dir:
+                        log_dir = Path(tmp_dir)
+                        reset_logging()
+                        logging.config.dictConfig(build_config(log_dir))
+                        samples = self.measure(client, url, options['requests'])
+                        reset_logging()
+                        log_bytes = sum(path.stat().st_size for path in log_dir.iterdir())
+                    report['scenarios'][name] = {**summarize_latencies(samples), 'log_bytes': log_bytes}
+            finally:
+                connection.force_debug_cursor = False
+                reset_logging()
+                logging.config.dictConfig(settings.LOGGING)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def seed(self, tasks_per_list):
+        """
+        Creates one board with 5 lists of assigned tasks.
+
+        Returns:
+            tuple: The URL of the board's lists endpoint and the board owner.
+        """
+        user = get_user_model().objects.create_user(username='bench', email='bench@example.com', password=None)
+        board = Board.objects.create(title='Benchmark board', owner=user, workspace=personal_workspace(user))
+        for list_index in range(5):
+            list_obj = List.objects.create(title=f'List {list_index}', board=board)
+            for task_index in range(tasks_per_list):
+                task = Task.objects.create(title=f'Task {task_index}', list=list_obj, order=task_index)
+                task.assigned_users.add(user)
+        return reverse('list-list-create', kwargs={'board_id': board.id}), user
+
+    def measure(self, client, url, count):
+        """
+        Issues GET requests and returns their latencies in seconds.
+        """
+        client.get(url)  # warm-up
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            client.get(url)
+            samples.append(time.perf_counter() - started)
+        return samples
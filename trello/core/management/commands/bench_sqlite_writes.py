@@ -0,0 +1,156 @@
+"""
+Multi-threaded write benchmark for the SQLite profiles.
+
+Drives the task create and task move endpoints from several threads against a scratch
+database, once per SQLite profile (see SQLITE_PROFILES in settings), and reports
+throughput, latency percentiles and "database is locked" errors as JSON.
+
+Each profile runs in its own process, because the profile is selected through the
+TRELLO_SQLITE_PROFILE environment variable when the settings are loaded.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from boards.models import Board
+from core.bench import summarize_latencies
+from lists.models import List
+from workspaces.tenancy import personal_workspace
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent task create/move throughput for each SQLite profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Number of concurrent writer threads')
+        parser.add_argument('--ops', type=int, default=50, help='Tasks each thread creates and then moves')
+        parser.add_argument(
+            '--profiles', nargs='+', default=['default', 'production'],
+            choices=sorted(settings.SQLITE_PROFILES), help='SQLite profiles to compare',
+        )
+        parser.add_argument('--worker', action='store_true', help='Internal: run one profile in this process')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            result = self.run_worker(options['threads'], options['ops'])
+            self.stdout.write(json.dumps(result))
+            return
+
+        report = {'threads': options['threads'], 'ops_per_thread': options['ops'], 'profiles': {}}
+        for profile in options['profiles']:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                env = {
+                    **os.environ,
+                    'TRELLO_SQLITE_PROFILE': profile,
+                    'TRELLO_SQLITE_PATH': os.path.join(tmp_dir, 'bench.sqlite3'),
+                }
+                proc = subprocess.run(
+                    [
+                        sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_sqlite_writes', '--worker',
+                        '--threads', str(options['threads']), '--ops', str(options['ops']),
+                    ],
+                    env=env, capture_output=True, text=True,
+                )
+            if proc.returncode != 0:
+                raise CommandError(f'Benchmark for profile "{profile}" failed:\n{proc.stderr}')
+            report['profiles'][profile] = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run_worker(self, thread_count, ops):
+        """
+        Migrates the scratch database, seeds one shared board and hammers it from threads.
+
+        Args:
+            thread_count (int): Number of concurrent writer threads, one user each.
+            ops (int): Number of tasks each thread creates and moves.
+
+        Returns:
+            dict: Throughput, per-operation latency summary and error counts.
+        """
+        call_command('migrate', verbosity=0)
+        setup_test_environment()
+
+        User = get_user_model()
+        users = [
+            User.objects.create_user(username=f'bench{i}', email=f'bench{i}@example.com', password=None)
+            for i in range(thread_count)
+        ]
+        board = Board.objects.create(title='Benchmark board', owner=users[0], workspace=personal_workspace(users[0]))
+        board.members.set(users[1:])
+        lists = [List.objects.create(title=f'List {i}', board=board) for i in range(4)]
+        connections.close_all()
+
+        samples = {'create': [], 'move': []}
+        errors = {'create': 0, 'move': 0}
+        lock = threading.Lock()
+
+        def record(kind, started, ok):
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    samples[kind].append(elapsed)
+                else:
+                    errors[kind] += 1
+
+        def writer(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                for n in range(ops):
+                    source, target = lists[n % len(lists)], lists[(n + 1) % len(lists)]
+                    started = time.perf_counter()
+                    try:
+                        response = client.post(
+                            reverse('task-list-create', kwargs={'list_id': source.id}),
+                            {'title': f'{user.username} task {n}'}, format='json',
+                        )
+                    except OperationalError:
+                        record('create', started, False)
+                        continue
+                    record('create', started, response.status_code == 201)
+                    if response.status_code != 201:
+                        continue
+
+                    started = time.perf_counter()
+                    try:
+                        response = client.patch(
+                            reverse('task-move', kwargs={'pk': response.data['id']}),
+                            {'list_id': target.id, 'order': n}, format='json',
+                        )
+                    except OperationalError:
+                        record('move', started, False)
+                        continue
+                    record('move', started, response.status_code == 200)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        completed = len(samples['create']) + len(samples['move'])
+        return {
+            'profile': settings.SQLITE_PROFILE,
+            'wall_s': round(wall, 3),
+            'throughput_ops_s': round(completed / wall, 1) if wall else 0.0,
+            'create': {**summarize_latencies(samples['create']), 'errors': errors['create']},
+            'move': {**summarize_latencies(samples['move']), 'errors': errors['move']},
+        }
@@ -0,0 +1,43 @@
+"""
+Generates the OpenAPI schema files served by the openapi.json / openapi.yaml endpoints.
+
+Run it once per deploy, after collectstatic, so the first visitor of swagger/ does not pay
+for the generation. With --check it only tells whether the files match the running code
+(exit status 1 if not), for CI or deploy scripts.
+"""
+
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.openapi import is_fresh, read_meta, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Writes the OpenAPI schema (JSON and YAML) to OPENAPI_SCHEMA_DIR'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Directory to write to instead of OPENAPI_SCHEMA_DIR')
+        parser.add_argument('--check', action='store_true', help='Only check that the files are up to date')
+        parser.add_argument('--force', action='store_true', help='Regenerate even if the files are up to date')
+
+    def handle(self, *args, **options):
+        directory = Path(options['output_dir'] or settings.OPENAPI_SCHEMA_DIR)
+        meta = read_meta(directory)
+        if options['check']:
+            if not is_fresh(meta):
+                raise CommandError(f'The OpenAPI schema in {directory} is missing or stale.')
+            self.stdout.write(self.style.SUCCESS(f"Up to date, generated at {meta['generated_at']}."))
+            return
+        if is_fresh(meta) and not options['force']:
+            self.stdout.write(f"Up to date, generated at {meta['generated_at']}; use --force to regenerate.")
+            return
+
+        started = time.perf_counter()
+        meta = write_schema(directory)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote the OpenAPI schema to {directory} in {time.perf_counter() - started:.2f}s '
+            f"(ETag {meta['etags']['json']})."
+        ))
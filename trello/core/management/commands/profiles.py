@@ -0,0 +1,82 @@
+"""
+Lists and summarizes the request profiles captured by ProfilingMiddleware.
+
+Without arguments, prints one line per profile (newest first) with the request, its
+duration, query count and number of slow queries. With a profile id, prints the hottest
+functions from its cProfile statistics and the slow queries with their plans and stacks.
+"""
+
+import io
+import json
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Lists the captured request profiles, or summarizes one of them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_id', nargs='?', help='Profile to summarize')
+        parser.add_argument('--limit', type=int, default=20, help='Number of profiles or functions to show')
+        parser.add_argument(
+            '--sort', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'],
+            help='Sort order of the functions of a profile',
+        )
+        parser.add_argument('--json', action='store_true', help='Print the request summaries as JSON')
+
+    def handle(self, *args, **options):
+        if options['profile_id']:
+            self.show(options['profile_id'], options)
+            return
+
+        directories = sorted(settings.PROFILING_DIR.glob('*/request.json'), reverse=True)[:options['limit']]
+        summaries = [json.loads(path.read_text(encoding='utf-8')) for path in directories]
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+            return
+        if not summaries:
+            self.stdout.write(f'No profiles in {settings.PROFILING_DIR}.')
+            return
+        for summary in summaries:
+            self.stdout.write(
+                f"{summary['id']}  {summary['status']} {summary['method']} {summary['path']}  "
+                f"{summary['duration_ms']} ms, {summary['query_count']} queries "
+                f"({summary['query_time_ms']} ms), {len(summary['slow_queries'])} slow  [{summary['user']}]"
+            )
+
+    def show(self, profile_id, options):
+        """
+        Prints the hottest functions and the slow queries of one profile.
+        """
+        directory = settings.PROFILING_DIR / profile_id
+        if not (directory / 'request.json').exists():
+            raise CommandError(f'No profile {profile_id} in {settings.PROFILING_DIR}.')
+        summary = json.loads((directory / 'request.json').read_text(encoding='utf-8'))
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['method']} {summary['path']} -> {summary['status']} in {summary['duration_ms']} ms, "
+            f"{summary['query_count']} queries ({summary['query_time_ms']} ms), by {summary['user']} at {summary['created']}"
+        ))
+
+        output = io.StringIO()
+        stats = pstats.Stats(str(directory / 'profile.pstats'), stream=output)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(output.getvalue())
+
+        self.stdout.write(self.style.WARNING(
+            f"{len(summary['slow_queries'])} queries slower than {summary['slow_sql_threshold_ms']} ms"
+        ))
+        for query in summary['slow_queries']:
+            self.stdout.write(f"\n{query['duration_ms']} ms [{query['alias']}] {query['sql']}")
+            if query['params']:
+                self.stdout.write(f"  params: {', '.join(query['params'])}")
+            for row in query['plan'] or []:
+                self.stdout.write(f'  plan: {row}')
+            for frame in query['stack'][-5:]:
+                self.stdout.write(f'  at {frame}')
+        self.stdout.write(f"\nFlame graph input: {directory / 'profile.collapsed'}")
@@ -0,0 +1,88 @@
+"""
+Summarizes the query budget violations found in the JSON log files.
+
+QueryBudgetMiddleware logs a warning on the core.querybudget logger for every request that
+exceeds its view's budget or repeats a query shape. This command reads those records from
+settings.LOG_DIR (including rotated files) and lists the worst offenders per view and
+method, with their most repeated queries and where they were issued from.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Lists the views that most often exceed their query budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help='Number of offenders to show')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        paths = sorted(settings.LOG_DIR.glob('trello.log*'))
+        if not paths:
+            raise CommandError(f'No log files found in {settings.LOG_DIR}.')
+
+        offenders = {}
+        for path in paths:
+            with open(path, encoding='utf-8') as log_file:
+                for line in log_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('logger') == 'core.querybudget':
+                        self.add(offenders, record)
+
+        report = sorted(offenders.values(), key=lambda item: (item['occurrences'], item['max_queries']), reverse=True)
+        report = [self.finish(item) for item in report[:options['limit']]]
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if not report:
+            self.stdout.write(self.style.SUCCESS('No query budget violations logged.'))
+            return
+        for item in report:
+            self.stdout.write(self.style.WARNING(
+                f"{item['method']} {item['view'] or item['route']}: {item['occurrences']} violations, "
+                f"max {item['max_queries']} / avg {item['avg_queries']} queries, budget {item['query_budget']}"
+            ))
+            for query in item['repeated_queries']:
+                self.stdout.write(f"  repeated up to {query['count']}x: {query['sql'][:160]}")
+                if query['stack']:
+                    self.stdout.write(f"    from {query['stack'][-1]}")
+
+    def add(self, offenders, record):
+        """
+        Adds one logged violation to the per view and method totals.
+        """
+        key = (record.get('view') or record.get('route'), record.get('method'))
+        item = offenders.setdefault(key, {
+            'view': record.get('view'),
+            'route': record.get('route'),
+            'method': record.get('method'),
+            'query_budget': record.get('query_budget'),
+            'occurrences': 0,
+            'total_queries': 0,
+            'max_queries': 0,
+            'repeated_queries': {},
+        })
+        item['occurrences'] += 1
+        item['total_queries'] += record.get('query_count', 0)
+        item['max_queries'] = max(item['max_queries'], record.get('query_count', 0))
+        for query in record.get('repeated_queries') or []:
+            seen = item['repeated_queries'].setdefault(query['sql'], {'sql': query['sql'], 'count': 0, 'stack': []})
+            if query['count'] > seen['count']:
+                seen.update(count=query['count'], stack=query.get('stack', []))
+
+    def finish(self, item):
+        """
+        Turns the totals of one offender into its report entry.
+        """
+        repeated = sorted(item.pop('repeated_queries').values(), key=lambda query: query['count'], reverse=True)
+        item['repeated_queries'] = repeated[:3]
+        item['avg_queries'] = round(item.pop('total_queries') / item['occurrences'], 1)
+        return item
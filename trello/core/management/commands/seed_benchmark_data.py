@@ -0,0 +1,129 @@
+"""
+Generates synthetic users, boards, lists, tasks and invitations for benchmarks.
+
+All rows are inserted with bulk_create, including the board-member and task-assignee
+through tables. Boards go to the personal workspace of their owner, and the generated data
+respects the default workspace quotas (boards per user, members per board), so the endpoints
+behave as they do for real users.
+Generated users share the prefix BENCH_USER_PREFIX and the password BENCH_PASSWORD.
+
+Point TRELLO_SQLITE_PATH at a scratch file to keep the data out of the main database.
+"""
+
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.models import Board
+from core.bench import BENCH_PASSWORD, BENCH_USER_PREFIX
+from invitations.models import Invitation
+from lists.models import List, Task
+from workspaces.models import Workspace
+
+MAX_BOARDS_PER_USER = settings.WORKSPACE_MAX_BOARDS_PER_USER
+MAX_MEMBERS_PER_BOARD = settings.WORKSPACE_MAX_BOARD_MEMBERS
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Bulk-creates synthetic benchmark data (users, boards, members, lists, tasks, assignments, invitations)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--boards', type=int, default=100)
+        parser.add_argument('--members', type=int, default=4, help='Members per board besides the owner')
+        parser.add_argument('--lists', type=int, default=5, help='Lists per board')
+        parser.add_argument('--tasks', type=int, default=20, help='Tasks per list')
+        parser.add_argument('--assignees', type=int, default=2, help='Assigned users per task')
+        parser.add_argument('--invitations', type=int, default=200, help='Pending invitations')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()
+            self.stdout.write(f'Deleted {deleted} rows of previous benchmark data')
+
+        with transaction.atomic():
+            password = make_password(BENCH_PASSWORD)
+            users = User.objects.bulk_create([
+                User(username=f'{BENCH_USER_PREFIX}{i}', email=f'{BENCH_USER_PREFIX}{i}@example.com',
+                     name=f'Bench User {i}', password=password)
+                for i in range(options['users'])
+            ], batch_size=BATCH_SIZE)
+            board_counts = {user.pk: 0 for user in users}
+
+            owners = [user for user in users for _ in range(MAX_BOARDS_PER_USER)][:options['boards']]
+            workspaces = {
+                workspace.owner_id: workspace for workspace in Workspace.objects.bulk_create([
+                    Workspace(owner=user, name=f"{user.username}'s workspace", is_personal=True)
+                    for user in dict.fromkeys(owners)
+                ], batch_size=BATCH_SIZE)
+            }
+            boards = Board.objects.bulk_create([
+                Board(title=f'Board {i}', owner=owner, workspace=workspaces[owner.pk],
+                      color=f'#{rng.randrange(0x1000000):06X}')
+                for i, owner in enumerate(owners)
+            ], batch_size=BATCH_SIZE)
+            for board in boards:
+                board_counts[board.owner_id] += 1
+
+            memberships = []
+            members_by_board = {}
+            for board in boards:
+                candidates = [user for user in users
+                              if user.pk != board.owner_id and board_counts[user.pk] < MAX_BOARDS_PER_USER]
+                chosen = rng.sample(candidates, min(options['members'], len(candidates), MAX_MEMBERS_PER_BOARD - 1))
+                members_by_board[board.pk] = {board.owner_id, *(user.pk for user in chosen)}
+                for user in chosen:
+                    board_counts[user.pk] += 1
+                    memberships.append(Board.members.through(board_id=board.pk, user_id=user.pk))
+            Board.members.through.objects.bulk_create(memberships, batch_size=BATCH_SIZE)
+
+            lists = List.objects.bulk_create([
+                List(title=f'List {i}', board=board) for board in boards for i in range(options['lists'])
+            ], batch_size=BATCH_SIZE)
+
+            tasks = Task.objects.bulk_create([
+                Task(title=f'Task {i}', description=f'Generated task {i} of {list_obj.title}', list=list_obj,
+                     order=i, due_date=None)
+                for list_obj in lists for i in range(options['tasks'])
+            ], batch_size=BATCH_SIZE)
+
+            assignments = []
+            for task in tasks:
+                board_members = list(members_by_board[task.list.board_id])
+                for user_id in rng.sample(board_members, min(options['assignees'], len(board_members))):
+                    assignments.append(Task.assigned_users.through(task_id=task.pk, user_id=user_id))
+            Task.assigned_users.through.objects.bulk_create(assignments, batch_size=BATCH_SIZE)
+
+            invitations = []
+            invited = set()
+            for _ in range(options['invitations'] * 10):
+                if len(invitations) >= options['invitations'] or not boards:
+                    break
+                board = rng.choice(boards)
+                user = rng.choice(users)
+                key = (board.pk, user.pk)
+                if (key in invited or user.pk in members_by_board[board.pk]
+                        or len(members_by_board[board.pk]) >= MAX_MEMBERS_PER_BOARD
+                        or board_counts[user.pk] >= MAX_BOARDS_PER_USER):
+                    continue
+                invited.add(key)
+                invitations.append(Invitation(board=board, invited_user=user, status='pending'))
+            Invitation.objects.bulk_create(invitations, batch_size=BATCH_SIZE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users, {len(boards)} boards, {len(memberships)} memberships, '
+            f'{len(lists)} lists, {len(tasks)} tasks, {len(assignments)} assignments and '
+            f'{len(invitations)} invitations in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,94 @@
+"""
+Reports what the web and worker processes spend their startup time importing.
+
+Starts each entry point (see core.startup) under `python -X importtime` and summarizes the
+output: the total import time, the packages with the most import time of their own, and
+the imports that pull in another package with the largest cumulative import time,
+together with the module and the project module that pulled them in. Cold-start wall times are measured in separate runs without
+-X importtime, whose overhead would distort them.
+"""
+
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import ENTRY_POINTS, measure_cold_start, parse_importtime, run_entry_point
+
+
+class Command(BaseCommand):
+    help = 'Profiles the import time of the web and worker entry points'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entry', nargs='+', choices=list(ENTRY_POINTS), default=['web', 'worker'], help='Entry points to profile',
+        )
+        parser.add_argument('--limit', type=int, default=15, help='Number of packages and modules to show')
+        parser.add_argument('--runs', type=int, default=3, help='Processes started to measure the cold start')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        cold_start = measure_cold_start(options['entry'], options['runs'])
+        report = {}
+        for entry in options['entry']:
+            try:
+                _, modules, output = run_entry_point(entry, importtime=True)
+            except RuntimeError as error:
+                raise CommandError(str(error)) from error
+            report[entry] = {'cold_start': cold_start[entry], **self.summarize(parse_importtime(output), options['limit'])}
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for entry, summary in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{entry}: cold start {summary['cold_start']['median_ms']} ms (best {summary['cold_start']['best_ms']} ms), "
+                f"{summary['modules']} modules imported in {summary['import_ms']} ms"
+            ))
+            self.stdout.write('  Packages by own import time:')
+            for package in summary['packages']:
+                self.stdout.write(f"    {package['self_ms']:8.1f} ms  {package['package']} ({package['modules']} modules)")
+            self.stdout.write('  Package imports by cumulative import time:')
+            for module in summary['slowest']:
+                via = ' <- '.join(name for name in (module['parent'], module['imported_by']) if name)
+                via = f'  <- {via}' if via else ''
+                self.stdout.write(f"    {module['cumulative_ms']:8.1f} ms  {module['module']}{via}")
+
+    def summarize(self, records, limit):
+        """
+        Summarizes parsed -X importtime records.
+
+        Args:
+            records (list): ImportRecord objects.
+            limit (int): Number of packages and modules to keep.
+
+        Returns:
+            dict: Total import time and module count, the packages with the most import
+            time of their own and the package imports with the largest cumulative time.
+        """
+        packages = defaultdict(lambda: {'self_us': 0, 'modules': 0})
+        for record in records:
+            packages[record.package]['self_us'] += record.self_us
+            packages[record.package]['modules'] += 1
+        top_packages = sorted(packages.items(), key=lambda item: item[1]['self_us'], reverse=True)[:limit]
+
+        # Where another package is first pulled in; its submodules are part of that cost
+        entries = [record for record in records if record.parent.split('.')[0] != record.package]
+        slowest = sorted(entries, key=lambda record: record.cumulative_us, reverse=True)[:limit]
+        return {
+            'modules': len(records),
+            'import_ms': round(sum(record.self_us for record in records) / 1000, 1),
+            'packages': [
+                {'package': name, 'self_ms': round(totals['self_us'] / 1000, 1), 'modules': totals['modules']}
+                for name, totals in top_packages
+            ],
+            'slowest': [
+                {
+                    'module': record.name,
+                    'cumulative_ms': round(record.cumulative_us / 1000, 1),
+                    'parent': record.parent,
+                    'imported_by': record.imported_by,
+                }
+                for record in slowest
+            ],
+        }
@@ -0,0 +1,53 @@
+"""
+Copies the primary SQLite database onto the configured read replicas.
+
+This stands in for real replication when running locally: each replica file listed in
+TRELLO_SQLITE_REPLICA_PATHS is refreshed from the primary with SQLite's online backup API,
+either once or continuously at a fixed interval.
+"""
+
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Refreshes the local SQLite read replicas from the primary database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep syncing every N seconds instead of syncing once',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASES:
+            raise CommandError('No replica configured. Set TRELLO_SQLITE_REPLICA_PATHS.')
+
+        while True:
+            started = time.perf_counter()
+            self.sync()
+            self.stdout.write(self.style.SUCCESS(
+                f'Synced {len(settings.REPLICA_DATABASES)} replica(s) in {time.perf_counter() - started:.3f}s'
+            ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def sync(self):
+        """
+        Copies the primary onto every replica with the SQLite backup API.
+        """
+        source = sqlite3.connect(connections[DEFAULT_DB_ALIAS].settings_dict['NAME'])
+        try:
+            for alias in settings.REPLICA_DATABASES:
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+        finally:
+            source.close()
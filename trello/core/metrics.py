@@ -0,0 +1,286 @@
+"""
+Per-request performance metrics.
+
+This module records, for the request being handled, the number of SQL queries and the time
+spent in the database, in the view, in serializing the response (building serializer data,
+which happens in the view and is timed by the views with core.mixins.SerializerTimingMixin,
+and rendering it) and in publishing Celery tasks.
+Finished requests are aggregated into per-route histograms that are exported in the
+Prometheus text format.
+
+The registry lives in process memory: every worker process exposes its own series.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Timings collected while handling one request. Durations are in seconds.
+
+    Attributes:
+        db_queries (int): Number of SQL statements executed.
+        db_time (float): Time spent executing SQL.
+        view_time (float): Time spent in the view, including its queries.
+        serialize_time (float): Time spent building serializer data (part of view_time) and
+            rendering the response.
+        celery_time (float): Time spent publishing Celery tasks.
+        celery_tasks (int): Number of Celery tasks published.
+    """
+    __slots__ = (
+        'db_queries', 'db_time', 'view_time', 'serialize_time', 'celery_time', 'celery_tasks',
+        'view_started', 'view_ended', 'publish_started',
+    )
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.view_time = 0.0
+        self.serialize_time = 0.0
+        self.celery_time = 0.0
+        self.celery_tasks = 0
+        self.view_started = None
+        self.view_ended = None
+        self.publish_started = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper (see connection.execute_wrapper) counting and timing queries.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def server_timing(self, total):
+        """
+        Formats the timings as a Server-Timing header value (milliseconds).
+
+        Args:
+            total (float): Total request time in seconds.
+
+        Returns:
+            str: The header value.
+        """
+        return ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'view;dur={self.view_time * 1000:.1f}',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'celery;dur={self.celery_time * 1000:.1f};desc="{self.celery_tasks} tasks"',
+        ])
+
+
+def start_request():
+    """
+    Starts collecting metrics for the current request.
+
+    Returns:
+        tuple: The RequestMetrics instance and the token to pass to end_request().
+    """
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    """
+    Stops collecting metrics for the request started with start_request().
+    """
+    _current.reset(token)
+
+
+def current_metrics():
+    """
+    Returns the RequestMetrics of the request being handled, or None outside a request.
+    """
+    return _current.get()
+
+
+@contextmanager
+def measure(attribute):
+    """
+    Adds the time spent in the enclosed block to an attribute of the current RequestMetrics.
+
+    Does nothing outside an instrumented request.
+
+    Args:
+        attribute (str): The RequestMetrics attribute to increase, e.g. 'serialize_time'.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, attribute, getattr(metrics, attribute) + time.perf_counter() - started)
+
+
+@functools.cache
+def timed_serializer_class(serializer_class):
+    """
+    Returns a subclass of a serializer class whose `data` counts as serialize_time.
+
+    Used by core.mixins.SerializerTimingMixin for the serializer of a view's response only,
+    so the serializers nested in it are not timed again.
+
+    Args:
+        serializer_class: The Serializer or ListSerializer subclass.
+
+    Returns:
+        type: The subclass, with the same name, created once per serializer class.
+    """
+    data = serializer_class.data
+
+    def timed_data(serializer):
+        with measure('serialize_time'):
+            return data.fget(serializer)
+
+    return type(serializer_class.__name__, (serializer_class,), {
+        '__module__': serializer_class.__module__,
+        '__qualname__': serializer_class.__qualname__,
+        'data': property(timed_data, doc=data.__doc__),
+    })
+
+
+def task_publish_started(**kwargs):
+    """
+    Celery before_task_publish handler: marks the start of a publish.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.publish_started = time.perf_counter()
+
+
+def task_publish_finished(**kwargs):
+    """
+    Celery after_task_publish handler: adds the publish duration to the request.
+    """
+    metrics = _current.get()
+    if metrics is not None and metrics.publish_started is not None:
+        metrics.celery_time += time.perf_counter() - metrics.publish_started
+        metrics.celery_tasks += 1
+        metrics.publish_started = None
+
+
+class Histogram:
+    """
+    Prometheus-style histogram with fixed upper bounds.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, ascending.
+        counts (list): Observations per bucket (not cumulative); the last entry is +Inf.
+        total (float): Sum of all observations.
+        count (int): Number of observations.
+    """
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Records one observation.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """
+    Aggregates finished requests into per-route histograms.
+
+    Each series is keyed by (method, route), where route is the URL pattern
+    (e.g. 'boards/<int:pk>/') so that ids do not create new series.
+    """
+    HISTOGRAMS = (
+        ('request_duration_seconds', 'Time spent handling the request.', DURATION_BUCKETS),
+        ('db_duration_seconds', 'Time spent executing SQL per request.', DURATION_BUCKETS),
+        ('db_queries', 'SQL statements executed per request.', QUERY_COUNT_BUCKETS),
+        ('view_duration_seconds', 'Time spent in the view per request.', DURATION_BUCKETS),
+        ('serialize_duration_seconds', 'Time spent building serializer data and rendering the response per request.',
+         DURATION_BUCKETS),
+        ('celery_enqueue_seconds', 'Time spent publishing Celery tasks per request.', DURATION_BUCKETS),
+    )
+
+    def __init__(self, namespace='trello'):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._series = {}
+        self._responses = {}
+
+    def observe(self, method, route, status_code, metrics, total):
+        """
+        Adds a finished request to the histograms of its route.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The matched URL pattern.
+            status_code (int): The response status code.
+            metrics (RequestMetrics): The request's timings.
+            total (float): Total request time in seconds.
+        """
+        values = (total, metrics.db_time, metrics.db_queries, metrics.view_time,
+                  metrics.serialize_time, metrics.celery_time)
+        key = (method, route)
+        with self._lock:
+            histograms = self._series.get(key)
+            if histograms is None:
+                histograms = self._series[key] = [Histogram(buckets) for _, _, buckets in self.HISTOGRAMS]
+            for histogram, value in zip(histograms, values):
+                histogram.observe(value)
+            response_key = (method, route, status_code)
+            self._responses[response_key] = self._responses.get(response_key, 0) + 1
+
+    def render_prometheus(self):
+        """
+        Renders all series in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics document.
+        """
+        lines = []
+        with self._lock:
+            name = f'{self.namespace}_requests_total'
+            lines += [f'# HELP {name} Requests handled.', f'# TYPE {name} counter']
+            for (method, route, status_code), count in sorted(self._responses.items()):
+                lines.append(
+                    f'{name}{{method="{method}",route="{_escape_label(route)}",status="{status_code}"}} {count}'
+                )
+            for index, (suffix, help_text, _) in enumerate(self.HISTOGRAMS):
+                name = f'{self.namespace}_{suffix}'
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (method, route), histograms in sorted(self._series.items()):
+                    histogram = histograms[index]
+                    labels = f'method="{method}",route="{_escape_label(route)}"'
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,494 @@
+"""
+Django middleware shared by all apps.
+
+This module defines the middleware that drives the read-replica router for each request,
+the middleware that instruments requests with per-request performance metrics, the
+middleware that enforces per-view query budgets, the middleware that profiles single
+requests on demand and the middleware that serves the collected static files.
+
+All of them support both sync (WSGI) and async (ASGI) request handling, so an async view
+served by ASGI does not need a thread for the whole request.
+"""
+
+import mimetypes
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.permissions import SAFE_METHODS
+
+from .db import execute_wrapper
+from .metrics import end_request, registry, start_request
+from .profiling import RequestProfile, is_requested, profiling_user
+from .querybudget import QueryRecorder, report_budget_violations
+from .routers import activate_request, deactivate_request, pin_user_to_primary, resolved_user
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware that lets the ReplicaRouter send safe-method reads to read replicas.
+
+    Reads of GET/HEAD/OPTIONS requests may use a replica unless the client carries the
+    pin cookie set after its last write. Unsafe requests read and write on the primary,
+    and pin the client (cookie) and the user (cache) to the primary for
+    settings.REPLICA_PIN_SECONDS so the next reads see the write.
+    The middleware removes itself when no replica is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initializes the middleware with the get_response callable.
+
+        Args:
+            get_response: The next middleware or view in the request-response cycle.
+
+        Raises:
+            MiddlewareNotUsed: If settings.REPLICA_DATABASES is empty.
+        """
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Activates routing for the request and pins the client after a write.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The response from the next middleware or view.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = activate_request(request, self.use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            deactivate_request(token)
+        user_id = self.pin_client(request, response)
+        if user_id is not None:
+            pin_user_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+        """
+        token = activate_request(request, self.use_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            deactivate_request(token)
+        user_id = self.pin_client(request, response)
+        if user_id is not None:
+            await sync_to_async(pin_user_to_primary)(user_id)
+        return response
+
+    def use_replica(self, request):
+        """
+        Tells whether the reads of the request may go to a replica.
+        """
+        return request.method in SAFE_METHODS and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+
+    def pin_client(self, request, response):
+        """
+        Sets the pin cookie after an unsafe request.
+
+        Returns:
+            int or None: The id of the user to pin in the cache, if known.
+        """
+        # A batch of reads is sent as a POST but writes nothing (see core.batch)
+        if request.method in SAFE_METHODS or getattr(request, 'read_only', False):
+            return None
+        response.set_cookie(
+            settings.REPLICA_PIN_COOKIE, '1',
+            max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+        )
+        user = resolved_user(request)
+        return user.pk if user is not None and user.is_authenticated else None
+
+
+class PerformanceMiddleware:
+    """
+    Middleware that measures where the time of each request goes.
+
+    Records the SQL query count and time (through connection.execute_wrapper on every
+    database alias), the view time, the response rendering time and the Celery publish
+    time. Adds them to the response as a Server-Timing header and aggregates them into
+    per-route histograms served by the metrics endpoint.
+    The middleware removes itself unless settings.PERF_INSTRUMENTATION is enabled.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initializes the middleware with the get_response callable.
+
+        Args:
+            get_response: The next middleware or view in the request-response cycle.
+
+        Raises:
+            MiddlewareNotUsed: If settings.PERF_INSTRUMENTATION is disabled.
+        """
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Collects the metrics of the request and records them.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The response with a Server-Timing header.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token = start_request()
+        request.perf_metrics = metrics
+        started = time.perf_counter()
+        try:
+            with execute_wrapper(metrics.execute_wrapper):
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.record(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+        """
+        metrics, token = start_request()
+        request.perf_metrics = metrics
+        started = time.perf_counter()
+        try:
+            with execute_wrapper(metrics.execute_wrapper):
+                response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.record(request, response, metrics, started)
+
+    def record(self, request, response, metrics, started):
+        """
+        Adds the Server-Timing header and records the request in the route histograms.
+
+        Returns:
+            Response: The response.
+        """
+        finished = time.perf_counter()
+        if metrics.view_started is not None:
+            view_ended = metrics.view_ended or finished
+            metrics.view_time = view_ended - metrics.view_started
+        total = finished - started
+        response['Server-Timing'] = metrics.server_timing(total)
+
+        match = request.resolver_match
+        route = match.route if match is not None else '<unmatched>'
+        registry.observe(request.method, route, response.status_code, metrics, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Marks the start of the view.
+        """
+        request.perf_metrics.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        """
+        Marks the end of the view; DRF responses are rendered after this hook.
+        """
+        request.perf_metrics.view_ended = time.perf_counter()
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware that checks each request against the query budget of its view.
+
+    Flags requests running more queries than the view's `query_budget`, and requests
+    repeating one query shape settings.QUERY_BUDGET_REPEAT_THRESHOLD times or more (N+1).
+    With settings.QUERY_BUDGET = 'log' the problem is logged as a warning on the
+    core.querybudget logger, with the repeated queries and their stacks; with 'raise'
+    (development and tests only) QueryBudgetExceeded is raised.
+    The middleware removes itself when settings.QUERY_BUDGET is 'off'.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initializes the middleware with the get_response callable.
+
+        Args:
+            get_response: The next middleware or view in the request-response cycle.
+
+        Raises:
+            MiddlewareNotUsed: If settings.QUERY_BUDGET is 'off'.
+        """
+        if settings.QUERY_BUDGET == 'off':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Records the queries of the request and reports budget violations.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The response from the next middleware or view.
+
+        Raises:
+            QueryBudgetExceeded: If settings.QUERY_BUDGET is 'raise' and the request breaks its budget.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(settings.QUERY_BUDGET_REPEAT_THRESHOLD)
+        with recorder.record():
+            response = self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+        """
+        recorder = QueryRecorder(settings.QUERY_BUDGET_REPEAT_THRESHOLD)
+        with recorder.record():
+            response = await self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    def check(self, request, recorder):
+        """
+        Reports the budget violations of a request.
+
+        Requests that checked their parts themselves (the /batch/ endpoint checks each
+        sub-request against its own view's budget) are skipped.
+
+        Raises:
+            QueryBudgetExceeded: If settings.QUERY_BUDGET is 'raise' and the request breaks its budget.
+        """
+        if getattr(request, 'query_budget_checked', False):
+            return
+        report_budget_violations(request, recorder)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Remembers the view class of the request, where the budget is declared.
+        """
+        request.query_budget_view = getattr(view_func, 'view_class', None)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware that profiles a request when a staff user asks for it.
+
+    Requests carrying the `X-Profile: 1` header or the `_profile=1` query parameter from a
+    staff user run under cProfile with slow SQL capture (see core.profiling); the profile
+    id is returned in the X-Profile-Id response header. Other requests pass through.
+    cProfile only follows the calling thread: for async requests it records the event loop
+    thread, so the ORM work done in worker threads shows up as awaits (the slow queries are
+    captured either way).
+    The middleware removes itself unless settings.PROFILING is enabled.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initializes the middleware with the get_response callable.
+
+        Args:
+            get_response: The next middleware or view in the request-response cycle.
+
+        Raises:
+            MiddlewareNotUsed: If settings.PROFILING is disabled.
+        """
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Profiles the request if it asks for it and the user is staff.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The response from the next middleware or view.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not is_requested(request):
+            return self.get_response(request)
+        user = profiling_user(request)
+        if user is None or not user.is_staff:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        started = time.perf_counter()
+        with execute_wrapper(profile.slow_queries):
+            try:
+                profile.profiler.enable()
+            except ValueError:  # another profiler is already active
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.profiler.disable()
+        profile.save(request, response, user, time.perf_counter() - started)
+        response['X-Profile-Id'] = profile.profile_id
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+        """
+        if not is_requested(request):
+            return await self.get_response(request)
+        user = await sync_to_async(profiling_user)(request)
+        if user is None or not user.is_staff:
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        started = time.perf_counter()
+        with execute_wrapper(profile.slow_queries):
+            try:
+                profile.profiler.enable()
+            except ValueError:  # another profiler is already active
+                return await self.get_response(request)
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.profiler.disable()
+        await sync_to_async(profile.save)(request, response, user, time.perf_counter() - started)
+        response['X-Profile-Id'] = profile.profile_id
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Middleware that serves the files collected in STATIC_ROOT, before any other middleware.
+
+    Content-hashed files (see core.storage) are served with a one-year immutable
+    Cache-Control; other files must be revalidated (Last-Modified). When the client
+    accepts it, the brotli or gzip variant written by collectstatic is sent instead of the
+    file, so nothing is compressed per request.
+    Requests for files that do not exist in STATIC_ROOT go on to the next middleware. With
+    DEBUG on, runserver serves static files from the apps before this middleware is reached.
+    The middleware removes itself unless settings.SERVE_STATIC is enabled.
+    """
+    sync_capable = True
+    async_capable = True
+
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        """
+        Initializes the middleware with the get_response callable.
+
+        Args:
+            get_response: The next middleware or view in the request-response cycle.
+
+        Raises:
+            MiddlewareNotUsed: If settings.SERVE_STATIC is disabled.
+        """
+        if not settings.SERVE_STATIC:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.root = str(settings.STATIC_ROOT)
+        # Names with a content hash, from the manifest written by collectstatic
+        self.immutable_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Serves the request from STATIC_ROOT if it is for a collected file.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The file response, or the response from the next middleware or view.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve(request)
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+        """
+        response = self.serve(request)
+        return response if response is not None else await self.get_response(request)
+
+    def serve(self, request):
+        """
+        Returns the response for a collected static file.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            HttpResponse or None: The file (or 304) response, or None if the request is
+            not for a collected file.
+        """
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return None
+        name = request.path[len(self.prefix):]
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        last_modified = int(stat.st_mtime)
+        response = get_conditional_response(request, last_modified=last_modified)
+        if response is None:
+            content_type, _ = mimetypes.guess_type(name)
+            accepted = {part.split(';')[0].strip() for part in request.headers.get('Accept-Encoding', '').split(',')}
+            encoding = None
+            for candidate, suffix in self.ENCODINGS:
+                if candidate in accepted and os.path.isfile(path + suffix):
+                    encoding, path = candidate, path + suffix
+                    break
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            if encoding:
+                response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = self.IMMUTABLE if name in self.immutable_names else 'no-cache'
+        return response
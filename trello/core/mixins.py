@@ -0,0 +1,79 @@
+"""
+Reusable mixins for Django REST Framework views.
+
+This module defines view mixins shared by the board, list, task and invitation apps.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import timed_serializer_class
+from .routers import tenant_database
+
+
+class AtomicWriteMixin:
+    """
+    Runs unsafe (writing) requests inside a single database transaction.
+
+    With the production SQLite profile, transactions start with BEGIN IMMEDIATE, so the
+    write lock is taken up front. The quota checks and the writes of a request then happen
+    under the same lock, and a busy database is waited on through busy_timeout instead of
+    failing with "database is locked" when a read transaction tries to upgrade.
+    Safe methods (GET, HEAD, OPTIONS) are left in autocommit mode so reads never take the lock.
+    The transaction is opened on the database of the active workspace (see core.routers).
+
+    DRF turns exceptions raised by the view (ValidationError, PermissionDenied, ...) into
+    error responses, so they never leave the atomic block; error responses therefore roll
+    back what the request wrote before failing.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Wraps the request in transaction.atomic() on the workspace's database unless the method is safe,
+        rolling it back if the response is an error.
+
+        Args:
+            request: The HTTP request object.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            Response: The response from the view.
+        """
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        database = tenant_database()
+        with transaction.atomic(using=database):
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code >= 400:
+                transaction.set_rollback(True, using=database)
+            return response
+
+
+class SerializerTimingMixin:
+    """
+    Times building the data of the serializers a view gets from get_serializer().
+
+    The time counts in the `serialize` phase of Server-Timing along with the JSON rendering
+    (see core.metrics), when settings.PERF_INSTRUMENTATION is enabled. Only the serializer
+    of the view is timed, so the serializers nested in it are not counted twice, and views
+    without this mixin are not timed at all.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Returns the serializer of the view, with its `data` timed.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            Serializer: The serializer.
+        """
+        serializer = super().get_serializer(*args, **kwargs)
+        # The schema generator tells serializers apart by class, and documents the untimed ones
+        if settings.PERF_INSTRUMENTATION and not getattr(self, 'swagger_fake_view', False):
+            serializer.__class__ = timed_serializer_class(type(serializer))
+        return serializer
@@ -0,0 +1,229 @@
+"""
+OpenAPI schema generated once per deploy instead of on every request.
+
+drf_yasg builds the schema by introspecting every view and serializer, which takes long
+and gives the same result until the code changes. The schema is instead written to
+settings.OPENAPI_SCHEMA_DIR as openapi.json and openapi.yaml, by the
+generate_openapi_schema command or on the first request that needs it, and served from
+there (and from memory) with an ETag.
+
+The files are tagged with a fingerprint of the URLconf: the URL patterns, their views, and
+the source of the modules defining the views and their serializers. When the fingerprint of
+the running code differs, the schema is stale and is regenerated.
+
+drf_yasg is only imported when a schema is generated or a documentation page is first
+requested, not when the URLconf is loaded.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from functools import lru_cache
+from importlib.metadata import version
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'json': ('openapi.json', 'application/json'),
+    'yaml': ('openapi.yaml', 'application/yaml'),
+}
+META_FILE = 'openapi.meta.json'
+
+_documents = {}  # format -> (fingerprint, content, etag), for this process
+_lock = threading.Lock()
+
+
+def api_info():
+    """
+    Returns the drf_yasg description of the API.
+    """
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Modern Trello API",
+        default_version='v1',
+        description="API documentation for Modern Trello project",
+        terms_of_service="https://www.example.com/terms/",
+        contact=openapi.Contact(email="contact@example.com"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def schema_ui_view(renderer):
+    """
+    Returns the view of a documentation page, which builds the drf_yasg view on its first
+    request.
+
+    Args:
+        renderer (str): 'swagger' or 'redoc'.
+
+    Returns:
+        function: The view.
+    """
+    view = None
+
+    def lazy_view(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_yasg.views import get_schema_view
+            from rest_framework import permissions
+
+            schema_view = get_schema_view(api_info(), public=True, permission_classes=(permissions.AllowAny,))
+            view = schema_view.with_ui(renderer, cache_timeout=0)
+        return view(request, *args, **kwargs)
+
+    return lazy_view
+
+
+def _view_sources(callback):
+    """
+    Returns the classes whose source defines the schema of a URL pattern's view.
+    """
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+    classes = [view_class]
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    if serializer_class is not None:
+        classes.append(serializer_class)
+    return classes
+
+
+def _walk(patterns, prefix=''):
+    """
+    Yields (route, view callback) for every URL pattern, following includes.
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern.callback
+
+
+@lru_cache(maxsize=1)
+def urlconf_fingerprint():
+    """
+    Returns the fingerprint of the URLconf the schema is generated from.
+
+    Computed once per process: the URLconf and the code do not change while it runs.
+
+    Returns:
+        str: A hex digest.
+    """
+    digest = hashlib.sha256(f'drf-yasg {version("drf-yasg")}'.encode())
+    modules = set()
+    for route, callback in _walk(get_resolver().url_patterns):
+        classes = _view_sources(callback)
+        digest.update(f'{route}:{classes[0].__module__}.{classes[0].__qualname__}\n'.encode())
+        modules.update(cls.__module__ for cls in classes)
+    for name in sorted(modules):
+        path = getattr(sys.modules.get(name), '__file__', None)
+        if path and path.endswith('.py') and os.path.isfile(path):
+            with open(path, 'rb') as source:
+                digest.update(name.encode() + b'\n' + source.read())
+    return digest.hexdigest()
+
+
+def generate_schema():
+    """
+    Generates the schema by introspecting the API, as the public swagger/ view does.
+
+    Returns:
+        dict: The encoded documents, {'json': bytes, 'yaml': bytes}.
+    """
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(api_info()).get_schema(request=None, public=True)
+    return {
+        'json': OpenAPICodecJson(validators=[]).encode(schema),
+        'yaml': OpenAPICodecYaml(validators=[]).encode(schema),
+    }
+
+
+def _write_atomic(path, content):
+    """
+    Writes a file through a temporary file, so readers never see a partial file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_schema(directory=None):
+    """
+    Generates the schema and writes its files, tagged with the current fingerprint.
+
+    Args:
+        directory (Path, optional): Where to write; settings.OPENAPI_SCHEMA_DIR by default.
+
+    Returns:
+        dict: The metadata written: fingerprint, generated_at and the ETag of every format.
+    """
+    directory = directory or settings.OPENAPI_SCHEMA_DIR
+    os.makedirs(directory, exist_ok=True)
+    documents = generate_schema()
+    meta = {'fingerprint': urlconf_fingerprint(), 'generated_at': timezone.now().isoformat(), 'etags': {}}
+    for schema_format, content in documents.items():
+        _write_atomic(os.path.join(directory, FORMATS[schema_format][0]), content)
+        meta['etags'][schema_format] = '"%s"' % hashlib.md5(content, usedforsecurity=False).hexdigest()
+    # Written last: files with a matching fingerprint in the metadata are complete
+    _write_atomic(os.path.join(directory, META_FILE), json.dumps(meta, indent=2).encode())
+    return meta
+
+
+def read_meta(directory=None):
+    """
+    Returns the metadata of the schema files, or None if there are none.
+    """
+    directory = directory or settings.OPENAPI_SCHEMA_DIR
+    try:
+        with open(os.path.join(directory, META_FILE)) as meta_file:
+            return json.load(meta_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(meta):
+    """
+    Tells whether schema files were generated from the running URLconf.
+    """
+    return meta is not None and meta.get('fingerprint') == urlconf_fingerprint()
+
+
+def get_schema_document(schema_format):
+    """
+    Returns a schema document, regenerating the files first if they are missing or stale.
+
+    Args:
+        schema_format (str): 'json' or 'yaml'.
+
+    Returns:
+        tuple: (content bytes, content type, etag)
+    """
+    fingerprint = urlconf_fingerprint()
+    document = _documents.get(schema_format)
+    if document is None or document[0] != fingerprint:
+        with _lock:
+            document = _documents.get(schema_format)
+            if document is None or document[0] != fingerprint:
+                meta = read_meta()
+                if not is_fresh(meta):
+                    logger.info('OpenAPI schema files missing or stale, regenerating')
+                    meta = write_schema()
+                file_name = FORMATS[schema_format][0]
+                with open(os.path.join(settings.OPENAPI_SCHEMA_DIR, file_name), 'rb') as schema_file:
+                    document = (fingerprint, schema_file.read(), meta['etags'][schema_format])
+                _documents[schema_format] = document
+    return document[1], FORMATS[schema_format][1], document[2]
@@ -0,0 +1,230 @@
+"""
+On-demand profiling of single requests.
+
+A staff user asks for a profile by sending the `X-Profile: 1` header or the `_profile=1`
+query parameter. The request then runs under cProfile, and every SQL statement slower than
+settings.PROFILING_SLOW_SQL_MS is captured with its query plan and the Python stack that
+issued it. Each profile is stored in its own directory under settings.PROFILING_DIR:
+
+    request.json      method, path, user, status, timings and the slow queries
+    profile.pstats    the cProfile statistics, for pstats or snakeviz
+    profile.collapsed collapsed stacks for flamegraph.pl or speedscope
+
+List and inspect them with `manage.py profiles`.
+"""
+
+import cProfile
+import json
+import pstats
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .querybudget import query_stack
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = '_profile'
+
+
+def is_requested(request):
+    """
+    Tells whether the request asks to be profiled.
+
+    Args:
+        request: The Django HttpRequest.
+
+    Returns:
+        bool: True if the profiling header or query parameter is set.
+    """
+    return request.headers.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_PARAM) == '1'
+
+
+def profiling_user(request):
+    """
+    Returns the user asking for a profile, authenticated by session or JWT.
+
+    The middleware runs before DRF authenticates the request, so the bearer token is
+    checked here; this only happens for requests that ask to be profiled.
+
+    Args:
+        request: The Django HttpRequest.
+
+    Returns:
+        User or None: The authenticated user, or None.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    return result[0] if result else None
+
+
+class SlowQueryCapture:
+    """
+    Execute wrapper recording the statements slower than a threshold.
+
+    Attributes:
+        threshold (float): Duration in seconds above which a statement is captured.
+        queries (list): The captured statements with their duration, plan and stack.
+        count (int): Number of statements executed.
+        total_time (float): Time spent in the database, in seconds.
+    """
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.queries = []
+        self.count = 0
+        self.total_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.total_time += duration
+            if duration >= self.threshold:
+                self.queries.append({
+                    'sql': sql,
+                    'params': [str(param) for param in params or []] if not many else [],
+                    'duration_ms': round(duration * 1000, 2),
+                    'alias': context['connection'].alias,
+                    'plan': self.explain(context['connection'], sql, params, many),
+                    'stack': query_stack(limit=15),
+                })
+
+    @staticmethod
+    def explain(connection, sql, params, many):
+        """
+        Returns the query plan of a SELECT statement (EXPLAIN QUERY PLAN on SQLite).
+
+        The plan is read through a raw cursor so it is neither counted nor captured again.
+
+        Returns:
+            list or None: The plan rows, or None for other statements.
+        """
+        if many or not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        cursor = connection.create_cursor()
+        try:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+        except Exception as error:
+            return [f'EXPLAIN failed: {error}']
+        finally:
+            cursor.close()
+
+
+def collapsed_stacks(stats):
+    """
+    Converts cProfile statistics to collapsed stacks ("a;b;c <microseconds>" lines).
+
+    cProfile only records caller/callee pairs, not full stacks, so the time of a function
+    called from several places is split between its callers in proportion to the time
+    each edge accounts for, as flameprof does. Recursive calls are folded into the
+    outermost frame.
+
+    Args:
+        stats (pstats.Stats): The profile statistics.
+
+    Returns:
+        list: The collapsed stack lines.
+    """
+    entries = stats.stats
+    callees = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(function)
+    if not entries:
+        return []
+    # The outermost profiled frame (the rest of the middleware chain) spans the whole profile
+    root = max(entries, key=lambda function: entries[function][3])
+    lines = {}
+
+    def label(function):
+        filename, lineno, name = function
+        return f'{name} ({filename}:{lineno})' if filename != '~' else name
+
+    def walk(function, path, scale):
+        path = path + [function]
+        own = int(entries[function][2] * scale * 1_000_000)
+        if own:
+            stack = ';'.join(label(item) for item in path)
+            lines[stack] = lines.get(stack, 0) + own
+        for callee in callees.get(function, []):
+            if callee in path:
+                continue
+            callee_total = entries[callee][3]
+            edge_total = entries[callee][4][function][3]
+            if callee_total <= 0 or edge_total * scale < 1e-6:
+                continue
+            walk(callee, path, scale * edge_total / callee_total)
+
+    walk(root, [], 1.0)
+    return [f'{stack} {value}' for stack, value in lines.items()]
+
+
+class RequestProfile:
+    """
+    Profiles one request and stores the result.
+
+    Attributes:
+        profile_id (str): Identifier of the profile, also its directory name.
+        profiler (cProfile.Profile): The profiler.
+        slow_queries (SlowQueryCapture): The execute wrapper capturing slow statements.
+    """
+    def __init__(self):
+        now = datetime.now(tz=timezone.utc)
+        self.profile_id = f'{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+        self.created = now
+        self.profiler = cProfile.Profile()
+        self.slow_queries = SlowQueryCapture(settings.PROFILING_SLOW_SQL_MS / 1000)
+
+    def save(self, request, response, user, duration):
+        """
+        Writes the profile files and drops the oldest profiles beyond settings.PROFILING_KEEP.
+
+        Args:
+            request: The profiled request.
+            response: Its response.
+            user: The staff user who asked for the profile.
+            duration (float): Request time in seconds.
+
+        Returns:
+            Path: The profile directory.
+        """
+        directory = settings.PROFILING_DIR / self.profile_id
+        directory.mkdir(parents=True, exist_ok=True)
+
+        stats = pstats.Stats(self.profiler)
+        stats.dump_stats(directory / 'profile.pstats')
+        (directory / 'profile.collapsed').write_text('\n'.join(collapsed_stacks(stats)) + '\n', encoding='utf-8')
+
+        match = request.resolver_match
+        summary = {
+            'id': self.profile_id,
+            'created': self.created.isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': match.route if match is not None else None,
+            'user': user.get_username(),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'query_count': self.slow_queries.count,
+            'query_time_ms': round(self.slow_queries.total_time * 1000, 2),
+            'slow_sql_threshold_ms': settings.PROFILING_SLOW_SQL_MS,
+            'slow_queries': self.slow_queries.queries,
+        }
+        (directory / 'request.json').write_text(json.dumps(summary, indent=2), encoding='utf-8')
+
+        for stale in sorted(settings.PROFILING_DIR.iterdir())[:-settings.PROFILING_KEEP]:
+            shutil.rmtree(stale, ignore_errors=True)
+        return directory
@@ -0,0 +1,231 @@
+"""
+Query budgets and N+1 detection.
+
+Views declare how many SQL queries a request may run with a `query_budget` class attribute,
+either one number for every method or a dict keyed by HTTP method:
+
+    class BoardListCreateView(generics.ListCreateAPIView):
+        query_budget = {'GET': 4, 'POST': 8}
+
+A request is flagged when it runs more queries than its budget, or when the same query
+shape (the SQL with its parameters left out) repeats settings.QUERY_BUDGET_REPEAT_THRESHOLD
+times or more, which is the signature of an N+1 pattern such as a nested serializer
+querying once per row. QueryBudgetMiddleware checks live requests; query_budget() does the
+same for a block of code in tests.
+"""
+
+import logging
+import os
+import re
+import traceback
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .db import execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a request or block exceeds its query budget or repeats a query shape.
+    """
+
+
+def query_shape(sql):
+    """
+    Returns the shape of a parameterized SQL statement.
+
+    Django passes SQL with %s placeholders to execute wrappers, so statements that differ
+    only in their parameters already have the same text; IN lists of any length are
+    collapsed as well.
+
+    Args:
+        sql (str): The SQL statement.
+
+    Returns:
+        str: The normalized statement.
+    """
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def budget_for(view_class, method):
+    """
+    Returns the query budget a view class declares for an HTTP method.
+
+    Args:
+        view_class (type): The view class.
+        method (str): The HTTP method.
+
+    Returns:
+        int or None: The budget, or None if the view declares none.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+
+# Frames from these paths only show how a query is executed, not who asked for it:
+# the ORM internals and the execute wrappers of this app
+_SKIPPED_FRAME_PATHS = (
+    '/django/db/', '/django/utils/',
+    *(os.path.join(os.path.dirname(__file__), name) for name in ('db.py', 'metrics.py', 'profiling.py', 'querybudget.py')),
+)
+
+
+def query_stack(limit=10):
+    """
+    Returns the innermost frames of the current stack that issued a query.
+
+    Frames of the ORM internals and of the execute wrappers are skipped, so the stack
+    ends at the code that triggered the query, e.g. a serializer field or a view.
+
+    Args:
+        limit (int): Maximum number of frames returned.
+
+    Returns:
+        list: The frames, outermost first, as "file:line in function" strings.
+    """
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if not any(path in frame.filename for path in _SKIPPED_FRAME_PATHS)
+    ]
+    return [f'{frame.filename}:{frame.lineno} in {frame.name}' for frame in frames[-limit:]]
+
+
+class QueryRecorder:
+    """
+    Execute wrapper that counts queries and their shapes.
+
+    The stack is captured once per shape, when the shape reaches the repeat threshold,
+    so it points at the code issuing the repeated query.
+
+    Attributes:
+        count (int): Number of queries executed.
+        shapes (dict): Number of executions per query shape.
+        stacks (dict): Project stack captured for each repeated shape.
+    """
+    def __init__(self, repeat_threshold):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.shapes = {}
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        shape = query_shape(sql)
+        seen = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = seen
+        if seen == self.repeat_threshold:
+            self.stacks[shape] = query_stack()
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def record(self):
+        """
+        Installs the recorder on every database connection for the enclosed block,
+        including the queries it runs through the async ORM.
+        """
+        with execute_wrapper(self):
+            yield self
+
+    def repeated_queries(self):
+        """
+        Returns the shapes repeated at least repeat_threshold times, most repeated first.
+
+        Returns:
+            list: Dicts with the SQL shape, its count and the captured stack.
+        """
+        repeated = [
+            {'sql': shape, 'count': count, 'stack': self.stacks.get(shape, [])}
+            for shape, count in self.shapes.items() if count >= self.repeat_threshold
+        ]
+        return sorted(repeated, key=lambda item: item['count'], reverse=True)
+
+    def violations(self, budget):
+        """
+        Describes what is wrong with the recorded queries.
+
+        Args:
+            budget (int or None): The allowed number of queries, or None for no limit.
+
+        Returns:
+            list: Human-readable problems; empty if the budget is respected.
+        """
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f'{self.count} queries, budget is {budget}')
+        for item in self.repeated_queries():
+            problems.append(f"query repeated {item['count']} times: {item['sql'][:200]}")
+        return problems
+
+
+def report_budget_violations(request, recorder):
+    """
+    Reports the budget violations of a request, as configured by settings.QUERY_BUDGET.
+
+    The budget is the one declared by `request.query_budget_view`. Violations are logged
+    as a warning with the repeated queries and their stacks, or raised in 'raise' mode.
+
+    Args:
+        request: The HttpRequest.
+        recorder (QueryRecorder): The queries of the request.
+
+    Raises:
+        QueryBudgetExceeded: If settings.QUERY_BUDGET is 'raise' and the request breaks its budget.
+    """
+    view_class = getattr(request, 'query_budget_view', None)
+    budget = budget_for(view_class, request.method) if view_class is not None else None
+    problems = recorder.violations(budget)
+    if not problems:
+        return
+    view_name = f'{view_class.__module__}.{view_class.__qualname__}' if view_class else None
+    if settings.QUERY_BUDGET == 'raise':
+        raise QueryBudgetExceeded(f'{request.method} {request.path} ({view_name}): ' + '; '.join(problems))
+    match = request.resolver_match
+    repeated_queries = recorder.repeated_queries()
+    logger.warning(
+        'Query budget exceeded for %s %s (%s): %d queries, budget %s, %d repeated query shapes',
+        request.method, request.path, view_name, recorder.count, budget, len(repeated_queries),
+        extra={
+            'view': view_name,
+            'method': request.method,
+            'route': match.route if match is not None else None,
+            'query_count': recorder.count,
+            'query_budget': budget,
+            'repeated_queries': repeated_queries,
+        },
+    )
+
+
+@contextmanager
+def query_budget(budget=None, view=None, method='GET', repeat_threshold=None):
+    """
+    Test helper: raises QueryBudgetExceeded if the block breaks a query budget.
+
+    Either pass the budget directly or the view class (and method) that declares it:
+
+        with query_budget(view=BoardListCreateView):
+            self.client.get('/boards/')
+
+    Args:
+        budget (int): The allowed number of queries.
+        view (type): A view class declaring `query_budget`, used when budget is None.
+        method (str): The HTTP method whose budget is used.
+        repeat_threshold (int): Repetitions of one query shape that count as N+1.
+
+    Raises:
+        QueryBudgetExceeded: If the budget is exceeded or a query shape repeats too often.
+    """
+    if budget is None and view is not None:
+        budget = budget_for(view, method)
+    recorder = QueryRecorder(repeat_threshold or settings.QUERY_BUDGET_REPEAT_THRESHOLD)
+    with recorder.record():
+        yield recorder
+    problems = recorder.violations(budget)
+    if problems:
+        raise QueryBudgetExceeded('; '.join(problems))
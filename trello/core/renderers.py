@@ -0,0 +1,23 @@
+"""
+Django REST Framework renderers.
+
+This module defines the JSON renderer used by all API views. It records the time spent
+rendering response data in the per-request metrics; the time spent building the data in
+the serializers is recorded by core.mixins.SerializerTimingMixin.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import measure
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that adds its rendering time to the request's serialize timing.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders data to JSON bytes while measuring the time spent.
+        """
+        with measure('serialize_time'):
+            return super().render(data, accepted_media_type, renderer_context)
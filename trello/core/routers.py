@@ -0,0 +1,266 @@
+"""
+Database routers: read replicas, and databases of their own for large workspaces.
+
+ReplicaRouter sends read-only request traffic to read replicas.
+
+Reads issued while handling a safe-method request (GET, HEAD, OPTIONS) are spread across
+the aliases in settings.REPLICA_DATABASES. Everything else goes to the primary ('default'):
+writes, reads of unsafe requests, reads inside a transaction, and all code running outside a
+request (Celery tasks, management commands).
+
+After a write, a client is pinned to the primary for settings.REPLICA_PIN_SECONDS so it reads
+its own writes while the replicas catch up. The pin is kept both as a cookie and as a cache
+entry keyed by user id, so API clients that do not keep cookies are covered as well.
+
+TenantRouter sends the tables of the apps in settings.TENANT_APP_LABELS (boards, lists,
+tasks, invitations) to the database of the active workspace, so a large or noisy workspace
+can be placed in a database file (or on a server) of its own. The workspace is activated
+per request by workspaces.middleware.WorkspaceRoutingMiddleware and around other code with
+using_tenant_database(); everything else (users, workspaces, notifications) stays on the
+default database. A workspace database holds copies of the user rows, so that the joins of
+the tenant tables with users (owners, members, assignees) run there; other rows referred to
+by tenant rows are read from the default database.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+
+_request_state = ContextVar('replica_request_state', default=None)
+_tenant_database = ContextVar('tenant_database', default=DEFAULT_DB_ALIAS)
+
+
+class RequestRoutingState:
+    """
+    Routing decision for the request being handled.
+
+    Attributes:
+        request: The Django HttpRequest being handled.
+        use_replica (bool): Whether reads of this request may go to a replica.
+        user_checked (bool): Whether the per-user pin has already been looked up.
+    """
+    __slots__ = ('request', 'use_replica', 'user_checked')
+
+    def __init__(self, request, use_replica):
+        self.request = request
+        self.use_replica = use_replica
+        self.user_checked = False
+
+
+def activate_request(request, use_replica):
+    """
+    Starts routing for a request.
+
+    Args:
+        request: The Django HttpRequest being handled.
+        use_replica (bool): Whether reads of this request may go to a replica.
+
+    Returns:
+        Token: The token to pass to deactivate_request() when the request is done.
+    """
+    return _request_state.set(RequestRoutingState(request, use_replica))
+
+
+def deactivate_request(token):
+    """
+    Ends routing for the request started with activate_request().
+
+    Args:
+        token: The token returned by activate_request().
+    """
+    _request_state.reset(token)
+
+
+def _pin_cache_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_user_to_primary(user_id):
+    """
+    Pins a user's reads to the primary for settings.REPLICA_PIN_SECONDS.
+
+    Args:
+        user_id (int): The primary key of the user who just wrote.
+    """
+    cache.set(_pin_cache_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_user_pinned(user_id):
+    """
+    Checks whether a user wrote recently and must read from the primary.
+
+    Args:
+        user_id (int): The primary key of the user.
+
+    Returns:
+        bool: True if the user is pinned to the primary.
+    """
+    return cache.get(_pin_cache_key(user_id), False)
+
+
+def resolved_user(request):
+    """
+    Returns the request's user only if it has already been loaded.
+
+    The router must not trigger authentication itself (that would query the database
+    from inside a routing decision), so a lazy user that has not been evaluated yet
+    is treated as unknown.
+
+    Args:
+        request: The Django HttpRequest.
+
+    Returns:
+        User or None: The loaded user, or None if it is not known yet.
+    """
+    user = request.__dict__.get('user')
+    if isinstance(user, LazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+    return user
+
+
+class ReplicaRouter:
+    """
+    Routes safe-method request reads to read replicas and everything else to the primary.
+
+    Returning None lets Django (or the next router) fall back to the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        """
+        Picks a replica for reads of a safe-method request that is not pinned to the primary.
+
+        Returns:
+            str or None: A replica alias, or None to use the primary.
+        """
+        state = _request_state.get()
+        if state is None or not state.use_replica or not settings.REPLICA_DATABASES:
+            return None
+        if not state.user_checked:
+            user = resolved_user(state.request)
+            if user is not None:
+                state.user_checked = True
+                if user.is_authenticated and is_user_pinned(user.pk):
+                    state.use_replica = False
+                    return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        """
+        Sends all writes to the primary.
+
+        Returns:
+            None: Always, so Django uses the default database.
+        """
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allows relations between objects loaded from the primary and any replica.
+
+        Returns:
+            bool or None: True if both objects come from the primary/replica pool.
+        """
+        pool = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Keeps migrations off the replicas; they receive the schema by syncing from the primary.
+
+        Returns:
+            bool or None: False for replica aliases, None otherwise.
+        """
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def tenant_database():
+    """
+    Returns the database alias of the active workspace.
+
+    Returns:
+        str: The alias the tenant tables are read from and written to, 'default' unless a
+        workspace placed on another database is active.
+    """
+    return _tenant_database.get()
+
+
+@contextmanager
+def using_tenant_database(alias):
+    """
+    Runs the enclosed block with the tenant tables routed to a database.
+
+    Args:
+        alias (str): The database of the workspace, see Workspace.database.
+    """
+    token = _tenant_database.set(alias or DEFAULT_DB_ALIAS)
+    try:
+        yield alias
+    finally:
+        _tenant_database.reset(token)
+
+
+class TenantRouter:
+    """
+    Routes the tenant tables to the database of the active workspace.
+
+    Listed before ReplicaRouter; returning None leaves the decision to it, so the workspaces
+    on the default database keep using the read replicas.
+    """
+
+    def tenant_alias(self, model):
+        """
+        Returns the database of the active workspace for a tenant model, else None.
+        """
+        if model._meta.app_label not in settings.TENANT_APP_LABELS:
+            return None
+        alias = _tenant_database.get()
+        return None if alias == DEFAULT_DB_ALIAS else alias
+
+    def db_for_read(self, model, **hints):
+        """
+        Reads tenant tables from the database of the active workspace, and the users related
+        to a tenant row (its owner, members) from the database it was read from.
+
+        Returns:
+            str or None: A workspace database alias, or None for the other routers.
+        """
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in settings.WORKSPACE_DATABASES:
+            if model._meta.label == settings.AUTH_USER_MODEL:
+                return instance._state.db
+            if model._meta.app_label not in settings.TENANT_APP_LABELS:
+                # Not the copy Django would fall back to: e.g. the quotas of the workspace
+                return DEFAULT_DB_ALIAS
+        return self.tenant_alias(model)
+
+    def db_for_write(self, model, **hints):
+        """
+        Writes tenant tables to the database of the active workspace.
+
+        Returns:
+            str or None: A workspace database alias, or None for the other routers.
+        """
+        return self.tenant_alias(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allows relations between tenant rows and the rows of the default database they refer
+        to (users, workspaces).
+
+        Returns:
+            bool or None: True if one object comes from a workspace database.
+        """
+        if {obj1._state.db, obj2._state.db} & set(settings.WORKSPACE_DATABASES):
+            return True
+        return None
@@ -0,0 +1,78 @@
+"""
+Serializers of the core endpoints.
+
+This module defines the serializers validating the body of the /batch/ endpoint.
+"""
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from .batch import ALLOWED_METHODS, FORWARDED_HEADERS
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """
+    Serializer for one sub-request of a batch.
+
+    Attributes:
+        method (ChoiceField): The HTTP method.
+        path (CharField): The path of an API endpoint, with an optional query string.
+        body (JSONField): The JSON body, if any.
+        headers (DictField): Conditional and language headers sent with the sub-request.
+    """
+    method = serializers.ChoiceField(choices=ALLOWED_METHODS)
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(child=serializers.CharField(max_length=500), required=False)
+
+    def validate_path(self, value):
+        """
+        Ensures the path is an absolute path on this server.
+
+        Raises:
+            ValidationError: If the path has a scheme or host, or does not start with '/'.
+        """
+        if not value.startswith('/') or value.startswith('//'):
+            raise serializers.ValidationError(_("The path must start with a single '/'."))
+        return value
+
+    def validate_headers(self, value):
+        """
+        Ensures only the forwarded headers are set.
+
+        Raises:
+            ValidationError: If a header is not forwarded to sub-requests.
+        """
+        allowed = {name.lower() for name in FORWARDED_HEADERS}
+        unknown = sorted(name for name in value if name.lower() not in allowed)
+        if unknown:
+            raise serializers.ValidationError(_('Unsupported headers: {unknown}. Allowed: {allowed}.').format(
+                unknown=', '.join(unknown), allowed=', '.join(FORWARDED_HEADERS)
+            ))
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Serializer for the body of a batch request.
+
+    Attributes:
+        requests (ListField): The sub-requests, run in order.
+        atomic (BooleanField): Whether to run all sub-requests in one database transaction.
+    """
+    requests = serializers.ListField(child=SubRequestSerializer(), allow_empty=False)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        """
+        Ensures the batch is not larger than settings.BATCH_MAX_REQUESTS.
+
+        Raises:
+            ValidationError: If there are too many sub-requests.
+        """
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                _('A batch can contain at most {max_requests} requests.').format(max_requests=settings.BATCH_MAX_REQUESTS)
+            )
+        return value
@@ -0,0 +1,76 @@
+"""
+Soft deletion of boards, lists and tasks.
+
+Deleting a board used to cascade through its lists, tasks, assignees, labels, checklists and
+invitations in the request, holding the SQLite write lock for seconds on a large board. A
+DELETE now only sets deleted_at on one row: the default manager of the model hides the row,
+and the rows below a hidden one (the lists of a deleted board, the tasks of a deleted list),
+from every queryset at once. A board can be restored during SOFT_DELETE_UNDO_MINUTES; after
+that the rows are removed in chunks by the purge task of boards.tasks (see boards.trash).
+
+Deletes made through the ORM elsewhere (the admin, a cascade from a workspace or a user)
+still remove the rows at once: Django collects related rows through the base manager, which
+sees the hidden rows too.
+"""
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class SoftDeleteManager(models.Manager):
+    """
+    Default manager of a soft-deletable model, which hides the deleted rows.
+
+    The rows are also hidden when one of the model's soft_delete_parents (lookups to
+    soft-deletable models, e.g. ('list', 'list__board') for tasks) is deleted. The model's
+    reverse relations (board.lists, list.tasks) use this manager as well.
+    """
+
+    def live_filter(self, prefix=''):
+        """
+        Returns the condition selecting the rows that are not deleted.
+
+        Args:
+            prefix (str): The lookup from another model to this one, e.g. 'task__', to filter
+                the rows of that model through the relation.
+
+        Returns:
+            Q: The condition.
+        """
+        lookups = ['', *(f'{parent}__' for parent in getattr(self.model, 'soft_delete_parents', ()))]
+        return Q(**{f'{prefix}{lookup}deleted_at__isnull': True for lookup in lookups})
+
+    def get_queryset(self):
+        """
+        Returns the rows that are not deleted, and have no deleted parent.
+        """
+        return super().get_queryset().filter(self.live_filter())
+
+
+def soft_delete(instance):
+    """
+    Marks a board, list or task as deleted, with one UPDATE whatever its size.
+
+    updated_at is bumped as well: the ETags of the responses nesting the row (the lists of a
+    board and their tasks) count the nested rows through a join, which sees the hidden rows,
+    but they change with the latest updated_at.
+
+    Args:
+        instance: The instance, of a model with deleted_at and a SoftDeleteManager.
+    """
+    now = timezone.now()
+    type(instance)._base_manager.filter(pk=instance.pk).update(deleted_at=now, updated_at=now)
+    instance.deleted_at = instance.updated_at = now
+
+
+def restore(instance):
+    """
+    Undoes soft_delete(): the row, and the rows below it, are visible again.
+
+    Args:
+        instance: The deleted instance, read through the model's base manager.
+    """
+    now = timezone.now()
+    type(instance)._base_manager.filter(pk=instance.pk).update(deleted_at=None, updated_at=now)
+    instance.deleted_at, instance.updated_at = None, now
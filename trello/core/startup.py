@@ -0,0 +1,159 @@
+"""
+Process startup measurement.
+
+Each entry point is started in a fresh interpreter and loaded to the point where it could
+serve its first request or task:
+
+    web     trello.wsgi's application, with the URLconf loaded
+    asgi    trello.asgi's application, with the URLconf loaded
+    worker  the Celery app as `celery -A trello worker` loads it: Django set up and the
+            tasks modules imported
+
+Python's `-X importtime` reports the time spent importing every module; parse_importtime()
+turns it into records that can be summed per package or ranked by cumulative cost.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+ENTRY_POINTS = {
+    'web': (
+        'from django.core.wsgi import get_wsgi_application\n'
+        'application = get_wsgi_application()\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns\n'
+    ),
+    'asgi': (
+        'from django.core.asgi import get_asgi_application\n'
+        'application = get_asgi_application()\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns\n'
+    ),
+    'worker': (
+        'from celery.apps.worker import Worker\n'
+        'from trello.celery import app\n'
+        'app.loader.import_default_modules()\n'
+    ),
+}
+
+# Modules of this project; an import is attributed to the first of them that triggered it
+PROJECT_PACKAGES = ('boards', 'core', 'invitations', 'lists', 'notifications', 'trello', 'users', 'workspaces')
+
+
+@dataclass
+class ImportRecord:
+    """
+    One line of `-X importtime` output.
+
+    Attributes:
+        name (str): The module name.
+        self_us (int): Microseconds spent in the module itself.
+        cumulative_us (int): Microseconds including the modules it imported.
+        depth (int): Nesting level, 0 for a module imported by the entry point code.
+        parent (str): The module that imported it, or '' for the entry point code.
+        imported_by (str): The closest project module up the import chain, or '' if the
+            entry point code (or a library outside the project) imported it.
+    """
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    parent: str = ''
+    imported_by: str = ''
+
+    @property
+    def package(self):
+        return self.name.split('.')[0]
+
+
+def parse_importtime(output):
+    """
+    Parses the stderr of `python -X importtime`.
+
+    The output lists every module after the modules it imported, indented one level deeper,
+    so a module's importer is the next line with a smaller indentation.
+
+    Args:
+        output (str): The stderr of the process.
+
+    Returns:
+        list: ImportRecord objects, in import completion order.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+
+    # Walk backwards, keeping the chain of importers of the current line
+    chain = []
+    for record in reversed(records):
+        del chain[record.depth:]
+        record.parent = chain[-1] if chain else ''
+        record.imported_by = next(
+            (importer for importer in reversed(chain) if importer.split('.')[0] in PROJECT_PACKAGES), ''
+        )
+        chain.append(record.name)
+    return records
+
+
+def run_entry_point(entry, importtime=False):
+    """
+    Starts an entry point in a new interpreter and waits until it is loaded.
+
+    Args:
+        entry (str): A key of ENTRY_POINTS.
+        importtime (bool): Whether to run with -X importtime.
+
+    Returns:
+        tuple: (wall time in seconds including interpreter startup, number of modules
+        loaded, stderr)
+
+    Raises:
+        RuntimeError: If the process fails.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', ENTRY_POINTS[entry] + 'import sys\nprint(len(sys.modules))\n']
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'trello.settings'}
+    started = time.perf_counter()
+    process = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if process.returncode:
+        raise RuntimeError(f'{entry} exited with code {process.returncode}: {process.stderr[-500:]}')
+    return wall, int(process.stdout.split()[-1]), process.stderr
+
+
+def measure_cold_start(entries=tuple(ENTRY_POINTS), runs=3):
+    """
+    Measures the cold-start time of entry points, without -X importtime overhead.
+
+    Args:
+        entries (iterable): Keys of ENTRY_POINTS.
+        runs (int): Processes started per entry point; the fastest and the median are kept.
+
+    Returns:
+        dict: {entry: {'runs', 'best_ms', 'median_ms', 'modules'}}
+    """
+    results = {}
+    for entry in entries:
+        walls = []
+        for _ in range(runs):
+            wall, modules, _ = run_entry_point(entry)
+            walls.append(wall)
+        walls.sort()
+        results[entry] = {
+            'runs': runs,
+            'best_ms': round(walls[0] * 1000, 1),
+            'median_ms': round(walls[len(walls) // 2] * 1000, 1),
+            'modules': modules,
+        }
+    return results
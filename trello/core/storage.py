@@ -0,0 +1,73 @@
+"""
+Static files storage with content-hashed names and precompressed variants.
+
+collectstatic copies every static file to STATIC_ROOT under a name that contains the hash
+of its content (css/app.css -> css/app.4f1c9e2b7a1d.css), so a hashed file never changes
+and can be cached by browsers forever. It then writes gzip and, if the brotli package is
+installed, brotli versions next to the text files (app.4f1c9e2b7a1d.css.gz and .br), so
+StaticFilesMiddleware never compresses anything while serving.
+"""
+
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Optional, only gzip variants are written without it
+    brotli = None
+
+COMPRESSED_EXTENSIONS = ('.css', '.js', '.html', '.json', '.map', '.svg', '.txt', '.xml')
+
+
+def compress_file(path):
+    """
+    Writes the gzip and brotli variants of a file next to it.
+
+    A variant is only kept if it is smaller than the file by at least 5%.
+
+    Args:
+        path (str): The absolute path of the file.
+
+    Returns:
+        list: The paths of the variants written.
+    """
+    with open(path, 'rb') as source:
+        content = source.read()
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('.br', lambda data: brotli.compress(data, quality=11)))
+
+    written = []
+    for suffix, encode in encoders:
+        compressed = encode(content)
+        if len(compressed) < len(content) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            written.append(path + suffix)
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes precompressed variants of the text files.
+
+    manifest_strict is off: a file missing from the manifest (collectstatic not run after
+    adding it) is served under its plain name instead of failing the page.
+    """
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        """
+        Hashes the collected files, then compresses the text files and their hashed copies.
+        """
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSED_EXTENSIONS) and self.exists(name):
+                compress_file(self.path(name))
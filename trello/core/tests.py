@@ -0,0 +1,395 @@
+import logging
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from boards.models import Board
+from boards.views import BoardDetailView, BoardListCreateView
+from workspaces.tenancy import personal_workspace
+from . import metrics
+from .async_views import AsyncReadView
+from .log import QueueListenerHandler
+from .middleware import ReplicaRoutingMiddleware
+from .mixins import AtomicWriteMixin
+from .querybudget import QueryBudgetExceeded, query_budget
+from .routers import ReplicaRouter, activate_request, deactivate_request, is_user_pinned, pin_user_to_primary
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASES=['replica'], REPLICA_PIN_SECONDS=60)
+class ReplicaRouterTests(SimpleTestCase):
+    """
+    Reads of safe requests go to the replicas unless the client or the user is pinned.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User(pk=1, username='alice')
+
+    def read_database(self, request):
+        """
+        Runs the request through ReplicaRoutingMiddleware and returns where its reads went.
+        """
+        databases = []
+
+        def get_response(request):
+            databases.append(ReplicaRouter().db_for_read(Board))
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(get_response)(request)
+        return databases[0], response
+
+    def test_safe_requests_read_from_a_replica(self):
+        request = self.factory.get('/boards/')
+        request.user = self.user
+        self.assertEqual(self.read_database(request)[0], 'replica')
+
+    def test_no_request_reads_from_the_primary(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Board))
+
+    def test_unsafe_requests_pin_the_client_and_the_user(self):
+        request = self.factory.post('/boards/')
+        request.user = self.user
+        database, response = self.read_database(request)
+
+        self.assertIsNone(database)
+        self.assertIn('replica_pin', response.cookies)
+        self.assertTrue(is_user_pinned(self.user.pk))
+
+    def test_pin_cookie_reads_from_the_primary(self):
+        self.factory.cookies['replica_pin'] = '1'
+        request = self.factory.get('/boards/')
+        request.user = self.user
+        self.assertIsNone(self.read_database(request)[0])
+
+    def test_pinned_user_reads_from_the_primary(self):
+        pin_user_to_primary(self.user.pk)
+        request = self.factory.get('/boards/')
+        request.user = self.user
+        token = activate_request(request, use_replica=True)
+        try:
+            self.assertIsNone(ReplicaRouter().db_for_read(Board))
+        finally:
+            deactivate_request(token)
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_middleware_is_removed_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+
+class QueueListenerHandlerTests(SimpleTestCase):
+    """
+    Records are written by one listener thread per process, and dropped records are reported.
+    """
+
+    def setUp(self):
+        self.handler = QueueListenerHandler(
+            {'memory': {'class': 'logging.handlers.BufferingHandler', 'capacity': 1000}}, queue_size=10,
+        )
+        self.addCleanup(self.handler.close)
+        self.target = self.handler.targets[0]
+
+    def record(self, message):
+        return logging.LogRecord('trello', logging.INFO, __file__, 0, message, (), None)
+
+    def messages(self):
+        self.handler.stop_listener()
+        return [record.getMessage() for record in self.target.buffer]
+
+    def test_concurrent_first_records_start_one_listener(self):
+        started = []
+        start_listener = self.handler.start_listener
+
+        def count_start():
+            started.append(threading.get_ident())
+            start_listener()
+
+        self.handler.start_listener = count_start
+        barrier = threading.Barrier(4)
+
+        def log(index):
+            barrier.wait()
+            self.handler.enqueue(self.record(f'record {index}'))
+
+        threads = [threading.Thread(target=log, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(started), 1)
+        self.assertEqual(sorted(self.messages()), [f'record {index}' for index in range(4)])
+
+    def test_dropped_records_are_reported(self):
+        self.handler.enqueue(self.record('first'))
+        self.handler.dropped = 2
+        self.handler.enqueue(self.record('second'))
+        self.handler.dropped += 3
+        self.assertEqual(self.messages(), [
+            'first',
+            '2 log records were dropped because the queue was full (2 in total).',
+            'second',
+            '3 log records were dropped because the queue was full (5 in total).',
+        ])
+
+    def test_records_left_on_the_queue_are_written_after_a_restart(self):
+        self.handler.enqueue(self.record('first'))
+        self.handler.stop_listener()
+        self.handler.queue.put_nowait(self.record('late'))
+        self.handler.enqueue(self.record('second'))
+        self.assertEqual(self.messages(), ['first', 'late', 'second'])
+
+
+@override_settings(PERF_INSTRUMENTATION=True)
+class SerializerTimingTests(APITestCase):
+    """
+    The serializer of a view's response is timed once, in the serialize phase of Server-Timing.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        for title in ('Roadmap', 'Backlog'):
+            Board.objects.create(title=title, owner=self.user, workspace=personal_workspace(self.user))
+        self.client.force_authenticate(self.user)
+
+    def test_nested_serializers_are_not_timed_again(self):
+        with mock.patch.object(metrics, 'measure', wraps=metrics.measure) as measure:
+            response = self.client.get('/boards/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(measure.call_args_list, [mock.call('serialize_time')])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+    @override_settings(PERF_INSTRUMENTATION=False)
+    def test_not_timed_without_instrumentation(self):
+        with mock.patch.object(metrics, 'measure', wraps=metrics.measure) as measure:
+            self.assertEqual(self.client.get('/boards/').status_code, 200)
+        measure.assert_not_called()
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    The query_budget() test helper, and the budgets of the board endpoints.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.client.force_authenticate(self.user)
+
+    def test_exceeded_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                list(User.objects.all())
+                list(Board.objects.all())
+
+    def test_repeated_queries_raise(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(100, repeat_threshold=3):
+                for pk in range(5):
+                    User.objects.filter(pk=pk).first()
+
+    def test_board_list_stays_within_its_budget(self):
+        workspace = personal_workspace(self.user)
+        for index in range(10):
+            member = User.objects.create_user(username=f'member{index}', email=f'member{index}@example.com')
+            board = Board.objects.create(title=f'Board {index}', owner=self.user, workspace=workspace)
+            board.members.add(member)
+
+        with query_budget(view=BoardListCreateView):
+            response = self.client.get('/boards/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 10)
+
+
+class ConditionalRequestTests(APITestCase):
+    """
+    ETag validators of the board detail: 304 Not Modified and 412 Precondition Failed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.board = Board.objects.create(title='Roadmap', owner=self.user, workspace=personal_workspace(self.user))
+        self.client.force_authenticate(self.user)
+        self.url = f'/boards/{self.board.pk}/'
+
+    def test_current_etag_answers_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with query_budget(view=BoardDetailView):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changed_board_answers_a_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(self.url, {'title': 'Plans'})
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stale_if_match_fails_the_update(self):
+        with query_budget(view=BoardDetailView, method='PATCH'):
+            response = self.client.patch(self.url, {'title': 'Plans'}, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code, 412)
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.title, 'Roadmap')
+
+    def test_current_if_match_updates(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.patch(self.url, {'title': 'Plans'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.title, 'Plans')
+
+    def test_repeated_query_parameters_change_the_etag(self):
+        etag = self.client.get(self.url, {'label': [1, 2]})['ETag']
+
+        self.assertNotEqual(self.client.get(self.url, {'label': 2})['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, {'label': [1, 2]})['ETag'], etag)
+
+
+class BatchTests(APITestCase):
+    """
+    The /batch/ endpoint, atomic or not.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.board = Board.objects.create(title='Roadmap', owner=self.user, workspace=personal_workspace(self.user))
+        self.client.force_authenticate(self.user)
+
+    def test_sub_requests_run_in_order(self):
+        response = self.client.post('/batch/', {'requests': [
+            {'method': 'GET', 'path': f'/boards/{self.board.pk}/'},
+            {'method': 'PATCH', 'path': f'/boards/{self.board.pk}/', 'body': {'title': 'Plans'}},
+            {'method': 'GET', 'path': f'/boards/{self.board.pk}/'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['rolled_back'])
+        self.assertEqual([sub['status'] for sub in response.data['responses']], [200, 200, 200])
+        self.assertEqual(response.data['responses'][2]['body']['title'], 'Plans')
+        self.assertIn('ETag', response.data['responses'][0]['headers'])
+
+    def test_atomic_batch_rolls_back_on_the_first_error(self):
+        response = self.client.post('/batch/', {'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/boards/', 'body': {'title': 'Created'}},
+            {'method': 'PATCH', 'path': f'/boards/{self.board.pk}/', 'body': {'title': 'Plans'}},
+            {'method': 'PATCH', 'path': '/boards/999999/', 'body': {'title': 'Missing'}},
+            {'method': 'GET', 'path': f'/boards/{self.board.pk}/'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['rolled_back'])
+        self.assertEqual([sub['status'] for sub in response.data['responses']], [201, 200, 404, 424])
+        self.assertFalse(Board.objects.filter(title='Created').exists())
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.title, 'Roadmap')
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_invalid_batches_are_rejected(self):
+        response = self.client.post('/batch/', {'requests': [
+            {'method': 'GET', 'path': 'https://example.com/boards/'},
+            {'method': 'GET', 'path': '/boards/', 'headers': {'Authorization': 'Bearer other'}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('path', response.data['requests'][0])
+        self.assertIn('headers', response.data['requests'][1])
+
+        response = self.client.post('/batch/', {'requests': [{'method': 'GET', 'path': '/boards/'}] * 3}, format='json')
+        self.assertEqual(response.data['requests'], ['A batch can contain at most 2 requests.'])
+
+    def test_batch_cannot_be_nested(self):
+        response = self.client.post('/batch/', {'requests': [
+            {'method': 'POST', 'path': '/batch/', 'body': {'requests': []}},
+        ]}, format='json')
+        self.assertEqual(response.data['responses'][0]['status'], 400)
+
+
+class FailingBoardCreateView(AtomicWriteMixin, generics.GenericAPIView):
+    """
+    Creates a board, then fails.
+    """
+
+    def post(self, request):
+        Board.objects.create(title='Half-written', owner=request.user, workspace=personal_workspace(request.user))
+        raise ValidationError({'title': ['Rejected after the write.']})
+
+
+class AtomicWriteMixinTests(APITestCase):
+    """
+    Error responses roll back what the request wrote.
+    """
+
+    def test_error_response_rolls_back_the_writes(self):
+        user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        request = APIRequestFactory().post('/failing/', {}, format='json')
+        force_authenticate(request, user)
+
+        response = FailingBoardCreateView.as_view()(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Board.objects.filter(title='Half-written').exists())
+
+
+class AsyncReadViewTests(APITestCase):
+    """
+    The async read views answer like their DRF versions.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.board = Board.objects.create(title='Roadmap', owner=self.user, workspace=personal_workspace(self.user))
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def test_responses_match_the_drf_views(self):
+        self.client.force_authenticate(self.user)
+        expected = self.client.get('/boards/').json()
+        self.client.force_authenticate(None)
+
+        response = self.client.get('/boards/async/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+
+    def test_errors_have_the_drf_format(self):
+        response = self.client.get('/boards/async/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('detail', response.json())
+        response = self.client.get('/boards/async/999999/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_one_user_query_in_the_language_of_the_user(self):
+        User.objects.filter(pk=self.user.pk).update(preferred_language='de')
+        # Through the async handler, where the middleware chain runs async
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(self.async_client.get)(
+                f'/lists/async/boards/{self.board.pk}/lists/?overdue=maybe',
+                headers={'Authorization': f'Bearer {self.token}'},
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'overdue': ['Muss ein gültiger Wahrheitswert sein.']})
+        user_queries = [query for query in queries.captured_queries if User._meta.db_table in query['sql']]
+        self.assertEqual(len(user_queries), 1)
+
+    def test_get_data_is_abstract(self):
+        class IncompleteView(AsyncReadView):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteView()
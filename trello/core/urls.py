@@ -0,0 +1,16 @@
+"""
+URL configuration for the operational endpoints.
+
+This module defines the URL patterns of the core application, such as the metrics endpoint,
+the pre-generated OpenAPI schema and the batch endpoint.
+"""
+
+from django.urls import path
+from .views import BatchView, MetricsView, OpenAPISchemaView
+
+urlpatterns = [
+    path('batch/', BatchView.as_view(), name='batch'),  # Runs a list of API requests in one round trip
+    path('metrics/', MetricsView.as_view(), name='metrics'),  # Endpoint for the Prometheus request metrics
+    path('openapi.json', OpenAPISchemaView.as_view(schema_format='json'), name='openapi-schema-json'),  # OpenAPI schema (JSON), generated once per deploy
+    path('openapi.yaml', OpenAPISchemaView.as_view(schema_format='yaml'), name='openapi-schema-yaml'),  # OpenAPI schema (YAML)
+]
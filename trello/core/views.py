@@ -0,0 +1,198 @@
+"""
+Views for the operational endpoints of the project.
+
+This module defines the endpoint that exposes the per-route request metrics
+in the Prometheus text format, the view serving the HTML shell of the frontend, the
+view serving the pre-generated OpenAPI schema and the endpoint running batches of API
+requests.
+"""
+
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.translation import gettext, gettext_noop
+from django.views import View
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .batch import run_batch
+from .metrics import registry
+from .openapi import get_schema_document
+from .serializers import BatchSerializer
+
+
+class MetricsView(View):
+    """
+    View serving the aggregated request metrics of this process for Prometheus.
+
+    When settings.PERF_METRICS_TOKEN is set, the scraper must send it as a bearer token.
+    Otherwise the endpoint is only available with DEBUG enabled or to staff users.
+    """
+    def get(self, request):
+        """
+        Handles GET requests for the metrics document.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            HttpResponse: The metrics in the Prometheus text format, or 403.
+        """
+        token = settings.PERF_METRICS_TOKEN
+        if token:
+            expected = f'Bearer {token}'
+            if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+                return HttpResponseForbidden()
+        elif not (settings.DEBUG or request.user.is_staff):
+            return HttpResponseForbidden()
+        return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Strings of static/js/app.js translated on the server, see gettext() in app.js
+JS_STRINGS = (
+    gettext_noop('Error loading board members'),
+    gettext_noop('No users assigned'),
+    gettext_noop('Select user to assign'),
+    gettext_noop('Select Board'),
+    gettext_noop('to'),
+    gettext_noop('Accept'),
+    gettext_noop('Reject'),
+    gettext_noop('No sent invitations'),
+    gettext_noop('No received invitations'),
+)
+
+
+class AppShellView(View):
+    """
+    View serving the HTML shell of the single-page frontend (templates/index.html).
+
+    The shell only depends on the active language and on the static files' hashed names,
+    so it is rendered once per language and build and then served from the cache with an
+    ETag. It is rendered without a request, hence without context processors. The CSS and
+    JavaScript are static files (static/css, static/js), cached by browsers.
+    Caching is skipped with DEBUG on, so template edits show up on the next reload.
+    """
+    template_name = 'index.html'
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handles GET requests for the shell.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            HttpResponse: The shell, or 304 if the client's copy is current.
+        """
+        html, etag = self.get_shell(translation.get_language())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(html)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def get_shell(self, language):
+        """
+        Returns the rendered shell of a language and its ETag, from the cache if possible.
+
+        Args:
+            language (str): The language code.
+
+        Returns:
+            tuple: (html, etag)
+        """
+        # A new collectstatic writes a new manifest, and the shell must link the new names
+        build = getattr(staticfiles_storage, 'manifest_hash', '')
+        cache_key = f'app_shell:{language}:{build}'
+        if not settings.DEBUG:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        html = render_to_string(self.template_name, {
+            'js_catalog': {msgid: gettext(msgid) for msgid in JS_STRINGS},
+        })
+        etag = '"%s"' % hashlib.md5(html.encode(), usedforsecurity=False).hexdigest()
+        if not settings.DEBUG:
+            cache.set(cache_key, (html, etag), settings.APP_SHELL_CACHE_SECONDS)
+        return html, etag
+
+
+class OpenAPISchemaView(View):
+    """
+    View serving the OpenAPI schema from the generated files (see core.openapi).
+
+    The swagger/ and redoc/ UIs load the schema from here instead of generating it on
+    every page view.
+    """
+    schema_format = 'json'
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handles GET requests for the schema.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            HttpResponse: The schema, or 304 if the client's copy is current.
+        """
+        content, content_type, etag = get_schema_document(self.schema_format)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class BatchView(generics.GenericAPIView):
+    """
+    API view running an ordered list of API requests in one round trip (see core.batch).
+
+    The body lists the sub-requests, each with its method, path and optional JSON body and
+    conditional headers, and whether to run them in one transaction:
+
+        {"atomic": false, "requests": [{"method": "GET", "path": "/boards/1/"}, ...]}
+
+    The response has the status, ETag/Last-Modified/Location headers and body of every
+    sub-request, in order.
+
+    Attributes:
+        serializer_class: BatchSerializer for validating the batch.
+        permission_classes: Requires the user to be authenticated.
+    """
+    serializer_class = BatchSerializer
+    permission_classes = [IsAuthenticated]
+    batchable = False
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handles POST requests running a batch.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The sub-responses, and whether an atomic batch was rolled back.
+
+        Raises:
+            ValidationError: If the batch is malformed or too large.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        atomic = serializer.validated_data['atomic']
+        responses, rolled_back = run_batch(request, serializer.validated_data['requests'], atomic)
+        return Response(
+            {'atomic': atomic, 'rolled_back': rolled_back, 'responses': responses},
+            status=status.HTTP_200_OK,
+        )
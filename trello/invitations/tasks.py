@@ -5,14 +5,16 @@ This module defines a Celery task to send an email notification to a user
 when they receive an invitation to join a board.
 """
 
-from celery import shared_task
 from django.core.mail import send_mail
 from django.utils.translation import activate, gettext_lazy as _
 from django.conf import settings
+from trello.celery import app
+from core.routers import using_tenant_database
 from .models import Invitation
 
-@shared_task
-def send_invitation_email(invitation_id, invited_user_language):
+# Bound to the project app: the views import this module lazily, which also loads the app
+@app.task
+def send_invitation_email(invitation_id, invited_user_language, database=None):
     """
     Sends an email to the invited user for a board invitation.
 
@@ -23,12 +25,14 @@ def send_invitation_email(invitation_id, invited_user_language):
     Args:
         invitation_id (int): The ID of the Invitation instance.
         invited_user_language (str): The language code for the invited user's preferred language.
+        database (str): The database of the board's workspace.
 
     Raises:
         None: If the invitation is not found, the task silently passes.
     """
     try:
-        invitation = Invitation.objects.get(id=invitation_id)
+        with using_tenant_database(database):
+            invitation = Invitation.objects.select_related('board', 'invited_user').get(id=invitation_id)
         board = invitation.board
         invited_user = invitation.invited_user
 
@@ -1,3 +1,61 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from boards.models import Board
+from core.querybudget import query_budget
+from workspaces.tenancy import personal_workspace
+from .models import Invitation
+from .views import InvitationAcceptView, InvitationListCreateView
+
+User = get_user_model()
+
+
+class InvitationTests(APITestCase):
+    """
+    Invitations to boards, within the quotas of the board's workspace.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.invited = User.objects.create_user(username='bob', email='bob@example.com', password='secret')
+        self.workspace = personal_workspace(self.user)
+        self.board = Board.objects.create(title='Roadmap', owner=self.user, workspace=self.workspace)
+        self.client.force_authenticate(self.user)
+
+    def invite(self, email='bob@example.com'):
+        with query_budget(view=InvitationListCreateView, method='POST'):
+            return self.client.post('/invitations/', {'board': self.board.pk, 'invited_user_email': email})
+
+    def test_accepted_invitation_adds_the_member(self):
+        response = self.invite()
+        self.assertEqual(response.status_code, 201)
+
+        self.client.force_authenticate(self.invited)
+        with query_budget(view=InvitationAcceptView, method='PATCH'):
+            response = self.client.patch(f'/invitations/{response.data["id"]}/accept/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.board.members.all()), [self.invited])
+
+    def test_duplicate_invitation_is_rejected(self):
+        self.invite()
+        self.assertEqual(self.invite().status_code, 400)
+        self.assertEqual(Invitation.objects.count(), 1)
+
+    def test_member_quota_is_enforced(self):
+        self.workspace.max_board_members = 1
+        self.workspace.save()
+        self.board.members.add(User.objects.create_user(username='carol', email='carol@example.com'))
+
+        self.assertEqual(self.invite().status_code, 400)
+        self.assertFalse(Invitation.objects.exists())
+
+    def test_only_the_owner_invites(self):
+        self.client.force_authenticate(self.invited)
+        response = self.client.post('/invitations/', {'board': self.board.pk, 'invited_user_email': 'alice@example.com'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_the_invited_user_accepts(self):
+        invitation = Invitation.objects.create(board=self.board, invited_user=self.invited)
+        response = self.client.patch(f'/invitations/{invitation.pk}/accept/')
+        self.assertIn(response.status_code, (400, 404))
+        self.assertFalse(self.board.members.exists())
@@ -6,10 +6,11 @@ to their respective views for listing, creating, accepting, and rejecting invita
 """
 
 from django.urls import path
-from .views import InvitationListCreateView, InvitationAcceptView, InvitationRejectView
+from .views import InvitationListCreateView, InvitationAcceptView, InvitationRejectView, InvitationListAsyncView
 
 urlpatterns = [
     path('', InvitationListCreateView.as_view(), name='invitation-list-create'),  # Endpoint for listing all invitations or creating a new invitation
+    path('async/', InvitationListAsyncView.as_view(), name='invitation-list-async'),  # Async (ASGI) version of the invitation list
     path('<int:pk>/accept/', InvitationAcceptView.as_view(), name='invitation-accept'),  # Endpoint for accepting an invitation by its primary key
     path('<int:pk>/reject/', InvitationRejectView.as_view(), name='invitation-reject'),  # Endpoint for rejecting an invitation by its primary key
 ]
\ No newline at end of file
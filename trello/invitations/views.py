@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
@@ -7,12 +7,32 @@ from .models import Invitation
 from .serializers import InvitationSerializer
 from boards.models import Board
 from django.contrib.auth import get_user_model
-from .tasks import send_invitation_email
-from django.db.models import Q
+from core.async_views import AsyncReadView
+from core.mixins import AtomicWriteMixin, SerializerTimingMixin
+from core.routers import tenant_database
+from notifications.inbox import notify
+from notifications.models import Notification
+from workspaces.tenancy import check_board_quota, check_member_quota
 
 User = get_user_model()
 
-class InvitationListCreateView(generics.ListCreateAPIView):
+
+def visible_invitations(user):
+    """
+    Returns the invitations a user sent (as board owner) or received, ready for InvitationSerializer.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The invitations of boards that are not deleted, with the board and its owner
+        joined and the board members prefetched.
+    """
+    return Invitation.objects.filter(
+        models.Q(board__owner=user) | models.Q(invited_user=user), Board.objects.live_filter(prefix='board__')
+    ).select_related('board__owner').prefetch_related('board__members')
+
+class InvitationListCreateView(AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating invitations.
 
@@ -22,25 +42,26 @@ class InvitationListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = InvitationSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5, 'POST': 16}
 
     def get_queryset(self):
         """
         Filters queryset to invitations where the user is either the board owner or the invited user.
+        The board and its owner are joined and the board members are prefetched for the nested serializer.
 
         Returns:
             QuerySet: Invitations accessible to the requesting user.
         """
-        return Invitation.objects.filter(
-            models.Q(board__owner=self.request.user) | models.Q(invited_user=self.request.user)
-        )
+        return visible_invitations(self.request.user)
 
     def perform_create(self, serializer):
         """
         Custom creation logic for invitations.
 
-        Validates board ownership, checks for duplicate invitations, enforces board member limits (10),
-        and ensures the invited user does not exceed the maximum board limit (5).
-        Sends an email notification for the invitation using a Celery task.
+        Validates board ownership, checks for duplicate invitations, enforces the member quota of
+        the board's workspace, and ensures the invited user does not exceed its board quota.
+        Sends an email notification for the invitation using a Celery task once the transaction commits,
+        and notifies the invited user in the app.
 
         Args:
             serializer: The serializer instance with validated data.
@@ -62,38 +83,47 @@ class InvitationListCreateView(generics.ListCreateAPIView):
         if Invitation.objects.filter(board=board, invited_user=invited_user, status='pending').exists():
             raise ValidationError("An invitation for this user to this board already exists.")
 
-        if board.members.count() >= 10:
-            raise ValidationError("Cannot add more than 10 members to a board.")
-        
-        # Check the invited user's board limit (5 boards)
-        max_boards = 5
-        total_boards = Board.objects.filter(
-            Q(owner=invited_user) | Q(members=invited_user)
-        ).distinct().count()
-        if total_boards >= max_boards:
-            raise ValidationError(f"User cannot be a member of more than {max_boards} boards.")
+        check_member_quota(board)
+        # Check the invited user's board quota in the workspace of the board
+        check_board_quota(
+            board.workspace, invited_user, "User cannot be a member of more than {max_boards} boards in this workspace."
+        )
 
         invitation = serializer.save(board=board)
-        send_invitation_email.delay(invitation.id, invited_user.preferred_language)
+        # Imported here: loads the Celery app, which only this view needs
+        from .tasks import send_invitation_email
+
+        # Enqueue only after the surrounding transaction commits, so the worker sees the row
+        database = tenant_database()
+        transaction.on_commit(
+            lambda: send_invitation_email.delay(invitation.id, invited_user.preferred_language, database),
+            using=database,
+        )
+        notify(
+            Notification.INVITATION_CREATED, [invited_user.id], actor=self.request.user,
+            board_id=board.id, invitation_id=invitation.id,
+        )
 
-class InvitationAcceptView(generics.UpdateAPIView):
+class InvitationAcceptView(AtomicWriteMixin, SerializerTimingMixin, generics.UpdateAPIView):
     """
     API view for accepting an invitation.
 
     Updates the invitation status to 'accepted' and adds the invited user to the board's members.
-    Ensures the user can only accept their own invitations and enforces board and user limits.
+    Ensures the user can only accept their own invitations and enforces the quotas of the board's workspace.
     """
     serializer_class = InvitationSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Invitation.objects.all()
+    query_budget = {'PUT': 15, 'PATCH': 15}
+    queryset = Invitation.objects.filter(Board.objects.live_filter(prefix='board__'))
 
     def perform_update(self, serializer):
         """
         Custom update logic for accepting an invitation.
 
         Validates that the user is the invited user, the invitation is pending, the board has not
-        reached its member limit (10), and the user has not exceeded their board limit (5).
+        reached the member quota of its workspace, and the user has not exceeded its board quota there.
         Adds the user to the board's members and updates the invitation status.
+        The owner and the other members of the board are notified.
 
         Args:
             serializer: The serializer instance with validated data.
@@ -102,26 +132,22 @@ class InvitationAcceptView(generics.UpdateAPIView):
             ValidationError: If the user is not the invited user, the invitation is already processed,
                             or board/user limits are exceeded.
         """
-        invitation = self.get_object()
-        if invitation.invited_user != self.request.user:
+        invitation = serializer.instance
+        if invitation.invited_user_id != self.request.user.pk:
             raise ValidationError("You can only accept your own invitations.")
         if invitation.status != 'pending':
             raise ValidationError("This invitation is already processed.")
         
         board = invitation.board
-        if board.members.count() >= 10:
-            raise ValidationError("Cannot add more than 10 members to a board.")
-        
-        # Check the user's board limit (5 boards) at the time of accepting the invitation
-        max_boards = 5
-        total_boards = Board.objects.filter(
-            Q(owner=self.request.user) | Q(members=self.request.user)
-        ).distinct().count()
-        if total_boards >= max_boards:
-            raise ValidationError(f"User cannot be a member of more than {max_boards} boards.")
+        check_member_quota(board)
+        # Check the user's board quota at the time of accepting the invitation
+        check_board_quota(
+            board.workspace, self.request.user, "User cannot be a member of more than {max_boards} boards in this workspace."
+        )
         
         board.members.add(invitation.invited_user)
         serializer.save(status='accepted')
+        notify(Notification.INVITATION_ACCEPTED, actor=self.request.user, board_id=board.id, invitation_id=invitation.id)
 
     def update(self, request, *args, **kwargs):
         """
@@ -143,7 +169,7 @@ class InvitationAcceptView(generics.UpdateAPIView):
         self.perform_update(serializer)
         return Response(serializer.data)
 
-class InvitationRejectView(generics.UpdateAPIView):
+class InvitationRejectView(AtomicWriteMixin, SerializerTimingMixin, generics.UpdateAPIView):
     """
     API view for rejecting an invitation.
 
@@ -152,14 +178,15 @@ class InvitationRejectView(generics.UpdateAPIView):
     """
     serializer_class = InvitationSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Invitation.objects.all()
+    query_budget = {'PUT': 11, 'PATCH': 11}
+    queryset = Invitation.objects.filter(Board.objects.live_filter(prefix='board__'))
 
     def perform_update(self, serializer):
         """
         Custom update logic for rejecting an invitation.
 
         Validates that the user is the invited user and the invitation is pending.
-        Updates the invitation status to 'rejected'.
+        Updates the invitation status to 'rejected' and notifies the board owner.
 
         Args:
             serializer: The serializer instance with validated data.
@@ -167,13 +194,17 @@ class InvitationRejectView(generics.UpdateAPIView):
         Raises:
             ValidationError: If the user is not the invited user or the invitation is already processed.
         """
-        invitation = self.get_object()
-        if invitation.invited_user != self.request.user:
+        invitation = serializer.instance
+        if invitation.invited_user_id != self.request.user.pk:
             raise ValidationError("You can only reject your own invitations.")
         if invitation.status != 'pending':
             raise ValidationError("This invitation is already processed.")
         
         serializer.save(status='rejected')
+        notify(
+            Notification.INVITATION_REJECTED, [invitation.board.owner_id], actor=self.request.user,
+            board_id=invitation.board_id, invitation_id=invitation.id,
+        )
 
     def update(self, request, *args, **kwargs):
         """
@@ -193,4 +224,20 @@ class InvitationRejectView(generics.UpdateAPIView):
         serializer = self.get_serializer(self.get_object(), data=data, partial=True)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+class InvitationListAsyncView(AsyncReadView):
+    """
+    Async version of the invitation list (GET of InvitationListCreateView) for ASGI.
+    """
+    query_budget = 5
+
+    async def get_data(self, request, user, **kwargs):
+        """
+        Returns the invitations the user sent as board owner or received.
+        """
+        invitations = [
+            invitation async for invitation in visible_invitations(user).aiterator(chunk_size=self.chunk_size)
+        ]
+        return InvitationSerializer(invitations, many=True).data
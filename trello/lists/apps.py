@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ListsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lists'
+
+    def ready(self):
+        from django.db.models.signals import m2m_changed
+        from core.conditional import touch_on_m2m_change
+        from .models import Task
+
+        # Membership changes must change the ETag of the task
+        m2m_changed.connect(touch_on_m2m_change('assigned_users'), sender=Task.assigned_users.through, weak=False)
+        m2m_changed.connect(touch_on_m2m_change('labels'), sender=Task.labels.through, weak=False)
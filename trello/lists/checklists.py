@@ -0,0 +1,73 @@
+"""
+Checklist counters of tasks.
+
+Every task stores the number of its checklist items and of the done ones, so the task and
+lists-with-tasks responses show "3/7" without counting the items of each task. The counters
+are changed with F() expressions in the transaction that changes the items, never read,
+incremented and saved, so concurrent changes to one checklist cannot lose an update. The
+counters do not complete the task: its completion is set explicitly (see
+lists.serializers.TaskSerializer). recount_checklists() recomputes the counters from the
+items, for the repair_checklist_counts command.
+"""
+
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Task
+
+
+def adjust_checklist_counts(task_id, total=0, done=0):
+    """
+    Adds to the checklist counters of a task and bumps its updated_at.
+
+    The task's ETag covers the counters, so updated_at changes with them. A counter never
+    goes below zero, even if it had drifted from the items.
+
+    Args:
+        task_id (int): The task.
+        total (int): Items added (positive) or removed (negative).
+        done (int): Items done (positive) or undone or removed while done (negative).
+    """
+    changes = {'updated_at': timezone.now()}
+    for field, delta in (('checklist_total_count', total), ('checklist_done_count', done)):
+        if delta:
+            changes[field] = Greatest(F(field) + delta, Value(0))
+    Task.objects.filter(pk=task_id).update(**changes)
+
+
+def recount_checklists(start_id, end_id, dry_run=False):
+    """
+    Recomputes the checklist counters of the tasks whose id is in [start_id, end_id).
+
+    Only the tasks whose counters differ from their items are written, in one bulk update.
+
+    Args:
+        start_id (int): The first task id of the range.
+        end_id (int): The task id after the range.
+        dry_run (bool): Whether to only report the wrong counters.
+
+    Returns:
+        list: (task id, (stored total, stored done), (actual total, actual done)) for each
+        task whose counters were wrong.
+    """
+    tasks = list(
+        Task.objects.filter(pk__gte=start_id, pk__lt=end_id)
+        .only('id', 'checklist_total_count', 'checklist_done_count')
+        .annotate(
+            items=Count('checklist_items'),
+            done_items=Count('checklist_items', filter=Q(checklist_items__done=True)),
+        )
+        .filter(~Q(items=F('checklist_total_count')) | ~Q(done_items=F('checklist_done_count')))
+    )
+    fixes = [
+        (task.pk, (task.checklist_total_count, task.checklist_done_count), (task.items, task.done_items))
+        for task in tasks
+    ]
+    if tasks and not dry_run:
+        now = timezone.now()
+        for task in tasks:
+            task.checklist_total_count, task.checklist_done_count = task.items, task.done_items
+            task.updated_at = now
+        Task.objects.bulk_update(tasks, ['checklist_total_count', 'checklist_done_count', 'updated_at'])
+    return fixes
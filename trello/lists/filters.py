@@ -0,0 +1,190 @@
+"""
+Filtering and sorting of tasks by query parameters.
+
+The task list of a list and the lists-with-tasks snapshot of a board accept the same
+query parameters:
+
+    assignee=<user id>|me       tasks assigned to that user
+    unassigned=true|false       tasks without (true) or with (false) assignees
+    due_after=<date or time>    tasks due at or after that moment
+    due_before=<date or time>   tasks due before that moment
+    overdue=true|false          tasks (not) past their due date and not completed
+    labels=<id>,<id>,...        tasks carrying any (or all) of these labels
+    labels_match=any|all        whether one of the labels is enough, 'any' by default
+    ordering=<field>            order, due_date or created_at, '-' for descending
+
+Unknown parameters and invalid values are rejected with 400, so a typo does not silently
+return every task. Each ordering is backed by an index on (list, field) of the Task table,
+which also serves the due date filters within a list. The label filters are subqueries on
+the (label, task) index of the TaskLabel table: one for any of the labels, one per label
+for all of them.
+"""
+
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from .models import TaskLabel
+
+# Allowed values of `ordering`, and the ORDER BY each one stands for
+TASK_ORDERINGS = {
+    'order': ('order', 'id'),
+    '-order': ('-order', '-id'),
+    'due_date': (F('due_date').asc(nulls_last=True), 'id'),
+    '-due_date': (F('due_date').desc(nulls_last=True), '-id'),
+    'created_at': ('created_at', 'id'),
+    '-created_at': ('-created_at', '-id'),
+}
+DEFAULT_TASK_ORDERING = 'order'
+
+# Largest number of labels a task filter may name
+MAX_FILTER_LABELS = 20
+
+
+class AssigneeField(serializers.Field):
+    """
+    A user id, or 'me' for the requesting user.
+    """
+    default_error_messages = {'invalid': "Must be a user id or 'me'."}
+
+    def to_internal_value(self, data):
+        if data == 'me':
+            return self.context['request'].user.pk
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('invalid')
+
+
+class LabelIdsField(serializers.Field):
+    """
+    A comma-separated list of label ids, e.g. '3,7'.
+    """
+    default_error_messages = {
+        'invalid': 'Must be a comma-separated list of label ids.',
+        'max_length': f'At most {MAX_FILTER_LABELS} labels.',
+    }
+
+    def to_internal_value(self, data):
+        try:
+            ids = sorted({int(part) for part in str(data).split(',')})
+        except ValueError:
+            self.fail('invalid')
+        if len(ids) > MAX_FILTER_LABELS:
+            self.fail('max_length')
+        return ids
+
+
+class TaskFilterSerializer(serializers.Serializer):
+    """
+    Serializer validating the task filter query parameters.
+
+    Attributes:
+        assignee (AssigneeField): Only tasks assigned to this user.
+        unassigned (BooleanField): Only tasks without (true) or with (false) assignees.
+        due_after (DateTimeField): Only tasks due at or after this moment.
+        due_before (DateTimeField): Only tasks due before this moment.
+        overdue (BooleanField): Only tasks that are (true) or are not (false) overdue: past
+            their due date and not completed, as in the board analytics.
+        labels (LabelIdsField): Only tasks carrying any or all of these labels.
+        labels_match (ChoiceField): 'any' or 'all' of the labels.
+        ordering (ChoiceField): The sort order, one of TASK_ORDERINGS.
+    """
+    assignee = AssigneeField(required=False)
+    unassigned = serializers.BooleanField(required=False, allow_null=True, default=None)
+    due_after = serializers.DateTimeField(required=False, input_formats=['iso-8601', '%Y-%m-%d'])
+    due_before = serializers.DateTimeField(required=False, input_formats=['iso-8601', '%Y-%m-%d'])
+    overdue = serializers.BooleanField(required=False, allow_null=True, default=None)
+    labels = LabelIdsField(required=False)
+    labels_match = serializers.ChoiceField(choices=['any', 'all'], default='any')
+    ordering = serializers.ChoiceField(choices=list(TASK_ORDERINGS), default=DEFAULT_TASK_ORDERING)
+
+    def validate(self, data):
+        """
+        Rejects unknown parameters and contradictory filters.
+
+        Raises:
+            ValidationError: If a parameter is unknown, or assignee is combined with unassigned=true.
+        """
+        allowed = set(self.fields) | {api_settings.URL_FORMAT_OVERRIDE}
+        unknown = sorted(set(self.initial_data) - allowed)
+        if unknown:
+            raise serializers.ValidationError({
+                name: [f"Unknown parameter. Allowed: {', '.join(self.fields)}."] for name in unknown
+            })
+        if 'assignee' in data and data['unassigned']:
+            raise serializers.ValidationError({'unassigned': ['Cannot be combined with assignee.']})
+        return data
+
+
+def task_filters(request):
+    """
+    Validates the task filter query parameters of a request.
+
+    Args:
+        request: The DRF Request (or Django HttpRequest with a user).
+
+    Returns:
+        dict: The validated filters; an empty request gives the default ordering only.
+
+    Raises:
+        ValidationError: If a parameter is unknown or invalid.
+    """
+    params = getattr(request, 'query_params', None) or request.GET
+    serializer = TaskFilterSerializer(data=params.dict(), context={'request': request})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def task_filter_q(filters, prefix=''):
+    """
+    Returns the condition selecting the tasks that match the filters.
+
+    Args:
+        filters (dict): Validated filters, see task_filters().
+        prefix (str): Lookup path from the queried model to the task, e.g. 'tasks__' to
+            filter the tasks of lists in an aggregate.
+
+    Returns:
+        Q: The condition; empty when nothing is filtered.
+    """
+    condition = Q()
+    if 'assignee' in filters:
+        condition &= Q(**{f'{prefix}assigned_users': filters['assignee']})
+    if filters.get('unassigned') is not None:
+        condition &= Q(**{f'{prefix}assigned_users__isnull': filters['unassigned']})
+    if 'due_after' in filters:
+        condition &= Q(**{f'{prefix}due_date__gte': filters['due_after']})
+    if 'due_before' in filters:
+        condition &= Q(**{f'{prefix}due_date__lt': filters['due_before']})
+    if filters.get('overdue') is not None:
+        overdue = Q(**{f'{prefix}due_date__lt': timezone.now(), f'{prefix}completed_at__isnull': True})
+        condition &= overdue if filters['overdue'] else ~overdue
+    if filters.get('labels'):
+        if filters.get('labels_match') == 'all':
+            for label_id in filters['labels']:
+                tagged = TaskLabel.objects.filter(label_id=label_id).values('task_id')
+                condition &= Q(**{f'{prefix}pk__in': tagged})
+        else:
+            tagged = TaskLabel.objects.filter(label_id__in=filters['labels']).values('task_id')
+            condition &= Q(**{f'{prefix}pk__in': tagged})
+    return condition
+
+
+def filter_tasks(queryset, filters):
+    """
+    Applies the filters and ordering to a Task queryset.
+
+    Args:
+        queryset (QuerySet): The tasks.
+        filters (dict): Validated filters, see task_filters().
+
+    Returns:
+        QuerySet: The matching tasks, in the requested order.
+    """
+    queryset = queryset.filter(task_filter_q(filters))
+    if filters.get('unassigned') is False:
+        # One joined row per assignee
+        queryset = queryset.distinct()
+    return queryset.order_by(*TASK_ORDERINGS[filters.get('ordering', DEFAULT_TASK_ORDERING)])
@@ -0,0 +1,46 @@
+"""
+Recomputes the checklist counters stored on tasks from their checklist items.
+
+The counters are maintained incrementally by the checklist views; this repairs them after
+changes made around the API (raw SQL, a restored backup, a bug). Tasks are processed in
+chunks of consecutive ids, each in its own short transaction, so the write lock is never
+held for long on a large database.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from lists.checklists import recount_checklists
+from lists.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the checklist counters of tasks in chunks and fixes the wrong ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Task ids per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the wrong counters')
+        parser.add_argument('--verbose-fixes', action='store_true', help='Print every wrong counter')
+
+    def handle(self, *args, **options):
+        bounds = Task.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('No tasks.')
+            return
+
+        chunk_size = options['chunk_size']
+        checked = fixed = 0
+        for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+            with transaction.atomic():
+                fixes = recount_checklists(start, start + chunk_size, dry_run=options['dry_run'])
+            checked += 1
+            fixed += len(fixes)
+            if options['verbose_fixes']:
+                for task_id, stored, actual in fixes:
+                    self.stdout.write(f'Task {task_id}: {stored[1]}/{stored[0]} -> {actual[1]}/{actual[0]}')
+
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {fixed} task(s) with wrong checklist counters in {checked} chunk(s) of {chunk_size} ids.'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0002_task_assigned_users'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='list',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='lists.list'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['list', 'order', 'id'], name='task_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['list', 'due_date'], name='task_list_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['list', 'created_at'], name='task_list_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_members_alter_board_owner'),
+        ('lists', '0003_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Label',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('color', models.CharField(default='#61BD4F', max_length=7)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='boards.board')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_labels', to='lists.label')),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_labels', to='lists.task')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='labels',
+            field=models.ManyToManyField(blank=True, related_name='tasks', through='lists.TaskLabel', to='lists.label'),
+        ),
+        migrations.AddConstraint(
+            model_name='label',
+            constraint=models.UniqueConstraint(fields=('board', 'name'), name='label_board_name_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklabel',
+            index=models.Index(fields=['label', 'task'], name='task_label_label_task_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasklabel',
+            constraint=models.UniqueConstraint(fields=('task', 'label'), name='task_label_unique'),
+        ),
+    ]
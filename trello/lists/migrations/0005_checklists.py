@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0004_task_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='checklist_done_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='checklist_total_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ChecklistItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=200)),
+                ('done', models.BooleanField(default=False)),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='checklist_items', to='lists.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'order', 'id'], name='checklist_item_task_order_idx')],
+            },
+        ),
+    ]
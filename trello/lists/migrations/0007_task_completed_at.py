@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_completed_at(apps, schema_editor):
+    """
+    Marks the tasks whose checklist is all done as completed when they were last updated.
+    """
+    Task = apps.get_model('lists', 'Task')
+    Task.objects.using(schema_editor.connection.alias).filter(
+        checklist_total_count__gt=0, checklist_done_count__gte=F('checklist_total_count')
+    ).update(completed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0006_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_completed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['updated_at'], name='task_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ),
+    ]
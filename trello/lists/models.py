@@ -3,11 +3,16 @@ Django models for List and Task entities.
 
 This module defines the List and Task models, which represent lists and tasks within a board
 in the application. Lists belong to a board, and tasks belong to a list, with additional
-attributes for task management such as due dates and assigned users.
+attributes for task management such as due dates and assigned users. Labels belong to a board
+and are applied to its tasks through the TaskLabel table. Tasks have checklist items, whose
+counts are kept on the task itself. A task is completed when it is marked so, whatever its
+checklist. Lists and tasks are deleted softly, like boards (see core.softdelete): a task is
+hidden when it, its list or its board is deleted.
 """
 
 from django.db import models
 from django.conf import settings
+from core.softdelete import SoftDeleteManager
 
 class List(models.Model):
     """
@@ -19,11 +24,25 @@ class List(models.Model):
                            Deleted lists are removed if the board is deleted (CASCADE).
         created_at (DateTimeField): Timestamp when the list was created, set automatically on creation.
         updated_at (DateTimeField): Timestamp when the list was last updated, updated automatically.
+        deleted_at (DateTimeField): When the list was deleted, null while it is not.
     """
     title = models.CharField(max_length=100)
     board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='lists')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = SoftDeleteManager()
+    # Hidden with their board
+    soft_delete_parents = ('board',)
+
+    class Meta:
+        """
+        Meta class for List.
+        """
+        indexes = [
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='list_deleted_idx'),
+        ]
 
     def __str__(self):
         """
@@ -46,17 +65,50 @@ class Task(models.Model):
         due_date (DateTimeField): Optional due date for the task, can be null or blank.
         order (PositiveIntegerField): The order of the task within the list, defaults to 0.
         assigned_users (ManyToManyField): Users assigned to the task, linked to AUTH_USER_MODEL, can be blank.
+        labels (ManyToManyField): Labels of the task's board applied to it, through TaskLabel, can be blank.
+        checklist_total_count (PositiveIntegerField): The number of checklist items of the task.
+        checklist_done_count (PositiveIntegerField): The number of those items that are done.
+        completed_at (DateTimeField): When the task was marked completed, null while it is not.
         created_at (DateTimeField): Timestamp when the task was created, set automatically on creation.
         updated_at (DateTimeField): Timestamp when the task was last updated, updated automatically.
+        deleted_at (DateTimeField): When the task was deleted, null while it is not.
     """
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
-    list = models.ForeignKey(List, on_delete=models.CASCADE, related_name='tasks')
+    # Indexed by the composite indexes below, which all start with the list
+    list = models.ForeignKey(List, on_delete=models.CASCADE, related_name='tasks', db_index=False)
     due_date = models.DateTimeField(null=True, blank=True)
     order = models.PositiveIntegerField(default=0)
     assigned_users = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='assigned_tasks', blank=True)
+    labels = models.ManyToManyField('Label', through='TaskLabel', related_name='tasks', blank=True)
+    # Maintained by lists.checklists, so task responses need no count per task
+    checklist_total_count = models.PositiveIntegerField(default=0, editable=False)
+    checklist_done_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = SoftDeleteManager()
+    # Hidden with their list or board
+    soft_delete_parents = ('list', 'list__board')
+
+    class Meta:
+        """
+        Meta class for Task.
+
+        The indexes serve the orderings and due date filters of lists.filters within a list,
+        the purge of the deleted tasks, and the lookup of the boards whose tasks changed or fell
+        due since the last analytics rollup (see boards.analytics).
+        """
+        indexes = [
+            models.Index(fields=['list', 'order', 'id'], name='task_list_order_idx'),
+            models.Index(fields=['list', 'due_date'], name='task_list_due_date_idx'),
+            models.Index(fields=['list', 'created_at'], name='task_list_created_at_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_at_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='task_deleted_idx'),
+        ]
 
     def __str__(self):
         """
@@ -65,4 +117,109 @@ class Task(models.Model):
         Returns:
             str: The title of the task.
         """
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class Label(models.Model):
+    """
+    Represents a label that can be applied to the tasks of a board.
+
+    Attributes:
+        board (ForeignKey): The board the label belongs to, linked to the Board model.
+                           Labels are removed if the board is deleted (CASCADE).
+        name (CharField): The name of the label, unique within the board, with a maximum length of 50 characters.
+        color (CharField): The color of the label in hexadecimal format, defaulting to green (#61BD4F).
+        created_at (DateTimeField): Timestamp when the label was created, set automatically on creation.
+        updated_at (DateTimeField): Timestamp when the label was last updated, updated automatically.
+    """
+    board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='labels')
+    name = models.CharField(max_length=50)
+    color = models.CharField(max_length=7, default='#61BD4F')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """
+        Meta class for Label.
+        """
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'name'], name='label_board_name_unique'),
+        ]
+
+    def __str__(self):
+        """
+        Returns the string representation of the Label instance.
+
+        Returns:
+            str: The name of the label.
+        """
+        return self.name
+
+
+class TaskLabel(models.Model):
+    """
+    A label applied to a task: the through table of Task.labels.
+
+    Attributes:
+        task (ForeignKey): The labelled task. Removed with the task (CASCADE).
+        label (ForeignKey): The applied label. Removed with the label (CASCADE).
+    """
+    # Indexed by the unique constraint and the index below
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='task_labels', db_index=False)
+    label = models.ForeignKey(Label, on_delete=models.CASCADE, related_name='task_labels', db_index=False)
+
+    class Meta:
+        """
+        Meta class for TaskLabel.
+
+        The unique constraint on (task, label) finds the labels of a task; the index on
+        (label, task) finds the tasks carrying a label without reading the task table, which
+        is how lists.filters selects the tasks with any or all of several labels.
+        """
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'label'], name='task_label_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['label', 'task'], name='task_label_label_task_idx'),
+        ]
+
+
+class ChecklistItem(models.Model):
+    """
+    Represents an item of the checklist of a task.
+
+    Attributes:
+        task (ForeignKey): The task the item belongs to. Items are removed with the task (CASCADE).
+        text (CharField): The text of the item, with a maximum length of 200 characters.
+        done (BooleanField): Whether the item is done, defaults to False.
+        order (PositiveIntegerField): The order of the item within the checklist, defaults to 0.
+        created_at (DateTimeField): Timestamp when the item was created, set automatically on creation.
+        updated_at (DateTimeField): Timestamp when the item was last updated, updated automatically.
+    """
+    # Indexed by the composite index below
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='checklist_items', db_index=False)
+    text = models.CharField(max_length=200)
+    done = models.BooleanField(default=False)
+    order = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """
+        Meta class for ChecklistItem.
+
+        The index serves the checklist of a task in order, and the recount of the checklist
+        counters of a range of tasks.
+        """
+        indexes = [
+            models.Index(fields=['task', 'order', 'id'], name='checklist_item_task_order_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Returns the string representation of the ChecklistItem instance.
+
+        Returns:
+            str: The text of the item.
+        """
+        return self.text
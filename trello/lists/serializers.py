@@ -1,31 +1,48 @@
 """
 Django REST Framework serializers for List and Task models.
 
-This module defines serializers for the List and Task models, handling serialization
-and deserialization for API interactions. Includes nested serialization for tasks within lists
-and validation for assigned users.
+This module defines serializers for the List, Task, Label and ChecklistItem models, handling
+serialization and deserialization for API interactions. Includes nested serialization for tasks
+within lists, validation for assigned users and labels, and the body of bulk label changes.
 """
 
 from rest_framework import serializers
-from .models import List, Task
+from .models import ChecklistItem, Label, List, Task
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+# Largest number of tasks a bulk label change may touch
+LABEL_BULK_MAX_TASKS = 5000
 
 class TaskSerializer(serializers.ModelSerializer):
     """
     Serializer for the Task model.
 
     Converts Task model instances to JSON and validates incoming data.
-    Supports assigning multiple users to a task via their primary keys.
+    Supports assigning multiple users and labels to a task via their primary keys.
+    The checklist counters and completion time are read-only columns of the task, so they
+    cost no query.
 
     Attributes:
         assigned_users (PrimaryKeyRelatedField): Field for assigning users to the task,
                                                allows multiple users, optional.
+        labels (PrimaryKeyRelatedField): Field for applying labels of the task's board,
+                                       allows multiple labels, optional.
+        completed (BooleanField): Marks the task completed (true) or not (false), setting or
+                                clearing completed_at; write-only, optional. Checklist items
+                                do not complete a task.
     """
     assigned_users = serializers.PrimaryKeyRelatedField(
         many=True,
         queryset=get_user_model().objects.all(),
         required=False
     )
+    labels = serializers.PrimaryKeyRelatedField(
+        many=True,
+        queryset=Label.objects.all(),
+        required=False
+    )
+    completed = serializers.BooleanField(write_only=True, required=False)
 
     class Meta:
         """
@@ -34,9 +51,56 @@ class TaskSerializer(serializers.ModelSerializer):
         Defines the model to serialize, fields to include, and read-only fields.
         """
         model = Task
-        fields = ['id', 'title', 'description', 'list', 'due_date', 'order', 'assigned_users', 'created_at', 'updated_at']
+        fields = [
+            'id', 'title', 'description', 'list', 'due_date', 'order', 'assigned_users', 'labels',
+            'checklist_total_count', 'checklist_done_count', 'completed', 'completed_at', 'created_at', 'updated_at',
+        ]
         read_only_fields = ['list', 'created_at', 'updated_at']
 
+    def validate(self, attrs):
+        """
+        Turns the completed flag into the completion time of the task.
+
+        The completion time is kept while a completed task is marked completed again.
+
+        Returns:
+            dict: The validated data, with completed_at instead of completed.
+        """
+        if 'completed' in attrs:
+            completed_at = self.instance.completed_at if self.instance is not None else None
+            attrs['completed_at'] = (completed_at or timezone.now()) if attrs.pop('completed') else None
+        return attrs
+
+    def validate_labels(self, labels):
+        """
+        Ensures the labels belong to the board of the task.
+
+        The board is the one of the task being updated, or of the list in the URL when a
+        task is created.
+
+        Args:
+            labels (list): The Label instances.
+
+        Returns:
+            list: The labels, unchanged.
+
+        Raises:
+            ValidationError: If a label belongs to another board.
+        """
+        if not labels:
+            return labels
+        if self.instance is not None:
+            board_id = self.instance.list.board_id
+        else:
+            list_id = self.context['view'].kwargs.get('list_id')
+            board_id = List.objects.filter(id=list_id).values_list('board_id', flat=True).first()
+        foreign = sorted(label.id for label in labels if label.board_id != board_id)
+        if foreign:
+            raise serializers.ValidationError(
+                f"Labels {', '.join(map(str, foreign))} do not belong to the board of this task."
+            )
+        return labels
+
 class ListSerializer(serializers.ModelSerializer):
     """
     Serializer for the List model.
@@ -57,4 +121,103 @@ class ListSerializer(serializers.ModelSerializer):
         """
         model = List
         fields = ['id', 'title', 'board', 'tasks', 'created_at', 'updated_at']
-        read_only_fields = ['board', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['board', 'created_at', 'updated_at']
+
+class ChecklistItemSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the ChecklistItem model.
+
+    Converts ChecklistItem model instances to JSON and validates incoming data. The task is
+    taken from the URL.
+    """
+
+    class Meta:
+        """
+        Meta class for ChecklistItemSerializer.
+
+        Defines the model to serialize, fields to include, and read-only fields.
+        """
+        model = ChecklistItem
+        fields = ['id', 'task', 'text', 'done', 'order', 'created_at', 'updated_at']
+        read_only_fields = ['task', 'created_at', 'updated_at']
+
+class LabelSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Label model.
+
+    Converts Label model instances to JSON and validates incoming data. The board is taken
+    from the URL, and the name must be unique within it.
+    """
+
+    class Meta:
+        """
+        Meta class for LabelSerializer.
+
+        Defines the model to serialize, fields to include, and read-only fields.
+        """
+        model = Label
+        fields = ['id', 'name', 'color', 'board', 'created_at', 'updated_at']
+        read_only_fields = ['board', 'created_at', 'updated_at']
+
+    def validate_color(self, value):
+        """
+        Ensures the color is a hexadecimal color code such as #61BD4F.
+
+        Raises:
+            ValidationError: If the color is not a '#' followed by six hexadecimal digits.
+        """
+        digits = value[1:]
+        if not value.startswith('#') or len(digits) != 6 or any(c not in '0123456789abcdefABCDEF' for c in digits):
+            raise serializers.ValidationError('Must be a hexadecimal color code such as #61BD4F.')
+        return value.upper()
+
+    def validate_name(self, value):
+        """
+        Ensures no other label of the board has the same name.
+
+        Raises:
+            ValidationError: If the board already has a label with this name.
+        """
+        board_id = self.instance.board_id if self.instance is not None else self.context['view'].kwargs.get('board_id')
+        labels = Label.objects.filter(board_id=board_id, name=value)
+        if self.instance is not None:
+            labels = labels.exclude(pk=self.instance.pk)
+        if labels.exists():
+            raise serializers.ValidationError('The board already has a label with this name.')
+        return value
+
+class LabelBulkSerializer(serializers.Serializer):
+    """
+    Serializer for the body of a bulk label change.
+
+    Attributes:
+        action (ChoiceField): 'apply' to add the labels to the tasks, 'remove' to take them off.
+        labels (ListField): Ids of labels of the board.
+        tasks (ListField): Ids of tasks on the board, at most LABEL_BULK_MAX_TASKS.
+    """
+    action = serializers.ChoiceField(choices=['apply', 'remove'])
+    labels = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=20)
+    tasks = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=LABEL_BULK_MAX_TASKS
+    )
+
+    def validate(self, data):
+        """
+        Ensures the labels and tasks all belong to the board in the URL.
+
+        Raises:
+            ValidationError: If a label or task is not on the board.
+        """
+        board_id = self.context['view'].kwargs.get('board_id')
+        data['labels'] = sorted(set(data['labels']))
+        data['tasks'] = sorted(set(data['tasks']))
+        labels = Label.objects.filter(board_id=board_id, pk__in=data['labels']).values_list('pk', flat=True)
+        missing = sorted(set(data['labels']) - set(labels))
+        if missing:
+            raise serializers.ValidationError({'labels': [f"Not labels of this board: {', '.join(map(str, missing))}."]})
+        tasks = Task.objects.filter(list__board_id=board_id, pk__in=data['tasks']).values_list('pk', flat=True)
+        missing = sorted(set(data['tasks']) - set(tasks))
+        if missing:
+            shown = ', '.join(map(str, missing[:20])) + (', ...' if len(missing) > 20 else '')
+            raise serializers.ValidationError({'tasks': [f'Not tasks of this board: {shown}.']})
+        return data
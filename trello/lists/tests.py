@@ -1,3 +1,169 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from boards.models import Board
+from core.querybudget import query_budget
+from workspaces.tenancy import personal_workspace
+from .checklists import recount_checklists
+from .models import ChecklistItem, List, Task
+from .views import (
+    ChecklistItemDetailView, ChecklistItemListCreateView, ListListCreateView, TaskDetailView, TaskListCreateView,
+    TaskMoveView,
+)
+
+User = get_user_model()
+
+
+class ListsTestCase(APITestCase):
+    """
+    A board of alice's with two lists, and a task in the first one.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.board = Board.objects.create(title='Roadmap', owner=self.user, workspace=personal_workspace(self.user))
+        self.todo = List.objects.create(board=self.board, title='To do')
+        self.done = List.objects.create(board=self.board, title='Done')
+        self.task = Task.objects.create(list=self.todo, title='Write the spec')
+        self.client.force_authenticate(self.user)
+        self.checklist_url = f'/lists/lists/{self.todo.pk}/tasks/{self.task.pk}/checklist/'
+
+    def counters(self):
+        self.task.refresh_from_db()
+        return self.task.checklist_done_count, self.task.checklist_total_count
+
+
+class ChecklistCounterTests(ListsTestCase):
+    """
+    The checklist counters of a task follow its items, without completing the task.
+    """
+
+    def add_item(self, text, done=False):
+        with query_budget(view=ChecklistItemListCreateView, method='POST'):
+            response = self.client.post(self.checklist_url, {'text': text, 'done': done})
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def tick(self, item_id, done):
+        with query_budget(view=ChecklistItemDetailView, method='PATCH'):
+            response = self.client.patch(f'{self.checklist_url}{item_id}/', {'done': done})
+        self.assertEqual(response.status_code, 200)
+
+    def test_adding_items_counts_them(self):
+        self.add_item('Outline')
+        self.add_item('Review', done=True)
+        self.assertEqual(self.counters(), (1, 2))
+        self.assertIsNone(self.task.completed_at)
+
+    def test_ticking_every_item_does_not_complete_the_task(self):
+        first, second = self.add_item('Outline'), self.add_item('Review')
+        self.tick(first, True)
+        self.tick(second, True)
+        self.assertEqual(self.counters(), (2, 2))
+        self.assertIsNone(self.task.completed_at)
+
+        self.tick(second, False)
+        self.assertEqual(self.counters(), (1, 2))
+
+    def test_ticking_twice_counts_once(self):
+        item = self.add_item('Outline')
+        self.tick(item, True)
+        self.tick(item, True)
+        self.assertEqual(self.counters(), (1, 1))
+
+    def test_deleting_items_uncounts_them(self):
+        first, second = self.add_item('Outline', done=True), self.add_item('Review')
+        self.assertEqual(self.client.delete(f'{self.checklist_url}{second}/').status_code, 204)
+        self.assertEqual(self.counters(), (1, 1))
+        self.client.delete(f'{self.checklist_url}{first}/')
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_counters_are_read_only(self):
+        self.add_item('Outline')
+        self.client.patch(
+            f'/lists/lists/{self.todo.pk}/tasks/{self.task.pk}/', {'checklist_total_count': 5, 'checklist_done_count': 5}
+        )
+        self.assertEqual(self.counters(), (0, 1))
+
+    def test_recount_repairs_drifted_counters(self):
+        ChecklistItem.objects.create(task=self.task, text='Outline', done=True)
+        ChecklistItem.objects.create(task=self.task, text='Review', done=True)
+
+        fixes = recount_checklists(self.task.pk, self.task.pk + 1, dry_run=True)
+        self.assertEqual(fixes, [(self.task.pk, (0, 0), (2, 2))])
+        self.assertEqual(self.counters(), (0, 0))
+
+        recount_checklists(self.task.pk, self.task.pk + 1)
+        self.assertEqual(self.counters(), (2, 2))
+        self.assertEqual(recount_checklists(self.task.pk, self.task.pk + 1), [])
+
+
+class TaskCompletionTests(ListsTestCase):
+    """
+    Tasks are completed when they are marked so.
+    """
+
+    def complete(self, completed):
+        with query_budget(view=TaskDetailView, method='PATCH'):
+            response = self.client.patch(
+                f'/lists/lists/{self.todo.pk}/tasks/{self.task.pk}/', {'completed': completed}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('completed', response.data)
+        return response.data['completed_at']
+
+    def test_marking_a_task_completed(self):
+        completed_at = self.complete(True)
+        self.assertIsNotNone(completed_at)
+        self.assertEqual(self.complete(True), completed_at)
+        self.assertIsNone(self.complete(False))
+
+    def test_creating_a_completed_task(self):
+        response = self.client.post(f'/lists/lists/{self.todo.pk}/tasks/', {'title': 'Done already', 'completed': True})
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(Task.objects.get(pk=response.data['id']).completed_at)
+
+    def test_completed_tasks_are_not_overdue(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        Task.objects.filter(pk=self.task.pk).update(due_date=yesterday)
+        finished = Task.objects.create(list=self.todo, title='Review', due_date=yesterday, completed_at=yesterday)
+
+        def titles(overdue):
+            with query_budget(view=TaskListCreateView):
+                response = self.client.get(f'/lists/lists/{self.todo.pk}/tasks/', {'overdue': overdue})
+            self.assertEqual(response.status_code, 200)
+            return [task['title'] for task in response.data]
+
+        self.assertEqual(titles('true'), [self.task.title])
+        self.assertEqual(titles('false'), [finished.title])
+
+
+class ListEndpointTests(ListsTestCase):
+    """
+    The lists of a board with their tasks, and moves between lists.
+    """
+
+    def test_lists_of_a_board_stay_within_their_budget(self):
+        for index in range(10):
+            Task.objects.create(list=self.done, title=f'Task {index}', order=index)
+
+        with query_budget(view=ListListCreateView):
+            response = self.client.get(f'/lists/boards/{self.board.pk}/lists/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([len(list_row['tasks']) for list_row in response.data], [1, 10])
+
+    def test_move_task_to_another_list(self):
+        with query_budget(view=TaskMoveView, method='PATCH'):
+            response = self.client.patch(f'/lists/tasks/{self.task.pk}/move/', {'list_id': self.done.pk, 'order': 0})
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.list_id, self.done.pk)
+
+    def test_lists_of_an_inaccessible_board(self):
+        self.client.force_authenticate(User.objects.create_user(username='carol', email='carol@example.com'))
+        self.assertEqual(self.client.get(f'/lists/boards/{self.board.pk}/lists/').data, [])
+        response = self.client.patch(f'/lists/tasks/{self.task.pk}/move/', {'list_id': self.done.pk, 'order': 0})
+        self.assertEqual(response.status_code, 404)
@@ -3,16 +3,25 @@ URL configuration for list and task-related endpoints.
 
 This module defines the URL patterns for the list and task application, mapping API endpoints
 to their respective views for listing, creating, retrieving, updating, deleting lists and tasks,
-and moving tasks between lists.
+and moving tasks between lists, and for managing the labels of a board and the checklists of tasks.
 """
 
 from django.urls import path
-from .views import ListListCreateView, ListDetailView, TaskListCreateView, TaskDetailView, TaskMoveView
+from .views import (
+    ListListCreateView, ListDetailView, TaskListCreateView, TaskDetailView, TaskMoveView, ListListAsyncView,
+    LabelListCreateView, LabelDetailView, LabelBulkView, ChecklistItemListCreateView, ChecklistItemDetailView,
+)
 
 urlpatterns = [
     path('boards/<int:board_id>/lists/', ListListCreateView.as_view(), name='list-list-create'),  # Endpoint for listing or creating lists for a specific board
+    path('async/boards/<int:board_id>/lists/', ListListAsyncView.as_view(), name='list-list-async'),  # Async (ASGI) version of the lists of a board with their tasks
     path('boards/<int:board_id>/lists/<int:pk>/', ListDetailView.as_view(), name='list-detail'),  # Endpoint for retrieving, updating, or deleting a specific list
     path('lists/<int:list_id>/tasks/', TaskListCreateView.as_view(), name='task-list-create'),  # Endpoint for listing or creating tasks for a specific list
     path('lists/<int:list_id>/tasks/<int:pk>/', TaskDetailView.as_view(), name='task-detail'),  # Endpoint for retrieving, updating, or deleting a specific task
+    path('lists/<int:list_id>/tasks/<int:task_id>/checklist/', ChecklistItemListCreateView.as_view(), name='checklist-item-list-create'),  # Endpoint for listing or adding the checklist items of a task
+    path('lists/<int:list_id>/tasks/<int:task_id>/checklist/<int:pk>/', ChecklistItemDetailView.as_view(), name='checklist-item-detail'),  # Endpoint for retrieving, ticking off, or deleting a checklist item
     path('tasks/<int:pk>/move/', TaskMoveView.as_view(), name='task-move'),  # Endpoint for moving a task to a different list
+    path('boards/<int:board_id>/labels/', LabelListCreateView.as_view(), name='label-list-create'),  # Endpoint for listing or creating the labels of a board
+    path('boards/<int:board_id>/labels/bulk/', LabelBulkView.as_view(), name='label-bulk'),  # Endpoint for applying or removing labels on many tasks at once
+    path('boards/<int:board_id>/labels/<int:pk>/', LabelDetailView.as_view(), name='label-detail'),  # Endpoint for retrieving, updating, or deleting a label
 ]
\ No newline at end of file
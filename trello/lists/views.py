@@ -2,19 +2,88 @@
 Django REST Framework views for list and task-related API endpoints.
 
 This module defines generic views for listing, creating, retrieving, updating, deleting lists and tasks,
-and moving tasks between lists. Views enforce authentication and restrict access to boards where the user
-is either the owner or a member.
+and moving tasks between lists, and an async version of the lists-with-tasks read for ASGI.
+The labels of a board are managed here too, and applied to or removed from many tasks at once,
+as are the checklist items of a task, whose counters on the task are kept up to date.
+Views enforce authentication and restrict access to boards where the user is either the owner or a member.
+The task list and the lists-with-tasks reads accept the task filters of lists.filters.
 """
 
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
-from .models import List, Task
-from .serializers import ListSerializer, TaskSerializer
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from .checklists import adjust_checklist_counts
+from .filters import filter_tasks, task_filter_q, task_filters
+from .models import ChecklistItem, Label, List, Task, TaskLabel
+from .serializers import (
+    ChecklistItemSerializer, LabelBulkSerializer, LabelSerializer, ListSerializer, TaskSerializer,
+)
 from boards.models import Board
-from django.db.models import Q
+from django.db.models import Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from core.async_views import AsyncReadView
+from core.conditional import ConditionalRequestMixin
+from core.mixins import AtomicWriteMixin, SerializerTimingMixin
+from core.softdelete import soft_delete
+from notifications.inbox import notify
+from notifications.models import Notification
+
+
+def accessible_boards(user):
+    """
+    Returns the ids of the boards the user owns or is a member of, for use as a subquery.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The board ids.
+    """
+    return Board.objects.filter(Q(owner=user) | Q(members=user)).values('pk')
+
+
+def board_lists(user, board_id, filters=None):
+    """
+    Returns the lists of a board the user owns or is a member of, ready for ListSerializer.
+
+    Args:
+        user: The user.
+        board_id (int): The board.
+        filters (dict, optional): Validated task filters (see lists.filters); the tasks are
+            only sorted by their order without them.
+
+    Returns:
+        QuerySet: The lists, with their matching tasks and the tasks' assigned users and labels prefetched.
+    """
+    tasks = filter_tasks(Task.objects.prefetch_related('assigned_users', 'labels'), filters or {})
+    return List.objects.filter(board__id=board_id).filter(
+        Q(board__owner=user) | Q(board__members=user)
+    ).distinct().prefetch_related(Prefetch('tasks', queryset=tasks))
+
 
-class ListListCreateView(generics.ListCreateAPIView):
+def list_tasks(user, list_id):
+    """
+    Returns the tasks of a list on a board the user owns or is a member of.
+
+    The access check is a subquery on the boards rather than a join with the members, so
+    the tasks need no distinct() and can be read in the order of an index.
+
+    Args:
+        user: The user.
+        list_id (int): The list.
+
+    Returns:
+        QuerySet: The tasks, with their assigned users and labels prefetched.
+    """
+    return Task.objects.filter(
+        list__id=list_id, list__board__in=accessible_boards(user)
+    ).prefetch_related('assigned_users', 'labels')
+
+
+class ListListCreateView(ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating lists within a board.
 
@@ -23,18 +92,31 @@ class ListListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = ListSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 7, 'POST': 8}
+    conditional_related = ('tasks',)
 
     def get_queryset(self):
         """
         Filters queryset to lists within a specific board where the user is the owner or a member.
+        Tasks and their assigned users are prefetched for the nested serializer; on GET only
+        the tasks matching the query parameters, in the requested order.
 
         Returns:
             QuerySet: Lists accessible to the requesting user for the specified board.
+
+        Raises:
+            ValidationError: If a task filter parameter is unknown or invalid.
         """
-        board_id = self.kwargs.get('board_id')
-        return List.objects.filter(board__id=board_id).filter(
-            Q(board__owner=self.request.user) | Q(board__members=self.request.user)
-        )
+        filters = task_filters(self.request) if self.request.method == 'GET' else None
+        return board_lists(self.request.user, self.kwargs.get('board_id'), filters)
+
+    def get_related_filter(self, related):
+        """
+        Restricts the tasks behind the ETag to the ones in the response.
+        """
+        if self.request.method != 'GET':
+            return None
+        return task_filter_q(task_filters(self.request), prefix='tasks__') or None
 
     def perform_create(self, serializer):
         """
@@ -47,37 +129,63 @@ class ListListCreateView(generics.ListCreateAPIView):
             serializer: The serializer instance with validated data.
 
         Raises:
+            Http404: If the board does not exist or is deleted.
             PermissionDenied: If the user is neither the board owner nor a member.
         """
         board_id = self.kwargs.get('board_id')
-        board = Board.objects.get(id=board_id)
+        board = get_object_or_404(Board, id=board_id)
         if board.owner != self.request.user and not board.members.filter(id=self.request.user.id).exists():
             raise PermissionDenied("You don't have permission to create lists in this board.")
         serializer.save(board=board)
 
-class ListDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ListDetailView(
+    ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API view for retrieving, updating, or deleting a specific list.
 
     Restricts access to lists within a board where the user is the owner or a member.
-    Supports GET, PUT/PATCH, and DELETE methods.
+    Supports GET, PUT/PATCH, and DELETE methods. DELETE hides the list with its tasks, which
+    are purged in the background later (see core.softdelete).
     """
     serializer_class = ListSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 7, 'PUT': 14, 'PATCH': 14, 'DELETE': 8}
+    conditional_related = ('tasks',)
 
     def get_queryset(self):
         """
         Filters queryset to lists within a specific board where the user is the owner or a member.
+        Tasks and their assigned users are prefetched for the nested serializer.
 
         Returns:
             QuerySet: Lists accessible to the requesting user for the specified board.
         """
-        board_id = self.kwargs.get('board_id')
-        return List.objects.filter(board__id=board_id).filter(
-            Q(board__owner=self.request.user) | Q(board__members=self.request.user)
-        )
+        return board_lists(self.request.user, self.kwargs.get('board_id'))
+
+    def perform_update(self, serializer):
+        """
+        Saves the list and reloads it with its tasks prefetched.
+
+        DRF drops the prefetched tasks of the updated instance, so without the reload the
+        response would query the assigned users of every task one by one.
+
+        Args:
+            serializer: The serializer instance with validated data.
+        """
+        instance = serializer.save()
+        serializer.instance = self.get_queryset().get(pk=instance.pk)
 
-class TaskListCreateView(generics.ListCreateAPIView):
+    def perform_destroy(self, instance):
+        """
+        Marks the list as deleted, with one UPDATE whatever the number of its tasks.
+
+        Args:
+            instance (List): The list to delete.
+        """
+        soft_delete(instance)
+
+class TaskListCreateView(ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating tasks within a list.
 
@@ -86,47 +194,61 @@ class TaskListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 6, 'POST': 14}
 
     def get_queryset(self):
         """
-        Filters queryset to tasks within a specific list where the user is the board owner or a member.
+        Filters queryset to tasks within a specific list where the user is the board owner or a member,
+        and on GET to the tasks matching the query parameters, in the requested order.
 
         Returns:
             QuerySet: Tasks accessible to the requesting user for the specified list.
+
+        Raises:
+            ValidationError: If a task filter parameter is unknown or invalid.
         """
-        list_id = self.kwargs.get('list_id')
-        return Task.objects.filter(list__id=list_id).filter(
-            Q(list__board__owner=self.request.user) | Q(list__board__members=self.request.user)
-        )
+        queryset = list_tasks(self.request.user, self.kwargs.get('list_id'))
+        if self.request.method == 'GET':
+            queryset = filter_tasks(queryset, task_filters(self.request))
+        return queryset
 
     def perform_create(self, serializer):
         """
         Custom creation logic for tasks.
 
         Ensures the user is the board owner or a member before creating a task.
-        Associates the task with the specified list.
+        Associates the task with the specified list and notifies its assigned users.
 
         Args:
             serializer: The serializer instance with validated data.
 
         Raises:
+            Http404: If the list does not exist or is deleted.
             PermissionDenied: If the user is neither the board owner nor a member.
         """
         list_id = self.kwargs.get('list_id')
-        list_obj = List.objects.get(id=list_id)
+        list_obj = get_object_or_404(List, id=list_id)
         if list_obj.board.owner != self.request.user and not list_obj.board.members.filter(id=self.request.user.id).exists():
             raise PermissionDenied("You don't have permission to create tasks in this list.")
-        serializer.save(list=list_obj)
-
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+        task = serializer.save(list=list_obj)
+        assigned = [user.pk for user in serializer.validated_data.get('assigned_users', [])]
+        if assigned:
+            notify(Notification.TASK_ASSIGNED, assigned, actor=self.request.user, board_id=list_obj.board_id, task_id=task.pk)
+
+class TaskDetailView(
+    ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API view for retrieving, updating, or deleting a specific task.
 
     Restricts access to tasks within a list where the user is the board owner or a member.
-    Supports GET, PUT/PATCH, and DELETE methods.
+    Supports GET, PUT/PATCH, and DELETE methods. DELETE hides the task, which is purged in the
+    background later (see core.softdelete).
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 6, 'PUT': 13, 'PATCH': 13, 'DELETE': 7}
+    last_modified_covers_payload = True
 
     def get_queryset(self):
         """
@@ -138,9 +260,33 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         list_id = self.kwargs.get('list_id')
         return Task.objects.filter(list__id=list_id).filter(
             Q(list__board__owner=self.request.user) | Q(list__board__members=self.request.user)
-        )
+        ).distinct().prefetch_related('assigned_users', 'labels')
+
+    def perform_update(self, serializer):
+        """
+        Saves the task and notifies the users newly assigned to it.
+
+        Args:
+            serializer: The serializer instance with validated data.
+        """
+        # Prefetched by get_queryset(), so this costs no query
+        before = {user.pk for user in serializer.instance.assigned_users.all()}
+        task = serializer.save()
+        if 'assigned_users' in serializer.validated_data:
+            added = {user.pk for user in serializer.validated_data['assigned_users']} - before
+            if added:
+                notify(Notification.TASK_ASSIGNED, added, actor=self.request.user, task_id=task.pk)
+
+    def perform_destroy(self, instance):
+        """
+        Marks the task as deleted.
 
-class TaskMoveView(generics.UpdateAPIView):
+        Args:
+            instance (Task): The task to delete.
+        """
+        soft_delete(instance)
+
+class TaskMoveView(ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.UpdateAPIView):
     """
     API view for moving a task to a different list or updating its order.
 
@@ -149,6 +295,7 @@ class TaskMoveView(generics.UpdateAPIView):
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'PUT': 14, 'PATCH': 14}
 
     def get_queryset(self):
         """
@@ -159,27 +306,279 @@ class TaskMoveView(generics.UpdateAPIView):
         """
         return Task.objects.filter(
             Q(list__board__owner=self.request.user) | Q(list__board__members=self.request.user)
-        )
+        ).distinct().prefetch_related('assigned_users', 'labels')
 
     def perform_update(self, serializer):
         """
         Custom update logic for moving a task or updating its order.
 
         Validates that the user has permission to move the task to the new list (if provided).
-        Updates the task's list and/or order based on the request data.
+        Updates the task's list and/or order based on the request data in a single save.
+        Labels belong to a board, so a task moved to another board loses them.
 
         Args:
             serializer: The serializer instance with validated data.
 
         Raises:
+            Http404: If the target list does not exist or is deleted.
             PermissionDenied: If the user is neither the board owner nor a member of the target list's board.
         """
         new_list_id = self.request.data.get('list_id')
         new_order = self.request.data.get('order')
+        changes = {}
         if new_list_id:
-            new_list = List.objects.get(id=new_list_id)
+            new_list = get_object_or_404(List, id=new_list_id)
             if new_list.board.owner != self.request.user and not new_list.board.members.filter(id=self.request.user.id).exists():
                 raise PermissionDenied("You don't have permission to move tasks to this list.")
-            serializer.save(list=new_list)
+            changes['list'] = new_list
         if new_order is not None:
-            serializer.save(order=new_order)
\ No newline at end of file
+            changes['order'] = new_order
+        if changes:
+            task = serializer.save(**changes)
+            if 'list' in changes:
+                task.task_labels.exclude(label__board_id=task.list.board_id).delete()
+
+
+class LabelListCreateView(ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
+    """
+    API view for listing and creating the labels of a board.
+
+    Handles GET requests to list the labels of a board where the user is the owner or a member,
+    and POST requests to create new labels on it.
+    """
+    serializer_class = LabelSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5, 'POST': 9}
+
+    def get_queryset(self):
+        """
+        Filters queryset to the labels of a specific board where the user is the owner or a member.
+
+        Returns:
+            QuerySet: Labels accessible to the requesting user for the specified board, by name.
+        """
+        return Label.objects.filter(
+            board__id=self.kwargs.get('board_id'), board__in=accessible_boards(self.request.user)
+        ).order_by('name', 'id')
+
+    def perform_create(self, serializer):
+        """
+        Custom creation logic for labels.
+
+        Ensures the user is the board owner or a member before creating a label.
+        Associates the label with the specified board.
+
+        Args:
+            serializer: The serializer instance with validated data.
+
+        Raises:
+            PermissionDenied: If the user is neither the board owner nor a member.
+        """
+        board = get_object_or_404(Board, id=self.kwargs.get('board_id'))
+        if board.owner != self.request.user and not board.members.filter(id=self.request.user.id).exists():
+            raise PermissionDenied("You don't have permission to create labels in this board.")
+        serializer.save(board=board)
+
+class LabelDetailView(
+    ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    """
+    API view for retrieving, updating, or deleting a label of a board.
+
+    Restricts access to labels of a board where the user is the owner or a member.
+    Supports GET, PUT/PATCH, and DELETE methods.
+    """
+    serializer_class = LabelSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 4, 'PUT': 8, 'PATCH': 8, 'DELETE': 9}
+    last_modified_covers_payload = True
+
+    def get_queryset(self):
+        """
+        Filters queryset to the labels of a specific board where the user is the owner or a member.
+
+        Returns:
+            QuerySet: Labels accessible to the requesting user for the specified board.
+        """
+        return Label.objects.filter(
+            board__id=self.kwargs.get('board_id'), board__in=accessible_boards(self.request.user)
+        )
+
+    def perform_destroy(self, instance):
+        """
+        Deletes the label, after touching the tasks carrying it.
+
+        The cascade removes the label from its tasks without saving them, so their updated_at
+        (and thus the ETags of the task lists) would not change.
+
+        Args:
+            instance (Label): The label to delete.
+        """
+        Task.objects.filter(task_labels__label=instance).update(updated_at=timezone.now())
+        instance.delete()
+
+class LabelBulkView(AtomicWriteMixin, SerializerTimingMixin, generics.GenericAPIView):
+    """
+    API view for applying labels to, or removing them from, many tasks of a board at once.
+
+    Handles POST requests with an action ('apply' or 'remove'), label ids and task ids. The
+    change takes a few queries whatever the number of tasks: one bulk INSERT that skips the
+    labels a task already carries, or one DELETE, and one UPDATE of the tasks' updated_at.
+    """
+    serializer_class = LabelBulkSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 11}
+
+    def post(self, request, board_id):
+        """
+        Applies or removes the labels.
+
+        Args:
+            request: The request, with the action, labels and tasks in its body.
+            board_id (int): The board of the labels and tasks.
+
+        Returns:
+            Response: The action, the label and task ids, and the number of labels added to
+            or removed from tasks.
+
+        Raises:
+            Http404: If the board does not exist or the user is neither its owner nor a member.
+            ValidationError: If the body is invalid, or a label or task is not on the board.
+        """
+        get_object_or_404(Board.objects.filter(pk__in=accessible_boards(request.user)), pk=board_id)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action, labels, tasks = (serializer.validated_data[name] for name in ('action', 'labels', 'tasks'))
+
+        applied = TaskLabel.objects.filter(task_id__in=tasks, label_id__in=labels)
+        if action == 'apply':
+            before = applied.count()
+            TaskLabel.objects.bulk_create(
+                [TaskLabel(task_id=task_id, label_id=label_id) for task_id in tasks for label_id in labels],
+                ignore_conflicts=True,
+            )
+            changed = applied.count() - before
+        else:
+            changed, _ = applied.delete()
+        if changed:
+            Task.objects.filter(pk__in=tasks).update(updated_at=timezone.now())
+        return Response({'action': action, 'labels': labels, 'tasks': tasks, 'changed': changed})
+
+
+class ChecklistItemListCreateView(
+    ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView
+):
+    """
+    API view for listing and creating the checklist items of a task.
+
+    Handles GET requests to list the items of a task on a board where the user is the owner or a member,
+    and POST requests to add items to it. Adding an item increments the task's checklist counters.
+    """
+    serializer_class = ChecklistItemSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 4, 'POST': 9}
+
+    def get_queryset(self):
+        """
+        Filters queryset to the checklist items of a specific task where the user is the board owner or a member.
+
+        Returns:
+            QuerySet: The items of the task, in order.
+        """
+        return ChecklistItem.objects.filter(
+            task__id=self.kwargs.get('task_id'),
+            task__list__id=self.kwargs.get('list_id'),
+            task__list__board__in=accessible_boards(self.request.user),
+        ).order_by('order', 'id')
+
+    def perform_create(self, serializer):
+        """
+        Adds the item to the task and increments the task's checklist counters.
+
+        Args:
+            serializer: The serializer instance with validated data.
+
+        Raises:
+            Http404: If the task does not exist or the user is neither the board owner nor a member.
+        """
+        task = get_object_or_404(
+            Task.objects.only('id'),
+            id=self.kwargs.get('task_id'),
+            list__id=self.kwargs.get('list_id'),
+            list__board__in=accessible_boards(self.request.user),
+        )
+        item = serializer.save(task=task)
+        adjust_checklist_counts(task.id, total=1, done=int(item.done))
+
+class ChecklistItemDetailView(
+    ConditionalRequestMixin, AtomicWriteMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    """
+    API view for retrieving, updating (e.g. ticking off), or deleting a checklist item.
+
+    Restricts access to items of tasks on a board where the user is the owner or a member.
+    Toggling or deleting an item adjusts the task's checklist counters.
+    """
+    serializer_class = ChecklistItemSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 4, 'PUT': 8, 'PATCH': 8, 'DELETE': 8}
+    last_modified_covers_payload = True
+
+    def get_queryset(self):
+        """
+        Filters queryset to the checklist items of a specific task where the user is the board owner or a member.
+
+        Writes lock the item row (on databases supporting SELECT ... FOR UPDATE), so the
+        counters are adjusted from its current state.
+
+        Returns:
+            QuerySet: The items of the task.
+        """
+        queryset = ChecklistItem.objects.filter(
+            task__id=self.kwargs.get('task_id'),
+            task__list__id=self.kwargs.get('list_id'),
+            task__list__board__in=accessible_boards(self.request.user),
+        )
+        if self.request.method not in SAFE_METHODS:
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def perform_update(self, serializer):
+        """
+        Saves the item and adjusts the task's done counter if it was ticked or unticked.
+
+        Args:
+            serializer: The serializer instance with validated data.
+        """
+        was_done = serializer.instance.done
+        item = serializer.save()
+        if item.done != was_done:
+            adjust_checklist_counts(item.task_id, done=1 if item.done else -1)
+
+    def perform_destroy(self, instance):
+        """
+        Deletes the item and decrements the task's checklist counters.
+
+        Args:
+            instance (ChecklistItem): The item to delete.
+        """
+        instance.delete()
+        adjust_checklist_counts(instance.task_id, total=-1, done=-int(instance.done))
+
+
+class ListListAsyncView(AsyncReadView):
+    """
+    Async version of the lists of a board with their tasks (GET of ListListCreateView) for ASGI.
+    """
+    query_budget = 7
+
+    async def get_data(self, request, user, board_id=None, **kwargs):
+        """
+        Returns the lists of the board with their tasks, if the user owns it or is a member of it.
+
+        Raises:
+            ValidationError: If a task filter parameter is unknown or invalid.
+        """
+        queryset = board_lists(user, board_id, task_filters(request))
+        lists = [list_obj async for list_obj in queryset.aiterator(chunk_size=self.chunk_size)]
+        return ListSerializer(lists, many=True).data
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .models import Notification
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the Notification model.
+
+    This class customizes the Django admin interface for the Notification model,
+    defining how notifications are displayed, filtered, and searched in the admin panel.
+    """
+    list_display = ('recipient', 'kind', 'board', 'read_at', 'created_at')
+    list_filter = ('kind', 'created_at')
+    search_fields = ('recipient__username', 'board__title')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at',)
+    raw_id_fields = ('recipient', 'actor', 'board', 'task', 'invitation')
+
+    def get_queryset(self, request):
+        """
+        Customize the queryset to optimize database queries.
+
+        Returns:
+            Queryset: A queryset with the recipient and board selected to reduce database hits.
+        """
+        return super().get_queryset(request).select_related('recipient', 'board')
@@ -0,0 +1,129 @@
+"""
+Digest emails of notifications.
+
+Instead of one email per event, the notifications a user has not read yet are summed up in
+one email per user and period (daily, at NOTIFICATION_DIGEST_HOUR, see trello.celery). A
+notification waits for a digest until digested_at is set, so a missed or repeated run
+neither loses nor repeats notifications; the ones read in the app meanwhile are left out.
+
+The recipients are streamed in (preferred_language, id) order with QuerySet.iterator(), so
+memory does not grow with the number of users: each chunk of users is fetched with its
+pending notifications in two queries, its emails are sent over one SMTP connection shared
+by the whole run, and the chunk's notifications are marked in one UPDATE. Users are grouped
+by language, so each translation catalog is activated once per run.
+"""
+
+from itertools import groupby, islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef, Prefetch
+from django.utils import timezone, translation
+from django.utils.translation import gettext as _, ngettext
+
+from .models import Notification
+from .serializers import notification_message
+
+# Invitations are emailed on their own (invitations.tasks), all other events in the digest
+DIGEST_KINDS = [kind for kind, _label in Notification.KIND_CHOICES if kind != Notification.INVITATION_CREATED]
+
+
+def pending_notifications(cutoff):
+    """
+    Returns the notifications waiting for a digest, created up to cutoff.
+    """
+    return Notification.objects.filter(digested_at__isnull=True, kind__in=DIGEST_KINDS, created_at__lte=cutoff)
+
+
+def digest_recipients(cutoff, chunk_size):
+    """
+    Streams the users with notifications waiting for a digest, grouped by language.
+
+    Args:
+        cutoff (datetime): Only notifications created up to this moment are considered.
+        chunk_size (int): Users fetched (with their notifications) per round trip.
+
+    Returns:
+        iterator: Users ordered by preferred_language and id, each with the unread
+        notifications of its digest in `digest_notifications`, oldest first.
+    """
+    pending = pending_notifications(cutoff)
+    unread = pending.filter(read_at__isnull=True).select_related('actor', 'board', 'task').order_by('id')
+    return (
+        get_user_model().objects
+        .filter(Exists(pending.filter(recipient=OuterRef('pk'))))
+        .order_by('preferred_language', 'id')
+        .only('id', 'username', 'name', 'email', 'preferred_language')
+        .prefetch_related(Prefetch('notifications', queryset=unread, to_attr='digest_notifications'))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def build_digest_email(user, notifications):
+    """
+    Renders the digest email of a user in the active language.
+
+    Args:
+        user: The recipient.
+        notifications (list): The notifications to sum up, oldest first.
+
+    Returns:
+        EmailMessage: The email, not sent.
+    """
+    count = len(notifications)
+    subject = ngettext(
+        '%(count)d new notification on Modern Trello', '%(count)d new notifications on Modern Trello', count
+    ) % {'count': count}
+    lines = '\n'.join(f'- {notification_message(notification)}' for notification in notifications)
+    message = _(
+        "Hello {user_name},\n\n"
+        "Here is what happened on your boards:\n\n"
+        "{lines}\n\n"
+        "Log in to see the details.\n\n"
+        "Best regards,\nModern Trello Team"
+    ).format(user_name=user.name or user.username, lines=lines)
+    return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+def send_digests(cutoff=None, chunk_size=None, dry_run=False):
+    """
+    Sends the digest email of every user with unread notifications waiting for a digest.
+
+    Args:
+        cutoff (datetime): Only notifications created up to this moment are sent; now by default.
+        chunk_size (int): Users per chunk; settings.NOTIFICATION_DIGEST_CHUNK_SIZE by default.
+        dry_run (bool): Whether to only render the emails, without sending them or marking
+            the notifications.
+
+    Returns:
+        dict: The number of users considered, emails sent (or rendered) and languages.
+    """
+    cutoff = cutoff or timezone.now()
+    chunk_size = chunk_size or settings.NOTIFICATION_DIGEST_CHUNK_SIZE
+    stats = {'users': 0, 'emails': 0, 'languages': 0}
+    connection = None if dry_run else get_connection()
+    try:
+        users = digest_recipients(cutoff, chunk_size)
+        for language, group in groupby(users, key=attrgetter('preferred_language')):
+            stats['languages'] += 1
+            with translation.override(language):
+                while chunk := list(islice(group, chunk_size)):
+                    emails = [
+                        build_digest_email(user, user.digest_notifications)
+                        for user in chunk if user.digest_notifications
+                    ]
+                    stats['users'] += len(chunk)
+                    stats['emails'] += len(emails)
+                    if dry_run:
+                        continue
+                    connection.send_messages(emails)
+                    # Read notifications are marked too: they are not worth an email any more
+                    pending_notifications(cutoff).filter(recipient_id__in=[user.pk for user in chunk]).update(
+                        digested_at=timezone.now()
+                    )
+    finally:
+        if connection is not None:
+            connection.close()
+    return stats
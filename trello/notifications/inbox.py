@@ -0,0 +1,124 @@
+"""
+Fan-out and unread counters of notifications.
+
+Notifications are fanned out on write: an event enqueues notifications.tasks.fan_out_notification
+once the transaction that caused it commits, and the worker inserts one row per recipient
+in a single bulk INSERT. The inbox is then a plain index read per user.
+
+The unread count of each user is cached (settings.CACHES, shared by the web and worker
+processes in production) and changed with cache.incr() when notifications are created,
+read or deleted. A count that is not cached is computed from the partial index of unread
+rows and cached for NOTIFICATION_UNREAD_CACHE_SECONDS, which also bounds how long a
+missed increment can show.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.routers import tenant_database
+from .models import Notification
+
+
+def unread_cache_key(user_id):
+    """
+    Returns the cache key of the unread count of a user.
+    """
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    """
+    Returns the number of unread notifications of a user, from the cache if possible.
+
+    Args:
+        user_id (int): The user.
+
+    Returns:
+        int: The unread count.
+    """
+    key = unread_cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, read_at__isnull=True).count()
+        # add() rather than set(): a counter cached meanwhile has seen later changes
+        cache.add(key, count, settings.NOTIFICATION_UNREAD_CACHE_SECONDS)
+    return count
+
+
+def change_unread_counts(deltas):
+    """
+    Adds to the cached unread counts of users.
+
+    Counts that are not cached are left alone; they are computed on their next read.
+
+    Args:
+        deltas (dict): {user id: number of notifications that became unread (positive) or read (negative)}
+    """
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(unread_cache_key(user_id), delta)
+        except ValueError:
+            pass  # Not cached
+
+
+def create_notifications(kind, recipient_ids, actor_id=None, board_id=None, task_id=None, invitation_id=None):
+    """
+    Inserts one notification per recipient and counts them as unread once committed.
+
+    The actor is not notified of their own action.
+
+    Args:
+        kind (str): One of Notification.KIND_CHOICES.
+        recipient_ids (iterable): The users to notify.
+        actor_id (int): The user who caused the event, if any.
+        board_id, task_id, invitation_id (int): The objects of the event, if any.
+
+    Returns:
+        int: The number of notifications created.
+    """
+    notifications = [
+        Notification(
+            recipient_id=recipient_id, kind=kind, actor_id=actor_id,
+            board_id=board_id, task_id=task_id, invitation_id=invitation_id,
+        )
+        for recipient_id in sorted(set(recipient_ids) - {actor_id})
+    ]
+    Notification.objects.bulk_create(notifications)
+    transaction.on_commit(lambda: change_unread_counts({n.recipient_id: 1 for n in notifications}))
+    return len(notifications)
+
+
+def notify(kind, recipient_ids=None, actor=None, board_id=None, task_id=None, invitation_id=None):
+    """
+    Enqueues the fan-out of an event once the current transaction commits.
+
+    The transaction is the one of the active workspace's database, which the worker reads
+    the board from.
+
+    A notification is a side effect: if the broker cannot be reached, the error is logged
+    and the request that caused the event still succeeds.
+
+    Args:
+        kind (str): One of Notification.KIND_CHOICES.
+        recipient_ids (iterable): The users to notify, or None for the owner and the members
+            of the board.
+        actor: The user who caused the event, if any.
+        board_id, task_id, invitation_id (int): The objects of the event, if any. Without
+            a board, the board of the task is used.
+    """
+    # Imported here: loads the Celery app, which only writing views need
+    from .tasks import fan_out_notification
+
+    payload = {
+        'kind': kind,
+        'recipient_ids': sorted(recipient_ids) if recipient_ids is not None else None,
+        'actor_id': actor.pk if actor is not None else None,
+        'board_id': board_id,
+        'task_id': task_id,
+        'invitation_id': invitation_id,
+        'database': tenant_database(),
+    }
+    transaction.on_commit(lambda: fan_out_notification.delay(**payload), using=payload['database'], robust=True)
@@ -0,0 +1,25 @@
+"""
+Sends the digest emails of the notifications waiting for one, as the daily beat task does.
+
+Useful to send a digest missed while the beat or the workers were down, or with --dry-run
+to see how many users and emails the next digest would cover.
+"""
+
+from django.core.management.base import BaseCommand
+
+from notifications.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Emails each user a digest of the unread notifications created since the last digest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='Users per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Only render the emails, send nothing')
+
+    def handle(self, *args, **options):
+        stats = send_digests(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        verb = 'Rendered' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['emails']} digest(s) to {stats['users']} user(s) in {stats['languages']} language(s)."
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('boards', '0003_board_members_alter_board_owner'),
+        ('invitations', '0001_initial'),
+        ('lists', '0005_checklists'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('invitation_created', 'Invitation created'), ('invitation_accepted', 'Invitation accepted'), ('invitation_rejected', 'Invitation rejected'), ('task_assigned', 'Task assigned'), ('task_due_soon', 'Task due soon')], max_length=30)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('board', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='boards.board')),
+                ('invitation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='invitations.invitation')),
+                ('recipient', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='lists.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recipient', '-id'], name='notification_inbox_idx'), models.Index(condition=models.Q(('read_at__isnull', True)), fields=['recipient'], name='notification_unread_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('kind', 'task_due_soon')), fields=('recipient', 'task'), name='notification_due_soon_unique')],
+            },
+        ),
+    ]
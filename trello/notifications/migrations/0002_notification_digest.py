@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_members_alter_board_owner'),
+        ('invitations', '0001_initial'),
+        ('lists', '0005_checklists'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='digested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('digested_at__isnull', True)), fields=['recipient'], name='notification_undigested_idx'),
+        ),
+    ]
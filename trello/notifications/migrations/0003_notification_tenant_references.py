@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0004_board_workspace'),
+        ('invitations', '0001_initial'),
+        ('lists', '0005_checklists'),
+        ('notifications', '0002_notification_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='board',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='boards.board'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='invitation',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='invitations.invitation'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='task',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='lists.task'),
+        ),
+    ]
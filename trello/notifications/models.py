@@ -0,0 +1,96 @@
+"""
+Django model for an in-app Notification.
+
+This module defines the Notification model: one row per recipient and event, written in
+bulk by the fan-out task of notifications.tasks, read from the recipient's inbox and
+summed up in the recipient's digest email.
+"""
+
+from django.db import models
+from django.conf import settings
+
+class Notification(models.Model):
+    """
+    Represents a notification in the inbox of a user.
+
+    Attributes:
+        recipient (ForeignKey): The user whose inbox the notification is in.
+                               Notifications are removed if the user is deleted (CASCADE).
+        kind (CharField): The event, one of KIND_CHOICES.
+        actor (ForeignKey): The user who caused the event, if any. Kept as null if that user is deleted.
+        board (ForeignKey): The board of the event, if any.
+        task (ForeignKey): The task of the event, if any.
+        invitation (ForeignKey): The invitation of the event, if any.
+        read_at (DateTimeField): When the recipient read the notification, null while unread.
+        digested_at (DateTimeField): When the notification was handled by the digest emails,
+                                    null while it is waiting for the next digest.
+        created_at (DateTimeField): Timestamp when the notification was created, set automatically on creation.
+    """
+    INVITATION_CREATED = 'invitation_created'
+    INVITATION_ACCEPTED = 'invitation_accepted'
+    INVITATION_REJECTED = 'invitation_rejected'
+    TASK_ASSIGNED = 'task_assigned'
+    TASK_DUE_SOON = 'task_due_soon'
+    KIND_CHOICES = [
+        (INVITATION_CREATED, 'Invitation created'),
+        (INVITATION_ACCEPTED, 'Invitation accepted'),
+        (INVITATION_REJECTED, 'Invitation rejected'),
+        (TASK_ASSIGNED, 'Task assigned'),
+        (TASK_DUE_SOON, 'Task due soon'),
+    ]
+
+    # Indexed by the composite indexes below, which all start with the recipient
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications', db_index=False
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Without a constraint: the board, task or invitation may live in a workspace database
+    board = models.ForeignKey(
+        'boards.Board', on_delete=models.CASCADE, null=True, blank=True, related_name='+', db_constraint=False
+    )
+    task = models.ForeignKey(
+        'lists.Task', on_delete=models.CASCADE, null=True, blank=True, related_name='+', db_constraint=False
+    )
+    invitation = models.ForeignKey(
+        'invitations.Invitation', on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+        db_constraint=False,
+    )
+    read_at = models.DateTimeField(null=True, blank=True)
+    digested_at = models.DateTimeField(null=True, blank=True)
+    # Indexed for the retention job, which deletes by age
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        """
+        Meta class for Notification.
+
+        The inbox is read newest first by recipient, and the unread count of a recipient
+        (when it is not cached) only reads the partial index of unread rows, as the digest
+        emails read the rows waiting for a digest. A task is announced as due soon once per
+        assigned user.
+        """
+        indexes = [
+            models.Index(fields=['recipient', '-id'], name='notification_inbox_idx'),
+            models.Index(
+                fields=['recipient'], condition=models.Q(read_at__isnull=True), name='notification_unread_idx'
+            ),
+            models.Index(
+                fields=['recipient'], condition=models.Q(digested_at__isnull=True), name='notification_undigested_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'task'], condition=models.Q(kind='task_due_soon'),
+                name='notification_due_soon_unique',
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns the string representation of the Notification instance.
+
+        Returns:
+            str: The kind of the notification and its recipient.
+        """
+        return f"{self.get_kind_display()} for {self.recipient}"
@@ -0,0 +1,85 @@
+"""
+Django REST Framework serializers for the Notification model.
+
+This module defines the serializer of inbox entries, which renders the message of each
+notification in the active language (also used by the digest emails), and the body of the
+mark-all-read operation.
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from .models import Notification
+
+# Message of each kind; {actor}, {board} and {task} are the names of the related objects
+MESSAGES = {
+    Notification.INVITATION_CREATED: _("{actor} invited you to join the board '{board}'."),
+    Notification.INVITATION_ACCEPTED: _("{actor} joined the board '{board}'."),
+    Notification.INVITATION_REJECTED: _("{actor} declined the invitation to the board '{board}'."),
+    Notification.TASK_ASSIGNED: _("{actor} assigned you to the task '{task}' on '{board}'."),
+    Notification.TASK_DUE_SOON: _("The task '{task}' on '{board}' is due soon."),
+}
+
+
+def notification_message(notification):
+    """
+    Returns the message of a notification in the active language.
+
+    Args:
+        notification (Notification): The notification, with its actor, board and task selected.
+
+    Returns:
+        str: The message.
+    """
+    actor = notification.actor
+    return MESSAGES[notification.kind].format(
+        actor=(actor.name or actor.username) if actor else _('Someone'),
+        board=notification.board.title if notification.board else '',
+        task=notification.task.title if notification.task else '',
+    )
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Notification model.
+
+    Converts Notification model instances to JSON. The actor, board and task must be
+    selected with the notification (see views.inbox()).
+
+    Attributes:
+        message (SerializerMethodField): The translated message of the notification.
+        read (SerializerMethodField): Whether the notification was read.
+    """
+    message = serializers.SerializerMethodField()
+    read = serializers.SerializerMethodField()
+
+    class Meta:
+        """
+        Meta class for NotificationSerializer.
+
+        Defines the model to serialize and fields to include; all of them are read-only.
+        """
+        model = Notification
+        fields = ['id', 'kind', 'message', 'actor', 'board', 'task', 'invitation', 'read', 'read_at', 'created_at']
+        read_only_fields = fields
+
+    def get_message(self, notification):
+        """
+        Returns the message of the notification in the active language.
+        """
+        return notification_message(notification)
+
+    def get_read(self, notification):
+        """
+        Returns whether the notification was read.
+        """
+        return notification.read_at is not None
+
+class MarkAllReadSerializer(serializers.Serializer):
+    """
+    Serializer for the body of the mark-all-read operation.
+
+    Attributes:
+        up_to (IntegerField): Only mark the notifications up to this id, e.g. the newest one
+                             the client has shown, so ones that arrived since stay unread.
+    """
+    up_to = serializers.IntegerField(required=False, min_value=1)
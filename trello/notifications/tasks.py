@@ -0,0 +1,157 @@
+"""
+Celery tasks of the notification inbox.
+
+This module defines the fan-out of an event to its recipients, the periodic announcement of
+tasks that are due soon, the daily digest emails, and the retention job deleting old
+notifications in batches. The periodic tasks are scheduled by CELERY_BEAT_SCHEDULE (the
+digests in trello.celery).
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from trello.celery import app
+from boards.models import Board
+from core.routers import using_tenant_database
+from lists.models import Task
+from .digest import send_digests
+from .inbox import change_unread_counts, create_notifications
+from .models import Notification
+
+@app.task
+def fan_out_notification(
+    kind, recipient_ids=None, actor_id=None, board_id=None, task_id=None, invitation_id=None, database=None,
+):
+    """
+    Creates the notifications of an event, one row per recipient in one bulk INSERT.
+
+    Args:
+        kind (str): One of Notification.KIND_CHOICES.
+        recipient_ids (list): The users to notify, or None for the owner and the members of the board.
+        actor_id (int): The user who caused the event, who is not notified.
+        board_id, task_id, invitation_id (int): The objects of the event, if any.
+        database (str): The database of the board's workspace.
+
+    Returns:
+        int: The number of notifications created.
+    """
+    with using_tenant_database(database):
+        if board_id is None and task_id is not None:
+            board_id = Task.objects.filter(pk=task_id).values_list('list__board_id', flat=True).first()
+        if recipient_ids is None:
+            owner_id = Board.objects.filter(pk=board_id).values_list('owner_id', flat=True).first()
+            if owner_id is None:
+                return 0  # The board was deleted meanwhile
+            members = Board.members.through.objects.filter(board_id=board_id).values_list('user_id', flat=True)
+            recipient_ids = [owner_id, *members]
+    with transaction.atomic():
+        return create_notifications(kind, recipient_ids, actor_id, board_id, task_id, invitation_id)
+
+def due_soon_notifications(database, now):
+    """
+    Returns the due soon notifications to create for the tasks of one database.
+
+    Args:
+        database (str): 'default' or a workspace database.
+        now (datetime): The current time.
+
+    Returns:
+        list: The unsaved notifications, one per assigned user not notified yet, of the tasks
+        that are not deleted.
+    """
+    assignments = Task.assigned_users.through.objects.using(database).filter(
+        Task.objects.live_filter(prefix='task__'),
+        task__due_date__gt=now,
+        task__due_date__lte=now + timedelta(hours=settings.NOTIFICATION_DUE_SOON_HOURS),
+    )
+    notified = Notification.objects.filter(kind=Notification.TASK_DUE_SOON)
+    if database == DEFAULT_DB_ALIAS:
+        assignments = assignments.exclude(Exists(notified.filter(
+            recipient_id=OuterRef('user_id'), task_id=OuterRef('task_id'),
+        )))
+    rows = list(assignments.values_list('user_id', 'task_id', 'task__list__board_id').iterator(chunk_size=2000))
+    if database != DEFAULT_DB_ALIAS:
+        # The notifications are on the default database: look the pairs up there, in chunks
+        pairs = set()
+        for start in range(0, len(rows), 500):
+            chunk = rows[start:start + 500]
+            pairs.update(notified.filter(
+                recipient_id__in={user_id for user_id, _, _ in chunk}, task_id__in={task_id for _, task_id, _ in chunk},
+            ).values_list('recipient_id', 'task_id'))
+        rows = [row for row in rows if row[:2] not in pairs]
+    return [
+        Notification(recipient_id=user_id, kind=Notification.TASK_DUE_SOON, task_id=task_id, board_id=board_id)
+        for user_id, task_id, board_id in rows
+    ]
+
+@app.task
+def notify_due_soon_tasks():
+    """
+    Notifies the assigned users of the tasks due within NOTIFICATION_DUE_SOON_HOURS.
+
+    Each task is announced once per assigned user: the pairs already notified are skipped,
+    and the partial unique index of due soon notifications rejects the pairs a concurrent
+    run inserted meanwhile, after which they are looked up again. Only the inserted
+    notifications are counted as unread. The tasks of the workspace databases are included.
+
+    Returns:
+        int: The number of notifications created.
+    """
+    now = timezone.now()
+
+    def pending():
+        return [
+            notification
+            for database in [DEFAULT_DB_ALIAS, *settings.WORKSPACE_DATABASES]
+            for notification in due_soon_notifications(database, now)
+        ]
+
+    notifications = pending()
+    try:
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=1000)
+    except IntegrityError:
+        # A concurrent run announced some of the tasks first
+        notifications = pending()
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=1000)
+    change_unread_counts(Counter(n.recipient_id for n in notifications))
+    return len(notifications)
+
+@app.task
+def send_daily_digests():
+    """
+    Emails each user a digest of the unread notifications created since the last digest.
+
+    Returns:
+        dict: The number of users, emails and languages, see send_digests().
+    """
+    return send_digests()
+
+@app.task
+def purge_old_notifications():
+    """
+    Deletes the notifications older than NOTIFICATION_RETENTION_DAYS.
+
+    Rows are deleted oldest first in batches of NOTIFICATION_PURGE_BATCH_SIZE, each in its
+    own short transaction, so the write lock is never held for long.
+
+    Returns:
+        int: The number of notifications deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    old = Notification.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id')
+    deleted = 0
+    while True:
+        batch = list(old.values_list('id', 'recipient_id', 'read_at')[:settings.NOTIFICATION_PURGE_BATCH_SIZE])
+        if not batch:
+            return deleted
+        with transaction.atomic():
+            Notification.objects.filter(id__in=[row[0] for row in batch]).delete()
+        unread = Counter(recipient_id for _, recipient_id, read_at in batch if read_at is None)
+        change_unread_counts({recipient_id: -count for recipient_id, count in unread.items()})
+        deleted += len(batch)
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from boards.models import Board
+from core.querybudget import query_budget
+from lists.models import List, Task
+from workspaces.tenancy import personal_workspace
+from .inbox import change_unread_counts, create_notifications
+from .models import Notification
+from .tasks import due_soon_notifications, notify_due_soon_tasks
+from .views import NotificationListView, NotificationMarkAllReadView, NotificationReadView, NotificationUnreadCountView
+
+User = get_user_model()
+
+
+class NotificationTests(APITestCase):
+    """
+    The inbox, and its unread count kept in the cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.actor = User.objects.create_user(username='bob', email='bob@example.com', password='secret')
+        self.board = Board.objects.create(title='Roadmap', owner=self.actor, workspace=personal_workspace(self.actor))
+        self.client.force_authenticate(self.user)
+
+    def notify(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(count):
+                create_notifications(
+                    Notification.INVITATION_CREATED, [self.user.pk, self.actor.pk], actor_id=self.actor.pk,
+                    board_id=self.board.pk,
+                )
+
+    def unread(self):
+        with query_budget(view=NotificationUnreadCountView):
+            return self.client.get('/notifications/unread-count/').data['unread']
+
+    def test_inbox_stays_within_its_budget(self):
+        self.notify(10)
+        with query_budget(view=NotificationListView):
+            response = self.client.get('/notifications/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 10)
+        # The actor is not notified of their own action
+        self.assertFalse(Notification.objects.filter(recipient=self.actor).exists())
+
+    def test_unread_count_follows_the_notifications(self):
+        self.assertEqual(self.unread(), 0)
+        self.notify(3)
+        self.assertEqual(self.unread(), 3)
+
+        notification = Notification.objects.filter(recipient=self.user).first()
+        with self.captureOnCommitCallbacks(execute=True), query_budget(view=NotificationReadView, method='POST'):
+            self.client.post(f'/notifications/{notification.pk}/read/')
+        self.assertEqual(self.unread(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True), query_budget(view=NotificationMarkAllReadView, method='POST'):
+            response = self.client.post('/notifications/mark-all-read/')
+        self.assertEqual(response.data['marked_read'], 2)
+        self.assertEqual(self.unread(), 0)
+
+    def test_notifications_of_other_users_are_not_read(self):
+        self.notify(1)
+        notification = Notification.objects.get(recipient=self.user)
+        self.client.force_authenticate(self.actor)
+        self.assertEqual(self.client.post(f'/notifications/{notification.pk}/read/').status_code, 404)
+
+    @override_settings(WORKSPACE_DATABASES=[])
+    def test_due_soon_tasks_are_counted_once(self):
+        todo = List.objects.create(board=self.board, title='To do')
+        task = Task.objects.create(list=todo, title='Ship it', due_date=timezone.now() + timedelta(hours=1))
+        task.assigned_users.add(self.user)
+        self.assertEqual(self.unread(), 0)
+
+        # A concurrent run announces the task between the lookup and the insert of this one
+        stale = due_soon_notifications(DEFAULT_DB_ALIAS, timezone.now())
+        Notification.objects.create(recipient=self.user, kind=Notification.TASK_DUE_SOON, task=task, board=self.board)
+        change_unread_counts({self.user.pk: 1})
+        with mock.patch('notifications.tasks.due_soon_notifications', side_effect=[stale, []]):
+            self.assertEqual(notify_due_soon_tasks(), 0)
+        self.assertEqual(self.unread(), 1)
+
+        self.assertEqual(notify_due_soon_tasks(), 0)
+        self.assertEqual(self.unread(), 1)
@@ -0,0 +1,16 @@
+"""
+URL configuration for the notification inbox.
+
+This module defines the URL patterns of the notification application, mapping API endpoints
+to their views for listing notifications, reading the unread count and marking notifications as read.
+"""
+
+from django.urls import path
+from .views import NotificationListView, NotificationUnreadCountView, NotificationReadView, NotificationMarkAllReadView
+
+urlpatterns = [
+    path('', NotificationListView.as_view(), name='notification-list'),  # Endpoint for the paginated inbox of the user
+    path('unread-count/', NotificationUnreadCountView.as_view(), name='notification-unread-count'),  # Endpoint for the cached unread count
+    path('mark-all-read/', NotificationMarkAllReadView.as_view(), name='notification-mark-all-read'),  # Endpoint for marking all notifications as read
+    path('<int:pk>/read/', NotificationReadView.as_view(), name='notification-read'),  # Endpoint for marking one notification as read
+]
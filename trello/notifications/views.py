@@ -0,0 +1,149 @@
+"""
+Django REST Framework views for the notification inbox.
+
+This module defines the inbox of the requesting user (newest first, cursor-paginated), its
+unread count served from the cache, and the operations marking one or all notifications
+as read, each a single UPDATE.
+"""
+
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .inbox import change_unread_counts, unread_count
+from .models import Notification
+from .serializers import MarkAllReadSerializer, NotificationSerializer
+from core.mixins import AtomicWriteMixin, SerializerTimingMixin
+
+
+def inbox(user):
+    """
+    Returns the notifications of a user, ready for NotificationSerializer.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The notifications, with their actor, board and task joined.
+    """
+    return Notification.objects.filter(recipient=user).select_related('actor', 'board', 'task')
+
+
+class NotificationPagination(CursorPagination):
+    """
+    Cursor pagination of the inbox, newest first.
+
+    Each page is read from the (recipient, -id) index whatever its depth, and notifications
+    arriving while the user pages do not shift the next page.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-id'
+
+class NotificationListView(SerializerTimingMixin, generics.ListAPIView):
+    """
+    API view for the inbox of the requesting user.
+
+    Handles GET requests listing the user's notifications, newest first, 20 per page.
+    `?unread=true` lists the unread ones only.
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationPagination
+    query_budget = {'GET': 3}
+
+    def get_queryset(self):
+        """
+        Filters queryset to the notifications of the requesting user.
+
+        Returns:
+            QuerySet: The user's notifications, or only the unread ones with ?unread=true.
+        """
+        queryset = inbox(self.request.user)
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+
+class NotificationUnreadCountView(APIView):
+    """
+    API view for the unread count of the requesting user.
+
+    Handles GET requests; the count comes from the cache, so polling it costs no query
+    beyond authentication (one COUNT on the partial index of unread rows on a cache miss).
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3}
+
+    def get(self, request):
+        """
+        Returns the number of unread notifications.
+
+        Returns:
+            Response: {"unread": <count>}
+        """
+        return Response({'unread': unread_count(request.user.pk)})
+
+class NotificationReadView(AtomicWriteMixin, APIView):
+    """
+    API view for marking one notification of the requesting user as read.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 5}
+
+    def post(self, request, pk):
+        """
+        Marks the notification as read, if it was unread.
+
+        Args:
+            request: The HTTP request object.
+            pk (int): The notification.
+
+        Returns:
+            Response: The notification.
+
+        Raises:
+            Http404: If the notification does not exist or is not the user's.
+        """
+        marked = Notification.objects.filter(pk=pk, recipient=request.user, read_at__isnull=True).update(
+            read_at=timezone.now()
+        )
+        if marked:
+            transaction.on_commit(lambda: change_unread_counts({request.user.pk: -1}))
+        notification = get_object_or_404(inbox(request.user), pk=pk)
+        return Response(NotificationSerializer(notification, context={'request': request}).data)
+
+class NotificationMarkAllReadView(AtomicWriteMixin, generics.GenericAPIView):
+    """
+    API view for marking all notifications of the requesting user as read, in one UPDATE.
+    """
+    serializer_class = MarkAllReadSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 4}
+
+    def post(self, request):
+        """
+        Marks the unread notifications (up to the id given as `up_to`, if any) as read.
+
+        Args:
+            request: The HTTP request object, with an optional `up_to` id in its body.
+
+        Returns:
+            Response: {"marked_read": <number of notifications marked>}
+
+        Raises:
+            ValidationError: If `up_to` is not a positive integer.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        unread = Notification.objects.filter(recipient=request.user, read_at__isnull=True)
+        if 'up_to' in serializer.validated_data:
+            unread = unread.filter(id__lte=serializer.validated_data['up_to'])
+        marked = unread.update(read_at=timezone.now())
+        if marked:
+            transaction.on_commit(lambda: change_unread_counts({request.user.pk: -marked}))
+        return Response({'marked_read': marked})
@@ -0,0 +1,1285 @@
+// Translations of the strings below, rendered into the page by the index.html shell
+const jsCatalog = JSON.parse(document.getElementById('js-catalog').textContent);
+
+function gettext(msgid) {
+    return jsCatalog[msgid] || msgid;
+}
+
+// Runs several API requests in one round trip; resolves to their {status, headers, body}
+async function batchRequests(requests, atomic = false) {
+    const response = await fetch('http://localhost:8000/batch/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${accessToken}`
+        },
+        body: JSON.stringify({ requests, atomic })
+    });
+    if (!response.ok) {
+        if (response.status === 401) {
+            logout();
+            throw new Error(getTranslation('unauthorized', 'Unauthorized'));
+        }
+        throw new Error(`Batch request failed (${response.status})`);
+    }
+    return (await response.json()).responses;
+}
+
+let accessToken = '';
+let currentBoardId = null;
+let currentBoardColor = '#0079bf';
+let selectedColor = '#0079bf';
+let currentListId = null;
+let currentTaskForDetails = null;
+
+// i18n
+let currentUserLanguage = 'en';
+let translations = {};
+let userInfo = null;
+
+// Function to load translations from server
+async function loadTranslations() {
+    try {
+        const headers = {
+            'Accept-Language': currentUserLanguage
+        };
+        
+        if (accessToken) {
+            headers['Authorization'] = `Bearer ${accessToken}`;
+        }
+
+        const response = await fetch('http://localhost:8000/users/test-translation/', {
+            headers: headers
+        });
+        
+        if (response.ok) {
+            const data = await response.json();
+            translations = data.translations || {};
+            currentUserLanguage = data.current_language || currentUserLanguage;
+            
+            setPageLanguage(currentUserLanguage);
+            
+            return true;
+        } else {
+            console.warn('Could not load translations, using defaults');
+        }
+    } catch (error) {
+        console.error('Error loading translations:', error);
+    }
+    return false;
+}
+
+// Function to get translation
+function getTranslation(key, fallback = key) {
+    return translations[key] || fallback || key;
+}
+
+// Function to set page language
+function setPageLanguage(language) {
+    const html = document.documentElement;
+    const body = document.body;
+    
+    html.setAttribute('lang', language);
+    
+    if (language === 'fa' || language === 'ar') {
+        html.setAttribute('dir', 'rtl');
+        body.classList.add('rtl-language');
+    } else {
+        html.setAttribute('dir', 'ltr');
+        body.classList.remove('rtl-language');
+    }
+    
+    if (language === 'fa') {
+        body.style.fontFamily = "'Vazir', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif";
+    } else {
+        body.style.fontFamily = "-apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif";
+    }
+}
+
+// Function to load user's saved language
+function loadUserLanguage() {
+    const savedLanguage = localStorage.getItem('userLanguage');
+    const userData = localStorage.getItem('userData');
+    
+    if (userData) {
+        try {
+            const user = JSON.parse(userData);
+            userInfo = user;
+            currentUserLanguage = user.preferred_language || savedLanguage || 'en';
+        } catch (error) {
+            currentUserLanguage = savedLanguage || 'en';
+        }
+    } else {
+        currentUserLanguage = savedLanguage || 'en';
+    }
+    
+    setPageLanguage(currentUserLanguage);
+    return currentUserLanguage;
+}
+
+// Initialize app
+async function initApp() {
+    accessToken = localStorage.getItem('accessToken') || '';
+    
+    loadUserLanguage();
+    
+    if (accessToken) {
+        await loadTranslations();
+        showBoardSelection();
+    } else {
+        await loadTranslations();
+        showWelcomePage();
+    }
+
+    setupColorPicker();
+    
+    // Add event listener for page refresh
+    window.addEventListener('beforeunload', () => {
+        localStorage.setItem('lastBoardId', currentBoardId || '');
+    });
+}
+
+// Page Navigation
+function showWelcomePage() {
+    hideAllPages();
+    document.getElementById('welcome-page').style.display = 'flex';
+    document.getElementById('app-header').style.display = 'none';
+    document.getElementById('app-footer').style.display = 'block';
+}
+
+function showAuthContainer() {
+    hideAllPages();
+    document.getElementById('auth-container').style.display = 'flex';
+    document.getElementById('app-header').style.display = 'none';
+    document.getElementById('app-footer').style.display = 'none';
+}
+
+function showBoardSelection() {
+    hideAllPages();
+    document.getElementById('board-selection').style.display = 'block';
+    document.getElementById('app-header').style.display = 'flex';
+    document.getElementById('back-to-boards-btn').style.display = 'none';
+    document.getElementById('app-footer').style.display = 'block';
+    document.body.style.background = 'var(--secondary-color)';
+    loadBoards();
+}
+
+function showTrelloBoard() {
+    hideAllPages();
+    document.getElementById('trello-board').style.display = 'block';
+    document.getElementById('app-header').style.display = 'flex';
+    document.getElementById('back-to-boards-btn').style.display = 'inline-flex';
+    document.getElementById('app-footer').style.display = 'none';
+    document.body.style.background = currentBoardColor;
+}
+
+function hideAllPages() {
+    document.getElementById('welcome-page').style.display = 'none';
+    document.getElementById('auth-container').style.display = 'none';
+    document.getElementById('board-selection').style.display = 'none';
+    document.getElementById('trello-board').style.display = 'none';
+}
+
+// Auth Functions
+function showLogin() {
+    showAuthContainer();
+    document.getElementById('login-card').style.display = 'block';
+    document.getElementById('register-card').style.display = 'none';
+}
+
+function showRegister() {
+    showAuthContainer();
+    document.getElementById('login-card').style.display = 'none';
+    document.getElementById('register-card').style.display = 'block';
+}
+
+async function login() {
+    const username = document.getElementById('login-username').value;
+    const password = document.getElementById('login-password').value;
+    
+    if (!username || !password) {
+        Swal.fire({
+            icon: 'warning',
+            title: getTranslation('please_fill_all_fields', 'Please fill in all fields'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+        return;
+    }
+
+    try {
+        const response = await fetch('http://localhost:8000/api/token/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username, password })
+        });
+
+        if (!response.ok) {
+            throw new Error(getTranslation('invalid_credentials', 'Invalid credentials'));
+        }
+
+        const data = await response.json();
+        accessToken = data.access;
+        localStorage.setItem('accessToken', accessToken);
+
+        if (data.user) {
+            userInfo = data.user;
+            currentUserLanguage = data.user.preferred_language || 'en';
+            localStorage.setItem('userLanguage', currentUserLanguage);
+            localStorage.setItem('userData', JSON.stringify(data.user));
+        } else {
+
+            await loadUserProfile();
+        }
+
+        await loadTranslations();
+        
+        showBoardSelection();
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('login_failed', 'Login failed'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+async function loadUserProfile() {
+    try {
+        const response = await fetch('http://localhost:8000/users/profile/', {
+            headers: { 'Authorization': `Bearer ${accessToken}` }
+        });
+
+        if (response.ok) {
+            const userData = await response.json();
+            userInfo = userData;
+            currentUserLanguage = userData.preferred_language || 'en';
+            localStorage.setItem('userLanguage', currentUserLanguage);
+            localStorage.setItem('userData', JSON.stringify(userData));
+        }
+    } catch (error) {
+        console.error('Error loading user profile:', error);
+    }
+}
+
+async function register() {
+    const username = document.getElementById('register-username').value;
+    const email = document.getElementById('register-email').value;
+    const password = document.getElementById('register-password').value;
+    const name = document.getElementById('register-name').value;
+    const language = document.getElementById('register-language').value;
+    
+    if (!username || !email || !password || !name) {
+        Swal.fire({
+            icon: 'warning',
+            title: getTranslation('please_fill_required_fields', 'Please fill in all required fields'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+        return;
+    }
+
+    try {
+        const response = await fetch('http://localhost:8000/users/register/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ 
+                username, 
+                email, 
+                password, 
+                name, 
+                preferred_language: language 
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error(getTranslation('registration_failed', 'Registration failed'));
+        }
+
+        const data = await response.json();
+
+        currentUserLanguage = language;
+        localStorage.setItem('userLanguage', language);
+        
+        await loadTranslations();
+
+        Swal.fire({
+            icon: 'success',
+            title: getTranslation('registration_successful', 'Registration successful! Please login.'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        }).then(() => {
+            showLogin();
+        });
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('registration_failed', 'Registration failed'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+function logout() {
+    localStorage.removeItem('accessToken');
+    localStorage.removeItem('lastBoardId');
+    localStorage.removeItem('userLanguage');
+    localStorage.removeItem('userData');
+    accessToken = '';
+    currentBoardId = null;
+    currentUserLanguage = 'en';
+    translations = {};
+    userInfo = null;
+    
+    setPageLanguage('en');
+    
+    showWelcomePage();
+}
+
+function backToBoards() {
+    currentBoardId = null;
+    showBoardSelection();
+}
+
+// Board Management
+function loadBoards() {
+    fetch('http://localhost:8000/boards/', {
+        headers: { 'Authorization': `Bearer ${accessToken}` }
+    })
+    .then(response => {
+        if (!response.ok) {
+            if (response.status === 401) {
+                logout();
+                throw new Error(getTranslation('unauthorized', 'Unauthorized'));
+            }
+            throw new Error(getTranslation('failed_load_boards', 'Failed to load boards'));
+        }
+        return response.json();
+    })
+    .then(renderBoards)
+    .catch(error => {
+        if (!error.message.includes('Unauthorized')) {
+            Swal.fire({
+                icon: 'error',
+                title: getTranslation('error_loading_boards', 'Error loading boards'),
+                text: error.message,
+                confirmButtonText: getTranslation('ok', 'OK')
+            });
+        }
+    });
+}
+
+function renderBoards(data) {
+    const boardsGrid = document.getElementById('boards-grid');
+    boardsGrid.innerHTML = '';
+    
+    data.forEach(board => {
+        const boardCard = document.createElement('div');
+        boardCard.className = 'board-card';
+        boardCard.style.setProperty('--primary-color', board.color);
+        let membersHtml = '<div class="board-members">';
+        board.members.forEach(member => {
+            const initial = (member.name || member.username).charAt(0).toUpperCase();
+            membersHtml += `
+                <div class="member-circle" data-member-id="${member.id}">
+                    ${initial}
+                    <span class="tooltip">${member.name || member.username}</span>
+                </div>
+            `;
+        });
+        membersHtml += '</div>';
+        boardCard.innerHTML = `
+            <div class="board-title">
+                <span>${board.title}</span>
+                <button class="btn btn-danger btn-sm" onclick="deleteBoard(event, ${board.id})">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+            <div class="board-meta">
+                <i class="fas fa-calendar"></i> ${getTranslation('created_recently', 'Created recently')}
+            </div>
+            ${membersHtml}
+        `;
+        boardCard.addEventListener('click', (e) => {
+            if (!e.target.closest('.btn-danger') && !e.target.closest('.member-circle')) {
+                openBoard(board.id, board.color);
+            }
+        });
+        boardsGrid.appendChild(boardCard);
+    });
+}
+
+function setupColorPicker() {
+    const colorOptions = document.querySelectorAll('.color-option');
+    colorOptions.forEach(option => {
+        option.addEventListener('click', () => {
+            colorOptions.forEach(o => o.classList.remove('active'));
+            option.classList.add('active');
+            selectedColor = option.dataset.color;
+        });
+    });
+}
+
+function createBoard() {
+    const title = document.getElementById('board-title').value.trim();
+    
+    if (!title) {
+        Swal.fire({
+            icon: 'warning',
+            title: getTranslation('please_enter_board_title', 'Please enter a board title'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+        return;
+    }
+
+    fetch('http://localhost:8000/boards/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${accessToken}`
+        },
+        body: JSON.stringify({ title, color: selectedColor })
+    })
+    .then(response => {
+        if (!response.ok) throw new Error(getTranslation('failed_create_board', 'Failed to create board'));
+        return response.json();
+    })
+    .then(data => {
+        document.getElementById('board-title').value = '';
+        loadBoards();
+    })
+    .catch(error => {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_creating_board', 'Error creating board'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    });
+}
+
+function deleteBoard(event, boardId) {
+    event.stopPropagation();
+    Swal.fire({
+        icon: 'warning',
+        title: getTranslation('confirm_delete_board', 'Are you sure you want to delete this board?'),
+        showCancelButton: true,
+        confirmButtonText: getTranslation('yes', 'Yes'),
+        cancelButtonText: getTranslation('no', 'No')
+    }).then((result) => {
+        if (result.isConfirmed) {
+            fetch(`http://localhost:8000/boards/${boardId}/`, {
+                method: 'DELETE',
+                headers: { 'Authorization': `Bearer ${accessToken}` }
+            })
+            .then(response => {
+                if (!response.ok) throw new Error(getTranslation('failed_delete_board', 'Failed to delete board'));
+                loadBoards();
+                if (currentBoardId === boardId) {
+                    currentBoardId = null;
+                    showBoardSelection();
+                }
+            })
+            .catch(error => {
+                Swal.fire({
+                    icon: 'error',
+                    title: getTranslation('error_deleting_board', 'Error deleting board'),
+                    text: error.message,
+                    confirmButtonText: getTranslation('ok', 'OK')
+                });
+            });
+        }
+    });
+}
+
+function openBoard(boardId, boardColor) {
+    currentBoardId = boardId;
+    currentBoardColor = boardColor;
+    localStorage.setItem('lastBoardId', boardId);
+    showTrelloBoard();
+    loadLists();
+}
+
+// List Management
+function loadLists() {
+    if (!currentBoardId) {
+        showBoardSelection();
+        return;
+    }
+
+    fetch(`http://localhost:8000/lists/boards/${currentBoardId}/lists/`, {
+        headers: { 'Authorization': `Bearer ${accessToken}` }
+    })
+    .then(response => {
+        if (!response.ok) {
+            if (response.status === 401) {
+                logout();
+                throw new Error(getTranslation('unauthorized', 'Unauthorized'));
+            }
+            throw new Error(getTranslation('failed_load_lists', 'Failed to load lists'));
+        }
+        return response.json();
+    })
+    .then(data => {
+        const listsContainer = document.getElementById('lists-container');
+        listsContainer.innerHTML = '';
+        
+        data.forEach(list => {
+            const listElement = createListElement(list);
+            listsContainer.appendChild(listElement);
+            loadTasks(list.id);
+        });
+    })
+    .catch(error => {
+        if (!error.message.includes('Unauthorized')) {
+            Swal.fire({
+                icon: 'error',
+                title: getTranslation('error_loading_lists', 'Error loading lists'),
+                text: error.message,
+                confirmButtonText: getTranslation('ok', 'OK')
+            });
+        }
+    });
+}
+
+function createListElement(list) {
+    const listDiv = document.createElement('div');
+    listDiv.className = 'list-column';
+    listDiv.id = `list-${list.id}`;
+    listDiv.innerHTML = `
+        <div class="list-header">
+            <h6 class="list-title">${list.title}</h6>
+            <button class="btn btn-danger btn-sm" onclick="deleteList(event, ${list.id})">
+                <i class="fas fa-trash"></i>
+            </button>
+        </div>
+        <ul class="task-list" id="task-list-${list.id}"></ul>
+        <button class="add-task-btn" onclick="showAddTaskModal(${list.id})">
+            <i class="fas fa-plus"></i> ${getTranslation('add_task', 'Add Task')}
+        </button>
+    `;
+
+    // Setup sortable
+    const taskList = listDiv.querySelector('.task-list');
+    new Sortable(taskList, {
+        group: 'shared',
+        animation: 200,
+        ghostClass: 'sortable-ghost',
+        onEnd: function (evt) {
+            const taskId = evt.item.dataset.taskId;
+            const newListId = evt.to.id.replace('task-list-', '');
+            const newOrder = evt.newIndex;
+            moveTask(taskId, newListId, newOrder);
+        }
+    });
+
+    return listDiv;
+}
+
+function showAddListModal() {
+    const modal = new bootstrap.Modal(document.getElementById('addListModal'));
+    document.getElementById('list-title-input').value = '';
+    modal.show();
+}
+
+function addList() {
+    const title = document.getElementById('list-title-input').value.trim();
+    
+    if (!title) {
+        Swal.fire({
+            icon: 'warning',
+            title: getTranslation('please_enter_list_title', 'Please enter a list title'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+        return;
+    }
+
+    fetch(`http://localhost:8000/lists/boards/${currentBoardId}/lists/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${accessToken}`
+        },
+        body: JSON.stringify({ title })
+    })
+    .then(response => {
+        if (!response.ok) throw new Error(getTranslation('failed_create_list', 'Failed to create list'));
+        return response.json();
+    })
+    .then(() => {
+        bootstrap.Modal.getInstance(document.getElementById('addListModal')).hide();
+        loadLists();
+    })
+    .catch(error => {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_creating_list', 'Error creating list'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    });
+}
+
+function deleteList(event, listId) {
+    event.stopPropagation();
+    Swal.fire({
+        icon: 'warning',
+        title: getTranslation('confirm_delete_list', 'Are you sure you want to delete this list and all its tasks?'),
+        showCancelButton: true,
+        confirmButtonText: getTranslation('yes', 'Yes'),
+        cancelButtonText: getTranslation('no', 'No')
+    }).then((result) => {
+        if (result.isConfirmed) {
+            fetch(`http://localhost:8000/lists/boards/${currentBoardId}/lists/${listId}/`, {
+                method: 'DELETE',
+                headers: { 'Authorization': `Bearer ${accessToken}` }
+            })
+            .then(response => {
+                if (!response.ok) throw new Error(getTranslation('failed_delete_list', 'Failed to delete list'));
+                loadLists();
+            })
+            .catch(error => {
+                Swal.fire({
+                    icon: 'error',
+                    title: getTranslation('error_deleting_list', 'Error deleting list'),
+                    text: error.message,
+                    confirmButtonText: getTranslation('ok', 'OK')
+                });
+            });
+        }
+    });
+}
+
+// Task Management
+function loadTasks(listId) {
+    fetch(`http://localhost:8000/lists/lists/${listId}/tasks/`, {
+        headers: { 'Authorization': `Bearer ${accessToken}` }
+    })
+    .then(response => {
+        if (!response.ok) {
+            if (response.status === 401) {
+                logout();
+                throw new Error(getTranslation('unauthorized', 'Unauthorized'));
+            }
+            throw new Error(getTranslation('failed_load_tasks', 'Failed to load tasks'));
+        }
+        return response.json();
+    })
+    .then(data => renderTasks(listId, data))
+    .catch(error => {
+        if (!error.message.includes('Unauthorized')) {
+            Swal.fire({
+                icon: 'error',
+                title: getTranslation('error_loading_tasks', 'Error loading tasks'),
+                text: error.message,
+                confirmButtonText: getTranslation('ok', 'OK')
+            });
+        }
+    });
+}
+
+function renderTasks(listId, data) {
+    const taskList = document.getElementById(`task-list-${listId}`);
+    taskList.innerHTML = '';
+
+    data.forEach(task => {
+        const taskElement = createTaskElement(task);
+        taskList.appendChild(taskElement);
+    });
+}
+
+function createTaskElement(task) {
+    const taskDiv = document.createElement('li');
+    taskDiv.className = 'task-card';
+    taskDiv.dataset.taskId = task.id;
+    taskDiv.onclick = () => showTaskDetails(task);
+    
+    const dueDate = task.due_date ? new Date(task.due_date).toLocaleDateString() : getTranslation('no_due_date', 'No due date');
+    const description = task.description || getTranslation('no_description', 'No description');
+    // Counters kept on the task, so no request per card
+    const checklist = task.checklist_total_count
+        ? `<span><i class="fas fa-check-square"></i> ${task.checklist_done_count}/${task.checklist_total_count}</span>`
+        : '';
+    
+    taskDiv.innerHTML = `
+        <div class="task-title">${task.title}</div>
+        <div class="task-meta">
+            <span><i class="fas fa-align-left"></i> ${description}</span>
+            <span><i class="fas fa-calendar"></i> ${dueDate}</span>
+            ${checklist}
+        </div>
+    `;
+    
+    return taskDiv;
+}
+
+function showAddTaskModal(listId) {
+    currentListId = listId;
+    const modal = new bootstrap.Modal(document.getElementById('addTaskModal'));
+    document.getElementById('task-title-input').value = '';
+    document.getElementById('task-description-input').value = '';
+    document.getElementById('task-due-date-input').value = '';
+    modal.show();
+}
+
+function addTask() {
+    const title = document.getElementById('task-title-input').value.trim();
+    const description = document.getElementById('task-description-input').value.trim();
+    const dueDate = document.getElementById('task-due-date-input').value;
+    
+    if (!title) {
+        Swal.fire({
+            icon: 'warning',
+            title: getTranslation('please_enter_task_title', 'Please enter a task title'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+        return;
+    }
+
+    const taskData = {
+        title,
+        description: description || '',
+        order: 0
+    };
+
+    if (dueDate) {
+        taskData.due_date = dueDate;
+    }
+
+    fetch(`http://localhost:8000/lists/lists/${currentListId}/tasks/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${accessToken}`
+        },
+        body: JSON.stringify(taskData)
+    })
+    .then(response => {
+        if (!response.ok) throw new Error(getTranslation('failed_create_task', 'Failed to create task'));
+        return response.json();
+    })
+    .then(() => {
+        bootstrap.Modal.getInstance(document.getElementById('addTaskModal')).hide();
+        loadTasks(currentListId);
+    })
+    .catch(error => {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_creating_task', 'Error creating task'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    });
+}
+
+// Task Details Management
+function showTaskDetails(task) {
+    currentTaskForDetails = task;
+    
+    document.getElementById('task-details-title').textContent = task.title;
+    document.getElementById('task-details-title-text').textContent = task.title;
+    document.getElementById('task-details-description').textContent = task.description || getTranslation('no_description_provided', 'No description provided');
+    
+    const dueDate = task.due_date ? new Date(task.due_date).toLocaleString() : getTranslation('no_due_date_set', 'No due date set');
+    document.getElementById('task-details-due-date').textContent = dueDate;
+    
+    const listElement = document.getElementById(`list-${task.list}`);
+    const listTitle = listElement ? listElement.querySelector('.list-title').textContent : getTranslation('unknown_list', 'Unknown List');
+    document.getElementById('task-details-list').textContent = listTitle;
+    
+    const createdDate = task.created_at ? new Date(task.created_at).toLocaleString() : getTranslation('unknown', 'Unknown');
+    document.getElementById('task-details-created').textContent = createdDate;
+    
+    // Load assigned users
+    loadAssignedUsers(task);
+    
+    const modal = new bootstrap.Modal(document.getElementById('taskDetailsModal'));
+    modal.show();
+}
+
+async function loadAssignedUsers(task) {
+    const assignedUsersContainer = document.getElementById('assigned-users');
+    assignedUsersContainer.innerHTML = '';
+
+    let boardMembers = [];
+    try {
+        const response = await fetch(`http://localhost:8000/boards/${currentBoardId}/`, {
+            headers: { 'Authorization': `Bearer ${accessToken}` }
+        });
+        if (!response.ok) throw new Error('Failed to load board members');
+        const board = await response.json();
+        boardMembers = board.members; 
+    } catch (error) {
+        assignedUsersContainer.innerHTML = `<p class="text-muted">${gettext('Error loading board members')}</p>`;
+        return;
+    }
+    renderAssignedUsers(task, boardMembers);
+}
+
+function renderAssignedUsers(task, boardMembers) {
+    const assignedUsersContainer = document.getElementById('assigned-users');
+    assignedUsersContainer.innerHTML = '';
+
+    if (task.assigned_users && task.assigned_users.length > 0) {
+        task.assigned_users.forEach(user => {
+            const userId = user.id || user; 
+            const matchedUser = boardMembers.find(member => member.id === userId);
+            const displayName = matchedUser ? (matchedUser.name || matchedUser.username || 'Unknown User') : 'Unknown User';
+
+            const chip = document.createElement('div');
+            chip.className = 'assigned-user-chip';
+            chip.innerHTML = `
+                ${displayName}
+                <i class="fas fa-times remove-user" onclick="unassignUser(${task.id}, ${userId})"></i>
+            `;
+            assignedUsersContainer.appendChild(chip);
+        });
+    } else {
+        assignedUsersContainer.innerHTML = `<p class="text-muted">${gettext('No users assigned')}</p>`;
+    }
+
+    const assignSelect = document.getElementById('assign-users-select');
+    assignSelect.innerHTML = '<option value="">' + gettext('Select user to assign') + '</option>';
+
+    boardMembers.forEach(user => {
+        if (!task.assigned_users || !task.assigned_users.some(u => (u.id || u) === user.id)) {
+            const option = document.createElement('option');
+            option.value = user.id;
+            option.textContent = user.name || user.username || 'Unknown User';
+            assignSelect.appendChild(option);
+        }
+    });
+}
+
+async function assignUser(taskId) {
+    const userId = document.getElementById('assign-users-select').value;
+    if (!userId) return;
+
+    try {
+        const currentAssignedUsers = (currentTaskForDetails.assigned_users || []).map(u => u.id || u);
+        const listId = currentTaskForDetails.list;
+        const [update, board, tasks] = await batchRequests([
+            {
+                method: 'PATCH',
+                path: `/lists/lists/${listId}/tasks/${taskId}/`,
+                body: { assigned_users: [...currentAssignedUsers, parseInt(userId)] }
+            },
+            { method: 'GET', path: `/boards/${currentBoardId}/` },
+            { method: 'GET', path: `/lists/lists/${listId}/tasks/` }
+        ]);
+
+        if (update.status >= 400) {
+            throw new Error(getTranslation('failed_assign_user', 'Failed to assign user'));
+        }
+
+        currentTaskForDetails = update.body;
+        if (board.status === 200) {
+            renderAssignedUsers(update.body, board.body.members);
+        }
+        if (tasks.status === 200) {
+            renderTasks(listId, tasks.body);
+        }
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_assigning_user', 'Error assigning user'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+async function unassignUser(taskId, userId) {
+    try {
+        const currentAssignedUsers = (currentTaskForDetails.assigned_users || []).map(u => u.id || u);
+        const updatedAssignedUsers = currentAssignedUsers.filter(id => id !== userId);
+
+        const listId = currentTaskForDetails.list;
+        const [update, board, tasks] = await batchRequests([
+            {
+                method: 'PATCH',
+                path: `/lists/lists/${listId}/tasks/${taskId}/`,
+                body: { assigned_users: updatedAssignedUsers }
+            },
+            { method: 'GET', path: `/boards/${currentBoardId}/` },
+            { method: 'GET', path: `/lists/lists/${listId}/tasks/` }
+        ]);
+
+        if (update.status >= 400) {
+            throw new Error(getTranslation('failed_unassign_user', 'Failed to unassign user'));
+        }
+
+        currentTaskForDetails = update.body;
+        if (board.status === 200) {
+            renderAssignedUsers(update.body, board.body.members);
+        }
+        if (tasks.status === 200) {
+            renderTasks(listId, tasks.body);
+        }
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_unassigning_user', 'Error unassigning user'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+function deleteTask() {
+    if (!currentTaskForDetails) return;
+    
+    Swal.fire({
+        icon: 'warning',
+        title: getTranslation('Are you sure you want to delete this task?', 'Are you sure you want to delete this task?'),
+        showCancelButton: true,
+        confirmButtonText: getTranslation('yes', 'Yes'),
+        cancelButtonText: getTranslation('no', 'No')
+    }).then((result) => {
+        if (result.isConfirmed) {
+            fetch(`http://localhost:8000/lists/lists/${currentTaskForDetails.list}/tasks/${currentTaskForDetails.id}/`, {
+                method: 'DELETE',
+                headers: { 'Authorization': `Bearer ${accessToken}` }
+            })
+            .then(response => {
+                if (!response.ok) throw new Error(getTranslation('failed_delete_task', 'Failed to delete task'));
+                bootstrap.Modal.getInstance(document.getElementById('taskDetailsModal')).hide();
+                loadTasks(currentTaskForDetails.list);
+                currentTaskForDetails = null;
+            })
+            .catch(error => {
+                Swal.fire({
+                    icon: 'error',
+                    title: getTranslation('error_deleting_task', 'Error deleting task'),
+                    text: error.message,
+                    confirmButtonText: getTranslation('ok', 'OK')
+                });
+            });
+        }
+    });
+}
+
+function moveTask(taskId, newListId, newOrder) {
+    fetch(`http://localhost:8000/lists/tasks/${taskId}/move/`, {
+        method: 'PATCH',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${accessToken}`
+        },
+        body: JSON.stringify({ list_id: parseInt(newListId), order: newOrder })
+    })
+    .then(response => {
+        if (!response.ok) throw new Error(getTranslation('failed_move_task', 'Failed to move task'));
+        return response.json();
+    })
+    .then(() => {
+        const affectedLists = new Set([newListId]);
+        document.querySelectorAll('.list-column').forEach(list => {
+            const listId = list.id.replace('list-', '');
+            if (affectedLists.has(listId) || list.querySelector(`[data-task-id="${taskId}"]`)) {
+                loadTasks(listId);
+            }
+        });
+    })
+    .catch(error => {
+        loadLists();
+    });
+}
+
+// Invite Functions
+async function showInviteMemberModal() {
+    const modal = new bootstrap.Modal(document.getElementById('inviteMemberModal'));
+    document.getElementById('invite-email-input').value = '';
+    document.getElementById('invite-error').style.display = 'none';
+    
+    // Load boards for dropdown
+    try {
+        const response = await fetch('http://localhost:8000/boards/', {
+            headers: { 'Authorization': `Bearer ${accessToken}` }
+        });
+        if (!response.ok) throw new Error('Failed to load boards');
+        const boards = await response.json();
+        
+        const select = document.getElementById('invite-board-select');
+        select.innerHTML = '<option value="">' + gettext('Select Board') + '</option>';
+        boards.forEach(board => {
+            const option = document.createElement('option');
+            option.value = board.id;
+            option.textContent = board.title;
+            select.appendChild(option);
+        });
+    } catch (error) {
+        console.error('Error loading boards for invite:', error);
+    }
+    
+    modal.show();
+}
+
+async function sendInvitation() {
+    const boardId = document.getElementById('invite-board-select').value;
+    const email = document.getElementById('invite-email-input').value.trim();
+    
+    if (!boardId) {
+        document.getElementById('invite-error').textContent = getTranslation('please_select_board', 'Please select a board');
+        document.getElementById('invite-error').style.display = 'block';
+        return;
+    }
+    
+    if (!email) {
+        document.getElementById('invite-error').textContent = getTranslation('please_enter_email', 'Please enter an email');
+        document.getElementById('invite-error').style.display = 'block';
+        return;
+    }
+
+    try {
+        const response = await fetch('http://localhost:8000/invitations/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${accessToken}`
+            },
+            body: JSON.stringify({ board: boardId, invited_user_email: email })
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.detail || getTranslation('failed_send_invitation', 'This user has already been invited'));
+        }
+
+        bootstrap.Modal.getInstance(document.getElementById('inviteMemberModal')).hide();
+        Swal.fire({
+            icon: 'success',
+            title: getTranslation('invitation_sent', 'Invitation sent successfully'),
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    } catch (error) {
+        document.getElementById('invite-error').textContent = error.message;
+        document.getElementById('invite-error').style.display = 'block';
+    }
+}
+
+function showInvitationsModal() {
+    const modal = new bootstrap.Modal(document.getElementById('invitationsModal'));
+    loadInvitations();
+    modal.show();
+}
+
+async function loadInvitations() {
+    try {
+        const response = await fetch('http://localhost:8000/invitations/', {
+            headers: { 'Authorization': `Bearer ${accessToken}` }
+        });
+
+        if (!response.ok) {
+            if (response.status === 401) {
+                logout();
+                throw new Error(getTranslation('unauthorized', 'Unauthorized'));
+            }
+            throw new Error(getTranslation('failed_load_invitations', 'Failed to load invitations'));
+        }
+
+        renderInvitations(await response.json());
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_loading_invitations', 'Error loading invitations'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+function renderInvitations(data) {
+    const sentList = document.getElementById('sent-invitations-list');
+    const receivedList = document.getElementById('received-invitations-list');
+    sentList.innerHTML = '';
+    receivedList.innerHTML = '';
+
+    const sentInvitations = data.filter(inv => {
+        if (!inv.board) return false;
+        const ownerId = inv.board.owner?.id || inv.board.owner;
+        return ownerId === userInfo.id;
+    });
+
+    const receivedInvitations = data.filter(inv => {
+        const invitedUserId = inv.invited_user?.id || inv.invited_user;
+        return invitedUserId === userInfo.id;
+    });
+
+
+    sentInvitations.forEach(inv => {
+        const boardTitle = inv.board?.title || 'Unknown Board';
+        const email = inv.invited_user?.email || inv.invited_user_email || 'invited you';
+        const invItem = document.createElement('div');
+        invItem.className = 'invitation-item';
+        invItem.innerHTML = `
+            <div>
+                <strong>${email}</strong> ${gettext('to')} <strong>${boardTitle}</strong>
+                <span class="invitation-status-${inv.status.toLowerCase()}">(${getTranslation(inv.status.toLowerCase(), inv.status)})</span>
+            </div>
+            <div class="invitation-actions"></div>
+        `;
+        sentList.appendChild(invItem);
+    });
+
+    receivedInvitations.forEach(inv => {
+        const boardTitle = inv.board?.title || 'Unknown Board';
+        const invItem = document.createElement('div');
+        invItem.className = 'invitation-item';
+        invItem.innerHTML = `
+            <div>
+                <strong>${boardTitle}</strong>
+                <span class="invitation-status-${inv.status.toLowerCase()}">(${getTranslation(inv.status.toLowerCase(), inv.status)})</span>
+            </div>
+            <div class="invitation-actions">
+                ${inv.status === 'pending' ? `
+                    <button class="btn btn-success btn-sm" onclick="acceptInvitation(${inv.id})">
+                        <i class="fas fa-check"></i> ${gettext('Accept')}
+                    </button>
+                    <button class="btn btn-danger btn-sm" onclick="rejectInvitation(${inv.id})">
+                        <i class="fas fa-times"></i> ${gettext('Reject')}
+                    </button>
+                ` : ''}
+            </div>
+        `;
+        receivedList.appendChild(invItem);
+    });
+
+    if (sentInvitations.length === 0) {
+        sentList.innerHTML = `<p class="text-muted">${gettext('No sent invitations')}</p>`;
+    }
+    if (receivedInvitations.length === 0) {
+        receivedList.innerHTML = `<p class="text-muted">${gettext('No received invitations')}</p>`;
+    }
+}
+
+async function acceptInvitation(invitationId) {
+    try {
+        const [update, invitations, boards] = await batchRequests([
+            { method: 'PATCH', path: `/invitations/${invitationId}/accept/`, body: { status: 'accepted' } },
+            { method: 'GET', path: '/invitations/' },
+            { method: 'GET', path: '/boards/' }
+        ]);
+
+        if (update.status >= 400) {
+            throw new Error((update.body && update.body.detail) || getTranslation('failed_accept_invitation', 'Failed to accept invitation'));
+        }
+
+        if (invitations.status === 200) {
+            renderInvitations(invitations.body);
+        }
+        if (boards.status === 200) {
+            renderBoards(boards.body); // Show the new board
+        }
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_accepting_invitation', 'Error accepting invitation'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+async function rejectInvitation(invitationId) {
+    try {
+        const [update, invitations] = await batchRequests([
+            { method: 'PATCH', path: `/invitations/${invitationId}/reject/`, body: { status: 'rejected' } },
+            { method: 'GET', path: '/invitations/' }
+        ]);
+
+        if (update.status >= 400) {
+            throw new Error((update.body && update.body.detail) || getTranslation('failed_reject_invitation', 'Failed to reject invitation'));
+        }
+
+        if (invitations.status === 200) {
+            renderInvitations(invitations.body);
+        }
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_rejecting_invitation', 'Error rejecting invitation'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+// Function to change language and refresh
+function changeLanguage(lang) {
+    localStorage.setItem('userLanguage', lang);
+    window.location.href = '/' + lang + window.location.pathname.replace(/^\/[a-z]{2}/, '');
+}
+
+async function showUserProfileModal() {
+    const modal = new bootstrap.Modal(document.getElementById('userProfileModal'));
+    
+    try {
+        const response = await fetch('http://localhost:8000/users/profile/', {
+            headers: { 'Authorization': `Bearer ${accessToken}` }
+        });
+
+        if (!response.ok) {
+            throw new Error(getTranslation('failed_load_profile', 'Failed to load profile'));
+        }
+
+        const userData = await response.json();
+        
+        document.getElementById('profile-username').textContent = userData.username || getTranslation('no_username', 'No username');
+        document.getElementById('profile-email').textContent = userData.email || getTranslation('no_email', 'No email');
+        document.getElementById('profile-name').textContent = userData.name || getTranslation('no_name', 'No name');
+        document.getElementById('profile-language').textContent = userData.preferred_language || getTranslation('no_language', 'No language');
+        
+        modal.show();
+    } catch (error) {
+        Swal.fire({
+            icon: 'error',
+            title: getTranslation('error_loading_profile', 'Error loading profile'),
+            text: error.message,
+            confirmButtonText: getTranslation('ok', 'OK')
+        });
+    }
+}
+
+// Initialize app when page loads
+document.addEventListener('DOMContentLoaded', async () => {
+    await initApp();
+    
+    // Check for last viewed board
+    const lastBoardId = localStorage.getItem('lastBoardId');
+    if (lastBoardId && accessToken) {
+        try {
+            const response = await fetch(`http://localhost:8000/boards/${lastBoardId}/`, {
+                headers: { 'Authorization': `Bearer ${accessToken}` }
+            });
+            
+            if (response.ok) {
+                const board = await response.json();
+                openBoard(board.id, board.color);
+            } else {
+                throw new Error('Board not found');
+            }
+        } catch (error) {
+            showBoardSelection();
+        }
+    }
+});
+
+// Handle Enter key for forms
+document.addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        const activeModal = document.querySelector('.modal.show');
+        if (activeModal) {
+            if (activeModal.id === 'addListModal') {
+                addList();
+            } else if (activeModal.id === 'addTaskModal') {
+                addTask();
+            } else if (activeModal.id === 'inviteMemberModal') {
+                sendInvitation();
+            }
+        } else if (document.getElementById('login-card').style.display === 'block') {
+            login();
+        } else if (document.getElementById('register-card').style.display === 'block') {
+            register();
+        }
+    }
+});
@@ -1,3 +1,10 @@
-from .celery import app as celery_app
+def __getattr__(name):
+    # The Celery app is loaded on first use rather than with Django: web processes only
+    # need it once they enqueue a task (`celery -A trello` finds trello.celery itself)
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-__all__ = ('celery_app',)
\ No newline at end of file
+
+__all__ = ('celery_app',)
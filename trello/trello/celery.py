@@ -1,10 +1,34 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import after_task_publish, before_task_publish
+from django.conf import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'trello.settings')
+# The worker runs Django's system checks on startup, which loads the URLconf and every view
+# it never uses; they already run for the web process and manage.py (set it to '' to keep them)
+os.environ.setdefault('CELERY_SKIP_CHECKS', '1')
 
 app = Celery('trello')
 
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+# Daily at a fixed hour rather than every 24 hours from whenever beat started
+app.conf.beat_schedule['send-daily-digests'] = {
+    'task': 'notifications.tasks.send_daily_digests',
+    'schedule': crontab(hour=settings.NOTIFICATION_DIGEST_HOUR, minute=0),
+}
+app.conf.beat_schedule['roll-up-board-analytics'] = {
+    'task': 'boards.tasks.roll_up_board_analytics',
+    'schedule': crontab(hour=settings.BOARD_ROLLUP_HOUR, minute=15),
+}
+
+# Publish timing for the request metrics, connected here rather than in CoreConfig.ready()
+# so that web processes only import Celery once they enqueue a task
+if settings.PERF_INSTRUMENTATION:
+    from core.metrics import task_publish_finished, task_publish_started
+
+    before_task_publish.connect(task_publish_started, weak=False)
+    after_task_publish.connect(task_publish_finished, weak=False)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +45,9 @@ INSTALLED_APPS = [
     'boards.apps.BoardsConfig',
     'lists.apps.ListsConfig',
     'invitations.apps.InvitationsConfig',
+    'workspaces.apps.WorkspacesConfig',
+    'notifications.apps.NotificationsConfig',
+    'core.apps.CoreConfig',
     
     #library 
     'rest_framework', 
@@ -63,6 +68,11 @@ AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',  # collected static files, precompressed
+    'core.middleware.PerformanceMiddleware',  # Server-Timing and request metrics
+    'core.middleware.QueryBudgetMiddleware',  # query budgets and N+1 detection
+    'core.middleware.ReplicaRoutingMiddleware',  # read replicas
+    'workspaces.middleware.WorkspaceRoutingMiddleware',  # workspace databases
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # i18n
     'corsheaders.middleware.CorsMiddleware',
@@ -70,6 +80,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',  
     'users.middleware.UserLanguageMiddleware',  
+    'core.middleware.ProfilingMiddleware',  # on-demand profiles for staff
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -100,13 +111,78 @@ WSGI_APPLICATION = 'trello.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite profile: 'production' turns on WAL, relaxed fsync, a busy timeout and
+# larger caches on every new connection, starts write transactions with
+# BEGIN IMMEDIATE and keeps connections open between requests. It is opt-in
+# (TRELLO_SQLITE_PROFILE=production on the servers): WAL mode is persistent, so any
+# command run with it, even `manage.py check`, converts the database file.
+# 'default' keeps Django's stock SQLite behaviour.
+SQLITE_PROFILE = os.environ.get('TRELLO_SQLITE_PROFILE', 'default')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'mmap_size': 128 * 1024 * 1024,  # bytes
+    'cache_size': -20000,  # negative = KiB, ~20MB
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_PROFILES = {
+    'default': {
+        'OPTIONS': {},
+        'CONN_MAX_AGE': 0,
+    },
+    'production': {
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'CONN_MAX_AGE': int(os.environ.get('TRELLO_CONN_MAX_AGE', 600)),
+    },
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('TRELLO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'CONN_HEALTH_CHECKS': True,
+        **SQLITE_PROFILES[SQLITE_PROFILE],
     }
 }
 
+# Read replicas: comma-separated SQLite files that mirror the primary. Locally they are kept
+# in sync with `python manage.py sync_sqlite_replicas`. Without replicas all traffic uses 'default'.
+for index, replica_path in enumerate(filter(None, os.environ.get('TRELLO_SQLITE_REPLICA_PATHS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': replica_path,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+REPLICA_PIN_SECONDS = int(os.environ.get('TRELLO_REPLICA_PIN_SECONDS', 5))  # read-your-writes window
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+# Workspace databases: comma-separated alias=path pairs of SQLite files holding the boards,
+# lists, tasks and invitations of the workspaces placed there (Workspace.database, see
+# `python manage.py move_workspace`); migrate each with `migrate --database=<alias>`. Keep the
+# order: the position of an alias sets the id range of the rows created there. Users,
+# workspaces and notifications live on 'default'. A workspace database holds copies of the
+# users, without their passwords, for the joins and foreign keys of its rows (see
+# workspaces.tenancy). The workspace of a board has no foreign key constraint, since the
+# workspaces are not copied.
+WORKSPACE_DATABASES = []
+for pair in filter(None, os.environ.get('TRELLO_WORKSPACE_DATABASE_PATHS', '').split(',')):
+    alias, path = pair.split('=', 1)
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': path}
+    WORKSPACE_DATABASES.append(alias)
+
+# Apps whose tables follow the active workspace to its database (see core.routers.TenantRouter)
+TENANT_APP_LABELS = {'boards', 'lists', 'invitations'}
+
+DATABASE_ROUTERS = ['core.routers.TenantRouter', 'core.routers.ReplicaRouter']
+
 
 
 REST_FRAMEWORK = {
@@ -115,10 +191,25 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
+# Per-request instrumentation: Server-Timing header and per-route histograms at /metrics/.
+# Enabled by default with DEBUG; when disabled the middleware is not loaded at all.
+PERF_INSTRUMENTATION = os.environ.get('TRELLO_PERF_INSTRUMENTATION', '1' if DEBUG else '0') == '1'
+PERF_METRICS_TOKEN = os.environ.get('TRELLO_METRICS_TOKEN', '')  # bearer token for the scraper
+
+# Query budgets declared on views (`query_budget`) and N+1 detection: 'off', 'log' or
+# 'raise' (development and tests only). Report offenders with `manage.py query_budget_report`.
+QUERY_BUDGET = os.environ.get('TRELLO_QUERY_BUDGET', 'log' if DEBUG else 'off')
+QUERY_BUDGET_REPEAT_THRESHOLD = int(os.environ.get('TRELLO_QUERY_BUDGET_REPEAT_THRESHOLD', 5))
+
+
 
 
 # Password validation
@@ -180,6 +271,24 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# Periodic tasks, run by `celery -A trello beat`
+CELERY_BEAT_SCHEDULE = {
+    'notify-due-soon-tasks': {
+        'task': 'notifications.tasks.notify_due_soon_tasks',
+        'schedule': timedelta(hours=1),
+    },
+    'purge-old-notifications': {
+        'task': 'notifications.tasks.purge_old_notifications',
+        'schedule': timedelta(days=1),
+    },
+    'purge-deleted-boards': {
+        'task': 'boards.tasks.purge_deleted_boards',
+        'schedule': timedelta(minutes=5),
+    },
+    # 'send-daily-digests' and 'roll-up-board-analytics' are added in trello/celery.py, as
+    # their crontab schedules need Celery
+}
+
 
 
 # smtp email settings
@@ -204,6 +313,30 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"  
 
+# collectstatic writes content-hashed copies of the static files plus their gzip/brotli
+# variants (core.storage); StaticFilesMiddleware serves them from STATIC_ROOT, the hashed
+# ones with an immutable Cache-Control.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+}
+SERVE_STATIC = os.environ.get('TRELLO_SERVE_STATIC', '1') == '1'
+
+# Uploaded files (Trello exports waiting to be imported), not served
+MEDIA_ROOT = os.environ.get('TRELLO_MEDIA_ROOT', BASE_DIR / 'media')
+APP_SHELL_CACHE_SECONDS = int(os.environ.get('TRELLO_APP_SHELL_CACHE_SECONDS', 24 * 3600))  # per language
+
+# Cache shared by the web and worker processes (e.g. redis://localhost:6379/1); without it
+# every process has its own in-memory cache
+CACHE_URL = os.environ.get('TRELLO_CACHE_URL', '')
+CACHES = {
+    'default': (
+        {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}
+        if CACHE_URL else
+        {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -225,7 +358,6 @@ SESSION_COOKIE_SECURE = False
 SESSION_COOKIE_HTTPONLY = True
 
 # JWT Settings 
-from datetime import timedelta
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -237,23 +369,125 @@ SIMPLE_JWT = {
 
 
 
+# Logging: records go through a bounded in-memory queue to a listener thread that writes
+# JSON lines to a size-capped rotating file (and text to the console). SQL statements
+# (django.db.backends, only emitted when DEBUG is on) are sampled.
+LOG_DIR = Path(os.environ.get('TRELLO_LOG_DIR', BASE_DIR / 'logs'))  # created on the first record written
+LOG_LEVEL = os.environ.get('TRELLO_LOG_LEVEL', 'INFO')
+SQL_LOG_LEVEL = os.environ.get('TRELLO_SQL_LOG_LEVEL', 'INFO')  # DEBUG logs SQL statements
+SQL_LOG_SAMPLE_RATE = float(os.environ.get('TRELLO_SQL_LOG_SAMPLE_RATE', 0.01))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
+    'filters': {
+        'sql_sampling': {
+            '()': 'core.log.SamplingFilter',
+            'rate': SQL_LOG_SAMPLE_RATE,
         },
-        'file': {
-            'class': 'logging.FileHandler',
-            'filename': 'debug.log',
+    },
+    'handlers': {
+        # Writes the records from a listener thread to its own target handlers (see core.log)
+        'queue': {
+            '()': 'core.log.QueueListenerHandler',
+            'formatters': {
+                'json': {
+                    '()': 'core.log.JsonFormatter',
+                },
+                'text': {
+                    'format': '{asctime} {levelname} {name} {message}',
+                    'style': '{',
+                },
+            },
+            'handlers': {
+                'console': {
+                    'class': 'logging.StreamHandler',
+                    'formatter': 'text',
+                },
+                'file': {
+                    'class': 'core.log.RotatingFileHandler',
+                    'filename': LOG_DIR / 'trello.log',
+                    'maxBytes': 10 * 1024 * 1024,
+                    'backupCount': 5,
+                    'encoding': 'utf-8',
+                    'delay': True,
+                    'formatter': 'json',
+                },
+            },
+            'queue_size': 10000,
         },
     },
     'loggers': {
         '': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
-            'propagate': True,
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+        },
+        'django.db.backends': {
+            'level': SQL_LOG_LEVEL,
+            'filters': ['sql_sampling'],
         },
     },
-}
\ No newline at end of file
+}
+
+# On-demand profiling: staff requests with `X-Profile: 1` (or `?_profile=1`) run under
+# cProfile and capture statements slower than PROFILING_SLOW_SQL_MS with their query plan.
+# Profiles are written to PROFILING_DIR; list them with `manage.py profiles`.
+PROFILING = os.environ.get('TRELLO_PROFILING', '1') == '1'
+PROFILING_DIR = Path(os.environ.get('TRELLO_PROFILING_DIR', LOG_DIR / 'profiles'))
+PROFILING_SLOW_SQL_MS = float(os.environ.get('TRELLO_PROFILING_SLOW_SQL_MS', 50))
+PROFILING_KEEP = int(os.environ.get('TRELLO_PROFILING_KEEP', 200))  # newest profiles kept
+
+# OpenAPI schema: written to OPENAPI_SCHEMA_DIR by `manage.py generate_openapi_schema`, or
+# on the first request after the URLconf or API code changed, and served from there. The
+# swagger/ and redoc/ pages load it instead of generating the schema on each view.
+OPENAPI_SCHEMA_DIR = Path(os.environ.get('TRELLO_OPENAPI_SCHEMA_DIR', BASE_DIR / 'openapi'))
+SWAGGER_SETTINGS = {'SPEC_URL': 'openapi-schema-json'}
+REDOC_SETTINGS = {'SPEC_URL': 'openapi-schema-json'}
+
+# Workspaces: quotas of new workspaces (changed per workspace in the admin); how long the
+# database of a workspace is cached for the routing middleware
+WORKSPACE_MAX_BOARDS_PER_USER = int(os.environ.get('TRELLO_WORKSPACE_MAX_BOARDS_PER_USER', 5))
+WORKSPACE_MAX_BOARD_MEMBERS = int(os.environ.get('TRELLO_WORKSPACE_MAX_BOARD_MEMBERS', 10))
+WORKSPACE_DATABASE_CACHE_SECONDS = int(os.environ.get('TRELLO_WORKSPACE_DATABASE_CACHE_SECONDS', 300))
+
+# Soft delete: deleted boards can be restored for SOFT_DELETE_UNDO_MINUTES; then the boards,
+# lists and tasks are purged by the beat schedule, SOFT_DELETE_PURGE_BATCH_SIZE tasks per
+# transaction (see boards.trash)
+SOFT_DELETE_UNDO_MINUTES = int(os.environ.get('TRELLO_SOFT_DELETE_UNDO_MINUTES', 30))
+SOFT_DELETE_PURGE_BATCH_SIZE = int(os.environ.get('TRELLO_SOFT_DELETE_PURGE_BATCH_SIZE', 1000))
+
+# Archive: boards without changes for BOARD_ARCHIVE_IDLE_DAYS are moved to compressed cold
+# storage by the archive_boards command, BOARD_ARCHIVE_BATCH_SIZE tasks at a time (see
+# boards.archive)
+BOARD_ARCHIVE_IDLE_DAYS = int(os.environ.get('TRELLO_BOARD_ARCHIVE_IDLE_DAYS', 180))
+BOARD_ARCHIVE_BATCH_SIZE = int(os.environ.get('TRELLO_BOARD_ARCHIVE_BATCH_SIZE', 1000))
+
+# Export: tasks read at a time when boards are streamed as JSON Lines or CSV (see boards.export)
+EXPORT_CHUNK_SIZE = int(os.environ.get('TRELLO_EXPORT_CHUNK_SIZE', 2000))
+
+# Trello import: cards inserted at a time, and the largest export imported during the upload;
+# larger ones are imported by a Celery task (see boards.trello_import)
+IMPORT_BATCH_SIZE = int(os.environ.get('TRELLO_IMPORT_BATCH_SIZE', 1000))
+IMPORT_INLINE_MAX_BYTES = int(os.environ.get('TRELLO_IMPORT_INLINE_MAX_BYTES', 1024 * 1024))
+
+# Board analytics: the counts of the lists of the boards changed each day are rolled up at
+# BOARD_ROLLUP_HOUR (UTC), BOARD_ROLLUP_CHUNK_SIZE boards per transaction; the analytics
+# endpoint reads at most BOARD_ANALYTICS_MAX_DAYS of them (see boards.analytics)
+BOARD_ROLLUP_HOUR = int(os.environ.get('TRELLO_BOARD_ROLLUP_HOUR', 0))
+BOARD_ROLLUP_CHUNK_SIZE = int(os.environ.get('TRELLO_BOARD_ROLLUP_CHUNK_SIZE', 100))
+BOARD_ANALYTICS_MAX_DAYS = int(os.environ.get('TRELLO_BOARD_ANALYTICS_MAX_DAYS', 366))
+
+# /batch/ endpoint: most sub-requests one batch may run
+BATCH_MAX_REQUESTS = int(os.environ.get('TRELLO_BATCH_MAX_REQUESTS', 20))
+
+# Notifications: unread counts are cached per user (see notifications.inbox); tasks due
+# within NOTIFICATION_DUE_SOON_HOURS are announced to their assignees, and notifications
+# older than NOTIFICATION_RETENTION_DAYS are deleted in batches by the beat schedule. The
+# unread notifications are also emailed as a daily digest at NOTIFICATION_DIGEST_HOUR (UTC),
+# NOTIFICATION_DIGEST_CHUNK_SIZE users at a time (see notifications.digest).
+NOTIFICATION_UNREAD_CACHE_SECONDS = int(os.environ.get('TRELLO_NOTIFICATION_UNREAD_CACHE_SECONDS', 300))
+NOTIFICATION_DUE_SOON_HOURS = int(os.environ.get('TRELLO_NOTIFICATION_DUE_SOON_HOURS', 24))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('TRELLO_NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_PURGE_BATCH_SIZE = int(os.environ.get('TRELLO_NOTIFICATION_PURGE_BATCH_SIZE', 1000))
+NOTIFICATION_DIGEST_HOUR = int(os.environ.get('TRELLO_NOTIFICATION_DIGEST_HOUR', 7))
+NOTIFICATION_DIGEST_CHUNK_SIZE = int(os.environ.get('TRELLO_NOTIFICATION_DIGEST_CHUNK_SIZE', 500))
@@ -6,6 +6,7 @@ user's preferred language, either from a JWT token or session-based authenticati
 It ensures the language is activated for each request and deactivated afterward to prevent memory leaks.
 """
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.utils import translation
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.authentication import JWTAuthentication
@@ -20,7 +21,12 @@ class UserLanguageMiddleware:
     Activates the user's preferred language for each request, either from a JWT token or session.
     Falls back to the session language or default if no user language is found.
     Deactivates translation after processing to prevent memory leaks.
+    Supports async request handling: the JWT user is then left to the async views, which
+    authenticate it with the async ORM and activate its language (see core.async_views).
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         """
         Initializes the middleware with the get_response callable.
@@ -29,6 +35,8 @@ class UserLanguageMiddleware:
             get_response: The next middleware or view in the request-response cycle.
         """
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
         """
@@ -44,17 +52,9 @@ class UserLanguageMiddleware:
         Returns:
             Response: The response from the next middleware or view.
         """
-        # Set language based on user
-        user_language = self.get_user_language(request)
-        if user_language:
-            translation.activate(user_language)
-            request.LANGUAGE_CODE = user_language
-        else:
-            # If user is not authenticated, use session language if available
-            session_language = request.session.get('_language')
-            if session_language:
-                translation.activate(session_language)
-                request.LANGUAGE_CODE = session_language
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.activate_language(request, self.get_request_language(request))
 
         response = self.get_response(request)
         
@@ -63,6 +63,67 @@ class UserLanguageMiddleware:
         
         return response
 
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+
+        Only the session user and the session language apply here, so the request loads its
+        JWT user once, in the view, and without a thread hop.
+        """
+        self.activate_language(request, await self.aget_session_language(request))
+
+        response = await self.get_response(request)
+
+        # Deactivate translation to prevent memory leaks
+        translation.deactivate()
+
+        return response
+
+    def get_request_language(self, request):
+        """
+        Determines the language of the request: the user's preferred language, else the session language.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            str or None: The language code, or None if neither is set.
+        """
+        # Set language based on user
+        user_language = self.get_user_language(request)
+        if user_language:
+            return user_language
+        # If user is not authenticated, use session language if available
+        return request.session.get('_language')
+
+    async def aget_session_language(self, request):
+        """
+        Determines the language of an async request: the session user's preferred language,
+        else the session language.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            str or None: The language code, or None if neither is set.
+        """
+        user = await request.auser()
+        if user.is_authenticated and getattr(user, 'preferred_language', None):
+            return user.preferred_language
+        return await request.session.aget('_language')
+
+    def activate_language(self, request, language):
+        """
+        Activates a language for the request, if any.
+
+        Args:
+            request: The HTTP request object.
+            language (str or None): The language code.
+        """
+        if language:
+            translation.activate(language)
+            request.LANGUAGE_CODE = language
+
     def get_user_language(self, request):
         """
         Determines the user's preferred language from JWT token or session.
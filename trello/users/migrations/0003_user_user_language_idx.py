@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_alter_user_preferred_language'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['preferred_language', 'id'], name='user_language_idx'),
+        ),
+    ]
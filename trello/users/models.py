@@ -34,6 +34,16 @@ class User(AbstractUser):
         default='en'
     )
 
+    class Meta(AbstractUser.Meta):
+        """
+        Meta class for User.
+
+        The index serves the digest emails, which read the users grouped by language.
+        """
+        indexes = [
+            models.Index(fields=['preferred_language', 'id'], name='user_language_idx'),
+        ]
+
     def __str__(self):
         """
         Returns the string representation of the User instance.
@@ -1,3 +1,42 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from core.querybudget import query_budget
+from .views import ProfileView
+
+User = get_user_model()
+
+
+class UserTests(APITestCase):
+    """
+    Registration, JWT login and the profile of the user.
+    """
+
+    def test_register_and_obtain_a_token(self):
+        response = self.client.post('/users/register/', {
+            'username': 'alice', 'email': 'alice@example.com', 'password': 'secret-pass', 'preferred_language': 'fr',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('password', response.data)
+        self.assertEqual(User.objects.get(username='alice').preferred_language, 'fr')
+
+        response = self.client.post('/api/token/', {'username': 'alice', 'password': 'secret-pass'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+
+    def test_invalid_language_is_rejected(self):
+        response = self.client.post('/users/register/', {
+            'username': 'alice', 'email': 'alice@example.com', 'password': 'secret-pass', 'preferred_language': 'xx',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('preferred_language', response.data)
+
+    def test_profile(self):
+        user = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.client.force_authenticate(user)
+
+        with query_budget(view=ProfileView, method='PATCH'):
+            response = self.client.patch('/users/profile/', {'name': 'Alice'})
+        self.assertEqual(response.status_code, 200)
+        with query_budget(view=ProfileView):
+            self.assertEqual(self.client.get('/users/profile/').data['name'], 'Alice')
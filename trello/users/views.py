@@ -13,10 +13,11 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView as BaseTokenObtainPairView
 from django.contrib.auth import authenticate
+from core.mixins import SerializerTimingMixin
 from .models import User
 from .serializers import UserSerializer, RegisterSerializer
 
-class RegisterView(generics.CreateAPIView):
+class RegisterView(SerializerTimingMixin, generics.CreateAPIView):
     """
     API view for user registration.
 
@@ -65,7 +66,7 @@ class RegisterView(generics.CreateAPIView):
             response['X-User-Language'] = request.session['_language']
         return response
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(SerializerTimingMixin, generics.RetrieveUpdateAPIView):
     """
     API view for retrieving and updating user profiles.
 
@@ -74,6 +75,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 6, 'PUT': 8, 'PATCH': 8}
 
     def get_object(self):
         """
@@ -0,0 +1,28 @@
+from django.contrib import admin
+from .models import Workspace
+
+@admin.register(Workspace)
+class WorkspaceAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the Workspace model.
+
+    This class customizes the Django admin interface for the Workspace model, where the
+    staff change the quotas of a workspace. Its database is changed with the move_workspace
+    command, which also moves the boards.
+    """
+    list_display = ('name', 'owner', 'is_personal', 'max_boards_per_user', 'max_board_members', 'database', 'created_at')
+    list_filter = ('is_personal', 'database', 'created_at')
+    search_fields = ('name', 'owner__username')
+    ordering = ('-created_at',)
+    filter_horizontal = ('members',)
+    readonly_fields = ('database', 'created_at', 'updated_at')
+    raw_id_fields = ('owner',)
+
+    def get_queryset(self, request):
+        """
+        Customize the queryset to optimize database queries.
+
+        Returns:
+            Queryset: A queryset with the owner selected to reduce database hits.
+        """
+        return super().get_queryset(request).select_related('owner')
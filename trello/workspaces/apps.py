@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+
+class WorkspacesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'workspaces'
+
+    def ready(self):
+        from django.conf import settings
+
+        if settings.WORKSPACE_DATABASES:
+            from django.contrib.auth import get_user_model
+            from django.db.models.signals import post_save
+            from .tenancy import copy_saved_user
+
+            # Owners, members and assignees are joined with the tenant tables of each database
+            post_save.connect(copy_saved_user, sender=get_user_model(), weak=False)
@@ -0,0 +1,122 @@
+"""
+Moves the boards of a workspace, with everything on them, to another database.
+
+The rows (deleted ones and archived boards too, see core.softdelete and boards.archive) are
+copied with their ids and timestamps in bulk, table by table, in one transaction on the
+target database; then the workspace is switched to it and the rows are deleted from the
+source, in one transaction there. Requests naming the workspace (X-Workspace header) follow
+it once the cached database of the workspace expires.
+
+A workspace only moves to a database later in settings.WORKSPACE_DATABASES than its own (from
+'default' to any): the ids it brings along then stay below the id range of the target.
+Writes to the workspace while it is moved are lost: run it while the workspace is idle.
+"""
+
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+
+from boards.models import ArchivedBoard, Board
+from invitations.models import Invitation
+from lists.models import ChecklistItem, Label, List, Task, TaskLabel
+from workspaces.models import Workspace
+from workspaces.tenancy import copy_users, reserve_id_range, workspace_database_cache_key
+
+# The tenant tables in the order they are copied (referenced rows first), with the lookup
+# from each to the workspace
+TABLES = (
+    (Board, 'workspace'),
+    (Board.members.through, 'board__workspace'),
+    (List, 'board__workspace'),
+    (Label, 'board__workspace'),
+    (Invitation, 'board__workspace'),
+    (Task, 'list__board__workspace'),
+    (Task.assigned_users.through, 'task__list__board__workspace'),
+    (TaskLabel, 'task__list__board__workspace'),
+    (ChecklistItem, 'task__list__board__workspace'),
+    (ArchivedBoard, 'workspace'),
+    (ArchivedBoard.members.through, 'archivedboard__workspace'),
+)
+
+
+@contextmanager
+def keep_timestamps(model):
+    """
+    Lets the rows of a model be inserted with their own auto_now/auto_now_add timestamps.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def rank(alias):
+    return 0 if alias == DEFAULT_DB_ALIAS else settings.WORKSPACE_DATABASES.index(alias) + 1
+
+
+class Command(BaseCommand):
+    help = 'Moves the boards of a workspace to one of the WORKSPACE_DATABASES'
+
+    def add_arguments(self, parser):
+        parser.add_argument('workspace', type=int, help='The workspace id')
+        parser.add_argument('database', help='The target database alias')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        try:
+            workspace = Workspace.objects.get(pk=options['workspace'])
+        except Workspace.DoesNotExist:
+            raise CommandError(f"Workspace {options['workspace']} does not exist.")
+        source, target = workspace.database, options['database']
+        if target not in settings.WORKSPACE_DATABASES:
+            raise CommandError(f"Unknown database {target!r}; add it to TRELLO_WORKSPACE_DATABASE_PATHS.")
+        if rank(target) <= rank(source):
+            raise CommandError(f"Workspace {workspace.pk} is on {source!r}, which {target!r} does not come after.")
+
+        started = time.perf_counter()
+        reserve_id_range(target)
+        copy_users(target)
+
+        copied = {}
+        try:
+            with transaction.atomic(using=target):
+                for model, lookup in TABLES:
+                    rows = model._base_manager.using(source).filter(**{lookup: workspace}).order_by('pk')
+                    rows = rows.iterator(chunk_size=options['batch_size'])
+                    count = 0
+                    with keep_timestamps(model):
+                        while batch := list(islice(rows, options['batch_size'])):
+                            model.objects.using(target).bulk_create(batch)
+                            count += len(batch)
+                    copied[model._meta.db_table] = count
+        except IntegrityError as error:
+            raise CommandError(f'Rows of workspace {workspace.pk} already exist on {target!r}: {error}')
+
+        Workspace.objects.filter(pk=workspace.pk).update(database=target)
+        cache.delete(workspace_database_cache_key(workspace.pk))
+
+        with transaction.atomic(using=source):
+            # Raw deletes, referencing rows first: the ORM would also delete the notifications
+            # of the boards, which stay valid on the default database
+            for model, lookup in reversed(TABLES):
+                model._base_manager.using(source).filter(**{lookup: workspace})._raw_delete(source)
+
+        for table, count in copied.items():
+            self.stdout.write(f'{table}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved workspace {workspace.pk} from {source!r} to {target!r} '
+            f'in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,131 @@
+"""
+Middleware that routes the tenant tables of a request to the database of its workspace.
+
+A client working in a workspace placed on a database of its own sends its id in the
+X-Workspace header; the boards, lists, tasks and invitations of the request are then read
+from and written to that database (see core.routers.TenantRouter). Without the header, or
+for workspaces on the default database, the request uses the default database.
+
+The header is only honoured for the owner and the members of the workspace: the user is
+taken from the JWT of the request, which is validated here without a query, and other
+users get 403 Forbidden.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.routers import using_tenant_database
+from .tenancy import member_workspace_database
+
+WORKSPACE_HEADER = 'HTTP_X_WORKSPACE'
+
+
+def token_user_id(request):
+    """
+    Returns the id of the user whose JWT authenticates the request.
+
+    Only the token is validated: whether the user still exists and is active is checked by
+    the view's authentication, as for any request.
+
+    Args:
+        request: The Django HttpRequest.
+
+    Returns:
+        int or None: The user id, or None without a valid token.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        user_id = authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except InvalidToken:
+        return None
+    return int(user_id) if str(user_id).isdigit() else None
+
+
+class WorkspaceRoutingMiddleware:
+    """
+    Middleware that activates the database of the workspace named by the X-Workspace header.
+
+    The database and the members of each workspace are cached
+    (settings.WORKSPACE_DATABASE_CACHE_SECONDS), so routing costs no query. Requests without
+    a valid JWT are not routed, and are answered by the views (401 for the API). Access to
+    the boards is still checked by the views.
+    The middleware removes itself when no workspace database is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initializes the middleware with the get_response callable.
+
+        Args:
+            get_response: The next middleware or view in the request-response cycle.
+
+        Raises:
+            MiddlewareNotUsed: If settings.WORKSPACE_DATABASES is empty.
+        """
+        if not settings.WORKSPACE_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Runs the request with the tenant tables routed to its workspace's database.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            Response: The response from the next middleware or view; 400 if the header is
+            not a workspace id, 403 if the user is not a member of the workspace.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        workspace_id = request.META.get(WORKSPACE_HEADER)
+        if workspace_id is None:
+            return self.get_response(request)
+        if not workspace_id.isdigit():
+            return self.invalid_header()
+        user_id = token_user_id(request)
+        if user_id is None:
+            return self.get_response(request)
+        alias = member_workspace_database(int(workspace_id), user_id)
+        if alias is None:
+            return self.forbidden()
+        with using_tenant_database(alias):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__, used when the rest of the chain is async.
+        """
+        workspace_id = request.META.get(WORKSPACE_HEADER)
+        if workspace_id is None:
+            return await self.get_response(request)
+        if not workspace_id.isdigit():
+            return self.invalid_header()
+        user_id = token_user_id(request)
+        if user_id is None:
+            return await self.get_response(request)
+        alias = await sync_to_async(member_workspace_database)(int(workspace_id), user_id)
+        if alias is None:
+            return self.forbidden()
+        with using_tenant_database(alias):
+            return await self.get_response(request)
+
+    def invalid_header(self):
+        return JsonResponse({'detail': 'The X-Workspace header must be a workspace id.'}, status=400)
+
+    def forbidden(self):
+        return JsonResponse({'detail': 'You are not a member of this workspace.'}, status=403)
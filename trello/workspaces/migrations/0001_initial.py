@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:55
+
+import django.db.models.deletion
+import workspaces.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Workspace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_personal', models.BooleanField(default=False)),
+                ('max_boards_per_user', models.PositiveIntegerField(default=workspaces.models.default_max_boards_per_user)),
+                ('max_board_members', models.PositiveIntegerField(default=workspaces.models.default_max_board_members)),
+                ('database', models.CharField(default='default', editable=False, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('members', models.ManyToManyField(blank=True, related_name='workspace_memberships', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owned_workspaces', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_personal', True)), fields=('owner',), name='workspace_personal_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+"""
+Django model for a Workspace entity.
+
+This module defines the Workspace model: the organization that owns boards. Each workspace
+carries the quotas of its boards and the database its boards are stored in, so large
+workspaces can be given their own database (see core.routers.TenantRouter).
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models
+
+
+def default_max_boards_per_user():
+    return settings.WORKSPACE_MAX_BOARDS_PER_USER
+
+
+def default_max_board_members():
+    return settings.WORKSPACE_MAX_BOARD_MEMBERS
+
+
+class Workspace(models.Model):
+    """
+    Represents a workspace, which owns boards.
+
+    Attributes:
+        name (CharField): The name of the workspace, with a maximum length of 100 characters.
+        owner (ForeignKey): The user who owns the workspace, linked to the AUTH_USER_MODEL.
+                          Workspaces are removed if the owner is deleted (CASCADE).
+        members (ManyToManyField): Users who may create boards in the workspace.
+        is_personal (BooleanField): Whether this is the owner's personal workspace, where their
+                                  boards go by default. A user has at most one.
+        max_boards_per_user (PositiveIntegerField): Boards of the workspace one user may own or be a member of.
+        max_board_members (PositiveIntegerField): Members one board of the workspace may have.
+        database (CharField): The alias of the database holding the boards of the workspace.
+        created_at (DateTimeField): Timestamp when the workspace was created, set automatically on creation.
+        updated_at (DateTimeField): Timestamp when the workspace was last updated, updated automatically.
+    """
+    name = models.CharField(max_length=100)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='owned_workspaces')
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='workspace_memberships', blank=True)
+    is_personal = models.BooleanField(default=False)
+    max_boards_per_user = models.PositiveIntegerField(default=default_max_boards_per_user)
+    max_board_members = models.PositiveIntegerField(default=default_max_board_members)
+    database = models.CharField(max_length=50, default=DEFAULT_DB_ALIAS, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """
+        Meta class for Workspace.
+
+        A user has a single personal workspace.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner'], condition=models.Q(is_personal=True), name='workspace_personal_unique'
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns the string representation of the Workspace instance.
+
+        Returns:
+            str: The name of the workspace.
+        """
+        return self.name
@@ -0,0 +1,41 @@
+"""
+Django REST Framework serializer for the Workspace model.
+
+This module defines the WorkspaceSerializer, which handles serialization and deserialization
+of Workspace model instances for API interactions. The quotas and the database of a
+workspace are shown but only changed by the staff, in the admin.
+"""
+
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+from .models import Workspace
+from users.serializers import UserSerializer
+
+class WorkspaceSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Workspace model.
+
+    Attributes:
+        owner (UserSerializer): Serializer for the workspace's owner, read-only.
+        members (PrimaryKeyRelatedField): The users who may create boards in the workspace,
+                                        by primary key, optional.
+    """
+    owner = UserSerializer(read_only=True)
+    members = serializers.PrimaryKeyRelatedField(
+        many=True,
+        queryset=get_user_model().objects.all(),
+        required=False
+    )
+
+    class Meta:
+        """
+        Meta class for WorkspaceSerializer.
+
+        Defines the model to serialize, fields to include, and read-only fields.
+        """
+        model = Workspace
+        fields = [
+            'id', 'name', 'owner', 'members', 'is_personal', 'max_boards_per_user', 'max_board_members',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = ['is_personal', 'max_boards_per_user', 'max_board_members', 'created_at', 'updated_at']
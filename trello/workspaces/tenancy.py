@@ -0,0 +1,308 @@
+"""
+Workspace scoping of boards: personal workspaces, quotas and database placement.
+
+The quotas of a workspace replace the fixed limits of 5 boards per user and 10 members per
+board: they are counted within the workspace, on the (workspace, owner) index of boards,
+and each workspace can be given its own. The database of a workspace is looked up once and
+cached, so routing a request to it costs no query.
+
+The rows created in a workspace database get ids from a range of their own, so an id (in
+a URL, or in a notification on the default database) never names two rows.
+"""
+
+from collections import Counter
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.core.cache import cache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+from core.routers import tenant_database
+from .models import Workspace
+
+# Ids of the rows created in the n-th workspace database start at n * WORKSPACE_ID_SPACING.
+# Nothing but this convention keeps the ranges apart: they hold while the order of
+# WORKSPACE_DATABASES never changes, the tables keep their AUTOINCREMENT sequences (which
+# reserve_id_range() moves), and no database creates 10**12 rows of a table.
+WORKSPACE_ID_SPACING = 10 ** 12
+
+# The columns of the users copied to the workspace databases: the ones their foreign keys
+# and the serializers of joined users (owners, members, assignees) need. No password hash
+# or permission is copied.
+USER_COPY_FIELDS = ('id', 'username', 'name', 'email', 'preferred_language')
+
+
+def accessible_workspaces(user):
+    """
+    Returns the workspaces a user owns or is a member of, ready for WorkspaceSerializer.
+
+    Args:
+        user: The user.
+
+    Returns:
+        QuerySet: The workspaces, with the owner joined and the members prefetched.
+    """
+    return (
+        Workspace.objects.filter(Q(owner=user) | Q(members=user))
+        .distinct()
+        .select_related('owner')
+        .prefetch_related('members')
+    )
+
+
+def personal_workspace(user):
+    """
+    Returns the personal workspace of a user, creating it on first use.
+
+    Args:
+        user: The user.
+
+    Returns:
+        Workspace: The workspace the user's boards are created in by default.
+    """
+    workspace, _created = Workspace.objects.get_or_create(
+        owner=user, is_personal=True, defaults={'name': f"{user.username}'s workspace"}
+    )
+    return workspace
+
+
+def check_board_quota(workspace, user, message):
+    """
+    Ensures a user may own or join one more board of a workspace.
+
+    Args:
+        workspace (Workspace): The workspace of the board.
+        user: The user who would own or join the board.
+        message (str): The error, formatted with the quota as {max_boards}.
+
+    Raises:
+        ValidationError: If the user already owns or is a member of max_boards_per_user
+                        boards of the workspace.
+    """
+    # Imported here: the boards app depends on this one
+    from boards.models import Board
+
+    total_boards = Board.objects.filter(
+        Q(owner=user) | Q(members=user), workspace=workspace
+    ).distinct().count()
+    if total_boards >= workspace.max_boards_per_user:
+        raise ValidationError(message.format(max_boards=workspace.max_boards_per_user))
+
+
+def users_within_board_quota(workspace, user_ids):
+    """
+    Returns those of some users who may own or join one more board of a workspace.
+
+    The boards of all the users are counted at once, with one grouped query for the boards
+    they own and one for the boards they joined, where check_board_quota() would count them
+    one user at a time.
+
+    Args:
+        workspace (Workspace): The workspace.
+        user_ids (list): The users, in the order kept in the result.
+
+    Returns:
+        list: The ids of the users under max_boards_per_user boards of the workspace.
+    """
+    # Imported here: the boards app depends on this one
+    from boards.models import Board
+
+    boards = Counter(dict(
+        Board.objects.filter(workspace=workspace, owner_id__in=user_ids)
+        .values_list('owner_id').annotate(count=Count('pk'))
+    ))
+    boards.update(dict(
+        Board.members.through.objects.filter(
+            Board.objects.live_filter(prefix='board__'), board__workspace=workspace, user_id__in=user_ids,
+        ).values_list('user_id').annotate(count=Count('pk'))
+    ))
+    return [user_id for user_id in user_ids if boards[user_id] < workspace.max_boards_per_user]
+
+
+def check_member_quota(board):
+    """
+    Ensures a board may have one more member.
+
+    Args:
+        board (Board): The board, with its workspace selected.
+
+    Raises:
+        ValidationError: If the board has max_board_members members already.
+    """
+    max_members = board.workspace.max_board_members
+    if board.members.count() >= max_members:
+        raise ValidationError(f"Cannot add more than {max_members} members to a board.")
+
+
+def workspace_database_cache_key(workspace_id):
+    return f'workspace-placement:{workspace_id}'
+
+
+def workspace_placement(workspace_id):
+    """
+    Returns the database of a workspace and the users who may work in it, from the cache.
+
+    Unknown workspaces are not cached, so a workspace is routed as soon as it is created.
+    Views changing the owner or the members of a workspace delete the cached entry; other
+    changes (the admin) are seen after settings.WORKSPACE_DATABASE_CACHE_SECONDS.
+
+    Args:
+        workspace_id (int): The workspace.
+
+    Returns:
+        tuple: (alias, frozenset of the ids of its owner and members), or None for unknown
+        workspaces.
+    """
+    key = workspace_database_cache_key(workspace_id)
+    placement = cache.get(key)
+    if placement is None:
+        workspace = Workspace.objects.filter(pk=workspace_id).values_list('database', 'owner_id').first()
+        if workspace is None:
+            return None
+        members = Workspace.members.through.objects.filter(workspace_id=workspace_id).values_list('user_id', flat=True)
+        placement = (workspace[0], frozenset([workspace[1], *members]))
+        cache.set(key, placement, settings.WORKSPACE_DATABASE_CACHE_SECONDS)
+    return placement
+
+
+def workspace_database(workspace_id):
+    """
+    Returns the alias of the database holding the boards of a workspace.
+
+    Args:
+        workspace_id (int): The workspace.
+
+    Returns:
+        str: The alias; 'default' for unknown workspaces and aliases that are not configured.
+    """
+    if not settings.WORKSPACE_DATABASES:
+        return DEFAULT_DB_ALIAS
+    placement = workspace_placement(workspace_id)
+    alias = placement[0] if placement is not None else DEFAULT_DB_ALIAS
+    return alias if alias in settings.WORKSPACE_DATABASES else DEFAULT_DB_ALIAS
+
+
+def member_workspace_database(workspace_id, user_id):
+    """
+    Returns the database of a workspace for its owner and members only.
+
+    Args:
+        workspace_id (int): The workspace.
+        user_id (int): The user.
+
+    Returns:
+        str or None: The alias, as workspace_database() returns it; None if the workspace does
+        not exist or the user is neither its owner nor a member.
+    """
+    placement = workspace_placement(workspace_id)
+    if placement is None or user_id not in placement[1]:
+        return None
+    return placement[0] if placement[0] in settings.WORKSPACE_DATABASES else DEFAULT_DB_ALIAS
+
+
+def check_workspace_database(workspace):
+    """
+    Ensures the boards of a workspace are written to the database of the active workspace.
+
+    A board created in a workspace on another database than the request's (see the
+    X-Workspace header) would be stored where its workspace's boards are not read from.
+
+    Args:
+        workspace (Workspace): The workspace of the new board.
+
+    Raises:
+        ValidationError: If the workspace is on another database.
+    """
+    if workspace_database(workspace.pk) != tenant_database():
+        raise ValidationError({'workspace': [
+            "The boards of this workspace are on another database: send its id in the X-Workspace header."
+        ]})
+
+
+def tenant_models():
+    """
+    Returns the models whose tables follow a workspace to its database, M2M tables included.
+    """
+    return [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.app_label in settings.TENANT_APP_LABELS
+    ]
+
+
+def reserve_id_range(alias):
+    """
+    Moves the id sequences of the tenant tables of a workspace database to its own range.
+
+    Args:
+        alias (str): One of settings.WORKSPACE_DATABASES.
+
+    Raises:
+        ImproperlyConfigured: If a sequence is already past the range, e.g. because the
+            order of WORKSPACE_DATABASES changed.
+    """
+    offset = (settings.WORKSPACE_DATABASES.index(alias) + 1) * WORKSPACE_ID_SPACING
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT name FROM sqlite_sequence WHERE seq >= %s', [offset + WORKSPACE_ID_SPACING])
+        overrun = sorted(name for name, in cursor.fetchall())
+        if overrun:
+            raise ImproperlyConfigured(
+                f"The ids of {', '.join(overrun)} on {alias!r} are past its range; "
+                "was the order of TRELLO_WORKSPACE_DATABASE_PATHS changed?"
+            )
+        for model in tenant_models():
+            table = model._meta.db_table
+            cursor.execute('UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s', [offset, table])
+            cursor.execute(
+                'INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s '
+                'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)',
+                [table, offset, table],
+            )
+
+
+def copy_users(alias, batch_size=1000):
+    """
+    Copies the users missing from a workspace database into it.
+
+    Only USER_COPY_FIELDS are copied, with an unusable password. The password hashes of
+    copies made before are cleared.
+
+    Args:
+        alias (str): One of settings.WORKSPACE_DATABASES.
+        batch_size (int): Users per INSERT.
+    """
+    User = get_user_model()
+    password = make_password(None)
+    User.objects.using(alias).exclude(password__startswith=UNUSABLE_PASSWORD_PREFIX).update(password=password)
+    users = User.objects.using(DEFAULT_DB_ALIAS).values(*USER_COPY_FIELDS).iterator(chunk_size=batch_size)
+    User.objects.using(alias).bulk_create(
+        (User(**values, password=password) for values in users), batch_size=batch_size, ignore_conflicts=True,
+    )
+
+
+def copy_saved_user(sender, instance, using, raw=False, **kwargs):
+    """
+    Copies a user saved on the default database to every workspace database (post_save receiver).
+
+    The copies are written once the save commits, so a rolled-back save is not copied: the
+    USER_COPY_FIELDS of an existing copy are updated, a missing copy is inserted with an
+    unusable password. Only saves are seen: users changed with QuerySet.update(),
+    bulk_create() or raw SQL keep stale copies until they are saved again, and a workspace
+    database that cannot be written is logged and left behind (copy_users() only adds the
+    missing users).
+    """
+    if raw or using != DEFAULT_DB_ALIAS:
+        return
+    values = {field: getattr(instance, field) for field in USER_COPY_FIELDS}
+
+    def copy_user():
+        for alias in settings.WORKSPACE_DATABASES:
+            copies = sender.objects.using(alias)
+            if not copies.filter(pk=values['id']).update(**values):
+                copies.bulk_create([sender(**values, password=make_password(None))], ignore_conflicts=True)
+
+    transaction.on_commit(copy_user, using=DEFAULT_DB_ALIAS, robust=True)
@@ -0,0 +1,211 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from boards.models import Board
+from core.querybudget import query_budget
+from core.routers import tenant_database
+from lists.models import List, Task
+from .middleware import WorkspaceRoutingMiddleware
+from .models import Workspace
+from .tenancy import WORKSPACE_ID_SPACING, copy_users, personal_workspace, reserve_id_range
+from .views import WorkspaceDetailView
+
+User = get_user_model()
+
+
+def bearer(user):
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+@override_settings(WORKSPACE_DATABASES=['workspace1'])
+class WorkspaceRoutingMiddlewareTests(APITestCase):
+    """
+    The X-Workspace header routes the requests of the owner and the members of a workspace only.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.member = User.objects.create_user(username='bob', email='bob@example.com', password='secret')
+        self.stranger = User.objects.create_user(username='carol', email='carol@example.com', password='secret')
+        self.workspace = Workspace.objects.create(name='Big', owner=self.owner)
+        self.workspace.members.add(self.member)
+        Workspace.objects.filter(pk=self.workspace.pk).update(database='workspace1')
+        self.factory = RequestFactory()
+
+    def route(self, user=None, workspace_id=None):
+        """
+        Runs a request through the middleware and returns the database it was routed to.
+        """
+        databases = []
+
+        def get_response(request):
+            databases.append(tenant_database())
+            return HttpResponse()
+
+        headers = {'HTTP_X_WORKSPACE': str(workspace_id or self.workspace.pk)}
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = bearer(user)
+        response = WorkspaceRoutingMiddleware(get_response)(self.factory.get('/boards/', **headers))
+        return response, databases[0] if databases else None
+
+    def test_owner_and_members_are_routed(self):
+        self.assertEqual(self.route(self.owner)[1], 'workspace1')
+        self.assertEqual(self.route(self.member)[1], 'workspace1')
+
+    def test_other_users_are_forbidden(self):
+        response, database = self.route(self.stranger)
+        self.assertEqual(response.status_code, 403)
+        self.assertIsNone(database)
+
+    def test_unknown_workspace_is_forbidden(self):
+        self.assertEqual(self.route(self.owner, workspace_id=999999)[0].status_code, 403)
+
+    def test_requests_without_a_token_are_not_routed(self):
+        response, database = self.route()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(database, 'default')
+
+    def test_invalid_header(self):
+        request = self.factory.get('/boards/', HTTP_X_WORKSPACE='big', HTTP_AUTHORIZATION=bearer(self.owner))
+        response = WorkspaceRoutingMiddleware(lambda request: HttpResponse())(request)
+        self.assertEqual(response.status_code, 400)
+
+    def test_new_member_is_routed_once_the_workspace_is_updated(self):
+        self.assertEqual(self.route(self.stranger)[0].status_code, 403)
+        self.client.force_authenticate(self.owner)
+        with query_budget(view=WorkspaceDetailView, method='PATCH'):
+            response = self.client.patch(
+                f'/workspaces/{self.workspace.pk}/', {'members': [self.member.pk, self.stranger.pk]}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.route(self.stranger)[1], 'workspace1')
+
+    def test_forbidden_through_the_api(self):
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.stranger))
+        response = self.client.get('/boards/', HTTP_X_WORKSPACE=str(self.workspace.pk))
+        self.assertEqual(response.status_code, 403)
+
+    def test_boards_are_not_created_on_the_database_of_another_workspace(self):
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.owner))
+        response = self.client.post('/boards/', {'title': 'Misplaced', 'workspace': self.workspace.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('workspace', response.data)
+
+        upload = SimpleUploadedFile('board.json', b'{"name": "Misplaced"}', content_type='application/json')
+        response = self.client.post('/boards/imports/', {'file': upload, 'workspace': self.workspace.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Board.objects.filter(title='Misplaced').exists())
+
+
+@skipUnless('workspace1' in settings.DATABASES, 'TRELLO_WORKSPACE_DATABASE_PATHS has no workspace1 database')
+class WorkspaceDatabaseTests(APITestCase):
+    """
+    Boards of a workspace on a database of its own, read and written across workspaces.
+
+    The foreign keys of both databases are checked after each test.
+    """
+    # The test runner sets up the databases of skipped tests too
+    databases = {'default', 'workspace1'} if 'workspace1' in settings.DATABASES else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.stranger = User.objects.create_user(username='carol', email='carol@example.com', password='secret')
+        reserve_id_range('workspace1')
+        copy_users('workspace1')
+        self.workspace = Workspace.objects.create(name='Big', owner=self.owner)
+        Workspace.objects.filter(pk=self.workspace.pk).update(database='workspace1')
+        self.board = Board.objects.using('workspace1').create(title='Remote', owner=self.owner, workspace=self.workspace)
+        self.todo = List.objects.using('workspace1').create(board=self.board, title='To do')
+        self.task = Task.objects.using('workspace1').create(list=self.todo, title='Write the spec')
+
+        # A board of the stranger's on the default database
+        self.local_board = Board.objects.create(
+            title='Local', owner=self.stranger, workspace=personal_workspace(self.stranger)
+        )
+        self.local_list = List.objects.create(board=self.local_board, title='Done')
+
+    def test_members_read_the_workspace_database(self):
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.owner))
+        response = self.client.get(f'/boards/{self.board.pk}/', HTTP_X_WORKSPACE=str(self.workspace.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Remote')
+
+    def test_other_users_cannot_read_it(self):
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.stranger))
+        response = self.client.get(f'/boards/{self.board.pk}/', HTTP_X_WORKSPACE=str(self.workspace.pk))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(f'/boards/{self.board.pk}/').status_code, 404)
+
+    def test_create_in_the_workspace(self):
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.owner))
+        response = self.client.post(
+            '/boards/', {'title': 'Created', 'workspace': self.workspace.pk}, HTTP_X_WORKSPACE=str(self.workspace.pk)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Board.objects.using('workspace1').filter(title='Created').exists())
+        self.assertFalse(Board.objects.filter(title='Created').exists())
+
+    def test_tasks_do_not_move_across_workspaces(self):
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.stranger))
+        response = self.client.patch(
+            f'/lists/tasks/{self.task.pk}/move/', {'list_id': self.local_list.pk, 'order': 0},
+            HTTP_X_WORKSPACE=str(self.workspace.pk),
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.owner))
+        response = self.client.patch(
+            f'/lists/tasks/{self.task.pk}/move/', {'list_id': self.local_list.pk, 'order': 0},
+            HTTP_X_WORKSPACE=str(self.workspace.pk),
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Task.objects.using('workspace1').get(pk=self.task.pk).list_id, self.todo.pk)
+
+    def set_board_sequence(self, seq):
+        with connections['workspace1'].cursor() as cursor:
+            cursor.execute('UPDATE sqlite_sequence SET seq = %s WHERE name = %s', [seq, Board._meta.db_table])
+
+    def test_ids_past_the_range_are_refused(self):
+        self.set_board_sequence(2 * WORKSPACE_ID_SPACING)
+        with self.assertRaises(ImproperlyConfigured):
+            reserve_id_range('workspace1')
+
+    def test_users_are_copied_without_their_password(self):
+        copy = User.objects.using('workspace1').get(pk=self.owner.pk)
+        self.assertEqual((copy.username, copy.email), ('alice', 'alice@example.com'))
+        self.assertFalse(copy.has_usable_password())
+
+        self.owner.name = 'Alice'
+        self.owner.set_password('changed')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.save()
+        copy = User.objects.using('workspace1').get(pk=self.owner.pk)
+        self.assertEqual(copy.name, 'Alice')
+        self.assertFalse(copy.has_usable_password())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            dave = User.objects.create_user(username='dave', email='dave@example.com', password='secret')
+        self.assertFalse(User.objects.using('workspace1').get(pk=dave.pk).has_usable_password())
+
+    def test_copies_of_older_versions_lose_their_password(self):
+        User.objects.using('workspace1').filter(pk=self.owner.pk).update(password=self.owner.password)
+        copy_users('workspace1')
+        self.assertFalse(User.objects.using('workspace1').get(pk=self.owner.pk).has_usable_password())
+
+    def test_foreign_keys_are_enforced(self):
+        orphan = Board.objects.using('workspace1').create(title='Orphan', owner_id=999999, workspace=self.workspace)
+        with self.assertRaises(IntegrityError):
+            connections['workspace1'].check_constraints()
+        orphan.delete()
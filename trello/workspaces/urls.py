@@ -0,0 +1,14 @@
+"""
+URL configuration for the workspace-related endpoints.
+
+This module defines the URL patterns for the workspace application, mapping API endpoints
+to their respective views for listing, creating, retrieving, updating, and deleting workspaces.
+"""
+
+from django.urls import path
+from .views import WorkspaceListCreateView, WorkspaceDetailView
+
+urlpatterns = [
+    path('', WorkspaceListCreateView.as_view(), name='workspace-list-create'),  # Endpoint for listing the user's workspaces or creating a new workspace
+    path('<int:pk>/', WorkspaceDetailView.as_view(), name='workspace-detail'),  # Endpoint for retrieving, updating, or deleting a specific workspace by its primary key
+]
@@ -0,0 +1,90 @@
+"""
+Django REST Framework views for workspace-related API endpoints.
+
+This module defines generic views for listing/creating workspaces and retrieving/updating/
+deleting individual workspaces. Any member may read a workspace; only its owner may change
+or delete it.
+"""
+
+from django.core.cache import cache
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from boards.models import ArchivedBoard, Board
+from core.mixins import AtomicWriteMixin, SerializerTimingMixin
+from .serializers import WorkspaceSerializer
+from .tenancy import accessible_workspaces, workspace_database_cache_key
+
+
+class WorkspaceListCreateView(AtomicWriteMixin, SerializerTimingMixin, generics.ListCreateAPIView):
+    """
+    API view for listing and creating workspaces.
+
+    Handles GET requests to list the workspaces the user owns or is a member of, and POST
+    requests to create a workspace owned by the user, with the default quotas.
+    """
+    serializer_class = WorkspaceSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5, 'POST': 8}
+
+    def get_queryset(self):
+        """
+        Filters queryset to workspaces owned by or where the user is a member.
+
+        Returns:
+            QuerySet: Workspaces accessible to the requesting user.
+        """
+        return accessible_workspaces(self.request.user)
+
+    def perform_create(self, serializer):
+        """
+        Saves the workspace with the requesting user as owner.
+        """
+        serializer.save(owner=self.request.user)
+
+
+class WorkspaceDetailView(AtomicWriteMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    API view for retrieving, updating, or deleting a specific workspace.
+
+    Members may retrieve the workspace; PUT/PATCH and DELETE are limited to its owner.
+    """
+    serializer_class = WorkspaceSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 5, 'PUT': 10, 'PATCH': 10, 'DELETE': 8}
+
+    def get_queryset(self):
+        """
+        Filters queryset to the workspaces the user may read, or owns for unsafe methods.
+
+        Returns:
+            QuerySet: Workspaces accessible to the requesting user.
+        """
+        queryset = accessible_workspaces(self.request.user)
+        if self.request.method not in SAFE_METHODS:
+            queryset = queryset.filter(owner=self.request.user)
+        return queryset
+
+    def perform_update(self, serializer):
+        """
+        Saves the workspace and forgets its cached members, which route the X-Workspace header.
+        """
+        serializer.save()
+        cache.delete(workspace_database_cache_key(serializer.instance.pk))
+
+    def perform_destroy(self, instance):
+        """
+        Deletes an empty workspace.
+
+        Raises:
+            ValidationError: If the workspace is the owner's personal one or still has boards,
+                            archived ones and deleted ones that are not purged yet included.
+        """
+        if instance.is_personal:
+            raise ValidationError("A personal workspace cannot be deleted.")
+        # Deleted boards too, which would otherwise be deleted here at once rather than purged
+        for model in (Board, ArchivedBoard):
+            if model._base_manager.using(instance.database).filter(workspace=instance).exists():
+                raise ValidationError("Delete the boards of the workspace first, and wait for them to be purged.")
+        instance.delete()
+        cache.delete(workspace_database_cache_key(instance.pk))